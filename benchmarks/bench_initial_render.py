@@ -0,0 +1,63 @@
+"""
+Initial render of a large tree: reconcile from an empty map, then write the
+page's HTML from the rendered map.
+
+The tree is a Column of list-like rows (Container > Row > Icon, Text,
+SizedBox, Text), six nodes per row.
+
+Usage:
+    python benchmarks/bench_initial_render.py [node_count] [repeats]
+"""
+import sys
+import time
+
+from pythra.reconciler import Reconciler
+from pythra.styles import EdgeInsets, TextStyle
+from pythra.widgets import Column, Container, Icon, Row, SizedBox, Text
+from pythra.icons import Icons
+
+TITLE = TextStyle(fontSize=14, fontWeight=600)
+PADDING = EdgeInsets.symmetric(horizontal=12, vertical=6)
+
+
+def build_tree(node_count):
+    rows = []
+    for i in range(max(1, node_count // 6)):
+        rows.append(Container(
+            padding=PADDING,
+            child=Row(children=[
+                Icon(Icons.star_outlined),
+                Text(f"Item {i}", style=TITLE),
+                SizedBox(width=8),
+                Text(f"{i * 3} points"),
+            ]),
+        ))
+    return Column(children=rows)
+
+
+def count_nodes(widget):
+    return 1 + sum(count_nodes(c) for c in widget.get_children())
+
+
+def main():
+    node_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    best_reconcile = best_html = float("inf")
+    for _ in range(repeats):
+        root = build_tree(node_count)
+        reconciler = Reconciler()
+        start = time.perf_counter()
+        result = reconciler.reconcile({}, root, "root-container")
+        mid = time.perf_counter()
+        page = reconciler.generate_html(root.get_unique_id(), result.new_rendered_map)
+        end = time.perf_counter()
+        best_reconcile = min(best_reconcile, mid - start)
+        best_html = min(best_html, end - mid)
+    print(f"nodes: {count_nodes(root)}  html: {len(page) / 1024:.0f} KiB  (best of {repeats})")
+    print(f"reconcile: {best_reconcile * 1000:8.1f} ms")
+    print(f"html:      {best_html * 1000:8.1f} ms")
+    print(f"total:     {(best_reconcile + best_html) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Virtual list items built the regular way (reconcile into the main map, then
+serialize) versus compiled into a template plus a data record.
+
+Each item is a list row: Container > Row > Icon, Text, SizedBox, Text,
+TextButton > Text. Reports the Python time per item and the JSON bytes sent
+to the browser per item, and checks that the stamped HTML is the HTML the
+regular path writes.
+
+Usage:
+    python benchmarks/bench_item_templates.py [item_count] [repeats]
+"""
+import json
+import re
+import sys
+import time
+
+from pythra.item_templates import ItemTemplates
+from pythra.reconciler import Reconciler
+from pythra.styles import EdgeInsets, TextStyle
+from pythra.widgets import Container, Icon, Row, SizedBox, Text, TextButton
+from pythra.icons import Icons
+
+TITLE = TextStyle(fontSize=14, fontWeight=600)
+PADDING = EdgeInsets.symmetric(horizontal=12, vertical=6)
+
+
+def open_row():
+    pass
+
+
+def build_row(i):
+    return Container(
+        padding=PADDING,
+        child=Row(children=[
+            Icon(Icons.star_outlined),
+            Text(f"Item {i}", style=TITLE),
+            SizedBox(width=8),
+            Text(f"{i * 3} points"),
+            TextButton(child=Text("Open"), onPressed=open_row),
+        ]),
+    )
+
+
+def regular(reconciler, rendered, i):
+    row = build_row(i)
+    result = reconciler.reconcile(rendered, row, "__limbo__", is_partial_reconciliation=True)
+    rendered.update(result.new_rendered_map)
+    html = reconciler.generate_html(row.get_unique_id(), result.new_rendered_map)
+    return {"html": html, "callback_names": list(result.registered_callbacks)}
+
+
+def templated(templates, reconciler, i):
+    return templates.compile(build_row(i), reconciler)
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    best_regular = best_templated = float("inf")
+    for _ in range(repeats):
+        reconciler, rendered = Reconciler(), {}
+        start = time.perf_counter()
+        full = [regular(reconciler, rendered, i) for i in range(item_count)]
+        best_regular = min(best_regular, time.perf_counter() - start)
+
+        templates = ItemTemplates()
+        start = time.perf_counter()
+        compiled = [templated(templates, reconciler, i) for i in range(item_count)]
+        best_templated = min(best_templated, time.perf_counter() - start)
+
+    for i in (0, item_count - 1):
+        expected = iter(range(1000))
+        html = re.sub(r'id="[^"]*"', lambda m: f'id="p{next(expected)}"', full[i]["html"])
+        assert compiled[i].template.stamp(compiled[i].values, "p") == html, f"item {i} differs"
+
+    full_bytes = sum(len(json.dumps(p)) for p in full) / item_count
+    record_bytes = sum(len(json.dumps(c.record())) for c in compiled) / item_count
+    template_bytes = sum(len(json.dumps(t.to_js())) for t in templates.templates)
+    print(f"items: {item_count}  templates: {len(templates)} ({template_bytes} bytes)  (best of {repeats})")
+    print(f"regular:   {best_regular / item_count * 1e6:7.1f} us/item  {full_bytes:6.0f} bytes/item")
+    print(f"templated: {best_templated / item_count * 1e6:7.1f} us/item  {record_bytes:6.0f} bytes/item")
+
+
+if __name__ == "__main__":
+    main()
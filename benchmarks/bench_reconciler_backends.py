@@ -0,0 +1,35 @@
+"""
+Runs the reconciler fuzz scenarios through every available diff backend and
+reports, per scenario, the patches each backend sent and the time it spent
+diffing. Every frame is checked against a fresh render, and the backends
+against each other (see pythra/tests/reconciler_harness.py).
+
+Usage:
+    python benchmarks/bench_reconciler_backends.py [scenarios] [steps] [max_nodes]
+"""
+import sys
+
+from pythra.tests.reconciler_harness import compare_backends
+
+
+def main():
+    scenarios = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    max_nodes = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    totals = {}
+    print(f"{'seed':>4}  {'backend':<8} {'patches':>7} {'INS':>5} {'REM':>5} {'UPD':>5} {'MOV':>5} {'REP':>5} {'diff ms':>9}")
+    for seed in range(scenarios):
+        for name, report in compare_backends(seed, steps, max_nodes).items():
+            counts = report.patch_counts
+            print(f"{seed:>4}  {name:<8} {report.patches:>7} {counts['INSERT']:>5} {counts['REMOVE']:>5} "
+                  f"{counts['UPDATE']:>5} {counts['MOVE']:>5} {counts['REPLACE']:>5} {report.diff_seconds * 1000:>9.2f}")
+            total = totals.setdefault(name, [0, 0.0])
+            total[0] += report.patches
+            total[1] += report.diff_seconds
+    print(f"all backends agree on {scenarios} scenarios of {steps} frames")
+    for name, (patches, seconds) in totals.items():
+        print(f"{name:<8} {patches:>7} patches {seconds * 1000:9.2f} ms diffing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-node memory overhead of the reconciler's rendered map.
+
+Compares the legacy eight-key dict layout against the slotted `NodeData`
+record. Widgets and props dicts are allocated up front and shared by both
+layouts, so the numbers only cover what the map itself adds per node.
+
+Usage:
+    python benchmarks/bench_rendered_map_memory.py [node_count]
+"""
+import sys
+import tracemalloc
+
+from pythra.base import Widget
+from pythra.reconciler import NodeData
+
+
+class BenchWidget(Widget):
+    pass
+
+
+def build_inputs(count):
+    widgets = [BenchWidget() for _ in range(count)]
+    props = [{"css_class": "shared-container-0", "data": str(i)} for i in range(count)]
+    return widgets, props
+
+
+def dict_layout(widgets, props):
+    rendered = {}
+    for i, (widget, node_props) in enumerate(zip(widgets, props)):
+        rendered[widget.get_unique_id()] = {
+            "html_id": f"fw_id_{i}",
+            "widget_type": type(widget).__name__,
+            "key": widget.key,
+            "widget_instance": widget,
+            "props": node_props,
+            "parent_html_id": "fw_id_0",
+            "parent_key": None,
+            "children_keys": [],
+        }
+    return rendered
+
+
+def node_data_layout(widgets, props):
+    rendered = {}
+    for i, (widget, node_props) in enumerate(zip(widgets, props)):
+        rendered[widget.get_unique_id()] = NodeData(
+            html_id=f"fw_id_{i}",
+            widget_type=type(widget).__name__,
+            key=widget.key,
+            widget_instance=widget,
+            props=node_props,
+            parent_html_id="fw_id_0",
+            parent_key=None,
+            children_keys=(),
+        )
+    return rendered
+
+
+def measure(layout, widgets, props):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    rendered = layout(widgets, props)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rendered
+    return (after - before) / len(widgets)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    widgets, props = build_inputs(count)
+    legacy = measure(dict_layout, widgets, props)
+    slotted = measure(node_data_layout, widgets, props)
+    print(f"nodes: {count}")
+    print(f"dict entries:     {legacy:8.1f} bytes/node")
+    print(f"NodeData records: {slotted:8.1f} bytes/node ({100 * (1 - slotted / legacy):.0f}% less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Cost of constructing the widgets a `build()` method creates by the thousand.
+
+Reports the time and the memory each `Text`, `Container` and `Row` takes to
+construct. Styles are built once up front, as an app's constants would be, so
+the numbers only cover the widget itself (its shared CSS class already exists
+after the first one).
+
+Usage:
+    python benchmarks/bench_widget_construction.py [widget_count]
+"""
+import sys
+import time
+import tracemalloc
+
+from pythra.styles import EdgeInsets, TextStyle
+from pythra.widgets import Container, Row, Text
+
+STYLE = TextStyle(fontSize=14, color="#333")
+PADDING = EdgeInsets.all(8)
+
+FACTORIES = {
+    "Text": lambda i: Text("row", style=STYLE),
+    "Container": lambda i: Container(padding=PADDING, color="#fff"),
+    "Row": lambda i: Row(children=[]),
+}
+
+
+def time_per_widget(factory, count):
+    factory(0)  # Registers the shared style.
+    start = time.perf_counter()
+    widgets = [factory(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    del widgets
+    return elapsed / count * 1e6
+
+
+def bytes_per_widget(factory, count):
+    factory(0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    widgets = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del widgets
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"widgets: {count}")
+    for name, factory in FACTORIES.items():
+        micros = time_per_widget(factory, count)
+        size = bytes_per_widget(factory, count)
+        print(f"{name:<10} {micros:6.2f} us/widget {size:8.1f} bytes/widget")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,73 @@
  *
  * This engine creates its own SimpleBar instance to avoid race conditions.
  * It handles pre-rendered initial items (HTML and CSS) for an instant first paint.
- * It asynchronously fetches additional items from Python as the user scrolls.
+ * It fetches additional items from Python as the user scrolls, a whole range per
+ * round trip, and prefetches the next viewport in the scroll direction so a fling
+ * lands on rows that are already built.
+ * With `options.grid` it lays the items out in cells instead of rows, and only
+ * the rows and columns in view are rendered.
+ * Items may come as HTML or as data records ({t, v}) stamped into a template
+ * Python compiled once for all items of that shape (see pythra/item_templates.py).
  * Most importantly, it dynamically attaches event listeners to both pre-rendered
  * and asynchronously loaded content to ensure full interactivity.
  */
+/**
+ * Item offsets for rows of different heights: a Fenwick tree (binary indexed
+ * tree) over the row heights. Changing one height, the offset of a row and the
+ * row at an offset are all O(log n), so a million rows stay cheap.
+ */
+class ExtentIndex {
+    /** `heights`, when given, are the known row heights (a Float64Array of `count`). */
+    constructor(count, estimate, heights) {
+        this.count = count;
+        this.heights = heights || new Float64Array(count).fill(estimate);
+        this.tree = new Float64Array(count + 1);
+        this.total = 0;
+        // Linear-time build: every node adds itself into its parent.
+        for (let i = 1; i <= count; i++) {
+            this.tree[i] += this.heights[i - 1];
+            this.total += this.heights[i - 1];
+            const parent = i + (i & -i);
+            if (parent <= count) this.tree[parent] += this.tree[i];
+        }
+        this.topBit = 1;
+        while (this.topBit * 2 <= count) this.topBit *= 2;
+    }
+
+    heightOf(index) {
+        return this.heights[index];
+    }
+
+    set(index, height) {
+        const delta = height - this.heights[index];
+        if (!delta) return;
+        this.heights[index] = height;
+        this.total += delta;
+        for (let i = index + 1; i <= this.count; i += i & -i) this.tree[i] += delta;
+    }
+
+    /** The top of row `index`: the sum of the heights before it. */
+    offsetOf(index) {
+        let sum = 0;
+        for (let i = index; i > 0; i -= i & -i) sum += this.tree[i];
+        return sum;
+    }
+
+    /** The row that contains `offset` (0 while there are no rows). */
+    indexAt(offset) {
+        if (!this.count) return 0;
+        let pos = 0;
+        for (let step = this.topBit; step > 0; step >>= 1) {
+            const next = pos + step;
+            if (next <= this.count && this.tree[next] <= offset) {
+                pos = next;
+                offset -= this.tree[next];
+            }
+        }
+        return Math.min(pos, this.count - 1);
+    }
+}
+
 export class PythraVirtualList {
     constructor(elementId, options) {
         this.container = document.getElementById(elementId);
@@ -16,33 +79,47 @@ export class PythraVirtualList {
         }
 
         console.log(`✅ PythraVirtualList engine is initializing for #${elementId}`);
-        
+
         this.options = options;
         this.simplebar = new SimpleBar(this.container, this.options.simplebarOptions || {});
         this.scrollEl = this.simplebar.getScrollElement();
         this.contentEl = this.simplebar.getContentElement();
-        
+
         this.itemCache = {}; // Cache will ONLY store HTML strings.
+        this.templates = {}; // Template id -> {parts, slots}, kept across refreshes.
+        // Numbers the stamped rows; cached rows move to other indices, so ids can't use those.
+        this.stampCount = 0;
         this.visibleItemElements = [];
+        // Items requested from Python and not answered yet.
+        this.pending = new Set();
+        // Bumped by Python on a full refresh; answers for older data are dropped.
+        this.version = this.options.dataVersion || 0;
+        this.lastScrollTop = 0;
+        this.direction = 1;
+        // Grid cells are sized from the viewport width (see gridLayout()).
+        this.grid = this.options.grid || null;
+        this.lastScrollLeft = 0;
+        // Without a fixed itemExtent, rows are measured and their offsets indexed.
+        this.extents = this.options.itemExtent || this.grid ? null
+            : new ExtentIndex(this.options.itemCount, this.options.estimatedItemExtent || 48);
+        this.layoutPasses = 0;
 
         // Process the initialItems object from Python.
         if (this.options.initialItems) {
             const initialCss = new Set();
             for (const index in this.options.initialItems) {
                 const itemData = this.options.initialItems[index];
+                Object.assign(this.templates, itemData.templates);
                 // 1. Store ONLY the HTML string in the cache.
-                this.itemCache[index] = itemData.html;
+                this.itemCache[index] = this.itemHtml(itemData);
                 // 2. Collect all unique CSS rules.
                 if (itemData.css) {
                     initialCss.add(itemData.css);
                 }
             }
-            // 3. Inject all collected CSS into the dynamic stylesheet in one go.
+            // 3. Inject all collected CSS in one go.
             if (initialCss.size > 0) {
-                const styleSheet = document.getElementById('dynamic-styles');
-                if (styleSheet) {
-                    styleSheet.textContent += `\n${[...initialCss].join('\n')}`;
-                }
+                this.addCss([...initialCss].join('\n'));
             }
         }
 
@@ -52,16 +129,48 @@ export class PythraVirtualList {
         this.sizer.style.top = '0';
         this.sizer.style.left = '0';
         this.sizer.style.width = '1px';
-        this.sizer.style.height = `${this.options.itemCount * this.options.itemExtent}px`;
+        if (!this.grid) this.sizer.style.height = `${this.totalHeight()}px`;
         this.contentEl.appendChild(this.sizer);
         this.contentEl.style.position = 'relative';
 
         this.render = this.render.bind(this);
         this.scrollEl.addEventListener('scroll', this.render);
-        
+        if (this.extents && typeof ResizeObserver === 'function') {
+            // Rows that change size later (images loading, text wrapping on a
+            // resize) are measured again on the next frame.
+            this.resizeObserver = new ResizeObserver(() => {
+                if (this.renderQueued) return;
+                this.renderQueued = true;
+                requestAnimationFrame(() => { this.renderQueued = false; this.render(); });
+            });
+        }
+        if (this.grid && typeof ResizeObserver === 'function') {
+            // The column count and the cell size follow the viewport width.
+            this.resizeObserver = new ResizeObserver(() => this.render());
+            this.resizeObserver.observe(this.scrollEl);
+        }
+
         this.render();
     }
 
+    /**
+     * Adds item CSS to a stylesheet of the list's own. `#dynamic-styles` is
+     * edited rule by rule by the patch runtime, and rewriting its text would
+     * drop those rules.
+     */
+    addCss(css) {
+        if (!css) return;
+        let styleEl = document.getElementById('virtual-list-styles');
+        if (!styleEl) {
+            styleEl = document.createElement('style');
+            styleEl.id = 'virtual-list-styles';
+            document.head.appendChild(styleEl);
+        }
+        if (!styleEl.textContent.includes(css)) {
+            styleEl.textContent += `\n${css}`;
+        }
+    }
+
     /**
      * Scans a newly rendered HTML fragment and attaches reliable event listeners
      * to elements that have an inline `onclick` attribute from the Python side.
@@ -71,7 +180,7 @@ export class PythraVirtualList {
         const clickableElements = element.querySelectorAll('[onclick]');
         clickableElements.forEach(clickable => {
             const onclickAttr = clickable.getAttribute('onclick');
-            
+
             // Regex to parse out the callback name from "handleClick('callback_name')"
             const match = onclickAttr.match(/handleClick\('([^']+)'\)/);
 
@@ -90,21 +199,133 @@ export class PythraVirtualList {
         });
     }
 
+    /**
+     * Cell geometry for the current viewport width: the column count, the
+     * cell size and the distance from one row (or column) to the next.
+     */
+    gridLayout() {
+        const g = this.grid;
+        const width = this.scrollEl.clientWidth;
+        const crossSpacing = g.crossAxisSpacing || 0;
+        const mainSpacing = g.mainAxisSpacing || 0;
+        const columns = g.crossAxisCount
+            || Math.max(1, Math.ceil(width / (g.maxCrossAxisExtent + crossSpacing)));
+        const cellWidth = g.crossAxisCount && g.crossAxisExtent ? g.crossAxisExtent
+            : Math.max(0, (width - crossSpacing * (columns - 1)) / columns);
+        const cellHeight = g.mainAxisExtent || cellWidth / (g.childAspectRatio || 1);
+        const rows = Math.ceil(this.options.itemCount / columns);
+        return {
+            columns, rows, cellWidth, cellHeight,
+            rowStride: cellHeight + mainSpacing,
+            columnStride: cellWidth + crossSpacing,
+            height: Math.max(0, rows * (cellHeight + mainSpacing) - mainSpacing),
+            width: Math.max(0, columns * (cellWidth + crossSpacing) - crossSpacing),
+        };
+    }
+
+    /** The HTML of an item sent either as HTML or as a template data record. */
+    itemHtml(item) {
+        if (item.html !== undefined) return item.html;
+        const template = this.templates[item.t];
+        if (!template) return undefined;
+        const { parts, slots } = template;
+        const idPrefix = `${this.container.id}-${this.stampCount++}-`;
+        let html = parts[0];
+        let nextId = 0;
+        for (let k = 0; k < slots.length; k++) {
+            html += (slots[k] < 0 ? idPrefix + nextId++ : item.v[slots[k]]) + parts[k + 1];
+        }
+        return html;
+    }
+
+    totalHeight() {
+        return this.extents ? this.extents.total : this.options.itemCount * this.options.itemExtent;
+    }
+
+    offsetOf(index) {
+        return this.extents ? this.extents.offsetOf(index) : index * this.options.itemExtent;
+    }
+
+    /**
+     * Records the heights of the rendered rows. The row at the top of the
+     * viewport keeps its place on screen while the rows above it change size,
+     * so corrected estimates never make the content jump. Returns whether
+     * anything changed.
+     */
+    measure() {
+        const scrollTop = this.scrollEl.scrollTop;
+        const changed = [];
+        this.visibleItemElements.forEach(el => {
+            if (el.dataset.loaded !== '1') return;
+            const height = el.offsetHeight;
+            const index = Number(el.dataset.index);
+            if (index >= 0 && height > 0 && height !== this.extents.heightOf(index)) changed.push([index, height]);
+        });
+        if (!changed.length) return false;
+
+        const anchor = this.extents.indexAt(scrollTop);
+        const anchorShift = this.extents.offsetOf(anchor) - scrollTop;
+        changed.forEach(([index, height]) => this.extents.set(index, height));
+        this.sizer.style.height = `${this.extents.total}px`;
+        const target = this.extents.offsetOf(anchor) - anchorShift;
+        if (Math.abs(target - scrollTop) >= 1) {
+            this.scrollEl.scrollTop = target;
+            this.lastScrollTop = this.scrollEl.scrollTop;
+        }
+        return true;
+    }
+
+    /** Shows `index`'s HTML in `el` if it's cached; returns whether it was. */
+    fill(el, index) {
+        const html = this.itemCache[index];
+        if (html === undefined) {
+            el.dataset.loaded = '0';
+            return false;
+        }
+        el.innerHTML = html;
+        el.dataset.loaded = '1';
+        // IMPORTANT: We must re-attach listeners every time we set innerHTML.
+        this.attachEventListeners(el);
+        return true;
+    }
+
     render() {
+        if (this.grid) return this.renderGrid();
+        if (!this.options.itemCount) {
+            // Nothing to show or fetch; park every recycled element.
+            this.visibleItemElements.forEach(el => {
+                el.style.transform = 'translateY(-9999px)';
+                el.dataset.index = '-1';
+                el.dataset.loaded = '0';
+            });
+            return;
+        }
         const scrollTop = this.scrollEl.scrollTop;
         const viewportHeight = this.scrollEl.clientHeight;
+        if (scrollTop !== this.lastScrollTop) {
+            this.direction = scrollTop > this.lastScrollTop ? 1 : -1;
+            this.lastScrollTop = scrollTop;
+        }
+
+        let startIndex, endIndex;
+        if (this.extents) {
+            startIndex = this.extents.indexAt(scrollTop);
+            endIndex = this.extents.indexAt(scrollTop + viewportHeight);
+        } else {
+            startIndex = Math.max(0, Math.floor(scrollTop / this.options.itemExtent));
+            endIndex = Math.min(
+                this.options.itemCount - 1,
+                Math.ceil((scrollTop + viewportHeight) / this.options.itemExtent)
+            );
+        }
 
-        const startIndex = Math.max(0, Math.floor(scrollTop / this.options.itemExtent));
-        const endIndex = Math.min(
-            this.options.itemCount - 1,
-            Math.ceil((scrollTop + viewportHeight) / this.options.itemExtent)
-        );
-        
         const itemsToRender = [];
+        let top = this.offsetOf(startIndex);
         for (let i = startIndex; i <= endIndex; i++) {
-            itemsToRender.push({ index: i, top: i * this.options.itemExtent });
+            itemsToRender.push({ index: i, top });
+            top += this.extents ? this.extents.heightOf(i) : this.options.itemExtent;
         }
-        
+
         for (let i = 0; i < itemsToRender.length; i++) {
             const item = itemsToRender[i];
             let el = this.visibleItemElements[i];
@@ -113,74 +334,351 @@ export class PythraVirtualList {
                 el = document.createElement('div');
                 el.style.position = 'absolute';
                 el.style.width = '100%';
-                el.style.height = `${this.options.itemExtent}px`;
+                if (this.extents) {
+                    // Variable rows size themselves to their content.
+                    if (this.resizeObserver) this.resizeObserver.observe(el);
+                } else {
+                    el.style.height = `${this.options.itemExtent}px`;
+                }
                 el.style.left = '0';
                 this.contentEl.appendChild(el);
                 this.visibleItemElements.push(el);
             }
 
             el.style.transform = `translateY(${item.top}px)`;
-            
+
             if (el.dataset.index !== String(item.index)) {
                 el.dataset.index = item.index;
-                
-                if (this.itemCache[item.index]) {
-                    // Item was pre-rendered or fetched before.
-                    el.innerHTML = this.itemCache[item.index];
-                    // IMPORTANT: We must re-attach listeners every time we set innerHTML.
-                    this.attachEventListeners(el);
-                } else {
-                    // Item needs to be fetched from Python.
+                if (!this.fill(el, item.index)) {
+                    // Filled in when the batch with this item arrives.
                     el.innerHTML = '<div>Loading...</div>';
-                    if (window.pywebview && this.options.itemBuilderName) {
-                        window.pywebview.build_list_item(this.options.itemBuilderName, item.index)
-                            .then(response => {
-                                const { html, css } = response;
-                                this.itemCache[item.index] = html;
-
-                                if (css) {
-                                    const styleSheet = document.getElementById('dynamic-styles');
-                                    if (styleSheet && !styleSheet.textContent.includes(css)) {
-                                        styleSheet.textContent += `\n${css}`;
-                                    }
-                                }
-                                
-                                if (el.dataset.index === String(item.index)) {
-                                    el.innerHTML = html;
-                                    // Attach event listeners to the newly created DOM nodes.
-                                    this.attachEventListeners(el);
-                                }
-                            })
-                            .catch(e => {
-                                console.error(`Error building virtual item ${item.index}:`, e);
-                                if (el.dataset.index === String(item.index)) {
-                                    el.innerHTML = '<div>Error</div>';
-                                }
-                            });
-                    }
                 }
             }
         }
-        
+
         for (let i = itemsToRender.length; i < this.visibleItemElements.length; i++) {
             this.visibleItemElements[i].style.transform = 'translateY(-9999px)';
+            this.visibleItemElements[i].dataset.index = '-1';
+            this.visibleItemElements[i].dataset.loaded = '0';
+        }
+
+        // Positions above were estimates for rows not measured yet; once real
+        // heights are known, lay the rows out again (this converges: the
+        // second pass measures the same heights; the pass limit only guards
+        // against rows whose height depends on where they are).
+        if (this.extents && this.layoutPasses < 3) {
+            this.layoutPasses++;
+            try {
+                if (this.measure()) return this.render();
+            } finally {
+                this.layoutPasses--;
+            }
         }
+
+        // The visible rows first, then the next viewport in the scroll direction.
+        const pageSize = endIndex - startIndex + 1;
+        const prefetch = Math.ceil(pageSize * (this.options.prefetchViewports ?? 1));
+        this.fetch(startIndex, endIndex + 1);
+        if (this.direction > 0) {
+            this.fetch(endIndex + 1, endIndex + 1 + prefetch);
+        } else {
+            this.fetch(startIndex - prefetch, startIndex);
+        }
+    }
+
+    /** Returns the recycled element for the `slot`-th visible item, creating it if needed. */
+    slotElement(slot) {
+        let el = this.visibleItemElements[slot];
+        if (!el) {
+            el = document.createElement('div');
+            el.style.position = 'absolute';
+            el.style.left = '0';
+            el.style.top = '0';
+            this.contentEl.appendChild(el);
+            this.visibleItemElements.push(el);
+        }
+        return el;
+    }
+
+    /** Shows the cells of the visible rows and columns, then fetches what's missing. */
+    renderGrid() {
+        const scrollTop = this.scrollEl.scrollTop;
+        const scrollLeft = this.scrollEl.scrollLeft;
+        const layout = this.gridLayout();
+        // Not laid out yet; the ResizeObserver renders again once it is.
+        if (!layout.cellWidth || !layout.cellHeight) return;
+
+        // When a resize changes the column count, keep the first visible
+        // item on screen instead of the same scroll offset.
+        if (this.layout && this.layout.columns !== layout.columns && this.firstVisible !== undefined) {
+            this.sizer.style.height = `${layout.height}px`;
+            this.layout = layout;
+            this.scrollEl.scrollTop = Math.floor(this.firstVisible / layout.columns) * layout.rowStride;
+            this.lastScrollTop = this.scrollEl.scrollTop;
+            return this.renderGrid();
+        }
+        this.layout = layout;
+        this.sizer.style.height = `${layout.height}px`;
+        this.sizer.style.width = `${layout.width}px`;
+
+        if (scrollTop !== this.lastScrollTop) {
+            this.direction = scrollTop > this.lastScrollTop ? 1 : -1;
+            this.lastScrollTop = scrollTop;
+        } else if (scrollLeft !== this.lastScrollLeft) {
+            this.direction = scrollLeft > this.lastScrollLeft ? 1 : -1;
+        }
+        this.lastScrollLeft = scrollLeft;
+
+        const lastRow = layout.rows - 1;
+        const startRow = Math.min(lastRow, Math.max(0, Math.floor(scrollTop / layout.rowStride)));
+        const endRow = Math.min(lastRow, Math.floor((scrollTop + this.scrollEl.clientHeight) / layout.rowStride));
+        const startCol = Math.min(layout.columns - 1, Math.max(0, Math.floor(scrollLeft / layout.columnStride)));
+        const endCol = Math.min(layout.columns - 1,
+            Math.floor((scrollLeft + this.scrollEl.clientWidth) / layout.columnStride));
+        this.firstVisible = startRow * layout.columns + startCol;
+
+        let slot = 0;
+        for (let row = startRow; row <= endRow; row++) {
+            for (let col = startCol; col <= endCol; col++) {
+                const index = row * layout.columns + col;
+                if (index >= this.options.itemCount) break;
+                const el = this.slotElement(slot++);
+                el.style.width = `${layout.cellWidth}px`;
+                el.style.height = `${layout.cellHeight}px`;
+                el.style.transform = `translate(${col * layout.columnStride}px, ${row * layout.rowStride}px)`;
+                if (el.dataset.index !== String(index)) {
+                    el.dataset.index = index;
+                    if (!this.fill(el, index)) el.innerHTML = '<div>Loading...</div>';
+                }
+            }
+        }
+        for (let i = slot; i < this.visibleItemElements.length; i++) {
+            this.visibleItemElements[i].style.transform = 'translate(0, -9999px)';
+            this.visibleItemElements[i].dataset.index = '-1';
+            this.visibleItemElements[i].dataset.loaded = '0';
+        }
+        if (layout.rows <= 0) return;
+
+        // The visible cells row by row, then the next rows in the scroll direction.
+        const rowsPerPage = endRow - startRow + 1;
+        const prefetch = Math.ceil(rowsPerPage * (this.options.prefetchViewports ?? 1));
+        const fetchRows = (from, to) => {
+            if (startCol === 0 && endCol === layout.columns - 1) {
+                // Every column is in view: the rows are one contiguous range.
+                return this.fetch(from * layout.columns, (to + 1) * layout.columns);
+            }
+            for (let row = Math.max(0, from); row <= Math.min(lastRow, to); row++) {
+                this.fetch(row * layout.columns + startCol, row * layout.columns + endCol + 1);
+            }
+        };
+        fetchRows(startRow, endRow);
+        if (this.direction > 0) {
+            fetchRows(endRow + 1, endRow + prefetch);
+        } else {
+            fetchRows(startRow - prefetch, startRow - 1);
+        }
+    }
+
+    /** Requests the uncached items in [start, end) that aren't already on their way. */
+    fetch(start, end) {
+        start = Math.max(0, start);
+        end = Math.min(this.options.itemCount, end);
+        let runStart = -1;
+        for (let i = start; i <= end; i++) {
+            const missing = i < end && this.itemCache[i] === undefined && !this.pending.has(i);
+            if (missing && runStart < 0) {
+                runStart = i;
+            } else if (runStart >= 0 && (!missing || i - runStart === this.options.batchSize)) {
+                this.request(runStart, i);
+                runStart = missing ? i : -1;
+            }
+        }
+    }
+
+    request(start, end) {
+        const bridge = window.pywebview;
+        if (!bridge || !this.options.itemBuilderName) return;
+        for (let i = start; i < end; i++) this.pending.add(i);
+        const version = this.version;
+
+        if (typeof bridge.build_list_items !== 'function') {
+            // Older bridge: one round trip per item.
+            for (let i = start; i < end; i++) {
+                bridge.build_list_item(this.options.itemBuilderName, i)
+                    .then(response => this.receive(i, i + 1, {
+                        version, items: { [i]: response }, templates: response.templates,
+                        css: response.css, evicted: response.evicted,
+                    }))
+                    .catch(e => this.fail(i, i + 1, e));
+            }
+            return;
+        }
+        bridge.build_list_items(this.options.itemBuilderName, start, end)
+            .then(response => this.receive(start, end, response))
+            .catch(e => this.fail(start, end, e));
+    }
+
+    receive(start, end, response) {
+        const items = response.items || {};
+        for (let i = start; i < end; i++) this.pending.delete(i);
+        if (response.version !== undefined && response.version !== this.version) {
+            return;  // Built from data that has been refreshed since.
+        }
+        // Python dropped these items (and their callbacks) from its cache.
+        (response.evicted || []).forEach(index => { delete this.itemCache[index]; });
+        this.addCss(response.css);
+        Object.assign(this.templates, response.templates);
+        for (const index in items) {
+            this.itemCache[index] = this.itemHtml(items[index]);
+        }
+        let filled = false;
+        this.visibleItemElements.forEach(el => {
+            if (el.dataset.index in items) filled = this.fill(el, el.dataset.index) || filled;
+        });
+        // New rows have real heights now; measure and lay out again.
+        if (filled && this.extents) this.render();
+    }
+
+    fail(start, end, e) {
+        console.error(`Error building virtual items ${start}-${end - 1}:`, e);
+        for (let i = start; i < end; i++) this.pending.delete(i);
+        this.visibleItemElements.forEach(el => {
+            const index = Number(el.dataset.index);
+            if (index >= start && index < end) el.innerHTML = '<div>Error</div>';
+        });
+    }
+
+    /**
+     * Where the item at `index` is after `change` (-1 if it was removed), the
+     * same mapping as `ListChange.map_index` in pythra/data_sources.py.
+     */
+    static mapIndex(change, index) {
+        const { kind, start, count, to } = change;
+        if (kind === 'insert') return index >= start ? index + count : index;
+        if (kind === 'remove') {
+            if (index < start) return index;
+            return index < start + count ? -1 : index - count;
+        }
+        if (kind === 'move') {
+            if (index >= start && index < start + count) return to + index - start;
+            const rest = index < start ? index : index - count;
+            return rest >= to ? rest + count : rest;
+        }
+        return index;
+    }
+
+    /** The first item on screen and how far its top is from the viewport's top. */
+    anchor() {
+        const scrollTop = this.scrollEl.scrollTop;
+        if (this.grid) {
+            if (!this.layout || this.firstVisible === undefined) return null;
+            const row = Math.floor(this.firstVisible / this.layout.columns);
+            return { index: this.firstVisible, shift: row * this.layout.rowStride - scrollTop };
+        }
+        if (!this.options.itemCount) return null;
+        const index = this.extents ? this.extents.indexAt(scrollTop)
+            : Math.min(this.options.itemCount - 1, Math.floor(scrollTop / this.options.itemExtent));
+        return { index, shift: this.offsetOf(index) - scrollTop };
+    }
+
+    /**
+     * Called from Python with the changes a ListDataSource reported. Cached
+     * items (and measured heights) move with their rows, removed and changed
+     * ones are dropped, and the row at the top of the viewport stays where it
+     * is; with `followTail`, a list scrolled to its end stays at the end.
+     * @param {Array<{kind, start, count, to}>} changes - In the order they happened.
+     * @param {number} itemCount - The item count after the changes.
+     * @param {number} version - The data version; answers for older ones are ignored.
+     */
+    applyChanges(changes, itemCount, version) {
+        const viewportHeight = this.scrollEl.clientHeight;
+        const contentHeight = this.grid ? (this.layout ? this.layout.height : 0) : this.totalHeight();
+        const atEnd = this.options.followTail && this.scrollEl.scrollTop + viewportHeight >= contentHeight - 1;
+        const anchor = this.anchor();
+
+        const follow = index => {
+            for (const change of changes) {
+                if (index < 0 || change.kind === 'reset') return -1;
+                if (change.kind === 'change' && index >= change.start && index < change.start + change.count) return -1;
+                index = PythraVirtualList.mapIndex(change, index);
+            }
+            return index;
+        };
+        const cache = {};
+        for (const index in this.itemCache) {
+            const moved = follow(Number(index));
+            if (moved >= 0) cache[moved] = this.itemCache[index];
+        }
+        this.itemCache = cache;
+
+        if (this.extents) {
+            // Measured heights travel with their rows; new rows start at the estimate.
+            const heights = new Float64Array(itemCount).fill(this.options.estimatedItemExtent || 48);
+            for (let i = 0; i < this.extents.count; i++) {
+                let moved = i;
+                for (const change of changes) {
+                    if (moved < 0 || change.kind === 'reset') { moved = -1; break; }
+                    moved = PythraVirtualList.mapIndex(change, moved);
+                }
+                if (moved >= 0 && moved < itemCount) heights[moved] = this.extents.heightOf(i);
+            }
+            this.extents = new ExtentIndex(itemCount, this.options.estimatedItemExtent || 48, heights);
+        }
+
+        this.options.itemCount = itemCount;
+        this.version = version;
+        this.pending.clear();
+        this.visibleItemElements.forEach(el => { el.dataset.index = '-1'; });
+
+        let target = null;
+        if (atEnd) {
+            target = Infinity;
+        } else if (anchor) {
+            // A removed anchor row hands its place to the row that followed it.
+            let index = anchor.index;
+            for (const change of changes) {
+                if (change.kind === 'reset') { index = -1; break; }
+                const moved = PythraVirtualList.mapIndex(change, index);
+                index = moved >= 0 ? moved : change.start;
+            }
+            if (index >= 0 && itemCount > 0) {
+                index = Math.min(index, itemCount - 1);
+                if (this.grid) {
+                    const layout = this.gridLayout();
+                    target = Math.floor(index / layout.columns) * layout.rowStride - anchor.shift;
+                } else {
+                    target = this.offsetOf(index) - anchor.shift;
+                }
+            }
+        }
+
+        const height = this.grid ? this.gridLayout().height : this.totalHeight();
+        this.sizer.style.height = `${height}px`;
+        if (target !== null) {
+            this.scrollEl.scrollTop = Math.max(0, Math.min(target, height - viewportHeight));
+            this.lastScrollTop = this.scrollEl.scrollTop;
+        }
+        if (this.grid) this.firstVisible = undefined;
+        this.render();
     }
 
     /**
      * Called from Python when the underlying data for the list has changed.
      * Clears the cache and forces a re-render of all visible items.
+     * @param {number} version - The new data version; answers for older ones are ignored.
      */
-    refresh() {
+    refresh(version) {
         console.log(`Refreshing ALL visible items for #${this.container.id}`);
         // 1. Clear the entire HTML cache.
         this.itemCache = {};
-        
+        this.pending.clear();
+        if (version !== undefined) this.version = version;
+
         // 2. Mark all currently visible DOM elements as "dirty" by resetting their data-index.
         this.visibleItemElements.forEach(el => {
             el.dataset.index = '-1'; // Set to an invalid index
         });
-        
+
         // 3. Trigger a render to fetch the new, updated content.
         this.render();
     }
@@ -195,13 +693,12 @@ export class PythraVirtualList {
 
         indices.forEach(index => {
             // 1. Invalidate the cache for this specific item.
-            if (this.itemCache[index]) {
-                delete this.itemCache[index];
-            }
-            
+            delete this.itemCache[index];
+            this.pending.delete(index);
+
             // 2. Find if this item is currently visible in the DOM.
             const visibleElement = this.visibleItemElements.find(el => el.dataset.index === String(index));
-            
+
             if (visibleElement) {
                 // 3. If it's visible, mark it as dirty so the next render pass will update it.
                 visibleElement.dataset.index = '-1';
@@ -211,12 +708,20 @@ export class PythraVirtualList {
         // 4. Trigger a render pass to update any newly dirtied elements.
         this.render();
     }
-    
+
     // --- END OF NEW LOGIC ---
 
     destroy() {
+        if (this.resizeObserver) {
+            this.resizeObserver.disconnect();
+        }
+        if (this.scrollEl) {
+            this.scrollEl.removeEventListener('scroll', this.render);
+        }
         if (this.simplebar && typeof this.simplebar.unMount === 'function') {
             this.simplebar.unMount();
         }
     }
-}
\ No newline at end of file
+}
+
+window.PythraVirtualList = PythraVirtualList;
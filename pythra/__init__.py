@@ -18,8 +18,10 @@ from .base import Widget
 # from .reconciler import Key
 from .base import Key # Prefer placing Key in base.py as it's fundamental
 from .state import State, StatefulWidget, StatelessWidget
+from .scheduler import Lane
 from .icons import Icons, IconData
 from .controllers import TextEditingController, SliderController, VirtualListController,DropdownController
+from .data_sources import ListChange, ListDataSource, SQLiteListDataSource
 from .events import TapDetails, PanUpdateDetails
 from .drived_widgets.dropdown.dropdown import DerivedDropdown
 from .drived_widgets.dropdown.controller import DerivedDropdownController
@@ -86,6 +88,7 @@ from .widgets import (
     SizedBox,
     ListView,
     VirtualListView,
+    VirtualGridView,
     GridView,
     ListTile,
     Divider,
@@ -1,6 +1,6 @@
 # BASE.PY
+import itertools
 import weakref
-import uuid
 from typing import Any, Dict, List, Optional, Set, Union
 
 # =============================================================================
@@ -74,6 +74,9 @@ class Key:
 # HASHABLE HELPER - The "Style Comparator" for PyThra
 # =============================================================================
 
+_PLAIN_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
 def make_hashable(value):
     """
     The "Universal Converter" - makes any value comparable for PyThra's style system.
@@ -110,6 +113,8 @@ def make_hashable(value):
         # Now PyThra can tell they're different!
         ```
     """
+    if type(value) in _PLAIN_TYPES:
+        return value # Most style props are plain values: answer those first
     if hasattr(value, 'to_tuple'):
         return value.to_tuple() # Prefer specific method if exists
     elif isinstance(value, (str, int, float, bool, tuple, Key, type(None))):
@@ -129,6 +134,16 @@ def make_hashable(value):
         print(f"Warning: Cannot make type {type(value)} hashable for style key.")
         return str(value) # Fallback to string representation (less reliable)
 
+# Widget ids only need to be unique within the process, so a counter is
+# enough (and much cheaper than a uuid4 per widget).
+_widget_ids = itertools.count(1)
+
+
+def new_widget_id() -> str:
+    """Returns a fresh internal id for an unkeyed widget."""
+    return f"w{next(_widget_ids)}"
+
+
 # =============================================================================
 # WIDGET CLASS - The "Building Block" of All PyThra UI Elements
 # =============================================================================
@@ -171,9 +186,19 @@ class Widget:
     
     Attributes:
         _children: The widgets contained inside this widget
-        _internal_id: Auto-generated backup ID if no key is provided
+        _internal_id: Auto-generated backup ID if no key is provided. Once the
+            widget is reconciled it holds the positional identity of its element.
         framework: Reference to the main PyThra system
+
+    **Cheap to create:** `build()` methods make thousands of short-lived
+    widgets, so construction does as little as possible. The internal id is
+    only handed out (from a counter) when something asks for it, and
+    `framework` is looked up when it's used. Widget declares `__slots__`; a
+    subclass that declares its own (like `Text`, `Container` and `Row`) has
+    no per-instance `__dict__` at all, one that doesn't works as before.
     """
+    __slots__ = ("key", "_children", "_id", "__weakref__")
+
     # Keep framework ref for potential *State* access, but not ID generation
     _framework_ref = None
 
@@ -193,21 +218,43 @@ class Widget:
         """
         self.key = key
         self._children: List['Widget'] = children if children is not None else []
-        # Internal ID used if key is None, or for mapping during reconciliation
-        self._internal_id: str = str(uuid.uuid4())
         # Note: parent relationship is implicit in the tree built by State.build()
-        # --- THIS IS THE FIX ---
-        # Every widget, upon creation, gets a direct reference to the framework.
-        self.framework: Optional['Framework'] = self._framework_ref() if self._framework_ref else None # type: ignore
-        # --- END OF FIX ---
+
+    @property
+    def _internal_id(self) -> str:
+        """
+        Internal ID used if key is None, created on first use. The reconciler
+        replaces it with the id of the old element in the same slot (same
+        parent, index and type), so unkeyed widgets keep a stable identity
+        across rebuilds.
+        """
+        try:
+            return self._id
+        except AttributeError:
+            self._id = new_widget_id()
+            return self._id
+
+    @_internal_id.setter
+    def _internal_id(self, value: str):
+        self._id = value
+
+    @property
+    def framework(self) -> Optional['Framework']: # type: ignore
+        """The running framework, for widgets that need to talk to it."""
+        return self._framework_ref() if self._framework_ref else None
 
     def get_unique_id(self) -> Union[Key, str]:
         """
-        Returns a unique identifier for the widget (Key if set, else internal UUID).
+        Returns a unique identifier for the widget (Key if set, else internal id).
 
-        :return: Key or string UUID
+        :return: Key or string id
         """
-        return self.key if self.key is not None else self._internal_id
+        if self.key is not None:
+            return self.key
+        try:
+            return self._id
+        except AttributeError:
+            return self._internal_id
 
     def get_children(self) -> List['Widget']:
         """
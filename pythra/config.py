@@ -39,6 +39,7 @@ DEFAULT_CONFIG = {
     
     # === DEVELOPMENT SETTINGS ===
     'Debug': True,                      # True = show debug info, False = production mode
+    'log_level': 'WARNING',             # Framework logging: DEBUG, INFO, WARNING, ERROR (or PYTHRA_LOG_LEVEL)
     
     # === FILE LOCATIONS ===
     'render_dir': 'render',                   # Folder for HTML, CSS, JavaScript files
@@ -46,6 +47,18 @@ DEFAULT_CONFIG = {
     
     # === NETWORK SETTINGS ===
     'assets_server_port': 8008,         # Port number for serving your app's files (8008 is usually free)
+
+    # === PERFORMANCE SETTINGS ===
+    'frame_rate': 60,                   # UI updates per second at most (match your display; 0 = unpaced)
+    'profiling': {                      # Per-frame timings (see pythra/profiling.py); off in production
+        'enabled': False,
+        'every': 1,                     # Profile every Nth frame
+        'sink': 'stdout',               # "stdout" or a path to a .jsonl file
+        'cprofile': False,              # Also collect a full cProfile report (slow)
+    },
+    'style_grace_period': 30,           # Seconds an unused shared style class is kept before it is evicted
+    'record_patches': None,             # Path of a .jsonl file to record every DOM patch frame to (or PYTHRA_RECORD_PATCHES)
+    'diff_backend': 'auto',             # "auto", "python" or "rust" (needs the rust_reconciler extension)
 }
 
 # =============================================================================
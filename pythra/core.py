@@ -1,9 +1,6 @@
 # pythra/core.py
 
 # --- ADDED THESE IMPORTS AT THE TOP OF THE FILE ---
-import cProfile
-import pstats
-import io
 import logging
 # --- END OF IMPORTS ---
 
@@ -17,8 +14,8 @@ import time
 import json
 import math
 import html
-import weakref
 from typing import Optional, Set, List, Dict, TYPE_CHECKING, Callable, Any, Union
+from collections import Counter
 
 # PySide imports for main thread execution
 from PySide6.QtCore import QTimer
@@ -32,7 +29,13 @@ from .window import webwidget
 # New/Refactored Imports
 from .base import Widget, Key
 from .state import State, StatefulWidget, StatelessWidget
-from .reconciler import Reconciler, Patch, ReconciliationResult
+from .reconciler import Reconciler, Patch, ReconciliationResult, callback_names, js_instance_names
+from .diff_backends import select_diff_backend
+from .scheduler import FrameScheduler, Lane
+from .profiling import Profiler
+from .stylesheet import StyleSheetManager
+from .patch_protocol import PATCH_RUNTIME_JS, PatchRecorder, apply_script, encode_patches
+from .log import configure_logging
 from .widgets import *  # Import all widgets for class lookups if needed
 from .package_manager import PackageManager
 from .package_system import PackageType
@@ -43,6 +46,8 @@ from .styles import *
 if TYPE_CHECKING:
     from .state import State
 
+logger = logging.getLogger(__name__)
+
 
 class Framework:
     """
@@ -100,6 +105,8 @@ class Framework:
         # STEP 2: Load your project configuration
         # This reads settings from your config.yaml file
         self.config = Config(config_path=self.project_root / 'config.yaml')
+        # Only warnings are logged unless `log_level` (or PYTHRA_LOG_LEVEL) asks for more
+        configure_logging(self.config.get("log_level"))
 
         # STEP 3: Set up directory paths for your app
         # render/ folder: Contains HTML, CSS, JS files for the UI
@@ -168,6 +175,8 @@ class Framework:
         # STEP 6: Initialize core components
         self.api = webwidget.Api()  # Handles JavaScript <-> Python communication
         self.reconciler = Reconciler()  # Manages UI updates efficiently
+        # Chosen once; Rust diffing when available unless config says otherwise
+        self.reconciler.diff_backend = select_diff_backend(self.reconciler, self.config.get("diff_backend", "auto"))
         self.root_widget: Optional[Widget] = None  # Your main UI widget
         self.window = None  # The application window
         self.id = "main_window_id"  # Unique ID for the main window
@@ -176,9 +185,29 @@ class Framework:
         self.called = False  # Tracks if the app has been started
 
         # State Management System
-        # These handle when your UI needs to be updated
-        self._reconciliation_requested: bool = False
-        self._pending_state_updates: Set[State] = set()
+        # The scheduler collects dirty States and runs one update cycle per frame,
+        # paced to `frame_rate` (input-driven updates don't wait for the pacing)
+        self.scheduler = FrameScheduler(
+            QTimer.singleShot, frame_rate=self.config.get("frame_rate", 60)
+        )
+        self.scheduler.set_frame_callback(self._process_reconciliation)
+        # Per-frame profiling, off unless enabled via config or PYTHRA_PROFILE
+        self.profiler = Profiler().configure(self.config)
+        # Optional recording of every patch frame sent to the browser, for replay
+        record_path = os.environ.get("PYTHRA_RECORD_PATCHES") or self.config.get("record_patches")
+        self.patch_recorder = PatchRecorder(record_path) if record_path else None
+        # Key of the widget rendered directly into "root-container" (the root
+        # StatefulWidget itself has no rendered entry).
+        self._mounted_root_key: Optional[Union[Key, str]] = None
+        # Which shared CSS classes mounted nodes use; the browser's dynamic
+        # stylesheet only gets rules inserted or deleted as that changes.
+        self.stylesheet = StyleSheetManager(grace_period=self.config.get("style_grace_period", 30.0))
+        # css_class -> (generate_css_rule, style_key) for every class ever rendered.
+        self._known_css_details: Dict[str, Tuple[Callable, Any]] = self.stylesheet.details
+        # How many mounted nodes refer to each callback name, and which names
+        # were registered from reconciliation results (and may be released).
+        self._callback_refs: Counter = Counter()
+        self._reconciler_callbacks: Set[str] = set()
 
         self._loaded_js_engines: Set[str] = set() # Tracks JS engines already sent to the browser
 
@@ -305,9 +334,10 @@ class Framework:
         self._result = result # Store the result
 
         # 3. Update framework state from the result
-        self.reconciler.context_maps["main"] = result.new_rendered_map
-        for cb_id, cb_func in result.registered_callbacks.items():
-            self.api.register_callback(cb_id, cb_func)
+        self.reconciler.context_maps["main"] = {}
+        self.stylesheet.register(result.active_css_details)
+        self._merge_rendered_nodes(result.new_rendered_map)
+        self._register_callbacks(result.registered_callbacks)
 
         # 4. Analyze required JS engines for optimization
         required_engines = self._analyze_required_js_engines(built_tree_root, result)
@@ -317,8 +347,9 @@ class Framework:
         
         # 5. Generate initial HTML, CSS, and JS with optimized loading
         root_key = initial_tree_to_reconcile.get_unique_id() if initial_tree_to_reconcile else None
+        self._mounted_root_key = root_key
         html_content = self._generate_html_from_map(root_key, result.new_rendered_map)
-        css_rules = self._generate_css_from_details(result.active_css_details)
+        css_rules = self.stylesheet.full_sheet()
         js_script = self._generate_initial_js_script(result, required_engines)
 
         # 6. Write files
@@ -451,16 +482,16 @@ class Framework:
         
         # If no specific engines requested, load all (fallback for compatibility)
         if required_engines is None:
-            print("🔧 Loading all JS engines (no optimization applied)")
+            logger.debug("🔧 Loading all JS engines (no optimization applied)")
             files_to_load = set(engine_to_file_map.values())
         else:
-            print(f"🎯 Optimized loading: Only loading engines for {required_engines}")
+            logger.debug("🎯 Optimized loading: Only loading engines for %s", required_engines)
             files_to_load = set()
             for engine in required_engines:
                 if engine in engine_to_file_map:
                     files_to_load.add(engine_to_file_map[engine])
                 else:
-                    print(f"⚠️  Unknown engine requested: {engine}")
+                    logger.warning("Unknown JS engine requested: %s", engine)
         
         all_js_code = []
         loaded_files = set()  # Track loaded files to avoid duplicates
@@ -497,9 +528,9 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
 }}"""
                     
                     all_js_code.append(f"// --- Injected from {os.path.basename(file_path)} ---\n{wrapped_content}")
-                    print(f"✅ Loaded JS engine: {os.path.basename(file_path)}")
+                    logger.debug("✅ Loaded JS engine: %s", file_path)
             except FileNotFoundError:
-                print(f"⚠️ Warning: JS utility file not found: {full_path}")
+                logger.warning("JS utility file not found: %s", full_path)
 
         # --- THIS IS THE NEW LOGIC ---
         # 2. Load all DISCOVERED PLUGIN JS files
@@ -516,9 +547,9 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
     console.error('Error loading plugin {module_info['plugin']} - {os.path.basename(full_path)}:', e);
 }}"""
                     all_js_code.append(f"// --- Injected Plugin '{module_info['plugin']}': {os.path.basename(full_path)} ---\n{wrapped_content}")
-                    print(f"✅ Loaded plugin JS: {module_info['plugin']} - {os.path.basename(full_path)}")
+                    logger.debug("✅ Loaded plugin JS: %s - %s", module_info['plugin'], full_path)
             except FileNotFoundError:
-                print(f"⚠️ Warning: Plugin JS file not found: {full_path}")
+                logger.warning("Plugin JS file not found: %s", full_path)
         # --- END OF NEW LOGIC ---
 
         return "\n\n".join(all_js_code)
@@ -536,7 +567,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         # Check reconciliation result for JS initializers
         for init in result.js_initializers:
             init_type = init.get("type")
-            print('init_type: ', init_type)
+            logger.debug("JS initializer type: %s", init_type)
             if init_type == "ResponsiveClipPath":
                 required_engines.update(['ResponsiveClipPath', 'generateRoundedPath', 'scalePathAbsoluteMLA'])
             elif init_type == "SimpleBar":
@@ -600,13 +631,16 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
             for child in widget.get_children():
                 self._check_widget_for_clip_path(child, required_engines)
 
-    def request_reconciliation(self, state_instance: State):
-        """Called by State.setState to schedule a UI update."""
-        self._pending_state_updates.add(state_instance)
+    def request_reconciliation(self, state_instance: State, priority: Optional[Lane] = None):
+        """
+        Called by State.setState to schedule a UI update.
 
-        if not self._reconciliation_requested:
-            self._reconciliation_requested = True
-            QTimer.singleShot(0, self._process_reconciliation)
+        Repeated calls before the next frame are coalesced, and calls made while
+        a frame is building are deferred to the frame after it. `priority` picks
+        the scheduler lane; by default it is INPUT while a UI event is being
+        handled and NORMAL otherwise.
+        """
+        self.scheduler.mark_dirty(state_instance, priority)
 
 
     def _process_reconciliation(self):
@@ -614,118 +648,242 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         Performs a targeted, high-performance reconciliation cycle for only the
         widgets whose state has changed.
         """
-        profiler = cProfile.Profile()
-        profiler.enable()
-
-        self._reconciliation_requested = False
         if not self.window:
-            print("Error: Window not available for reconciliation.")
+            logger.error("Window not available for reconciliation.")
+            self.scheduler.skip_frame()
             return
 
-        print("\n🔄 PyThra Framework | Processing Smart UI Update Cycle...")
+        logger.debug("🔄 Processing Smart UI Update Cycle...")
         start_time = time.time()
+        # None unless profiling is on and this frame is sampled.
+        frame = self.profiler.start_frame()
 
         main_context_map = self.reconciler.get_map_for_context("main")
         all_patches = []
         all_new_callbacks = {}
-        all_active_css_details = {}
+        instance_cleanup_script = ""
         
         # --- NEW: Track required engines for this entire update cycle ---
         all_required_engines_this_cycle = set()
 
-        for state_instance in self._pending_state_updates:
-            widget_to_rebuild = state_instance.get_widget()
-            if not widget_to_rebuild:
-                print(f"Warning: Widget for state {state_instance} lost. Skipping update.")
-                continue
-
-            widget_key = widget_to_rebuild.get_unique_id()
-            old_widget_data = main_context_map.get(widget_key)
-
-            parent_html_id = "root-container"
-            if old_widget_data:
-                parent_html_id = old_widget_data["parent_html_id"]
-            elif widget_to_rebuild is not self.root_widget:
-                print(f"Error: Could not find previous state for widget {widget_key}. A full rebuild may be required.")
-                continue
-
-            print(f"🔧 PyThra Framework | Updating: {widget_to_rebuild.__class__.__name__} (ID: {widget_key.__str_key__()[:8]}...)")
-
-            new_subtree = self._build_widget_tree(widget_to_rebuild)
-            subtree_result = self.reconciler.reconcile(
-                previous_map=main_context_map,
-                new_widget_root=new_subtree,
-                parent_html_id=parent_html_id,
-                old_root_key=widget_key,
-                is_partial_reconciliation=True
-            )
-
-            all_patches.extend(subtree_result.patches)
-            all_new_callbacks.update(subtree_result.registered_callbacks)
-            all_active_css_details.update(subtree_result.active_css_details)
-            main_context_map.update(subtree_result.new_rendered_map)
-            
-            # --- NEW: Analyze this subtree and aggregate required engines ---
-            required_in_subtree = self._analyze_required_js_engines(new_subtree, subtree_result)
-            all_required_engines_this_cycle.update(required_in_subtree)
-            # --- END NEW ---
+        # Dirty states arrive shallowest first, background work last. A state
+        # that was already rebuilt as part of an ancestor's rebuild in this frame
+        # is skipped, background work that doesn't fit the frame budget is
+        # carried over, and any setState() made while building is deferred to
+        # the next frame.
+        dirty_states = self.scheduler.begin_frame(main_context_map, self.root_widget)
+        try:
+            for state_instance in dirty_states:
+                if not self.scheduler.admit(state_instance):
+                    continue
+                widget_to_rebuild = state_instance.get_widget()
+                if not widget_to_rebuild:
+                    logger.warning("Widget for state %s lost. Skipping update.", state_instance)
+                    continue
+
+                widget_key = widget_to_rebuild.get_unique_id()
+                old_widget_data = main_context_map.get(widget_key)
+
+                if old_widget_data:
+                    parent_html_id = old_widget_data.parent_html_id
+                    old_root_key = widget_key
+                    new_subtree = reconcile_root = self._build_widget_tree(widget_to_rebuild)
+                elif widget_to_rebuild is self.root_widget:
+                    # The root StatefulWidget is not rendered itself; like the
+                    # initial render, reconcile the child it builds against the
+                    # element currently mounted in "root-container".
+                    parent_html_id = "root-container"
+                    old_root_key = self._mounted_root_key
+                    new_subtree = self._build_widget_tree(widget_to_rebuild)
+                    children = new_subtree.get_children() if new_subtree else []
+                    reconcile_root = children[0] if children else None
+                    if reconcile_root is not None and old_root_key is not None:
+                        self.reconciler._adopt_positional_ids(
+                            (old_root_key,), [reconcile_root], main_context_map
+                        )
+                    self._mounted_root_key = reconcile_root.get_unique_id() if reconcile_root else None
+                else:
+                    # Unmounted by an ancestor rebuilt earlier in this frame.
+                    continue
+                if frame:
+                    frame.lap("build")
+                    frame.count("states")
+
+                logger.debug("🔧 Updating: %s (ID: %s)", type(widget_to_rebuild).__name__, widget_key)
+
+                subtree_result = self.reconciler.reconcile(
+                    previous_map=main_context_map,
+                    new_widget_root=reconcile_root,
+                    parent_html_id=parent_html_id,
+                    old_root_key=old_root_key,
+                    is_partial_reconciliation=True
+                )
 
-        for cb_id, cb_func in all_new_callbacks.items():
-            self.api.register_callback(cb_id, cb_func)
+                all_patches.extend(subtree_result.patches)
+                all_new_callbacks.update(subtree_result.registered_callbacks)
+                self.stylesheet.register(subtree_result.active_css_details)
+                self._merge_rendered_nodes(subtree_result.new_rendered_map)
+                instance_cleanup_script += self._sweep_unmounted(subtree_result.unmounted_keys)
+
+                # --- NEW: Analyze this subtree and aggregate required engines ---
+                required_in_subtree = self._analyze_required_js_engines(new_subtree, subtree_result)
+                all_required_engines_this_cycle.update(required_in_subtree)
+                # --- END NEW ---
+                if frame:
+                    frame.lap("diff")
+        finally:
+            self.scheduler.end_frame()
+
+        self._register_callbacks(all_new_callbacks)
+        if frame:
+            frame.lap("diff")
 
         # --- NEW: DYNAMIC JS ENGINE INJECTION LOGIC ---
         js_injection_script = ""
         newly_required_engines = all_required_engines_this_cycle - self._loaded_js_engines
         
         if newly_required_engines:
-            print(f"🚀 PyThra Framework | Dynamically loading {len(newly_required_engines)} new JS engine(s): {newly_required_engines}")
+            logger.info("🚀 Dynamically loading %d new JS engine(s): %s", len(newly_required_engines), newly_required_engines)
             js_injection_script = self._get_js_utility_functions(newly_required_engines)
             self._loaded_js_engines.update(newly_required_engines)
         # --- END OF NEW LOGIC ---
 
-        new_css_keys = set(all_active_css_details.keys())
-        css_update_script = ""
-        if not hasattr(self, '_last_css_keys') or self._last_css_keys != new_css_keys:
-            print("🎨 PyThra Framework | CSS styles changed - Updating stylesheet...")
-            full_css_details = {
-                data['props']['css_class']: (type(data['widget_instance']).generate_css_rule, data['widget_instance'].style_key)
-                for data in main_context_map.values()
-                if 'css_class' in data['props'] and hasattr(data['widget_instance'], 'style_key')
-            }
-            css_rules = self._generate_css_from_details(full_css_details)
-            css_update_script = self._generate_css_update_script(css_rules)
-            self._last_css_keys = new_css_keys
-        else:
-            print("✅ PyThra Framework | CSS styles unchanged - Skipping regeneration")
+        if frame:
+            frame.lap("codegen")
+
+        # Only the shared classes that appeared or went away this frame.
+        css_ops = self.stylesheet.flush()
+        if frame:
+            frame.lap("css")
+            for name, value in self.stylesheet.stats().items():
+                frame.count(name, value)
 
-        dom_patch_script = self._generate_dom_patch_script(all_patches, js_initializers=[])
+        dom_patch_script = self._generate_dom_patch_script(all_patches, css_ops)
 
         # --- CRITICAL: Prepend the JS injection script to the DOM patches ---
-        combined_script = (js_injection_script + "\n" + css_update_script + "\n" + dom_patch_script).strip()
+        combined_script = (
+            js_injection_script + "\n" + instance_cleanup_script + "\n" + dom_patch_script
+        ).strip()
+        if frame:
+            frame.lap("codegen")
+            frame.count("patches", len(all_patches))
 
         if combined_script:
-            print(f"🛠️  PyThra Framework | Applying {len(all_patches)} UI changes to app...")
-            print(f"📝 PyThra Framework | Patch Details: {[f'{p.action}({p.html_id[:8]}...)' for p in all_patches]}")
+            logger.debug("🛠️  Applying %d UI changes to app...", len(all_patches))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📝 Patch Details: %s", [f"{p.action}({p.html_id})" for p in all_patches])
             self.window.evaluate_js(self.id, combined_script)
         else:
-            print("✨ PyThra Framework | UI is up-to-date - No changes needed")
-
-        self._pending_state_updates.clear()
+            logger.debug("✨ UI is up-to-date - No changes needed")
+        if frame:
+            frame.lap("evaluate_js")
 
         end_time = time.time()
         cycle_duration = end_time - start_time
         fps = 1.0 / cycle_duration if cycle_duration > 0 else float('inf')
 
-        print(f"🎉 PyThra Framework | UI Update Complete! at (⏱️ {cycle_duration:.4f}s) ({(cycle_duration * 1000):.2f}ms) ({fps:.2f} FPS)")
-        
-        profiler.disable()
-        s = io.StringIO()
-        ps = pstats.Stats(profiler, stream=s).sort_stats('cumulative')
-        ps.print_stats(20)
-        print("\n--- cProfile Report ---")
-        print(s.getvalue())
-        print("--- End of Report ---\n")
+        logger.info("🎉 UI Update Complete! (⏱️ %.2fms) (%.2f FPS)", cycle_duration * 1000, fps)
+        self.profiler.finish_frame(frame)
         
+    # --- Rendered Map Bookkeeping ---
+    def _merge_rendered_nodes(self, new_nodes: Dict[Union[Key, str], Any]):
+        """
+        Merges reconciled nodes into the main context map, keeping count of
+        how many mounted nodes refer to each callback name and CSS class.
+        """
+        main_context_map = self.reconciler.get_map_for_context("main")
+        refs = self._callback_refs
+        for key, node in new_nodes.items():
+            old_node = main_context_map.get(key)
+            if old_node is node:
+                continue  # Carried over unchanged.
+            if old_node is not None:
+                for name in callback_names(old_node.props):
+                    refs[name] -= 1
+                self.stylesheet.release(key, old_node)
+            for name in callback_names(node.props):
+                refs[name] += 1
+            self.stylesheet.retain(key, node)
+            main_context_map[key] = node
+
+    def _register_callbacks(self, callbacks: Dict[str, Callable]):
+        """Registers callbacks collected by the reconciler with the API."""
+        for cb_id, cb_func in callbacks.items():
+            self.api.register_callback(cb_id, cb_func)
+        self._reconciler_callbacks.update(callbacks)
+
+    def _sweep_unmounted(self, keys: List[Union[Key, str]]) -> str:
+        """
+        Prunes unmounted nodes from the main context map, unregisters the
+        callbacks no mounted node refers to any more and returns a script that
+        destroys the JS instances they owned.
+
+        Without this, nodes removed by partial reconciliations (and every
+        virtual-list item ever built) would stay in the map forever.
+        """
+        if not keys:
+            return ""
+        main_context_map = self.reconciler.get_map_for_context("main")
+        instance_names = []
+        for key in keys:
+            node = main_context_map.pop(key, None)
+            if node is None:
+                continue
+            instance_names.extend(js_instance_names(node))
+            self.stylesheet.release(key, node)
+            self._release_callbacks(callback_names(node.props))
+        return self._generate_instance_cleanup_script(instance_names)
+
+    def _retain_callbacks(self, names):
+        """
+        Counts references to callbacks held outside the rendered map, such as
+        the virtual-list items sent as template records (they have no nodes).
+        """
+        refs = self._callback_refs
+        for name in names:
+            refs[name] += 1
+
+    def _release_callbacks(self, names):
+        """Drops one reference per name and unregisters the names nothing refers to any more."""
+        refs = self._callback_refs
+        for name in names:
+            refs[name] -= 1
+            if refs[name] > 0:
+                continue
+            del refs[name]
+            if name in self._reconciler_callbacks:
+                self._reconciler_callbacks.discard(name)
+                self.api.unregister_callback(name)
+
+    def _release_subtree(self, root_key: Union[Key, str]):
+        """
+        Unmounts a subtree that was rendered outside the normal update cycle
+        (a virtual-list item) and cleans up after it right away.
+        """
+        main_context_map = self.reconciler.get_map_for_context("main")
+        keys = self.reconciler.unmount_subtree(root_key, main_context_map)
+        cleanup_script = self._sweep_unmounted(keys)
+        if cleanup_script and self.window:
+            self.window.evaluate_js(self.id, cleanup_script)
+
+    def _generate_instance_cleanup_script(self, instance_names: List[str]) -> str:
+        """Destroys and forgets `window._pythra_instances` entries."""
+        if not instance_names:
+            return ""
+        return f"""
+            (function(names) {{
+                var registry = window._pythra_instances || {{}};
+                names.forEach(function(name) {{
+                    var instance = registry[name];
+                    if (!instance) return;
+                    if (typeof instance.destroy === 'function') {{
+                        try {{ instance.destroy(); }} catch (e) {{ console.error('Cleanup failed for ' + name, e); }}
+                    }}
+                    delete registry[name];
+                }});
+            }})({json.dumps(instance_names)});
+        """
+
     # --- Widget Tree Building ---
     def _build_widget_tree(self, widget: Optional[Widget]) -> Optional[Widget]:
         """
@@ -768,7 +926,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
             # 1. Build the child widget from the StatelessWidget.
             built_child = widget.build()
             # 2. Recursively process the built child to build its own subtree.
-            processed_child = self._build_widget_tree(built_child)
+            processed_child = self._build_child_tree(built_child)
             # 3. CRITICAL: The StatelessWidget's children list becomes the processed child.
             #    This keeps the StatelessWidget in the tree as the parent.
             widget._children = [processed_child] if processed_child else []
@@ -783,9 +941,10 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
 
             # Build the child widget from the state.
             built_child = state.build()
+            self.scheduler.note_built(state)
 
             # Recursively process the built child to build its own subtree.
-            processed_child = self._build_widget_tree(built_child)
+            processed_child = self._build_child_tree(built_child)
 
             # CRITICAL: The StatefulWidget's children list becomes the *single* processed child.
             # This keeps the StatefulWidget as the parent node in the tree.
@@ -800,13 +959,31 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
                 new_children = []
                 for child in widget.get_children():
                     # Recursively build each child.
-                    built_child = self._build_widget_tree(child)
+                    built_child = self._build_child_tree(child)
                     if built_child:
                         new_children.append(built_child)
                 # Replace the old children list with the newly built one.
                 widget._children = new_children
             return widget
 
+    def _build_child_tree(self, widget: Optional[Widget]) -> Optional[Widget]:
+        """
+        Builds a child widget, skipping it when it is the identical instance
+        that is already mounted.
+
+        Widgets are immutable configurations, so an instance that is reused as-is
+        (a widget cached on a State, a route's page, a "const" child) renders the
+        same subtree it rendered last time. Its StatefulWidget descendants still
+        rebuild on their own when their state is marked dirty. The reconciler
+        sees the same instance and carries its rendered entries over unchanged,
+        so an unchanged subtree costs neither a build nor a diff.
+        """
+        if widget is not None:
+            mounted = self.reconciler.context_maps["main"].get(widget.get_unique_id())
+            if mounted is not None and mounted.get("widget_instance") is widget:
+                return widget
+        return self._build_widget_tree(widget)
+
     # --- HTML and CSS Generation ---
 
     # --- ADD THIS NEW METHOD ---
@@ -845,75 +1022,26 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         self, root_key: Optional[Union[Key, str]], rendered_map: Dict
     ) -> str:
         """Generates the full HTML string by recursively traversing the flat rendered_map."""
-        if root_key is None or root_key not in rendered_map:
-            return ""
-
-        node_data = rendered_map.get(root_key)
-        if not node_data:
-            return ""
-
-        # A StatefulWidget doesn't render itself, so we render its child.
-        if node_data["widget_type"] == "StatefulWidget":
-            child_keys = node_data.get("children_keys", [])
-            if child_keys:
-                return self._generate_html_from_map(child_keys[0], rendered_map)
-            return ""
-
-        html_id = node_data["html_id"]
-        props = node_data["props"]
-        widget_instance = node_data["widget_instance"]
-
-        stub = self.reconciler._generate_html_stub(widget_instance, html_id, props)
-        # print("stub: ", stub)
-
-        children_html = "".join(
-            self._generate_html_from_map(child_key, rendered_map)
-            for child_key in node_data.get("children_keys", [])
-        )
-
-        if ">" in stub and "</" in stub:
-            tag = self.reconciler._get_widget_render_tag(widget_instance)
-            closing_tag = f"</{tag}>"
-            if stub.endswith(closing_tag):
-                content_part = stub[: -len(closing_tag)]
-                return f"{content_part}{children_html}{closing_tag}"
-
-        return stub
+        return self.reconciler.generate_html(root_key, rendered_map)
 
     def _generate_css_from_details(
         self, css_details: Dict[str, Tuple[Callable, Any]]
     ) -> str:
         """Generates CSS rules directly from the details collected by the Reconciler."""
+        # The stylesheet manager caches each class's rule text.
+        self.stylesheet.register(css_details)
         all_rules = []
-        for css_class, (generator_func, style_key) in css_details.items():
-            try:
-                rule = generator_func(style_key, css_class)
-                if rule:
-                    all_rules.append(rule)
-                    # print("Rule: ",rule)
-            except Exception as e:
-                import traceback
-
-                print(f"💥 ERROR generating CSS for class '{css_class}': {e}")
-                traceback.print_exc()
+        for css_class in css_details:
+            rule = self.stylesheet.rule_for(css_class)
+            if rule:
+                all_rules.append(rule)
 
-        print(f"🪄  PyThra Framework | Generated CSS for {len(all_rules)} active shared classes.")
+        logger.debug("🪄  Generated CSS for %d active shared classes.", len(all_rules))
         # print(f"Rules: {all_rules}")
         return "\n".join(all_rules)
 
     # --- Script Generation and File Writing ---
 
-    def _generate_css_update_script(self, css_rules: str) -> str:
-        """Generates JS to update the <style id="dynamic-styles"> tag."""
-        escaped_css = json.dumps(css_rules).replace("`", "\\`")
-        return f"""
-            var styleSheet = document.getElementById('dynamic-styles');
-            var newCss = {escaped_css};
-            if (styleSheet.textContent !== newCss) {{
-                 styleSheet.textContent = newCss;
-            }}
-        """
-
     def _build_path_from_commands(self, commands_data: List[Dict]) -> str:
         """
         Builds an SVG path data string from serialized command data.
@@ -922,598 +1050,20 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         return ""
 
 
-    def _sanitize_for_json(self, data: Any) -> Any:
-        """
-        Recursively removes non-serializable values from a data structure
-        before it's passed to json.dumps.
+    def _generate_dom_patch_script(self, patches: List[Patch], css_ops: Optional[Dict] = None) -> str:
         """
-        if isinstance(data, dict):
-            # Create a new dict, excluding keys with function values or widget instances
-            return {
-                k: self._sanitize_for_json(v)
-                for k, v in data.items()
-                if not callable(v) and not isinstance(v, Widget)
-            }
-        elif isinstance(data, list):
-            return [self._sanitize_for_json(item) for item in data]
-        # Allow basic types that are JSON-serializable
-        elif isinstance(data, (str, int, float, bool, type(None))):
-            return data
-        else:
-            # For any other complex object, return its string representation
-            # This is a safe fallback.
-            return str(data)
+        Encodes the frame's patches and stylesheet changes for the resident JS
+        patch runtime.
 
-    def _generate_dom_patch_script(self, patches: List[Patch], js_initializers=None) -> str:
-        """Converts the list of Patch objects from the reconciler into executable JavaScript."""
-        js_commands = []
-        old_id = None
-        new_id = None
-
-        count = 0
-        for patch in patches:
-
-            action, target_id, data = patch.action, patch.html_id, patch.data
-
-            # --- THIS IS THE FIX ---
-            # Create a sanitized version of the data for logging.
-            sanitized_data_for_log = self._sanitize_for_json(data)
-            loggable_data_str = json.dumps(sanitized_data_for_log)
-            # --- END OF FIX ---
-
-            command_js = ""
-
-            # print("Patch details: ",action, target_id, data)
-
-            if action == "INSERT":
-                parent_id, html_stub, props, before_id = (
-                    data["parent_html_id"],
-                    data["html"],
-                    data["props"],
-                    data["before_id"],
-                )
-                # Escape the HTML for safe injection into a JS template literal
-                final_escaped_html = (
-                    json.dumps(html_stub)[1:-1]
-                    .replace("`", "\\`")
-                    .replace("${", "\\${")
-                )
-                before_id_js = (
-                    f"document.getElementById('{before_id}')" if before_id else "null"
-                )
-                command_js = f"""
-                    var parentEl = document.getElementById('{parent_id}');
-                    if (parentEl) {{
-                        try {{
-                            // Create a temporary, disconnected container
-                            var tempContainer = document.createElement('div');
-                            // Use trim() to remove leading/trailing whitespace from the HTML string
-                            tempContainer.innerHTML = `{final_escaped_html}`.trim(); 
-                            
-                            // Use `firstElementChild` which ignores whitespace text nodes
-                            var insertedEl = tempContainer.firstElementChild; 
-
-                            if (insertedEl) {{
-                                // Check if before element exists and is still in DOM
-                                var beforeEl = {before_id_js};
-                                if (beforeEl && !parentEl.contains(beforeEl)) {{
-                                    beforeEl = null; // Element no longer exists, append at end
-                                }}
-                                parentEl.insertBefore(insertedEl, beforeEl);
-                                // Now we can safely apply props because 'insertedEl' is guaranteed to be an element
-                                {self._generate_prop_update_js(target_id, props, is_insert=True)}
-                            }} else {{
-                                console.warn('INSERT: No valid element created from HTML for {target_id}');
-                            }}
-                        }} catch (e) {{
-                            console.error('INSERT: DOM operation failed for {target_id}:', e);
-                        }}
-                    }} else {{
-                        console.error('INSERT: Parent element {parent_id} not found for {target_id}');
-                    }}
-                """
-                props = data.get("props", {})
-
-                # --- ADD THIS BLOCK ---
-                if props.get("init_gradient_clip_border"):
-                    options_json = json.dumps(props.get("gradient_clip_options", {}))
-                    command_js += f"""
-                        setTimeout(() => {{
-                            if (typeof PythraGradientClipPath !== 'undefined') {{
-                                window._pythra_instances['{target_id}'] = new PythraGradientClipPath('{target_id}', {options_json});
-                            }}
-                        }}, 0);
-                    """
-                # --- END OF BLOCK ---
-
-                # --- ADD THIS BLOCK ---
-                if props.get("init_gesture_detector"):
-                    options_json = json.dumps(props.get("gesture_options", {}))
-                    command_js += f"""
-                        setTimeout(() => {{
-                            if (typeof PythraGestureDetector !== 'undefined') {{
-                                window._pythra_instances['{target_id}'] = new PythraGestureDetector('{target_id}', {options_json});
-                            }}
-                        }}, 0);
-                    """
-                # --- END OF BLOCK ---
-
-                # --- ADD THIS BLOCK ---
-                # print("Props: ", props)
-                if props.get("init_dropdown"):
-                    print("---- dropdown init ----", target_id)
-                    options_json = json.dumps(props.get("dropdown_options", {}))
-                    command_js += f"""
-                        setTimeout(() => {{
-                            console.log("Initializig dropdown");
-                            if (typeof window.PythraDropdown !== 'undefined') {{
-                                console.log("Initializig the dropdown");
-                                if (!window._pythra_instances['{target_id}']){{
-                                    window._pythra_instances['{target_id}'] = new window.PythraDropdown('{target_id}', {options_json});
-                                }}
-                            }}
-                        }}, 0);
-                    """
-                # --- END OF BLOCK ---
-
-                if props.get("init_slider"):
-                    options_json = json.dumps(props.get("slider_options", {}))
-                    command_js += f"""
-                        setTimeout(() => {{
-                            if (typeof window.PythraSlider !== 'undefined') {{
-                                if (!window._pythra_instances['{target_id}']) {{
-                                    console.log('Initializing dynamically inserted PythraSlider for #{target_id}');
-                                    window._pythra_instances['{target_id}'] = new window.PythraSlider('{target_id}', {options_json});
-                                }}
-                            }}
-                        }}, 0);
-                    """
-                # --- END ADDITION ---
-                if props.get("init_simplebar"):
-                    options_json = json.dumps(props.get("simplebar_options", {}))
-                    command_js += f"""
-                    setTimeout(() => {{
-                        var el_{target_id} = document.getElementById('{target_id}');
-                        if (el_{target_id} && !el_{target_id}.simplebar) {{
-                            new SimpleBar(el_{target_id}, {options_json} );
-                            console.log(el_{target_id}.simplebar);
-                        }}
-                        }}, 0);
-                    """
-                    # print("new SimpleBar: ", options_json)
-
-                # --- ADD THIS BLOCK ---
-                if props.get("init_virtual_list"):
-                    options = props.get("virtual_list_options", {})
-                    options_json = json.dumps(options)
-                    # We need to wait for SimpleBar to initialize first, so we defer this.
-                    js_commands.append(f"""
-                    setTimeout(() => {{
-                        if (typeof window.PythraVirtualList !== 'undefined' && document.getElementById('{target_id}').simplebar) {{
-                            window._pythra_instances['{target_id}_vlist'] = new window.PythraVirtualList('{target_id}', {options_json});
-                        }}
-                    }}, 0);
-                    """)
-                # --- END OF BLOCK ---
-
-                if 'responsive_clip_path' in props:
-                    # print("INITIALIZERS: ", js_initializers)
-                    if target_id != new_id:
-                        old_id, new_id = new_id, target_id
-                    initializer_data = {
-                        'type': 'ResponsiveClipPath',
-                        'target_id': target_id,
-                        'data': props['responsive_clip_path'],
-                        'before_id': old_id
-                    }
-                    # js_initializers.append(initializer_data) if js_initializers else print("no js_initializers found")
-                    # print("INITIALIZERS:AFTER: ", js_initializers)
-                    # target_id = initializer_data["target_id"]
-                    clip_data = initializer_data["data"]
-                    # print("target id: ", target_id, "Data: ", clip_data, "before_id: ", initializer_data["before_id"] if initializer_data["before_id"] else None)
-
-                    # Serialize the Python data into JSON strings for JS
-                    points_json = json.dumps(clip_data["points"])
-                    radius_json = json.dumps(clip_data["radius"])
-                    ref_w_json = json.dumps(clip_data["viewBox"][0])
-                    ref_h_json = json.dumps(clip_data["viewBox"][1])
-
-                    # This JS code performs the exact two-step process you described.
-                    # commands_js = 
-
-
-                    js_commands.append(f"""
-                    setTimeout(() => {{
-                        // Step 0: Convert Python's array-of-arrays to JS's array-of-objects
-                        const pointsForGenerator_{target_id} = {points_json}.map(p => ({{x: p[0], y: p[1]}}));
-                        
-                        // Step 1: Call generateRoundedPath with the points and radius
-                        const initialPathString_{target_id} = window.generateRoundedPath(pointsForGenerator_{target_id}, {radius_json});
-                        
-                        // Step 2: Feed the generated path into ResponsiveClipPath
-                        window._pythra_instances['{initializer_data["before_id"] if initializer_data["before_id"] else target_id}'] = new window.ResponsiveClipPath(
-                            '{initializer_data["before_id"] if initializer_data["before_id"] else target_id}', 
-                            initialPathString_{target_id}, 
-                            {ref_w_json}, 
-                            {ref_h_json}, 
-                            {{ uniformArc: true, decimalPlaces: 2 }}
-                        );
-                        }}, 0);
-                    """)
-
-                # --- GENERIC JS INITIALIZER FOR BOTH INSERT AND REPLACE ---
-                js_init_data = props.get("_js_init")
-                if js_init_data and isinstance(js_init_data, dict):
-                    # print("js_init_data: ", js_init_data)
-                    engine_name = js_init_data.get("engine")
-                    instance_name = js_init_data.get("instance_name")
-                    options = js_init_data.get("options", {})
-                    options_json = json.dumps(options)
-                    
-                    # We use setTimeout to ensure the element is fully in the DOM.
-                    command_js += f"""
-                        console.log('Scheduling dynamic initialization of {engine_name} for {instance_name}');
-                        setTimeout(() => {{
-        const targetElement = document.getElementById('{target_id}');
-        const instanceExists = window._pythra_instances && window._pythra_instances['{instance_name}'];
-
-        if (targetElement && typeof {engine_name} !== 'undefined') {{
-            // --- NEW LIFECYCLE LOGIC ---
-            
-            // 1. Check if an old instance exists.
-            if (instanceExists) {{
-                // 2. If it has a destroy method, call it to clean up.
-                if (typeof window._pythra_instances['{instance_name}'].destroy === 'function') {{
-                    window._pythra_instances['{instance_name}'].destroy();
-                }}
-                // 3. Nullify the reference.
-                window._pythra_instances['{instance_name}'] = null;
-            }}
-
-            // 4. Now, create the new instance. This is safe.
-            console.log('✅ Initializing/Re-initializing JS component: {instance_name} on #{target_id}');
-            if (!window._pythra_instances) {{ window._pythra_instances = {{}}; }}
-            window._pythra_instances['{instance_name}'] = new {engine_name}(targetElement, {options_json});
-
-        }} else {{
-            console.error('Failed to initialize {instance_name}. Element "{target_id}" or class "{engine_name}" not found.');
-        }}
-    }}, 0);
-                    """
-                # --- END OF GENERIC LOGIC ---
-                    
-                    
-            elif action == "REMOVE":
-                command_js = f"""
-                    var el_to_remove = document.getElementById('{target_id}');
-                    if (el_to_remove) {{
-                        // Check if it was a SimpleBar instance before removing.
-                        if (el_to_remove.simplebar) {{
-                            // This is crucial to prevent memory leaks from ResizeObserver.
-                            el_to_remove.simplebar.unMount();
-                        }}
-                        el_to_remove.remove();
-                    }}
-                """
-                command_js = f'var el = document.getElementById("{target_id}"); if(el) el.remove();'
-            elif action == "UPDATE":
-                # Pass the element's ID to the prop updater, not the element itself
-                prop_update_js = self._generate_prop_update_js(target_id, data["props"])
-                if prop_update_js:
-                    command_js = f"""
-                        var elToUpdate = document.getElementById("{target_id}");
-                        if (elToUpdate) {{
-                            try {{
-                                {prop_update_js}
-                            }} catch (e) {{
-                                console.error('UPDATE: Property update failed for {target_id}:', e);
-                            }}
-                        }} else {{
-                            console.error('UPDATE: Element {target_id} not found in DOM');
-                        }}
-                    """
-
-
-            elif action == "MOVE":
-                parent_id, before_id = data["parent_html_id"], data["before_id"]
-                before_id_js = (
-                    f"document.getElementById('{before_id}')" if before_id else "null"
-                )
-                command_js = f"""
-                    var el = document.getElementById('{target_id}');
-                    var p = document.getElementById('{parent_id}');
-                    if (el && p) {{
-                        try {{
-                            var beforeEl = {before_id_js};
-                            // Check if before element still exists and is in the target parent
-                            if (beforeEl && !p.contains(beforeEl)) {{
-                                beforeEl = null; // Element moved or removed, append at end
-                            }}
-                            p.insertBefore(el, beforeEl);
-                        }} catch (e) {{
-                            console.error('MOVE: Failed to move element {target_id}:', e);
-                        }}
-                    }} else {{
-                        if (!el) console.error('MOVE: Element {target_id} not found');
-                        if (!p) console.error('MOVE: Parent element {parent_id} not found');
-                    }}
-                """
-
-            # --- ADD THIS NEW BLOCK ---
-            elif action == "REPLACE":
-                new_html_stub = data["new_html"]
-                new_props = data["new_props"]
-                
-                # Use a robust replacement method. `outerHTML` is simple and effective.
-                # It replaces the entire element, including the element itself.
-                escaped_html = json.dumps(new_html_stub)[1:-1].replace("`", "\\`")
-
-                command_js = f"""
-                    var oldEl = document.getElementById('{target_id}');
-                    if (oldEl) {{
-                        oldEl.outerHTML = `{escaped_html}`;
-                        // After replacement, we may need to apply props to the NEW element.
-                        // The new element's ID is embedded in the escaped_html, so we need to find it.
-                        // NOTE: This part is tricky. A simpler way for now is to bake initial props
-                        // into the HTML stub (like inline styles), which our stub generator does.
-                        // Complex JS initializers (like SimpleBar) would need more handling here.
-                    }}
-                """
-                # --- ADD THIS NEW LOGIC ---
-                # After replacing the HTML, we must check if the NEW widget
-                # needs a JS engine and initialize it.
-                
-                # Check for Dropdown
-                if new_props.get("init_dropdown"):
-                    options_json = json.dumps(new_props.get("dropdown_options", {}))
-                    # The element ID is the same, but the element itself is new.
-                    command_js += f"""
-                        setTimeout(() => {{
-                            if (typeof PythraDropdown !== 'undefined') {{
-                                console.log('Re-initializing Dropdown for #{target_id} after replacement.');
-                                window._pythra_instances['{target_id}'] = new PythraDropdown('{target_id}', {options_json});
-                            }}
-                        }}, 0);
-                    """
-            # --- END OF NEW BLOCK ---
-                
-
-            elif action == "SVG_INSERT":
-                parent_id = data.get("parent_html_id")  # e.g., 'svg-defs'
-                html_stub = data.get("html")
-                final_escaped_html = json.dumps(html_stub)[1:-1]
-
-                command_js = f"""
-                    var svgDefs = document.getElementById('{parent_id}');
-                    if (svgDefs) {{
-                        // Don't add if it already exists
-                        if (!document.getElementById('{target_id}')) {{
-                            svgDefs.insertAdjacentHTML('beforeend', `{final_escaped_html}`);
-                        }}
-                    }} else {{
-                        console.warn('SVG defs container #{parent_id} not found for INSERT of {target_id}');
-                    }}
-                """
-            # ... (any other patch types like SVG_INSERT) ...
-
-            if command_js:
-                # --- THIS IS THE FIX FOR THE TypeError ---
-                # Helper function to recursively clean a dictionary for JSON serialization.
-                def make_loggable(obj):
-                    if isinstance(obj, dict):
-                        # Create a new dict, processing each value.
-                        return {k: make_loggable(v) for k, v in obj.items()}
-                    if isinstance(obj, list):
-                        # Create a new list, processing each item.
-                        return [make_loggable(i) for i in obj]
-                    # Replace non-serializable types with a descriptive string.
-                    if (
-                        callable(obj)
-                        or isinstance(obj, Widget)
-                        or isinstance(obj, weakref.ReferenceType)
-                    ):
-                        return f"<{type(obj).__name__}>"
-                    # Return all other (presumably serializable) types as is.
-                    return obj
-
-                # Create the log-safe string representation of the data.
-                loggable_data_str = json.dumps(make_loggable(data))
-
-                is_textfield_patch = False
-                if "props" in data and isinstance(data["props"], dict):
-                    if "onChangedName" in data["props"]:
-                        is_textfield_patch = True
-
-                # Use the sanitized string in the catch block.
-                # TODO: RECHECK AND FIX THE TRY CATCH BLOCK CAUSING UI BREAKAGE
-                # print(f"Loggable Data str: [{loggable_data_str}]")
-                js_commands.append(
-                    
-                    f"try {{ {command_js} }} catch (e) {{ console.error('Error applying patch {action} {target_id}:', e.name + ': ' + e.message, 'Stack:', e.stack, 'Data:', {loggable_data_str}); }};"
-                )
-
-         # --- THIS IS THE FIX ---
-        # The `self.called` flag is used to ensure we only inject the JS utilities ONCE
-        # per application session, on the very first set of patches that gets sent.
-        if not self.called:
-            self.called = True
-            print("🔧 PyThra Framework | Injecting JS utilities for the first time during reconciliation")
-            # Prepend the combined JS utilities to the list of commands.
-            # Get the required engines from the current reconciliation result
-            required_engines = self._analyze_required_js_engines(None, result)
-            js_utilities = self._get_js_utility_functions(required_engines)
-            print("🔧 PyThra Framework | Required JS engines for utilities:", required_engines)
-            print("🔧 PyThra Framework | Injecting JS utilities for engines:", js_utilities)
-            js_commands.insert(0, js_utilities)
-        else:
-            print("🔧 PyThra Framework | Skipping JS utilities injection (already loaded)")
-        # --- END OF FIX ---
-
-
-        return "\n".join(js_commands)
-
-    def _generate_prop_update_js(
-        self, target_id: str, props: Dict, is_insert: bool = False
-    ) -> str:
-        """Generates specific JS commands for updating element properties."""
-        js_prop_updates = []
-        style_updates = {}
-        element_var = "insertedEl" if is_insert else "elToUpdate"
-
-        # --- Special handling for TextField value to prevent cursor jumping ---
-        # if props.get('onChangedName'): # A good heuristic for input-like elements
-        #      new_value = props.get('value', '')
-        #      # Only update the value if it's different. This is crucial for focus.
-        #      js_prop_updates.append(f"if ({element_var}.value !== {json.dumps(new_value)}) {{ console.log({element_var}); {element_var}.value = {json.dumps(new_value)}; }};")
-        # ---
-
-        for key, value in props.items():
-            # if key == 'value' and 'onChangedName' in props:
-            #     # For TextField, we target the inner <input> element directly.
-            #     input_element_selector = f"document.getElementById('{target_id}_input')"
-            #     js_prop_updates.append(f"var inputEl = {input_element_selector}; if(inputEl) inputEl.value = {json.dumps(value)};")
-            # print("Props:", props)
-
-            if key == "data":
-                js_prop_updates.append(
-                    f"{element_var}.textContent = {json.dumps(str(value))};"
-                )
-                # print("data: ",value)
-            # --- THIS IS THE NEW, INTELLIGENT CLASS UPDATE LOGIC ---
-            elif key == "css_class":
-                # We need the old shared class to remove it. This must be passed in the patch.
-                # Let's assume the patch data for an UPDATE now contains:
-                # data['props']['css_class'] -> new_class
-                # data['old_props']['css_class'] -> old_class
-                
-                old_class = props.get("old_shared_class") # We'll need to add this to the patch
-                new_class = value # The new shared class
-                new_classes = new_class.split(' ')
-                # print("New class: ", new_class.split(' '),)
-
-                for _class in new_classes:
-                    # print("New class: ",_class) 
-
-                    # This JS is robust: it works even if classes are None or the same.
-                    js_prop_updates.append(f"""
-                        if ("{old_class}" !== "{_class}") {{
-                            if ("{old_class}" && {element_var}.classList.contains("{old_class}")) {{
-                                {element_var}.classList.remove("{old_class}");
-                            }}
-                            if ("{_class}") {{
-                                {element_var}.classList.add("{_class}");
-                            }}
-                        }}
-                    """)
-            # --- END OF NEW LOGIC ---
-            elif key == "src":
-                js_prop_updates.append(f"{element_var}.src = {json.dumps(value)};")
-            elif key == "tooltip":
-                js_prop_updates.append(f"{element_var}.title = {json.dumps(value)};")
-            
-            elif key == "value" and "textfield" in props.get(
-                "css_class", ""
-            ):
-                # This is a value update for a TextField. Target the inner input.
-                
-                input_id = f"{target_id}_input"
-                # --- ADD DETAILED LOGGING ---
-                js_prop_updates.append(f"""
-                    var inputEl = document.getElementById('{input_id}');
-                    if (inputEl) {{
-                        console.log('--- TextField Update Patch ---');
-                        console.log('Target Input ID:', '{input_id}');
-                        console.log('Current Browser Value:', inputEl.value);
-                        console.log('New Value from Python:', {json.dumps(str(value))});
-                        if (inputEl.value !== {json.dumps(str(value))}) {{
-                            console.log('Values are different. Applying update.');
-                            inputEl.value = {json.dumps(str(value))};
-                        }} else {{
-                            console.log('Values are the same. Skipping update to prevent cursor jump.');
-                        }}
-                    }} else {{
-                        console.error('Could not find input element with ID:', '{input_id}');
-                    }}
-                """)
-                # --- END OF LOGGING ---
-
-            elif key == "errorText" and "textfield-root-container" in props.get(
-                "css_class", ""
-            ):
-                # This is an errorText update for a TextField. Target the helper div.
-                helper_id = f"{target_id}_helper"
-                js_prop_updates.append(
-                    f"var helperEl = document.getElementById('{helper_id}'); if(helperEl) helperEl.textContent = {json.dumps(str(value))};"
-                )
-
-            # elif key == 'value' and 'onChangedName' in props: # Check if it's a TextField
-            #         input_element = f"document.getElementById('{target_id}_input')" if not is_insert else f"{element_var}.querySelector('.textfield-input')"
-            #         js_prop_updates.append(f"var inputEl = {input_element}; if(inputEl && inputEl.value !== {json.dumps(value)}) {{ inputEl.value = {json.dumps(value)}; }}")
-
-            # Direct style props (use sparingly)
-            elif key == "color":
-                style_updates["color"] = value
-            elif key == "backgroundColor":
-                style_updates["backgroundColor"] = value
-            elif key == "width" and value is not None:
-                style_updates["width"] = (
-                    f"{value}px" if isinstance(value, (int, float)) else value
-                )
-            elif key == "height" and value is not None:
-                style_updates["height"] = (
-                    f"{value}px" if isinstance(value, (int, float)) else value
-                )
-            elif key == "aspectRatio":
-                style_updates["aspect-ratio"] = value
-            elif key == "clip_path_string":
-                style_updates["clip-path"] = value
-
-        # Handle the 'style' dictionary passed from render_props
-        if "style" in props and isinstance(props["style"], dict):
-            for style_key, style_value in props["style"].items():
-                # print("style_key: ",style_key,"style_value: ",style_value)
-                # Convert camelCase to kebab-case for CSS
-                css_prop_kebab = "".join(
-                    ["-" + c.lower() if c.isupper() else c for c in style_key]
-                ).lstrip("")
-                # print("css_prop_kebab: ", css_prop_kebab, f"{json.dumps(style_value)}")
-                if css_prop_kebab == "--slider-percentage" and props.get("isDragEnded"):
-                    print("drag css", props["isDragEnded"])
-                    js_prop_updates.append(
-                        f"try {{ {element_var}.style.setProperty('{css_prop_kebab}', {json.dumps(style_value)}); }} catch (e) {{ console.warn('Failed to set CSS property {css_prop_kebab}:', e); }}"
-                    )
-                elif css_prop_kebab == "--slider-percentage" and not props.get("isDragEnded"):
-                    print("drag css", props.get("isDragEnded"))
-                elif css_prop_kebab != "--slider-percentage" and "isDragEnded" not in props:
-                    js_prop_updates.append(
-                        f"try {{ {element_var}.style.setProperty('{css_prop_kebab}', {json.dumps(style_value)}); }} catch (e) {{ console.warn('Failed to set CSS property {css_prop_kebab}:', e); }}"
-                    )
-        # --- END OF ADDITION ---
-
-        # --- NEW: Apply _style_override from the widget instance ---
-        # We need the widget instance to get the override
-        # This assumes the reconciler includes it in the patch data (we'll ensure this next)
-        widget_instance = props.get("widget_instance")
-        if widget_instance and hasattr(widget_instance, "_style_override"):
-            for style_key, style_value in widget_instance._style_override.items():
-                style_updates[style_key] = style_value
-                # print("Style Value Init: ", style_value)
-
-        # Handle style dict passed from widgets like ListTile
-        if "style" in props and isinstance(props["style"], dict):
-            for style_key, style_value in props["style"].items():
-                style_updates[style_key] = style_value
-
-        if style_updates:
-            for prop, val in style_updates.items():
-                css_prop_kebab = "".join(
-                    ["-" + c.lower() if c.isupper() else c for c in prop]
-                ).lstrip("-")
-                js_prop_updates.append(
-                    f"try {{ {element_var}.style.setProperty('{css_prop_kebab}', {json.dumps(val)}); }} catch (e) {{ console.warn('Failed to set style property {css_prop_kebab}:', e); }}"
-                )
-
-        return "\n".join(js_prop_updates)
+        The browser receives one JSON document per frame (see
+        `pythra.patch_protocol`) instead of a freshly generated script per patch.
+        """
+        if not patches and not css_ops:
+            return ""
+        patch_frame = encode_patches(patches, css_ops)
+        if self.patch_recorder:
+            self.patch_recorder.record(patch_frame)
+        return apply_script(patch_frame)
 
     def _generate_initial_js_script(self, result: 'ReconciliationResult', required_engines: set = None) -> str:
         """Generates a script tag to run initializations after the DOM loads with optimized JS loading."""
@@ -1598,7 +1148,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
             # --- ADD THIS BLOCK ---
             # --- SIMPLIFIED VLIST LOGIC ---
             if props.get("init_virtual_list"):
-                print("Initializing Virtual List...")
+                logger.debug("Initializing Virtual List %s", html_id)
                 imports.add("import { PythraVirtualList } from './js/virtual_list.js';")
                 options = props.get("virtual_list_options", {})
                 options_json = json.dumps(options)
@@ -1633,7 +1183,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
                 imports.add("import { PythraGestureDetector } from './js/gesture_detector.js';")
                 options = props.get("gesture_options", {})
                 options_json = json.dumps(options)
-                print("options: ", options_json)
+                logger.debug("Gesture detector options: %s", options_json)
                 js_commands.append(f"window._pythra_instances['{html_id}'] = new PythraGestureDetector('{html_id}', {options_json});")
             # --- END OF BLOCK ---
 
@@ -1797,13 +1347,13 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         # First check the new-style plugin_js_modules
         if engine_name in self.plugin_js_modules:
             module_info = self.plugin_js_modules[engine_name]
-            print(f"✅ Found module in plugin_js_modules: {module_info}")
+            logger.debug("✅ Found module in plugin_js_modules: %s", module_info)
             return module_info
             
         # Fall back to old-style plugins dict
         for plugin_name, plugin_info in self.plugins.items():
             modules = plugin_info.get("js_modules", {})
-            print(f"Checking plugin {plugin_name} modules:", modules)
+            logger.debug("Checking plugin %s modules: %s", plugin_name, modules)
             if engine_name in modules:
                 return {
                     "plugin": plugin_name,
@@ -1813,7 +1363,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         # If not found, look in package manager's loaded packages
         if hasattr(self, 'package_manager'):
             loaded_packages = self.package_manager.get_loaded_packages()
-            print("Checking loaded packages:", loaded_packages.keys())
+            logger.debug("Checking loaded packages: %s", list(loaded_packages))
             for pkg_name, pkg_info in loaded_packages.items():
                 js_modules = pkg_info.manifest.js_modules
                 if engine_name in js_modules:
@@ -1824,7 +1374,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
                             "path": str(module_path)
                         }
         
-        print(f"⚠️ No JS module found for engine: {engine_name}")
+        logger.warning("No JS module found for engine: %s", engine_name)
         return None
 
     def _write_initial_files(
@@ -1927,6 +1477,7 @@ if (typeof scalePathAbsoluteMLA !== 'undefined') window.scalePathAbsoluteMLA = s
         """Generates standard script includes for QWebChannel and event handling."""
         return f"""
         <script src="qwebchannel.js"></script>
+        <script>{PATCH_RUNTIME_JS}</script>
         <script>
             // Suppress inset-area deprecation warnings
             (function() {{
@@ -0,0 +1,290 @@
+# =============================================================================
+# PYTHRA DATA SOURCES - Where a Virtual List's Items Come From
+# =============================================================================
+"""
+PyThra List Data Sources
+
+A `ListDataSource` is the data behind a `VirtualListView` (or `VirtualGridView`):
+it knows how many items there are, hands out one item by index and tells its
+listeners exactly what changed. The list then moves its built items along
+instead of throwing them all away, and the rows on screen stay where they are:
+inserting a row at the top of a 100k-row list is a shift, not a refresh.
+
+**Real-world analogy:**
+A librarian who keeps a change log. Instead of announcing "the catalogue has
+changed, start over", they say "three books were added at shelf 12": whoever
+was reading shelf 40 just walks three shelves further and keeps reading.
+
+**The change events:**
+- `notifyInserted(start, count)`: `count` items now sit at `start`.
+- `notifyRemoved(start, count)`: the items at `start..start+count-1` are gone.
+- `notifyChanged(start, count)`: those items have new content, same places.
+- `notifyMoved(start, to, count)`: a run of items now starts at `to`.
+- `notifyReset()`: anything may have changed; the list reloads everything.
+
+Inside `with source.batch():` events are collected and delivered together (one
+update for the list, one message to the browser) when the block ends.
+
+```python
+log = SQLiteListDataSource("app.db", "log", columns=("ts", "level", "message"))
+
+VirtualListView(
+    key=Key("log"),
+    controller=VirtualListController(),
+    itemCount=None,                      # Taken from the data source
+    dataSource=log,
+    itemBuilder=lambda i: LogRow(*log.getItem(i)),
+    itemExtent=24,
+    followTail=True,                     # Stay at the bottom while rows arrive
+)
+
+log.extend(new_rows)                     # Thousands at a time, one update
+```
+"""
+
+import logging
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+ChangeListener = Callable[[List["ListChange"]], None]
+
+
+@dataclass(frozen=True)
+class ListChange:
+    """
+    One change to a list: `kind` is "insert", "remove", "change", "move" or
+    "reset"; it covers `count` items from `start` (a move puts them at `to`).
+    """
+    kind: str
+    start: int = 0
+    count: int = 0
+    to: int = 0
+
+    def map_index(self, index: int) -> Optional[int]:
+        """Where the item at `index` before the change is after it (None if removed)."""
+        start, end = self.start, self.start + self.count
+        if self.kind == "insert":
+            return index + self.count if index >= start else index
+        if self.kind == "remove":
+            if index < start:
+                return index
+            return None if index < end else index - self.count
+        if self.kind == "move":
+            if start <= index < end:
+                return self.to + index - start
+            index = index if index < start else index - self.count
+            return index + self.count if index >= self.to else index
+        return index
+
+    def invalidates(self, index: int) -> bool:
+        """Whether whatever was built for the item at `index` is out of date."""
+        if self.kind == "reset":
+            return True
+        return self.kind == "change" and self.start <= index < self.start + self.count
+
+    def to_js(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "start": self.start, "count": self.count, "to": self.to}
+
+
+class ListDataSource:
+    """
+    The protocol a virtual list reads its items through. Subclasses implement
+    `itemCount` and `getItem()`, and call the `notify*` methods (or let their
+    own mutators call them) whenever the data changes.
+    """
+
+    def __init__(self):
+        self._listeners: List[ChangeListener] = []
+        self._batch_depth = 0
+        self._batched: List[ListChange] = []
+
+    @property
+    def itemCount(self) -> int:
+        raise NotImplementedError
+
+    def getItem(self, index: int) -> Any:
+        raise NotImplementedError
+
+    def add_listener(self, listener: ChangeListener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: ChangeListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def batch(self):
+        """Delivers the events of the block together when it ends."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batched:
+                changes, self._batched = self._batched, []
+                self._deliver(changes)
+
+    def notifyInserted(self, start: int, count: int = 1):
+        if count > 0:
+            self._emit(ListChange("insert", start, count))
+
+    def notifyRemoved(self, start: int, count: int = 1):
+        if count > 0:
+            self._emit(ListChange("remove", start, count))
+
+    def notifyChanged(self, start: int, count: int = 1):
+        if count > 0:
+            self._emit(ListChange("change", start, count))
+
+    def notifyMoved(self, start: int, to: int, count: int = 1):
+        if count > 0 and start != to:
+            self._emit(ListChange("move", start, count, to))
+
+    def notifyReset(self):
+        self._emit(ListChange("reset"))
+
+    def _on_change(self, change: ListChange):
+        """Called for every event before listeners hear of it (for caches)."""
+
+    def _emit(self, change: ListChange):
+        self._on_change(change)
+        if not self._batch_depth:
+            self._deliver([change])
+            return
+        last = self._batched[-1] if self._batched else None
+        if last and change.kind == last.kind == "insert" and change.start == last.start + last.count:
+            # Rows appended one by one in a batch travel as one range.
+            self._batched[-1] = ListChange("insert", last.start, last.count + change.count)
+        else:
+            self._batched.append(change)
+
+    def _deliver(self, changes: List[ListChange]):
+        for listener in list(self._listeners):
+            try:
+                listener(changes)
+            except Exception:
+                logger.exception("List data source listener failed")
+
+
+class SQLiteListDataSource(ListDataSource):
+    """
+    The rows of an SQLite table as a list, read a page at a time.
+
+    Only the pages in use are kept in memory (least recently used go first),
+    so the table can be far larger than memory. `key` is a unique column the
+    rows are ordered by (the rowid by default). Pages are found from whichever
+    is closest: the start of the table, a page already read, or the end of the
+    table, so a view following the newest rows never scans the whole table.
+
+    `extend()` / `append()` insert rows in one transaction and notify one
+    range; they assume new rows sort after the existing ones (as rowids and
+    timestamps do). After writing to the table some other way, call `reload()`.
+    """
+
+    def __init__(self,
+                 database: Union[str, sqlite3.Connection],
+                 table: str,
+                 columns: Optional[Sequence[str]] = None,
+                 key: str = "rowid",
+                 pageSize: int = 256,
+                 maxCachedPages: int = 16):
+        super().__init__()
+        self._owns_connection = not isinstance(database, sqlite3.Connection)
+        self.connection = sqlite3.connect(database) if self._owns_connection else database
+        self.table = table
+        self.columns = tuple(columns) if columns else None
+        self.key = key
+        self.pageSize = max(1, pageSize)
+        self.maxCachedPages = max(1, maxCachedPages)
+        column_list = ", ".join(self.columns) if self.columns else "*"
+        self._select = f"SELECT {key}, {column_list} FROM {table}"
+        self._pages: "OrderedDict[int, List[Tuple]]" = OrderedDict()
+        # page -> key of its first row; lets a read seek instead of skipping rows.
+        self._page_keys: Dict[int, Any] = {}
+        self._count = self._query_count()
+
+    @property
+    def itemCount(self) -> int:
+        return self._count
+
+    def getItem(self, index: int) -> Tuple:
+        if not 0 <= index < self._count:
+            raise IndexError(f"row {index} out of range (0..{self._count - 1})")
+        page, offset = divmod(index, self.pageSize)
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._load_page(page)
+        else:
+            self._pages.move_to_end(page)
+        return rows[offset]
+
+    def append(self, row: Sequence):
+        self.extend([row])
+
+    def extend(self, rows: Sequence[Sequence]):
+        """Inserts `rows` at the end in one transaction and notifies one range."""
+        rows = list(rows)
+        if not rows:
+            return
+        placeholders = ", ".join("?" * len(rows[0]))
+        target = f"{self.table} ({', '.join(self.columns)})" if self.columns else self.table
+        with self.connection:
+            self.connection.executemany(f"INSERT INTO {target} VALUES ({placeholders})", rows)
+        self.notifyInserted(self._count, len(rows))
+
+    def reload(self):
+        """Re-reads the table after it was changed behind the data source's back."""
+        self.notifyReset()
+
+    def close(self):
+        if self._owns_connection:
+            self.connection.close()
+
+    def _query_count(self) -> int:
+        return self.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def _on_change(self, change: ListChange):
+        if change.kind == "insert" and change.start == self._count:
+            # Appended: only a partly filled last page is out of date.
+            self._pages.pop(self._count // self.pageSize, None)
+            self._count += change.count
+            return
+        self._pages.clear()
+        self._page_keys.clear()
+        if change.kind == "insert":
+            self._count += change.count
+        elif change.kind == "remove":
+            self._count -= change.count
+        elif change.kind == "reset":
+            self._count = self._query_count()
+
+    def _load_page(self, page: int) -> List[Tuple]:
+        start = page * self.pageSize
+        size = min(self.pageSize, self._count - start)
+        # Rows SQLite would have to step over for each way of reaching the page.
+        from_end = self._count - start - size
+        known = max((p for p in self._page_keys if p <= page), default=None)
+        from_known = start - known * self.pageSize if known is not None else start
+
+        if from_end < min(start, from_known):
+            sql = f"{self._select} ORDER BY {self.key} DESC LIMIT ? OFFSET ?"
+            records = self.connection.execute(sql, (size, from_end)).fetchall()[::-1]
+        elif known is not None and from_known < start:
+            sql = f"{self._select} WHERE {self.key} >= ? ORDER BY {self.key} LIMIT ? OFFSET ?"
+            records = self.connection.execute(sql, (self._page_keys[known], size, from_known)).fetchall()
+        else:
+            sql = f"{self._select} ORDER BY {self.key} LIMIT ? OFFSET ?"
+            records = self.connection.execute(sql, (size, start)).fetchall()
+
+        if records:
+            self._page_keys[page] = records[0][0]
+        rows = [record[1:] for record in records]
+        self._pages[page] = rows
+        while len(self._pages) > self.maxCachedPages:
+            self._pages.popitem(last=False)
+        return rows
@@ -0,0 +1,98 @@
+"""
+Diff backends for the Reconciler.
+
+The Reconciler always produces a `ReconciliationResult`; a diff backend is
+what computes it. The pure-Python diff in `Reconciler` is always there, and
+the optional Rust module (`rust_reconciler`, built with `maturin develop`)
+can take over the diffing when it is installed.
+
+The backend is chosen once, when the Framework starts (config key
+`diff_backend`), instead of on every reconcile:
+- `"auto"` (default): Rust when the module imports, Python otherwise.
+- `"python"`: always the Python diff.
+- `"rust"`: the Rust diff; logs a warning and uses Python if it can't load.
+
+The chosen backend lives for the whole session, so it can keep state between
+frames (the Rust adapter keeps a mirror of the tree it last diffed).
+"""
+
+import importlib
+import logging
+from typing import Any, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DIFF_BACKEND_CHOICES = ("auto", "python", "rust")
+
+_UNLOADED = object()
+_rust_module: Any = _UNLOADED
+
+
+def load_rust_reconciler():
+    """
+    Imports the `rust_reconciler` extension once per process and returns it,
+    or None when it isn't installed (or fails while importing).
+    """
+    global _rust_module
+    if _rust_module is _UNLOADED:
+        try:
+            # Broad on purpose: a faulty installed package may raise anything
+            # from inside its own __init__.
+            _rust_module = importlib.import_module("rust_reconciler")
+            logger.debug("✨ Rust reconciler loaded for performance boost")
+        except Exception as e:
+            logger.debug("Rust reconciler import failed; using the Python diff. Error: %s", e)
+            _rust_module = None
+    return _rust_module
+
+
+class DiffBackend:
+    """
+    Computes a `ReconciliationResult` for the Reconciler it belongs to.
+
+    Subclasses implement `reconcile()` with the same arguments and result
+    semantics as `Reconciler.reconcile`. `reset()` drops whatever the backend
+    remembers about earlier frames; it is called after a failed diff.
+    """
+
+    name = "python"
+
+    def __init__(self, reconciler):
+        self.reconciler = reconciler
+
+    def is_available(self) -> bool:
+        return True
+
+    def reconcile(
+        self,
+        previous_map: Dict,
+        new_widget_root,
+        parent_html_id: str,
+        old_root_key: Optional[Union[str, Any]] = None,
+        is_partial_reconciliation: bool = False,
+    ):
+        return self.reconciler._reconcile_python(
+            previous_map, new_widget_root, parent_html_id,
+            old_root_key, is_partial_reconciliation
+        )
+
+    def reset(self):
+        pass
+
+
+def select_diff_backend(reconciler, choice: Optional[str] = "auto") -> DiffBackend:
+    """Returns the diff backend for `choice` (see `DIFF_BACKEND_CHOICES`)."""
+    choice = (choice or "auto").lower()
+    if choice not in DIFF_BACKEND_CHOICES:
+        logger.warning("Unknown diff_backend %r; expected one of %s. Using 'auto'.",
+                       choice, ", ".join(DIFF_BACKEND_CHOICES))
+        choice = "auto"
+    if choice != "python":
+        from .rust_reconciler_adapter import RustReconcilerAdapter
+        adapter = RustReconcilerAdapter(reconciler)
+        if adapter.is_available():
+            return adapter
+        if choice == "rust":
+            logger.warning("diff_backend 'rust' requested but rust_reconciler is not installed; "
+                           "using the Python diff.")
+    return DiffBackend(reconciler)
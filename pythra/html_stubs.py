@@ -0,0 +1,287 @@
+# =============================================================================
+# PYTHRA HTML STUBS - Turns One Rendered Node Into Its HTML Element
+# =============================================================================
+"""
+PyThra HTML Stub Renderers
+
+The reconciler writes the page (and every inserted subtree) as HTML built from
+the flat rendered map. Each element's markup comes from the renderer
+registered for its widget type: a `StubRenderer` that knows the element's tag,
+has its opening-tag template ready, and adds whatever attributes, inline
+styles and content that type needs.
+
+**How it works:**
+- `STUB_RENDERERS` maps widget type names to renderers. Everything not listed
+  is a plain `<div>`.
+- Widget classes with their own `_generate_html_stub` (TextField, Slider, ...)
+  get a `FunctionStubRenderer` wrapping it.
+- `stub_renderer_for(widget)` resolves a widget's renderer once per class and
+  then answers from a cache.
+- A renderer writes into a list of string parts, and the caller joins the whole
+  page once. Children go between the opening part and the closing tag that
+  `open()` returns.
+
+To give a new widget type its own markup, subclass `StubRenderer` and
+`register_stub_renderer("MyWidget", MyStub())`.
+"""
+
+import html
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+VOID_TAGS = frozenset(("img", "hr", "br"))
+
+
+@lru_cache(maxsize=1024)
+def css_property_name(key: str) -> str:
+    """Converts a Python style key (`backgroundColor`, `z_index`) to CSS kebab-case."""
+    return "".join("-" + c.lower() if c.isupper() else c for c in key).lstrip("-").replace("_", "-")
+
+
+class StubRenderer:
+    """
+    Renders the element of one widget type.
+
+    `open()` appends the opening tag and the element's own content to `out`
+    and returns the closing tag, or None when the element is complete and
+    can't hold children (void tags, custom markup).
+    """
+
+    __slots__ = ("tag", "_open", "_close")
+
+    def __init__(self, tag: str = "div"):
+        self.tag = tag
+        self._open = f'<{tag} id="'
+        self._close = None if tag in VOID_TAGS else f"</{tag}>"
+
+    def tag_for(self, widget) -> str:
+        return self.tag
+
+    def styles(self, props: Dict, inline: Dict):
+        """Adds the inline styles this type derives from its props."""
+
+    def late_styles(self, props: Dict, inline: Dict):
+        """Like `styles()`, applied after the generic `style` prop."""
+
+    def content(self, props: Dict, out: List[str]) -> str:
+        """Appends type-specific attributes to `out`; returns the inner HTML."""
+        return ""
+
+    def open(self, widget, html_id: str, props: Dict, out: List[str]) -> Optional[str]:
+        out.append(f'{self._open}{html_id}" class="{props.get("css_class", "")}"')
+
+        if "attributes" in props:
+            for attr_name, attr_value in props["attributes"].items():
+                out.append(f' {html.escape(attr_name)}="{html.escape(str(attr_value), quote=True)}"')
+
+        inline: Dict[str, Any] = {}
+        self.styles(props, inline)
+        # Generic handling for a 'style' dictionary from render_props, so the
+        # initial render matches what the patch runtime applies on update.
+        style = props.get("style")
+        if isinstance(style, dict):
+            for key, value in style.items():
+                inline[css_property_name(key)] = value
+        if "position_type" in props:
+            inline["position"] = props["position_type"]
+        self.late_styles(props, inline)
+        if inline:
+            style_str = "; ".join(f"{k}: {v}" for k, v in inline.items() if v is not None)
+            if style_str:
+                out.append(f' style="{html.escape(style_str, quote=True)}"')
+
+        event_attr = _event_attribute(props)
+        if event_attr:
+            out.append(event_attr)
+        if props.get("tooltip"):
+            out.append(f' title="{html.escape(props["tooltip"], quote=True)}"')
+
+        inner_html = self.content(props, out)
+        out.append(">")
+        if self._close is None:
+            return None
+        if inner_html:
+            out.append(inner_html)
+        return self._close
+
+
+def _event_attribute(props: Dict) -> str:
+    if not props.get("enabled", True):
+        return ""
+    if "onPressedName" in props:
+        cb_name, args = props["onPressedName"], props.get("onPressedArgs")
+    elif "onTapName" in props:
+        cb_name, args = props.get("onTapName"), props.get("onTapArg")
+    elif "onItemTapName" in props:
+        cb_name = props.get("onItemTapName")
+        if not cb_name:
+            return ""
+        return f' onclick="handleItemTap(\'{html.escape(cb_name, quote=True)}\', {props.get("item_index", -1)})"'
+    else:
+        return ""
+    if not cb_name:
+        return ""
+    if args != []:
+        return f" onclick=\"handleClickWithArgs('{html.escape(cb_name, quote=True)}', {args})\""
+    return f" onclick=\"handleClick('{html.escape(cb_name, quote=True)}')\""
+
+
+class FunctionStubRenderer(StubRenderer):
+    """Wraps a function that returns an element's complete markup."""
+
+    __slots__ = ("render",)
+
+    def __init__(self, render: Callable[[Any, str, Dict], str], tag: str = "div"):
+        super().__init__(tag)
+        self.render = render
+
+    def open(self, widget, html_id: str, props: Dict, out: List[str]) -> Optional[str]:
+        stub = self.render(widget, html_id, props)
+        closing_tag = f"</{self.tag_for(widget)}>"
+        if ">" in stub and stub.endswith(closing_tag):
+            out.append(stub[: -len(closing_tag)])
+            return closing_tag
+        out.append(stub)
+        return None
+
+
+class TextStub(StubRenderer):
+    __slots__ = ()
+
+    def content(self, props, out):
+        return html.escape(str(props.get("data", "")))
+
+
+class ImageStub(StubRenderer):
+    __slots__ = ()
+
+    def content(self, props, out):
+        out.append(f' src="{html.escape(props.get("src", ""), quote=True)}" alt=""')
+        return ""
+
+
+class IconStub(StubRenderer):
+    """Font icons are an `<i>`; icons from a custom image source an `<img>`."""
+
+    __slots__ = ("_as_img",)
+
+    def __init__(self, tag: str = "i"):
+        super().__init__(tag)
+        self._as_img = None if tag == "img" else IconStub("img")
+
+    def tag_for(self, widget):
+        return "img" if self._as_img and getattr(widget, "custom_icon_source", None) else self.tag
+
+    def open(self, widget, html_id, props, out):
+        if self._as_img and getattr(widget, "custom_icon_source", None):
+            return self._as_img.open(widget, html_id, props, out)
+        return super().open(widget, html_id, props, out)
+
+    def content(self, props, out):
+        if props.get("render_type") == "img":
+            out.append(f' src="{html.escape(props.get("custom_icon_src", ""), quote=True)}" alt=""')
+        icon_name = props.get("data")
+        return f"{icon_name}".strip() if icon_name else ""
+
+
+class ClipPathStub(StubRenderer):
+    __slots__ = ()
+
+    def styles(self, props, inline):
+        if "width" in props:
+            inline["width"] = props["width"]
+        if "height" in props:
+            inline["height"] = props["height"]
+        if "clip_path_string" in props:
+            inline["clip-path"] = props["clip_path_string"]
+        if props.get("aspectRatio") is not None:
+            inline["aspect-ratio"] = props["aspectRatio"]
+
+
+class SizedBoxStub(StubRenderer):
+    __slots__ = ()
+
+    def styles(self, props, inline):
+        if (w := props.get("width")) is not None:
+            inline["width"] = f"{w}px" if isinstance(w, (int, float)) else w
+        if (h := props.get("height")) is not None:
+            inline["height"] = f"{h}px" if isinstance(h, (int, float)) else h
+
+
+class DividerStub(StubRenderer):
+    __slots__ = ()
+
+    def styles(self, props, inline):
+        if "height" in props:
+            inline["height"] = f"{props['height']}px"
+        if "color" in props:
+            inline["background-color"] = props["color"]
+        if "margin" in props:
+            inline["margin"] = props["margin"]
+
+
+class AspectRatioStub(StubRenderer):
+    __slots__ = ()
+
+    def styles(self, props, inline):
+        if "aspectRatio" in props:
+            inline["aspect-ratio"] = props["aspectRatio"]
+
+
+class PositionedStub(StubRenderer):
+    __slots__ = ()
+
+    def late_styles(self, props, inline):
+        for side in ("height", "width", "bottom", "top", "right", "left"):
+            inline[side] = props[side] if props[side] else ""
+
+
+def _virtual_list_stub(widget, html_id: str, props: Dict) -> str:
+    return f"""
+            <div id="{html_id}" class="{props.get('css_class','')}" style="color: peach;">
+            <div class="viewport" id="{html_id}_viewport">
+                <div class="phantom"></div>
+            </div>
+            </div>
+            """
+
+
+DEFAULT_STUB = StubRenderer("div")
+
+STUB_RENDERERS: Dict[str, StubRenderer] = {
+    "Text": TextStub("p"),
+    "Image": ImageStub("img"),
+    "Icon": IconStub("i"),
+    "TextButton": StubRenderer("button"),
+    "ElevatedButton": StubRenderer("button"),
+    "IconButton": StubRenderer("button"),
+    "FloatingActionButton": StubRenderer("button"),
+    "SnackBarAction": StubRenderer("button"),
+    "SizedBox": SizedBoxStub("div"),
+    "Divider": DividerStub("div"),
+    "AspectRatio": AspectRatioStub("div"),
+    "ClipPath": ClipPathStub("div"),
+    "Positioned": PositionedStub("div"),
+    "VirtualListView": FunctionStubRenderer(_virtual_list_stub),
+    "VirtualGridView": FunctionStubRenderer(_virtual_list_stub),
+}
+
+_by_class: Dict[type, StubRenderer] = {}
+
+
+def register_stub_renderer(type_name: str, renderer: StubRenderer):
+    """Registers the renderer for every widget class named `type_name`."""
+    STUB_RENDERERS[type_name] = renderer
+    _by_class.clear()
+
+
+def stub_renderer_for(widget) -> StubRenderer:
+    """The renderer for `widget`'s class, resolved once per class."""
+    cls = type(widget)
+    renderer = _by_class.get(cls)
+    if renderer is None:
+        named = STUB_RENDERERS.get(cls.__name__, DEFAULT_STUB)
+        custom = getattr(cls, "_generate_html_stub", None)
+        renderer = FunctionStubRenderer(custom, named.tag) if custom is not None else named
+        _by_class[cls] = renderer
+    return renderer
@@ -0,0 +1,225 @@
+"""
+Item templates for virtualized lists.
+
+Rows built by one `itemBuilder` are usually the same widgets with different
+text, image sources and callbacks. Instead of reconciling and serializing
+every row, `ItemTemplates` compiles the first row of each structural shape
+into an HTML template with slots, and every row after it is sent as a small
+data record that the JS engine stamps into that template:
+
+    template: {"parts": ['<button id="', '" class="b-0" onclick=...>', ...],
+               "slots": [-1, 0, ...]}
+    record:   {"t": 0, "v": ["Row 41", "on_row_41"]}
+
+The HTML between two parts is `record["v"][slot]`, or a generated element id
+when the slot is -1. Stamping reproduces exactly what the stub renderers
+write for the row (see `ItemTemplate.stamp`).
+
+**What is a slot:** a Text's `data`, an Image's `src`, the callback name of
+the click handler and a `tooltip`. Everything else a stub writes is part of
+the shape, so rows whose styles or structure differ get their own template.
+
+**What is not templated:** rows containing a StatefulWidget (their state
+lives in the rendered map), widgets with custom markup (`_generate_html_stub`)
+and widgets with JS initializers. `compile()` returns None for those and the
+caller builds the row the regular way.
+"""
+
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import make_hashable
+from .html_stubs import VOID_TAGS, FunctionStubRenderer, ImageStub, TextStub, stub_renderer_for
+from .reconciler import DIFF_IGNORED_PROPS, JS_INSTANCE_PROPS, ReconciliationResult
+from .state import StatefulWidget
+
+HOST_TYPES = ("StatefulWidget", "StatelessWidget")
+# The click handler `_event_attribute` writes, in the order it looks for it.
+EVENT_NAME_PROPS = ("onPressedName", "onTapName", "onItemTapName")
+ID_SLOT = -1
+
+_ID_SENTINEL = "\x00i\x00"
+_SENTINEL = re.compile("\x00(i|\\d+)\x00")
+# Props whose presence makes the reconciler queue a JS initializer for the
+# element (a truthy `_js_init` does too).
+_INITIALIZER_PROPS = frozenset(JS_INSTANCE_PROPS) | {"init_virtual_list"}
+
+
+class ItemTemplate:
+    """One compiled shape: the static `parts` of its HTML and the `slots` between them."""
+
+    __slots__ = ("id", "parts", "slots")
+
+    def __init__(self, template_id: int, parts: List[str], slots: List[int]):
+        self.id = template_id
+        self.parts = parts
+        self.slots = slots
+
+    def to_js(self) -> Dict[str, Any]:
+        return {"parts": self.parts, "slots": self.slots}
+
+    def stamp(self, values: List[str], id_prefix: str) -> str:
+        """The row's HTML; the reference for `PythraVirtualList.itemHtml` in JS."""
+        out = [self.parts[0]]
+        next_id = 0
+        for slot, part in zip(self.slots, self.parts[1:]):
+            if slot == ID_SLOT:
+                out.append(f"{id_prefix}{next_id}")
+                next_id += 1
+            else:
+                out.append(values[slot])
+            out.append(part)
+        return "".join(out)
+
+
+class CompiledItem:
+    """A row as a data record, with the CSS and callbacks it needs."""
+
+    __slots__ = ("template", "values", "css_details", "callbacks")
+
+    def __init__(self, template: ItemTemplate, values: List[str], css_details: Dict, callbacks: Dict):
+        self.template = template
+        self.values = values
+        self.css_details = css_details
+        self.callbacks = callbacks
+
+    def record(self) -> Dict[str, Any]:
+        return {"t": self.template.id, "v": self.values}
+
+
+def _slot_keys(renderer, props: Dict) -> Tuple[str, ...]:
+    """The props of one element that are sent as data instead of being baked in."""
+    keys = []
+    if isinstance(renderer, TextStub):
+        keys.append("data")
+    elif isinstance(renderer, ImageStub) and isinstance(props.get("src", ""), str):
+        keys.append("src")
+    for name in EVENT_NAME_PROPS:
+        if name in props:
+            if props[name] and isinstance(props[name], str):
+                keys.append(name)
+            break
+    if props.get("tooltip") and isinstance(props["tooltip"], str):
+        keys.append("tooltip")
+    return tuple(keys)
+
+
+class ItemTemplates:
+    """
+    The templates of one virtual list, keyed by shape.
+
+    `compile(tree, reconciler)` turns a built row (the output of
+    `Framework._build_widget_tree`) into a `CompiledItem`, compiling a new
+    template the first time a shape is seen.
+    """
+
+    def __init__(self):
+        self._by_shape: Dict[Tuple, ItemTemplate] = {}
+        self.templates: List[ItemTemplate] = []
+
+    def __len__(self):
+        return len(self.templates)
+
+    def compile(self, tree, reconciler) -> Optional[CompiledItem]:
+        elements: List[Tuple[Any, Any, Dict, Tuple[str, ...]]] = []
+        shape: List[Any] = []
+        scratch = ReconciliationResult()
+        try:
+            if not self._walk(tree, reconciler, elements, shape, scratch):
+                return None
+            shape_key = tuple(shape)
+            template = self._by_shape.get(shape_key)
+        except TypeError:
+            # Props that can't be hashed can't be compared either.
+            return None
+        if template is None:
+            template = self._compile_template(tree, elements)
+            if template is None:
+                return None
+            self._by_shape[shape_key] = template
+
+        values = [
+            html.escape(str(props.get(key, "")))
+            for _, _, props, keys in elements
+            for key in keys
+        ]
+        return CompiledItem(template, values, scratch.active_css_details, scratch.registered_callbacks)
+
+    def _walk(self, widget, reconciler, elements, shape, scratch) -> bool:
+        """
+        Collects the elements of the row in document order and its shape: per
+        element, its type, tag, baked-in props and slot names, then its
+        children and a closing marker. Returns False when it can't be templated.
+        """
+        if widget is None:
+            return True
+        if isinstance(widget, StatefulWidget):
+            return False
+        type_name = type(widget).__name__
+        if type_name in HOST_TYPES:
+            return all(self._walk(c, reconciler, elements, shape, scratch) for c in widget.get_children())
+
+        renderer = stub_renderer_for(widget)
+        if isinstance(renderer, FunctionStubRenderer) or type_name == "Scrollbar":
+            return False
+        props = widget.render_props()
+        if not _INITIALIZER_PROPS.isdisjoint(props) or props.get("_js_init"):
+            return False
+        reconciler._collect_details(widget, props, scratch)
+
+        keys = _slot_keys(renderer, props)
+        # render_props() writes its keys in a fixed order, so no sorting is needed.
+        baked = tuple(
+            (key, make_hashable(value)) for key, value in props.items()
+            if key not in keys and key not in DIFF_IGNORED_PROPS
+        )
+        hash(baked)
+        children = widget.get_children()
+        if children and renderer.tag_for(widget) in VOID_TAGS:
+            return False  # A void tag's children are inserted separately.
+        elements.append((widget, renderer, props, keys))
+        shape.append((type_name, renderer.tag_for(widget), baked, keys))
+        for child in children:
+            if not self._walk(child, reconciler, elements, shape, scratch):
+                return False
+        shape.append(None)
+        return True
+
+    def _compile_template(self, tree, elements) -> Optional[ItemTemplate]:
+        """Renders the row with sentinels in its slots and splits the HTML at them."""
+        slotted = {}
+        next_value = 0
+        for widget, _, props, keys in elements:
+            sentinel_props = dict(props)
+            for key in keys:
+                sentinel_props[key] = f"\x00{next_value}\x00"
+                next_value += 1
+            slotted[id(widget)] = sentinel_props
+
+        out: List[str] = []
+        self._write(tree, slotted, out)
+        pieces = _SENTINEL.split("".join(out))
+        parts = pieces[0::2]
+        if any("\x00" in part for part in parts):
+            return None  # A renderer transformed a sentinel; bake nothing we can't stamp.
+        slots = [ID_SLOT if token == "i" else int(token) for token in pieces[1::2]]
+        template = ItemTemplate(len(self.templates), parts, slots)
+        self.templates.append(template)
+        return template
+
+    def _write(self, widget, slotted, out):
+        """Mirrors `Reconciler._write_subtree_html` for a row that isn't in the map."""
+        if widget is None:
+            return
+        children = widget.get_children()
+        if type(widget).__name__ in HOST_TYPES:
+            for child in children:
+                self._write(child, slotted, out)
+            return
+        closing_tag = stub_renderer_for(widget).open(widget, _ID_SENTINEL, slotted[id(widget)], out)
+        if closing_tag is None:
+            return
+        for child in children:
+            self._write(child, slotted, out)
+        out.append(closing_tag)
@@ -0,0 +1,58 @@
+# =============================================================================
+# PYTHRA LOGGING - Quiet by Default, Detailed When You Ask
+# =============================================================================
+"""
+PyThra Logging Setup
+
+Every PyThra module logs through its own logger (`logging.getLogger(__name__)`,
+so `pythra.core`, `pythra.reconciler`, `pythra.state`, `pythra.server`,
+`pythra.window.webwidget`, ...). Messages use lazy `%s` formatting, so a debug
+message costs a level check and nothing else while debug output is off - the
+repr of a big ReconciliationResult is never built unless someone reads it.
+
+**Levels used by the framework:**
+- `DEBUG`: Per-frame and per-event tracing (patches, setState calls, asset
+  requests, slider drags, JS initializers).
+- `INFO`: Per-frame summaries (update cycle timings, stylesheet updates).
+- `WARNING` and up: Something went wrong.
+
+**Choosing a level:**
+- `log_level: DEBUG` in `config.yaml`, or
+- `PYTHRA_LOG_LEVEL=DEBUG` in the environment (wins over the config), or
+- the standard `logging` API, e.g.
+  `logging.getLogger("pythra.reconciler").setLevel(logging.DEBUG)`.
+
+Only warnings and errors are shown by default.
+"""
+
+import logging
+import os
+from typing import Optional, Union
+
+ROOT_LOGGER_NAME = "pythra"
+DEFAULT_LEVEL = "WARNING"
+
+_handler: Optional[logging.Handler] = None
+
+
+def configure_logging(level: Union[str, int, None] = None) -> logging.Logger:
+    """
+    Attaches a console handler to the `pythra` logger and sets its level.
+
+    `level` is a level name or number; PYTHRA_LOG_LEVEL overrides it, and it
+    defaults to WARNING. Calling this again only changes the level.
+    """
+    global _handler
+    level = os.environ.get("PYTHRA_LOG_LEVEL") or level or DEFAULT_LEVEL
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.WARNING
+
+    logger = logging.getLogger(ROOT_LOGGER_NAME)
+    logger.setLevel(level)
+    if _handler is None:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("%(levelname)s %(name)s | %(message)s"))
+        logger.addHandler(_handler)
+    return logger
@@ -0,0 +1,503 @@
+# =============================================================================
+# PYTHRA PATCH PROTOCOL - The "Wire Format" Between Python and the Browser
+# =============================================================================
+"""
+PyThra Patch Protocol
+
+The reconciler describes UI changes as `Patch` objects. This module turns a
+frame's patches into a compact JSON document that a small JavaScript runtime,
+loaded once with the page, applies to the DOM. Python never generates
+JavaScript per patch, so the browser only parses data on each update instead
+of compiling a fresh script.
+
+**A frame on the wire:**
+```json
+{"v": 1,
+ "ids": ["fw_id_6", "fw_id_5", "fw_id_11"],
+ "ops": [[3, 0, {"data": "Count 4", "css_class": "shared-text-0"}],
+         [1, 2, 1, -1, "<p id=\\"fw_id_11\\" ...>row 0</p>", {...}]]}
+```
+- `v`: Protocol version; the runtime refuses frames it doesn't understand.
+- `ids`: Every element id used by the frame, listed once ("interned").
+- `ops`: One array per patch: an op code, then id-table indexes and data
+  (-1 means "no id", e.g. append instead of insert-before).
+
+**Op layouts:**
+- `[INSERT, id, parent, before, html, props, batch?]`
+- `[REMOVE, id]`
+- `[UPDATE, id, props]`
+- `[MOVE, id, parent, before]`
+- `[REPLACE, id, html, props, batch?]`
+- `[SVG_INSERT, id, parent, html]`
+
+A newly mounted subtree arrives as ONE INSERT (or REPLACE) whose `html` is the
+whole subtree. The optional `batch` lists `[id, props]` for the elements
+inside it, applied in one pass after the fragment is in the document. Props
+that the markup already carries (text, classes, src, title) are left out of
+the batch.
+
+Only the props the runtime knows how to apply are sent (see `RUNTIME_PROPS`);
+callbacks, widget instances and builder functions stay in Python. UPDATE ops
+carry only the props that changed (see `Reconciler._update_props`), so the
+runtime touches nothing else: a ticking clock costs one `textContent` write.
+
+**Stylesheet changes** ride along in the same frame as an optional
+`"css": {"insert": [[css_class, rule_text], ...], "delete": [css_class, ...]}`
+(see `pythra.stylesheet`). They're applied before the ops, with
+`insertRule`/`deleteRule` on `<style id="dynamic-styles">`.
+
+**Record and replay:** Because a frame is plain data, it can be written to a
+JSON Lines file (`PatchRecorder`, or `record_patches: <path>` in config.yaml /
+`PYTHRA_RECORD_PATCHES`) and later replayed with `read_recording()` - to
+reproduce a bug, or to benchmark the runtime without running the app.
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+PROTOCOL_VERSION = 1
+
+OP_INSERT = 1
+OP_REMOVE = 2
+OP_UPDATE = 3
+OP_MOVE = 4
+OP_REPLACE = 5
+OP_SVG_INSERT = 6
+
+OP_CODES = {
+    "INSERT": OP_INSERT,
+    "REMOVE": OP_REMOVE,
+    "UPDATE": OP_UPDATE,
+    "MOVE": OP_MOVE,
+    "REPLACE": OP_REPLACE,
+    "SVG_INSERT": OP_SVG_INSERT,
+}
+
+NO_ID = -1
+
+# Props the JavaScript runtime applies to elements, or uses to set up JS
+# controllers (sliders, dropdowns, virtual lists, ...) after an insert.
+RUNTIME_PROPS = frozenset({
+    "data", "css_class", "old_shared_class", "src", "tooltip", "value", "errorText",
+    "color", "backgroundColor", "width", "height", "aspectRatio", "clip_path_string",
+    "style", "isDragEnded",
+    "init_gradient_clip_border", "gradient_clip_options",
+    "init_gesture_detector", "gesture_options",
+    "init_dropdown", "dropdown_options",
+    "init_slider", "slider_options",
+    "init_simplebar", "simplebar_options",
+    "init_virtual_list", "virtual_list_options",
+    "responsive_clip_path", "_js_init",
+})
+
+# Props the runtime writes as text, so they're sent the way Python prints them.
+TEXT_PROPS = frozenset({"data", "value", "errorText"})
+
+# Props already rendered into an element's HTML stub. Elements that arrive
+# inside a subtree fragment don't need them applied a second time.
+MARKUP_PROPS = frozenset({"data", "css_class", "old_shared_class", "src", "tooltip"})
+
+
+def to_json_safe(value: Any) -> Any:
+    """Converts a prop value into plain JSON data (unknown objects become strings)."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): to_json_safe(v) for k, v in value.items() if not callable(v)}
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(v) for v in value]
+    return str(value)
+
+
+def encode_props(props: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Keeps the props the runtime understands, in a JSON-safe form."""
+    if not props:
+        return {}
+    encoded = {}
+    for key, value in props.items():
+        if key not in RUNTIME_PROPS:
+            continue
+        encoded[key] = str(value) if key in TEXT_PROPS else to_json_safe(value)
+    widget = props.get("widget_instance")
+    style_override = getattr(widget, "_style_override", None) if widget is not None else None
+    if style_override:
+        encoded["styleOverride"] = to_json_safe(style_override)
+    return encoded
+
+
+class PatchEncoder:
+    """Encodes one frame of patches, interning element ids as it goes."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.ops: List[list] = []
+
+    def intern(self, html_id: Optional[str]) -> int:
+        if not html_id:
+            return NO_ID
+        index = self._index.get(html_id)
+        if index is None:
+            index = self._index[html_id] = len(self.ids)
+            self.ids.append(html_id)
+        return index
+
+    def batch(self, elements) -> List[list]:
+        """Encodes the `(html_id, props)` of the elements inside a fragment."""
+        encoded = []
+        for html_id, props in elements or ():
+            sent = {k: v for k, v in encode_props(props).items() if k not in MARKUP_PROPS}
+            if sent:
+                encoded.append([self.intern(html_id), sent])
+        return encoded
+
+    def add(self, patch) -> None:
+        action, data = patch.action, patch.data or {}
+        op = OP_CODES.get(action)
+        if op is None:
+            raise ValueError(f"Unknown patch action: {action}")
+        target = self.intern(patch.html_id)
+        if op == OP_INSERT:
+            encoded = [
+                op, target, self.intern(data.get("parent_html_id")), self.intern(data.get("before_id")),
+                data.get("html", ""), encode_props(data.get("props")),
+            ]
+            batch = self.batch(data.get("descendants"))
+            self.ops.append(encoded + [batch] if batch else encoded)
+        elif op == OP_REMOVE:
+            self.ops.append([op, target])
+        elif op == OP_UPDATE:
+            self.ops.append([op, target, encode_props(data.get("props"))])
+        elif op == OP_MOVE:
+            self.ops.append([
+                op, target, self.intern(data.get("parent_html_id")), self.intern(data.get("before_id")),
+            ])
+        elif op == OP_REPLACE:
+            encoded = [op, target, data.get("new_html", ""), encode_props(data.get("new_props"))]
+            batch = self.batch(data.get("descendants"))
+            self.ops.append(encoded + [batch] if batch else encoded)
+        else:  # OP_SVG_INSERT
+            self.ops.append([op, target, self.intern(data.get("parent_html_id")), data.get("html", "")])
+
+    def frame(self, css: Optional[Dict[str, List]] = None) -> Dict[str, Any]:
+        frame = {"v": PROTOCOL_VERSION, "ids": self.ids, "ops": self.ops}
+        if css:
+            frame["css"] = css
+        return frame
+
+
+def encode_patches(patches: Sequence, css: Optional[Dict[str, List]] = None) -> Dict[str, Any]:
+    """Encodes a list of `Patch` objects (and stylesheet changes) into a protocol frame."""
+    encoder = PatchEncoder()
+    for patch in patches:
+        encoder.add(patch)
+    return encoder.frame(css)
+
+
+def dumps(frame: Dict[str, Any]) -> str:
+    return json.dumps(frame, separators=(",", ":"))
+
+
+def apply_script(frame: Dict[str, Any]) -> str:
+    """
+    The script handed to `evaluate_js`: the frame as a JSON string, parsed with
+    JSON.parse (much cheaper for the browser than an object literal).
+    """
+    return f"window.PythraPatches.apply(JSON.parse({json.dumps(dumps(frame))}));"
+
+
+class PatchRecorder:
+    """Appends every frame sent to the browser to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def record(self, frame: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(dumps(frame) + "\n")
+
+
+def read_recording(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields the frames of a recording made by `PatchRecorder`."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+# -----------------------------------------------------------------------------
+# The resident runtime. Loaded once with the page (see Framework._get_js_includes)
+# and then fed frames via `window.PythraPatches.apply(frame)`.
+# -----------------------------------------------------------------------------
+PATCH_RUNTIME_JS = r"""
+(function () {
+    if (window.PythraPatches) { return; }
+    var VERSION = 1;
+    var OP_INSERT = 1, OP_REMOVE = 2, OP_UPDATE = 3, OP_MOVE = 4, OP_REPLACE = 5, OP_SVG_INSERT = 6;
+    var OP_NAMES = {1: 'INSERT', 2: 'REMOVE', 3: 'UPDATE', 4: 'MOVE', 5: 'REPLACE', 6: 'SVG_INSERT'};
+    window._pythra_instances = window._pythra_instances || {};
+
+    function byId(id) { return id ? document.getElementById(id) : null; }
+    function kebab(key) { return key.replace(/[A-Z]/g, function (c) { return '-' + c.toLowerCase(); }); }
+    function setStyle(el, prop, value) {
+        try { el.style.setProperty(prop, value); }
+        catch (e) { console.warn('Failed to set style property ' + prop + ':', e); }
+    }
+    function px(value) { return typeof value === 'number' ? value + 'px' : value; }
+
+    // Engines are usually published on window; plugin engines may only be
+    // global bindings, which an indirect eval of the (validated) name can see.
+    function resolveEngine(name) {
+        if (typeof window[name] === 'function') { return window[name]; }
+        if (!/^[A-Za-z_$][\w$]*$/.test(name)) { return undefined; }
+        try { return (0, eval)(name); } catch (e) { return undefined; }
+    }
+
+    function classList(value) { return String(value || '').split(/\s+/).filter(Boolean); }
+
+    function applyProps(el, id, props) {
+        var styles = {};
+        Object.keys(props).forEach(function (key) {
+            var value = props[key];
+            switch (key) {
+                case 'data': el.textContent = value; break;
+                case 'css_class':
+                    // Only the classes that actually came or went are touched.
+                    var next = classList(value), prev = classList(props.old_shared_class);
+                    prev.forEach(function (cls) { if (next.indexOf(cls) < 0) { el.classList.remove(cls); } });
+                    next.forEach(function (cls) { if (prev.indexOf(cls) < 0) { el.classList.add(cls); } });
+                    break;
+                case 'src': el.src = value; break;
+                case 'tooltip': el.title = value; break;
+                case 'value':
+                    // Text fields render their <input> as "<id>_input". Only touch it
+                    // when the text differs, so the cursor doesn't jump.
+                    var input = byId(id + '_input');
+                    if (input && input.value !== value) { input.value = value; }
+                    break;
+                case 'errorText':
+                    var helper = byId(id + '_helper');
+                    if (helper) { helper.textContent = value; }
+                    break;
+                case 'color': styles.color = value; break;
+                case 'backgroundColor': styles.backgroundColor = value; break;
+                case 'width': if (value !== null) { styles.width = px(value); } break;
+                case 'height': if (value !== null) { styles.height = px(value); } break;
+                case 'aspectRatio': styles['aspect-ratio'] = value; break;
+                case 'clip_path_string': styles['clip-path'] = value; break;
+            }
+        });
+        if (props.styleOverride) {
+            Object.keys(props.styleOverride).forEach(function (k) { styles[k] = props.styleOverride[k]; });
+        }
+        var style = props.style;
+        if (style && typeof style === 'object') {
+            var dragging = 'isDragEnded' in props;
+            Object.keys(style).forEach(function (k) {
+                var prop = kebab(k);
+                if (prop.indexOf('--') === 0) {
+                    // Custom properties; a slider's percentage is only written once the drag ends.
+                    var allowed = prop === '--slider-percentage' ? props.isDragEnded : !dragging;
+                    if (allowed) { setStyle(el, prop, style[k]); }
+                } else {
+                    styles[k] = style[k];
+                }
+            });
+        }
+        Object.keys(styles).forEach(function (k) { setStyle(el, kebab(k).replace(/^-+/, ''), styles[k]); });
+    }
+
+    function later(fn) { setTimeout(fn, 0); }
+    function construct(name, id, options, instanceName, onlyOnce) {
+        later(function () {
+            var Ctor = window[name];
+            var key = instanceName || id;
+            if (typeof Ctor !== 'function') { return; }
+            if (onlyOnce && window._pythra_instances[key]) { return; }
+            window._pythra_instances[key] = new Ctor(id, options || {});
+        });
+    }
+
+    function initInstances(el, id, props) {
+        if (props.init_gradient_clip_border) { construct('PythraGradientClipPath', id, props.gradient_clip_options); }
+        if (props.init_gesture_detector) { construct('PythraGestureDetector', id, props.gesture_options); }
+        if (props.init_dropdown) { construct('PythraDropdown', id, props.dropdown_options, null, true); }
+        if (props.init_slider) { construct('PythraSlider', id, props.slider_options, null, true); }
+        if (props.init_simplebar) {
+            later(function () {
+                var target = byId(id);
+                if (target && !target.simplebar && typeof window.SimpleBar === 'function') {
+                    new window.SimpleBar(target, props.simplebar_options || {});
+                }
+            });
+        }
+        if (props.init_virtual_list) {
+            later(function () {
+                var target = byId(id);
+                if (typeof window.PythraVirtualList === 'function' && target && target.simplebar) {
+                    window._pythra_instances[id + '_vlist'] = new window.PythraVirtualList(id, props.virtual_list_options || {});
+                }
+            });
+        }
+        var clip = props.responsive_clip_path;
+        if (clip) {
+            later(function () {
+                var points = clip.points.map(function (p) { return {x: p[0], y: p[1]}; });
+                var path = window.generateRoundedPath(points, clip.radius);
+                window._pythra_instances[id] = new window.ResponsiveClipPath(
+                    id, path, clip.viewBox[0], clip.viewBox[1], {uniformArc: true, decimalPlaces: 2}
+                );
+            });
+        }
+        var init = props._js_init;
+        if (init && init.engine) {
+            later(function () {
+                var target = byId(id);
+                var Engine = resolveEngine(init.engine);
+                if (!target || typeof Engine !== 'function') {
+                    console.error('Failed to initialize ' + init.instance_name + '. Element "' + id + '" or class "' + init.engine + '" not found.');
+                    return;
+                }
+                var existing = window._pythra_instances[init.instance_name];
+                if (existing && typeof existing.destroy === 'function') { existing.destroy(); }
+                window._pythra_instances[init.instance_name] = new Engine(target, init.options || {});
+            });
+        }
+    }
+
+    // One parse for a whole subtree; <template> content is inert until inserted.
+    function parse(html) {
+        var temp = document.createElement('template');
+        temp.innerHTML = html.trim();
+        return temp.content.firstElementChild;
+    }
+
+    // Applies the props of the elements inside a just-inserted fragment.
+    function hydrate(batch, ids) {
+        if (!batch) { return; }
+        for (var i = 0; i < batch.length; i++) {
+            var id = ids[batch[i][0]], el = byId(id);
+            if (!el) { continue; }
+            applyProps(el, id, batch[i][1]);
+            initInstances(el, id, batch[i][1]);
+        }
+    }
+
+    function insert(id, parentId, beforeId, html, props, batch, ids) {
+        var parent = byId(parentId);
+        if (!parent) { console.error('INSERT: Parent element ' + parentId + ' not found for ' + id); return; }
+        var el = parse(html);
+        if (!el) { console.warn('INSERT: No valid element created from HTML for ' + id); return; }
+        var before = byId(beforeId);
+        if (before && !parent.contains(before)) { before = null; }
+        parent.insertBefore(el, before);
+        applyProps(el, id, props);
+        initInstances(el, id, props);
+        hydrate(batch, ids);
+    }
+
+    function replace(id, html, props, batch, ids) {
+        var old = byId(id);
+        if (!old) { console.error('REPLACE: Element ' + id + ' not found in DOM'); return; }
+        var el = parse(html);
+        if (!el) { console.warn('REPLACE: No valid element created from HTML for ' + id); return; }
+        old.replaceWith(el);
+        applyProps(el, el.id, props);
+        initInstances(el, el.id, props);
+        hydrate(batch, ids);
+    }
+
+    function move(id, parentId, beforeId) {
+        var el = byId(id), parent = byId(parentId);
+        if (!el || !parent) {
+            if (!el) { console.error('MOVE: Element ' + id + ' not found'); }
+            if (!parent) { console.error('MOVE: Parent element ' + parentId + ' not found'); }
+            return;
+        }
+        var before = byId(beforeId);
+        if (before && !parent.contains(before)) { before = null; }
+        parent.insertBefore(el, before);
+    }
+
+    function applyOp(op, ids) {
+        var id = ids[op[1]];
+        var ref = function (i) { return i >= 0 ? ids[i] : null; };
+        switch (op[0]) {
+            case OP_INSERT: insert(id, ref(op[2]), ref(op[3]), op[4], op[5], op[6], ids); break;
+            case OP_REMOVE: var gone = byId(id); if (gone) { gone.remove(); } break;
+            case OP_UPDATE:
+                var el = byId(id);
+                if (el) { applyProps(el, id, op[2]); }
+                else { console.error('UPDATE: Element ' + id + ' not found in DOM'); }
+                break;
+            case OP_MOVE: move(id, ref(op[2]), ref(op[3])); break;
+            case OP_REPLACE: replace(id, op[2], op[3], op[4], ids); break;
+            case OP_SVG_INSERT:
+                var defs = byId(ref(op[2]));
+                if (!defs) { console.warn('SVG defs container #' + ref(op[2]) + ' not found for INSERT of ' + id); }
+                else if (!byId(id)) { defs.insertAdjacentHTML('beforeend', op[3]); }
+                break;
+            default: console.error('Unknown patch op', op);
+        }
+    }
+
+    // --- Dynamic stylesheet: rules come and go one shared class at a time ---
+    var CLASS_RE = /\.(-?[_a-zA-Z][\w-]*)/g;
+    function mentions(rule, classes) {
+        var text = rule.selectorText, match;
+        if (!text) { return false; }
+        CLASS_RE.lastIndex = 0;
+        while ((match = CLASS_RE.exec(text))) { if (classes[match[1]]) { return true; } }
+        return false;
+    }
+    function deleteRules(list, classes) {
+        for (var i = list.cssRules.length - 1; i >= 0; i--) {
+            var rule = list.cssRules[i];
+            if (mentions(rule, classes)) {
+                list.deleteRule(i);
+            } else if (typeof CSSGroupingRule !== 'undefined' && rule instanceof CSSGroupingRule) {
+                deleteRules(rule, classes);  // @media, @supports, ...
+                if (!rule.cssRules.length) { list.deleteRule(i); }
+            }
+        }
+    }
+    function insertRules(sheet, text) {
+        // Parse just this class's text, then move its rules over one by one.
+        var parsed = new CSSStyleSheet();
+        parsed.replaceSync(text);
+        for (var i = 0; i < parsed.cssRules.length; i++) {
+            try { sheet.insertRule(parsed.cssRules[i].cssText, sheet.cssRules.length); }
+            catch (e) { console.warn('Could not insert CSS rule:', e, parsed.cssRules[i].cssText); }
+        }
+    }
+    function applyStyles(css) {
+        var styleEl = byId('dynamic-styles');
+        if (!styleEl || !styleEl.sheet) { console.error('PythraPatches: #dynamic-styles not found'); return; }
+        if (css.delete && css.delete.length) {
+            var classes = {};
+            css.delete.forEach(function (cls) { classes[cls] = true; });
+            deleteRules(styleEl.sheet, classes);
+        }
+        (css.insert || []).forEach(function (entry) {
+            try { insertRules(styleEl.sheet, entry[1]); }
+            catch (e) { console.error('Error inserting CSS for ' + entry[0] + ':', e); }
+        });
+    }
+
+    window.PythraPatches = {
+        version: VERSION,
+        apply: function (frame) {
+            if (!frame || frame.v !== VERSION) {
+                console.error('PythraPatches: unsupported patch frame version', frame && frame.v);
+                return;
+            }
+            if (frame.css) { applyStyles(frame.css); }
+            var ids = frame.ids, ops = frame.ops;
+            for (var i = 0; i < ops.length; i++) {
+                try { applyOp(ops[i], ids); }
+                catch (e) { console.error('Error applying patch ' + OP_NAMES[ops[i][0]] + ' ' + ids[ops[i][1]] + ':', e, ops[i]); }
+            }
+        }
+    };
+})();
+"""
@@ -0,0 +1,202 @@
+# =============================================================================
+# PYTHRA PROFILING - Optional "Stopwatch" for the UI Update Cycle
+# =============================================================================
+"""
+PyThra Profiling Hooks
+
+Measures where the time of a UI update cycle (a "frame") goes, without
+costing anything when nobody is looking. Profiling is OFF by default; a
+disabled profiler hands out no frame record, so the update cycle only pays a
+couple of `if frame:` checks.
+
+**What gets measured (per frame):**
+- `build`: calling `build()` on the dirty States
+- `diff`: reconciling the rebuilt subtrees
+- `css`: regenerating the stylesheet
+- `codegen`: turning patches into JavaScript
+- `evaluate_js`: handing the script to the browser
+Plus a few counters (states rebuilt, patches) and, optionally, a full
+cProfile report.
+
+**Turning it on:**
+
+In `config.yaml`:
+```yaml
+profiling:
+  enabled: true
+  every: 10            # Only profile every 10th frame (sampling)
+  sink: stdout         # "stdout", or a path ending in .jsonl
+  cprofile: false      # Also collect a cProfile report (expensive!)
+```
+
+Or with environment variables (these win over the config file):
+`PYTHRA_PROFILE=1` (or `PYTHRA_PROFILE=cprofile`), `PYTHRA_PROFILE_EVERY=10`,
+`PYTHRA_PROFILE_SINK=frames.jsonl`.
+
+Or from code, with your own sink (any callable taking the frame dict):
+```python
+app.profiler.enable(every=5, sinks=[lambda frame: print(frame["phases"])])
+```
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+Sink = Callable[[Dict[str, Any]], None]
+
+
+def stdout_sink(frame: Dict[str, Any]):
+    """Prints a one-line summary of the frame (and its cProfile report, if any)."""
+    phases = " ".join(f"{name}={ms:.2f}ms" for name, ms in frame["phases"].items())
+    counters = " ".join(f"{name}={value}" for name, value in frame["counters"].items())
+    print(f"⏱️  PyThra Profile | frame #{frame['frame']} total={frame['total_ms']:.2f}ms {phases} {counters}".rstrip())
+    if frame.get("cprofile"):
+        print("\n--- cProfile Report ---")
+        print(frame["cprofile"])
+        print("--- End of Report ---\n")
+
+
+class JsonlSink:
+    """Appends one JSON object per profiled frame to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, frame: Dict[str, Any]):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(frame) + "\n")
+
+
+def make_sink(spec: Any) -> Sink:
+    """Turns a sink setting ("stdout", "<path>.jsonl" or a callable) into a sink."""
+    if callable(spec):
+        return spec
+    if not spec or spec == "stdout":
+        return stdout_sink
+    return JsonlSink(str(spec))
+
+
+class FrameRecord:
+    """Timings for one profiled frame. Phases are accumulated, so a phase that
+    runs once per dirty State adds up to the frame's total for that phase."""
+
+    __slots__ = ("number", "phases", "counters", "_start", "_last", "_cprofile")
+
+    def __init__(self, number: int, use_cprofile: bool = False):
+        self.number = number
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._cprofile = cProfile.Profile() if use_cprofile else None
+        if self._cprofile:
+            self._cprofile.enable()
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        """Charges the time since the previous lap to `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def skip(self):
+        """Restarts the lap timer without charging the elapsed time to a phase."""
+        self._last = time.perf_counter()
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self) -> Dict[str, Any]:
+        total = time.perf_counter() - self._start
+        report = None
+        if self._cprofile:
+            self._cprofile.disable()
+            stream = io.StringIO()
+            pstats.Stats(self._cprofile, stream=stream).sort_stats("cumulative").print_stats(20)
+            report = stream.getvalue()
+        return {
+            "frame": self.number,
+            "timestamp": time.time(),
+            "total_ms": total * 1000,
+            "phases": {name: seconds * 1000 for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+            "cprofile": report,
+        }
+
+
+class Profiler:
+    """
+    Hands out a `FrameRecord` for the frames that should be profiled and sends
+    the finished records to the sinks.
+
+    Usage inside the update cycle:
+    ```python
+    frame = self.profiler.start_frame()   # None unless this frame is profiled
+    ...
+    if frame: frame.lap("build")
+    ...
+    self.profiler.finish_frame(frame)
+    ```
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.every = 1
+        self.use_cprofile = False
+        self.sinks: List[Sink] = []
+        self._frames_seen = 0
+
+    def enable(self, every: int = 1, sinks: Optional[List[Any]] = None, cprofile: bool = False):
+        """Turns profiling on for every `every`-th frame."""
+        self.every = max(1, int(every))
+        self.use_cprofile = bool(cprofile)
+        self.sinks = [make_sink(s) for s in (sinks or ["stdout"])]
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def add_sink(self, sink: Any):
+        self.sinks.append(make_sink(sink))
+
+    def configure(self, config) -> "Profiler":
+        """Applies the `profiling` config section and the PYTHRA_PROFILE* env vars."""
+        settings = dict(config.get("profiling") or {}) if config else {}
+        env_flag = os.environ.get("PYTHRA_PROFILE")
+        if env_flag is not None:
+            settings["enabled"] = env_flag.lower() not in ("", "0", "false", "off")
+            if env_flag.lower() == "cprofile":
+                settings["cprofile"] = True
+        if os.environ.get("PYTHRA_PROFILE_EVERY"):
+            settings["every"] = os.environ["PYTHRA_PROFILE_EVERY"]
+        if os.environ.get("PYTHRA_PROFILE_SINK"):
+            settings["sink"] = os.environ["PYTHRA_PROFILE_SINK"]
+
+        if settings.get("enabled"):
+            self.enable(
+                every=settings.get("every", 1),
+                sinks=[settings.get("sink", "stdout")],
+                cprofile=settings.get("cprofile", False),
+            )
+        return self
+
+    def start_frame(self) -> Optional[FrameRecord]:
+        if not self.enabled:
+            return None
+        self._frames_seen += 1
+        if self._frames_seen % self.every:
+            return None
+        return FrameRecord(self._frames_seen, self.use_cprofile)
+
+    def finish_frame(self, frame: Optional[FrameRecord]):
+        if frame is None:
+            return
+        record = frame.finish()
+        for sink in self.sinks:
+            try:
+                sink(record)
+            except Exception as e:
+                print(f"⚠️ PyThra Profile | Sink {sink!r} failed: {e}")
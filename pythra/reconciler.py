@@ -58,27 +58,35 @@ only those elements, leaving everything else untouched.
 - ID management: The "naming system" for tracking elements
 """
 
+import sys
 import uuid
+import logging
 import html
 import json
+import weakref
 from typing import Any, Dict, List, Optional, Tuple, Union, Callable, Literal
 from dataclasses import dataclass, field
 from collections import defaultdict
+from bisect import bisect_left
 # near top imports if not already present
 # from collections import defaultdict
 
 
 from .widgets import Scrollbar
 from .state import StatefulWidget
-from .base import Widget, Key
+from .base import Widget, Key, make_hashable, new_widget_id
+from .html_stubs import stub_renderer_for
 
 # It's good practice to import from your own project modules for type hints.
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from .diff_backends import DiffBackend
     from .base import Widget, Key
     from .drawing import PathCommandWidget
 
+logger = logging.getLogger(__name__)
+
 
 # --- Key Class, IDGenerator, Data Structures (Unchanged) ---
 class Key:
@@ -129,7 +137,105 @@ class Patch:
     data: Dict[str, Any]
 
 
-NodeData = Dict[str, Any]
+class NodeData:
+    """
+    One rendered element in a context map.
+
+    A slotted record instead of an eight-key dict: long-running apps hold
+    hundreds of thousands of these. Widget type names are interned and the
+    widget itself is only weakly referenced, since the next diff needs the
+    rendered props, not the old configuration. StatefulWidgets are the
+    exception and are held strongly, because removal and `didUpdateWidget`
+    must still reach their State after the parent dropped the old widget.
+
+    Dict-style access (`node["html_id"]`, `node.get("props", {})`) keeps
+    working for framework code and plugins that read the map.
+    """
+    __slots__ = (
+        "html_id", "widget_type", "key", "_widget", "props", "props_fingerprint",
+        "props_signature", "parent_html_id", "parent_key", "children_keys",
+    )
+
+    _FIELDS = frozenset({
+        "html_id", "widget_type", "key", "widget_instance", "props", "props_fingerprint",
+        "props_signature", "parent_html_id", "parent_key", "children_keys",
+    })
+
+    def __init__(
+        self,
+        html_id: str,
+        widget_type: str,
+        key: Optional[Key],
+        widget_instance: Optional["Widget"],
+        props: Dict[str, Any],
+        parent_html_id: Optional[str],
+        parent_key: Optional[Union[Key, str]],
+        children_keys: Tuple[Union[Key, str], ...] = (),
+        props_fingerprint: Optional[int] = None,
+        props_signature: Optional[Tuple] = None,
+    ):
+        self.html_id = html_id
+        self.widget_type = sys.intern(widget_type) if widget_type else widget_type
+        self.key = key
+        self.widget_instance = widget_instance
+        self.props = props
+        self.props_fingerprint = props_fingerprint
+        self.props_signature = props_signature
+        self.parent_html_id = parent_html_id
+        self.parent_key = parent_key
+        self.children_keys = tuple(children_keys)
+
+    @property
+    def widget_instance(self) -> Optional["Widget"]:
+        ref = self._widget
+        return ref() if type(ref) is weakref.ReferenceType else ref
+
+    @widget_instance.setter
+    def widget_instance(self, widget: Optional["Widget"]):
+        if widget is None or isinstance(widget, StatefulWidget):
+            self._widget = widget
+        else:
+            try:
+                self._widget = weakref.ref(widget)
+            except TypeError:
+                self._widget = widget
+
+    # --- Mapping compatibility ---
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name: str, value: Any):
+        if name not in self._FIELDS:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._FIELDS
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name not in self._FIELDS:
+            return default
+        return getattr(self, name)
+
+    def keys(self):
+        return iter(self._FIELDS)
+
+    def copy(self) -> "NodeData":
+        return NodeData(
+            self.html_id, self.widget_type, self.key, self.widget_instance, self.props,
+            self.parent_html_id, self.parent_key, self.children_keys, self.props_fingerprint,
+            self.props_signature,
+        )
+
+    def __repr__(self) -> str:
+        return f"NodeData({self.widget_type} #{self.html_id}, key={self.key!r}, children={len(self.children_keys)})"
+
+
+# Props that are never compared when diffing. These are typically function
+# references that are re-created on every build.
+DIFF_IGNORED_PROPS = frozenset({'widget_instance', 'itemBuilder', 'onChanged', 'onPressed', 'onTap', 'onDrag'})
 
 
 @dataclass
@@ -139,6 +245,75 @@ class ReconciliationResult:
     active_css_details: Dict[str, Tuple[Callable, Any]] = field(default_factory=dict)
     registered_callbacks: Dict[str, Callable] = field(default_factory=dict)
     js_initializers: List[Dict] = field(default_factory=list)
+    # Keys of nodes (including every descendant) that left the tree. Their
+    # States are already disposed; the owner of the map prunes them.
+    unmounted_keys: List[Union[Key, str]] = field(default_factory=list)
+    # Backend diagnostics (e.g. the Rust adapter's per-step timings in ms).
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def callback_names(props: Dict[str, Any]) -> List[str]:
+    """Returns the callback names a node's props refer to (every `*Name` prop)."""
+    return [
+        value for name, value in props.items()
+        if value and name.endswith("Name") and isinstance(value, str)
+    ]
+
+
+# Props that make the patch script create an entry in `window._pythra_instances`
+# keyed by the element's html_id.
+JS_INSTANCE_PROPS = (
+    "init_slider", "init_dropdown", "init_gesture_detector",
+    "init_gradient_clip_border", "responsive_clip_path",
+)
+
+
+def js_instance_names(node: "NodeData") -> List[str]:
+    """Returns the `window._pythra_instances` entries owned by a rendered node."""
+    props = node.props
+    names = []
+    if any(props.get(flag) for flag in JS_INSTANCE_PROPS):
+        names.append(node.html_id)
+    if props.get("init_virtual_list"):
+        names.append(f"{node.html_id}_vlist")
+        if node.key is not None:
+            names.append(f"{node.key.value}_vlist")
+    js_init = props.get("_js_init")
+    if isinstance(js_init, dict) and js_init.get("instance_name"):
+        names.append(js_init["instance_name"])
+    return names
+
+
+def longest_increasing_subsequence(values: List[int]) -> List[int]:
+    """
+    Returns the positions of a longest strictly increasing subsequence of
+    `values`, ignoring negative entries (children that are new).
+
+    Patience sorting with binary search: O(n log n).
+    """
+    tail_positions: List[int] = []
+    tail_values: List[int] = []
+    previous = [-1] * len(values)
+    for position, value in enumerate(values):
+        if value < 0:
+            continue
+        length = bisect_left(tail_values, value)
+        if length > 0:
+            previous[position] = tail_positions[length - 1]
+        if length == len(tail_values):
+            tail_positions.append(position)
+            tail_values.append(value)
+        else:
+            tail_positions[length] = position
+            tail_values[length] = value
+
+    sequence = []
+    position = tail_positions[-1] if tail_positions else -1
+    while position != -1:
+        sequence.append(position)
+        position = previous[position]
+    sequence.reverse()
+    return sequence
 
 
 # --- The Reconciler Class ---
@@ -148,6 +323,11 @@ class Reconciler:
         self.id_generator = IDGenerator()
         self._external_js_init_queue: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         self._registered_js_initializers: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._carry_over_descendants = True
+        # Computes the diffs; None means the Python diff below. The Framework
+        # picks one at startup (see diff_backends.select_diff_backend).
+        self.diff_backend: Optional["DiffBackend"] = None
+        self._in_backend = False
 
         print("🪄  PyThra Framework | Reconciler Initialized")
 
@@ -174,38 +354,60 @@ class Reconciler:
     ) -> ReconciliationResult:
         """
         Compares a new widget tree with the previous state and generates patches.
+
+        The diff itself comes from `self.diff_backend` when one is set. A
+        backend that fails is reset and the frame is diffed in Python, so a
+        broken extension never costs more than the time it took to fail.
         """
+        backend = self.diff_backend
+        result = None
+        # Backends may hand edge cases back to this method; those go to Python.
+        if backend is not None and not self._in_backend:
+            self._in_backend = True
+            try:
+                result = backend.reconcile(
+                    previous_map, new_widget_root, parent_html_id,
+                    old_root_key, is_partial_reconciliation
+                )
+            except Exception:
+                logger.exception("%s diff backend failed; diffing this frame in Python.", backend.name)
+                backend.reset()
+            finally:
+                self._in_backend = False
+        if result is None:
+            result = self._reconcile_python(
+                previous_map, new_widget_root, parent_html_id,
+                old_root_key, is_partial_reconciliation
+            )
+
+        # --- Inject any external JS initializers queued by register_js_initializer ---
+        queued = self._external_js_init_queue.get("main", [])  # change context if you pass context
+        if queued:
+            # copy them so the result owns its copy
+            result.js_initializers.extend([dict(q) for q in queued])
+            # clear the queue for that context after pushing to result
+            self._external_js_init_queue["main"].clear()
+
+        return result
+
+    def _reconcile_python(
+        self,
+        previous_map: Dict,
+        new_widget_root: Optional["Widget"],
+        parent_html_id: str,
+        old_root_key: Optional[Union[Key, str]] = None,
+        is_partial_reconciliation: bool = False
+    ) -> ReconciliationResult:
+        """The pure-Python diff: walks the new tree against `previous_map`."""
         result = ReconciliationResult()
+        # Skipped subtrees only need their descendants copied when stale keys
+        # are computed from the new map (full reconciliation).
+        self._carry_over_descendants = not is_partial_reconciliation
+
+        old_root_key = self._adopt_root(
+            previous_map, new_widget_root, parent_html_id, old_root_key, is_partial_reconciliation
+        )
 
-        # Auto-delegate to Rust adapter if available for better performance.
-        try:
-            from .rust_reconciler_adapter import RustReconcilerAdapter
-            adapter = RustReconcilerAdapter(self)
-            if adapter.is_available():
-                print("🪄  Rust adapter available.")
-                try:
-                    rs_result = adapter.reconcile(
-                        previous_map, new_widget_root, parent_html_id,
-                        old_root_key, is_partial_reconciliation
-                    )
-                    # Let the adapter produce a full ReconciliationResult
-                    print(f'Rust reconciler: {rs_result}')
-
-                    return rs_result
-                except Exception:
-                    pass
-                # pass
-        except Exception:
-            # Any import or adapter error should not prevent normal Python flow
-            pass
-
-        if old_root_key is None:
-            # Find the root key from the previous map if not provided.
-            for key, data in previous_map.items():
-                if data.get("parent_html_id") == parent_html_id and data.get("parent_key") is None:
-                    old_root_key = key
-                    break
-        
         # Start the recursive diffing process, passing `None` as the initial parent_key.
         self._diff_node_recursive(
             old_node_key=old_root_key,
@@ -221,26 +423,34 @@ class Reconciler:
             new_keys = set(result.new_rendered_map.keys())
             removed_keys = old_keys - new_keys
             for key in removed_keys:
-                data = previous_map.get(key, {})
-                if not data: continue
-                if isinstance(data.get("widget_instance"), StatefulWidget):
-                    state = data["widget_instance"].get_state()
-                    if state: state.dispose()
-                if data.get("html_id"):
-                    result.patches.append(Patch(action="REMOVE", html_id=data["html_id"], data={}))
+                data = previous_map.get(key)
+                if data is None: continue
+                result.unmounted_keys.append(key)
+                if data.html_id:
+                    result.patches.append(Patch(action="REMOVE", html_id=data.html_id, data={}))
 
-        # --- Inject any external JS initializers queued by register_js_initializer ---
-        queued = self._external_js_init_queue.get("main", [])  # change context if you pass context
-        if queued:
-            # copy them so the result owns its copy
-            result.js_initializers.extend([dict(q) for q in queued])
-            # clear the queue for that context after pushing to result
-            self._external_js_init_queue["main"].clear()
+        self._finish_unmount(result, previous_map)
 
-        print(f'Python reconciler: {result}')
+        logger.debug("Python reconciler: %s", result)
 
         return result
 
+    def _adopt_root(self, previous_map, new_widget_root, parent_html_id, old_root_key, is_partial_reconciliation):
+        """
+        Returns the key of the old root and lets an unkeyed new root take over
+        its identity, just like unkeyed children do; otherwise it would be stale.
+        """
+        if old_root_key is None and not is_partial_reconciliation:
+            # Find the root key from the previous map if not provided.
+            # A partial reconciliation without an old root is a fresh mount.
+            for key, data in previous_map.items():
+                if data.get("parent_html_id") == parent_html_id and data.get("parent_key") is None:
+                    old_root_key = key
+                    break
+        if old_root_key is not None and new_widget_root is not None:
+            self._adopt_positional_ids([old_root_key], [new_widget_root], previous_map)
+        return old_root_key
+
     def _diff_node_recursive(
         self, old_node_key, new_widget, parent_html_id, parent_key, result, previous_map
     ):
@@ -259,43 +469,63 @@ class Reconciler:
             return
             
         new_type = type(new_widget).__name__
-        old_type = old_data.get("widget_type")
+        old_type = old_data.widget_type
+        # Props are rendered and their details collected exactly once per node.
         new_props = new_widget.render_props()
         self._collect_details(new_widget, new_props, result)
         
         # If the type or key has changed, it's a replacement.
-        if old_type != new_type or new_widget.key != old_data.get("key"):
+        if old_type != new_type or new_widget.key != old_data.key:
             # The reconciler will treat this as a REMOVE and an INSERT
             # during the child diffing phase. We generate a specific REPLACE patch
             # to handle this more efficiently.
-            new_props = new_widget.render_props()
-            self._collect_details(new_widget, new_props, result)
-            
-            # Insert the new node and its children into the map first.
-            self._insert_node_recursive(new_widget, parent_html_id, parent_key, result, previous_map)
 
-            # Then, create a REPLACE patch. The `html_id` is the old one to replace.
-            new_html_stub = self._generate_html_stub(new_widget, old_data["html_id"], new_props)
+            # Mount the new node and its children into the map first.
+            self._mount_node_recursive(new_widget, parent_html_id, parent_key, result, new_props)
+
+            # Everything that was rendered under the old node is gone.
+            self._unmount_subtree(old_node_key, previous_map, result)
+
+            if new_type in ["StatefulWidget", "StatelessWidget"]:
+                # A host has no element of its own to swap in.
+                result.patches.append(Patch(action="REMOVE", html_id=old_data.html_id, data={}))
+                self._emit_subtree_insert(new_widget_key, parent_html_id, None, result)
+                return
+
+            # Then, create a REPLACE patch that swaps the old element (the
+            # `html_id`) for the whole new subtree in one go, e.g. a route push.
+            elements, detached = [], []
+            fragment = self._subtree_html(new_widget_key, result.new_rendered_map, elements, detached)
             result.patches.append(
-                Patch(action="REPLACE", html_id=old_data["html_id"], data={
-                    "new_html": new_html_stub,
-                    "new_props": new_props
+                Patch(action="REPLACE", html_id=old_data.html_id, data={
+                    "new_html": fragment,
+                    "new_props": new_props,
+                    "descendants": elements[1:],
                 })
             )
+            for child_key, child_parent_html_id in detached:
+                self._emit_subtree_insert(child_key, child_parent_html_id, None, result)
             return
 
         # --- UPDATE PATH ---
-        html_id = old_data["html_id"]
-        new_props = new_widget.render_props()
-        self._collect_details(new_widget, new_props, result)
-        old_props_from_map = old_data.get("props", {})
-        prop_changes = self._diff_props(old_props_from_map, new_props)
+        html_id = old_data.html_id
+        # Unkeyed children take over the identity of the old element in the same
+        # slot before any key below is read, so they are updated in place.
+        self._adopt_positional_ids(
+            old_data.children_keys, new_widget.get_children(), previous_map
+        )
+        old_props_from_map = old_data.props
+        new_signature, new_fingerprint = self._props_signature(new_props)
+        if self._props_unchanged(old_data, new_signature, new_fingerprint):
+            prop_changes = None
+        else:
+            prop_changes = self._diff_props(old_props_from_map, new_props)
 
         widget_type_name = type(new_widget).__name__
 
         # --- THIS IS THE NEW LIFECYCLE HOOK ---
         if widget_type_name == "StatefulWidget" and prop_changes:
-            old_widget_instance = old_data.get("widget_instance")
+            old_widget_instance = old_data.widget_instance
             state = new_widget.get_state()
             if state and old_widget_instance:
                 # Call the lifecycle method, passing the old and new widget configs.
@@ -304,30 +534,28 @@ class Reconciler:
 
         # ONLY generate an UPDATE patch for renderable widgets.
         if widget_type_name not in ["StatefulWidget", "StatelessWidget"]:
-            old_props_from_map = old_data.get("props", {})
-            prop_changes = self._diff_props(old_props_from_map, new_props)
             if prop_changes:
-                patch_data = {"props": new_props, "old_props": old_props_from_map}
-                if 'css_class' in prop_changes:
-                    patch_data["props"]["old_shared_class"] = old_props_from_map.get("css_class")
+                patch_data = {"props": self._update_props(old_props_from_map, new_props, prop_changes)}
                 result.patches.append(Patch(action="UPDATE", html_id=html_id, data=patch_data))
         
         # Update the map with the new widget data, including the parent_key.
-        result.new_rendered_map[new_widget_key] = {
-            "html_id": html_id,
-            "widget_type": new_type,
-            "key": new_widget.key,
-            "widget_instance": new_widget,
-            "props": new_props,
-            "parent_html_id": parent_html_id,
-            "parent_key": parent_key, # Store the parent's unique key
-            "children_keys": [c.get_unique_id() for c in new_widget.get_children()],
-        }
+        result.new_rendered_map[new_widget_key] = NodeData(
+            html_id=html_id,
+            widget_type=new_type,
+            key=new_widget.key,
+            widget_instance=new_widget,
+            props=new_props,
+            props_fingerprint=new_fingerprint,
+            props_signature=new_signature,
+            parent_html_id=parent_html_id,
+            parent_key=parent_key, # Store the parent's unique key
+            children_keys=[c.get_unique_id() for c in new_widget.get_children()],
+        )
 
         # Recurse on children, passing the current widget's key as their parent_key.
         child_parent_html_id = html_id if widget_type_name not in ["StatefulWidget", "StatelessWidget"] else parent_html_id
         self._diff_children_recursive(
-            old_data.get("children_keys", []),
+            old_data.children_keys,
             new_widget.get_children(),
             child_parent_html_id, # <-- Pass the correct parent HTML ID
             new_widget.get_unique_id(),
@@ -335,17 +563,87 @@ class Reconciler:
             previous_map,
         )
 
+    def _adopt_positional_ids(
+        self,
+        old_children_keys: List[Union[Key, str]],
+        new_children_widgets: List["Widget"],
+        previous_map: Dict,
+    ):
+        """
+        Gives unkeyed children the identity of the old element in the same slot.
+
+        Unkeyed widgets are matched the way Flutter matches them: by parent,
+        index in the children list and runtime type. When the old child at the
+        same index was also unkeyed and of the same type, the new widget takes
+        over its id, so a rebuild that creates fresh instances still produces an
+        UPDATE instead of a REMOVE + INSERT. Keys are only needed to reorder.
+        """
+        if not old_children_keys:
+            return
+
+        adopted = set()
+        for index, new_child in enumerate(new_children_widgets):
+            if index >= len(old_children_keys):
+                break
+            if new_child is None or new_child.key is not None:
+                continue
+            old_key = old_children_keys[index]
+            old_data = previous_map.get(old_key)
+            if old_data is None or old_data.get("key") is not None:
+                continue
+            if old_data.get("widget_type") != type(new_child).__name__:
+                continue
+            new_child._internal_id = old_key
+            adopted.add(index)
+
+        # A reused instance that landed in a different slot must not keep an id
+        # that now belongs to another element, or two children would share it.
+        claimed = {old_children_keys[i] for i in adopted}
+        for index, new_child in enumerate(new_children_widgets):
+            if new_child is None or new_child.key is not None or index in adopted:
+                continue
+            if new_child._internal_id in claimed:
+                new_child._internal_id = new_widget_id()
+
     def _insert_node_recursive(
-        self, new_widget, parent_html_id, parent_key, result, previous_map, before_id=None
+        self, new_widget, parent_html_id, parent_key, result, previous_map, before_id=None, props=None
     ):
-        """Recursively handles the insertion of a new widget and its children."""
+        """
+        Mounts a new widget and its whole subtree.
+
+        The subtree is serialized into one HTML fragment, the way the initial
+        render is, and sent as a single INSERT patch instead of one per node.
+        The props of the nodes inside the fragment travel with it in the
+        patch's `descendants` list, so the browser applies them and runs their
+        initializers in one batch once the fragment is in the document.
+
+        `props` can carry the widget's already rendered (and collected) props so
+        a caller that has them does not render them a second time.
+        """
         if new_widget is None:
             return
+        key = self._mount_node_recursive(new_widget, parent_html_id, parent_key, result, props)
+        self._emit_subtree_insert(key, parent_html_id, before_id, result)
+
+    def _mount_node_recursive(self, new_widget, parent_html_id, parent_key, result, props=None, known_props=None):
+        """
+        Gives a new widget and its children ids and entries in the new map,
+        collecting their CSS classes, callbacks and JS initializers. Returns
+        the widget's key. No patches are emitted here.
+
+        `known_props` maps keys of the subtree to props that were already
+        rendered and collected (a diff backend walks the tree first).
+        """
 
         html_id = self.id_generator.next_id()
-        new_props = new_widget.render_props()
-        self._collect_details(new_widget, new_props, result)
         key = new_widget.get_unique_id()
+        if props is None and known_props is not None:
+            props = known_props.get(key)
+        if props is None:
+            new_props = new_widget.render_props()
+            self._collect_details(new_widget, new_props, result)
+        else:
+            new_props = props
 
         old_id = None
         new_id = None
@@ -384,7 +682,7 @@ class Reconciler:
 
 
         if "init_dropdown" in new_props:
-            print("DROPDOWN INIT")
+            logger.debug("Dropdown init: %s", html_id)
             if html_id != new_id:
                 old_id, new_id = new_id, html_id
             initializer_data = {
@@ -396,7 +694,7 @@ class Reconciler:
             result.js_initializers.append(initializer_data)
 
         if "type" in new_props and "init_slider" in new_props:
-            print("SLIDER INIT")
+            logger.debug("Slider init: %s", html_id)
             if html_id != new_id:
                 old_id, new_id = new_id, html_id
             initializer_data = {
@@ -408,7 +706,7 @@ class Reconciler:
             result.js_initializers.append(initializer_data)
 
         if "init_gesture_detector" in new_props:
-            print("GESTURE-DETECTOR INIT")
+            logger.debug("Gesture detector init: %s", html_id)
             if html_id != new_id:
                 old_id, new_id = new_id, html_id
             initializer_data = {
@@ -420,7 +718,7 @@ class Reconciler:
             result.js_initializers.append(initializer_data)
 
         if "init_virtual_list" in new_props:
-            print("VIRTUAL-LIST INIT: for ", html_id)
+            logger.debug("Virtual list init: %s", html_id)
             if html_id != new_id:
                 old_id, new_id = new_id, html_id
             initializer_data = {
@@ -432,7 +730,7 @@ class Reconciler:
             result.js_initializers.append(initializer_data)
 
         if "init_gradient_clip_border" in new_props:
-            print("GRADIENT-CLIP-BORDER INIT")
+            logger.debug("Gradient clip border init: %s", html_id)
             if html_id != new_id:
                 old_id, new_id = new_id, html_id
             initializer_data = {
@@ -464,25 +762,20 @@ class Reconciler:
         widget_type_name = type(new_widget).__name__
         
         # Store the node in the map, regardless of its type.
-        result.new_rendered_map[key] = {
-            "html_id": html_id,
-            "widget_type": widget_type_name,
-            "key": new_widget.key,
-            "widget_instance": new_widget,
-            "props": new_props,
-            "parent_html_id": parent_html_id,
-            "parent_key": parent_key,
-            "children_keys": [c.get_unique_id() for c in new_widget.get_children()],
-        }
-
-        # ONLY generate a patch for renderable widgets.
-        # StatefulWidget and StatelessWidget are hosts, not renderable elements.
-        if widget_type_name not in ["StatefulWidget", "StatelessWidget"]:
-            stub_html = self._generate_html_stub(new_widget, html_id, new_props)
-            result.patches.append(Patch(action="INSERT", html_id=html_id, data={
-                "html": stub_html, "parent_html_id": parent_html_id,
-                "props": new_props, "before_id": before_id,
-            }))
+        signature, fingerprint = self._props_signature(new_props)
+        result.new_rendered_map[key] = NodeData(
+            html_id=html_id,
+            widget_type=widget_type_name,
+            key=new_widget.key,
+            widget_instance=new_widget,
+            props=new_props,
+            props_fingerprint=fingerprint,
+            props_signature=signature,
+            parent_html_id=parent_html_id,
+            parent_key=parent_key,
+            children_keys=[c.get_unique_id() for c in new_widget.get_children()],
+        )
+
         # --- END OF FIX ---
 
         # Recurse for children, passing the current widget's key as their parent_key.
@@ -490,7 +783,76 @@ class Reconciler:
             # If the parent is composable (Stateless/Stateful), its children are rendered
             # into the same parent DOM element. Otherwise, they are rendered inside the parent's new DOM element.
             child_parent_html_id = parent_html_id if widget_type_name in ["StatefulWidget", "StatelessWidget"] else html_id
-            self._insert_node_recursive(child, child_parent_html_id, key, result, previous_map)
+            self._mount_node_recursive(child, child_parent_html_id, key, result, known_props=known_props)
+        return key
+
+    def _emit_subtree_insert(self, key, parent_html_id, before_id, result: ReconciliationResult):
+        """
+        Emits the INSERT patch for a freshly mounted subtree: its HTML as one
+        fragment plus the props of every element inside it.
+
+        StatefulWidget and StatelessWidget are hosts, not renderable elements,
+        so a host's children are inserted in its place.
+        """
+        node = result.new_rendered_map[key]
+        if node.widget_type in ["StatefulWidget", "StatelessWidget"]:
+            for child_key in node.children_keys:
+                if child_key in result.new_rendered_map:
+                    self._emit_subtree_insert(child_key, parent_html_id, before_id, result)
+            return
+
+        elements, detached = [], []
+        fragment = self._subtree_html(key, result.new_rendered_map, elements, detached)
+        result.patches.append(Patch(action="INSERT", html_id=node.html_id, data={
+            "html": fragment, "parent_html_id": parent_html_id,
+            "props": node.props, "before_id": before_id,
+            "descendants": elements[1:],
+        }))
+        for child_key, child_parent_html_id in detached:
+            self._emit_subtree_insert(child_key, child_parent_html_id, None, result)
+
+    def generate_html(self, root_key: Optional[Union[Key, str]], rendered_map: Dict) -> str:
+        """Generates the HTML of a rendered subtree by walking the flat rendered map."""
+        out: List[str] = []
+        self._write_subtree_html(root_key, rendered_map, out)
+        return "".join(out)
+
+    def _subtree_html(self, key, rendered_map: Dict, elements: Optional[List] = None, detached: Optional[List] = None) -> str:
+        """
+        Serializes the subtree under `key`. When given, `elements` collects the
+        `(html_id, props)` of every element in the fragment (in document
+        order) and `detached` the `(child_key, parent_html_id)` of children
+        whose parent's markup can't hold them (a void tag or a custom stub
+        that doesn't end in its closing tag); those must be inserted on their own.
+        """
+        out: List[str] = []
+        self._write_subtree_html(key, rendered_map, out, elements, detached)
+        return "".join(out)
+
+    def _write_subtree_html(self, key, rendered_map: Dict, out: List[str], elements=None, detached=None):
+        """Appends the subtree's markup to `out`; children go before the element's closing tag."""
+        node = rendered_map.get(key) if key is not None else None
+        if node is None:
+            return
+        children_keys = node.children_keys or ()
+
+        # A host doesn't render itself, so we render its children.
+        if node.widget_type in ["StatefulWidget", "StatelessWidget"]:
+            for child_key in children_keys:
+                self._write_subtree_html(child_key, rendered_map, out, elements, detached)
+            return
+
+        widget_instance = node.widget_instance
+        closing_tag = stub_renderer_for(widget_instance).open(widget_instance, node.html_id, node.props, out)
+        if elements is not None:
+            elements.append((node.html_id, node.props))
+        if closing_tag is None:
+            if children_keys and detached is not None:
+                detached.extend((c, node.html_id) for c in children_keys)
+            return
+        for child_key in children_keys:
+            self._write_subtree_html(child_key, rendered_map, out, elements, detached)
+        out.append(closing_tag)
 
     def _diff_children_recursive(
         self,
@@ -501,53 +863,130 @@ class Reconciler:
         result: ReconciliationResult,
         previous_map: Dict,
     ):
-        """Efficiently diffs a list of child widgets."""
+        """
+        Efficiently diffs a list of child widgets.
+
+        Children that exist in both lists are diffed in place. The longest
+        increasing subsequence of their old indices is the largest set that is
+        already in the right relative order, so only the children outside it
+        are moved. Moves and inserts are then emitted in a single backwards
+        pass, where the next sibling is always in its final place and can be
+        used directly as the `before_id` anchor. O(n log n) overall.
+        """
         if not old_children_keys and not new_children_widgets:
             return
 
-        old_key_to_data = {key: previous_map[key] for key in old_children_keys if key in previous_map}
-        new_key_to_widget = {widget.get_unique_id(): widget for widget in new_children_widgets}
-        old_keys_set = set(old_key_to_data.keys())
-        new_keys_set = set(new_key_to_widget.keys())
+        old_key_to_index = {key: i for i, key in enumerate(old_children_keys) if key in previous_map}
+        new_children = [widget for widget in new_children_widgets if widget is not None]
+        new_keys = [widget.get_unique_id() for widget in new_children]
+        new_keys_set = set(new_keys)
 
         # Identify and patch removals.
-        keys_to_remove = old_keys_set - new_keys_set
-        for key in keys_to_remove:
-            old_data = old_key_to_data[key]
-            result.patches.append(Patch(action="REMOVE", html_id=old_data["html_id"], data={}))
-            if isinstance(old_data.get("widget_instance"), StatefulWidget):
-                state = old_data["widget_instance"].get_state()
-                if state: state.dispose()
+        for key in old_key_to_index:
+            if key in new_keys_set:
+                continue
+            result.patches.append(Patch(action="REMOVE", html_id=previous_map[key].html_id, data={}))
+            self._unmount_subtree(key, previous_map, result)
+
+        # Diff the children that survived and remember where they came from.
+        old_indices = []
+        for new_widget, new_key in zip(new_children, new_keys):
+            old_idx = old_key_to_index.get(new_key, -1)
+            old_indices.append(old_idx)
+            if old_idx == -1:
+                continue
+            if new_widget is previous_map[new_key].widget_instance:
+                # The identical, already-built instance: nothing below it changed.
+                self._carry_over_subtree(new_key, previous_map, result)
+            else:
+                # It's an existing widget, so diff it, passing the parent_key.
+                self._diff_node_recursive(new_key, new_widget, parent_html_id, parent_key, result, previous_map)
 
-        # Handle updates, inserts, and moves.
-        last_placed_old_idx = -1
-        old_key_to_index = {key: i for i, key in enumerate(old_children_keys)}
+        stable = set(longest_increasing_subsequence(old_indices))
+
+        # Place everything else, back to front, in front of its next sibling.
+        before_id = None
+        for i in range(len(new_children) - 1, -1, -1):
+            new_key = new_keys[i]
+            if old_indices[i] == -1:
+                self._insert_node_recursive(
+                    new_children[i], parent_html_id, parent_key, result, previous_map, before_id=before_id
+                )
+            elif i not in stable:
+                moved_html_id = result.new_rendered_map[new_key].html_id
+                result.patches.append(Patch("MOVE", moved_html_id, {"parent_html_id": parent_html_id, "before_id": before_id}))
+            if new_key in result.new_rendered_map:
+                before_id = result.new_rendered_map[new_key].html_id
+
+    def _unmount_subtree(self, root_key, previous_map: Dict, result: ReconciliationResult):
+        """
+        Records a removed node and all of its descendants as unmounted.
 
-        for i, new_widget in enumerate(new_children_widgets):
-            new_key = new_widget.get_unique_id()
+        Only the root gets a REMOVE patch, but every descendant still has an
+        entry in the map, callbacks and maybe a JS instance that must go too.
+        """
+        stack = [root_key]
+        while stack:
+            key = stack.pop()
+            data = previous_map.get(key)
+            if data is None:
+                continue
+            result.unmounted_keys.append(key)
+            stack.extend(data.get("children_keys") or ())
+
+    def _finish_unmount(self, result: ReconciliationResult, previous_map: Dict):
+        """
+        Drops unmounted keys that were mounted again elsewhere in this pass
+        (a keyed widget moved to a new parent) and disposes the States of the
+        ones that are really gone.
+        """
+        still_mounted = result.new_rendered_map
+        unmounted = []
+        seen = set()
+        for key in result.unmounted_keys:
+            if key in still_mounted or key in seen:
+                continue
+            seen.add(key)
+            unmounted.append(key)
+            widget_instance = previous_map[key].get("widget_instance")
+            if isinstance(widget_instance, StatefulWidget):
+                state = widget_instance.get_state()
+                if state: state.dispose()
+        result.unmounted_keys = unmounted
 
-            if new_key in old_keys_set:
-                # It's an existing widget, so diff it, passing the parent_key.
-                self._diff_node_recursive(new_key, new_widget, parent_html_id, parent_key, result, previous_map)
-                
-                # Check for moves.
-                old_idx = old_key_to_index[new_key]
-                if old_idx < last_placed_old_idx:
-                    moved_html_id = result.new_rendered_map[new_key]["html_id"]
-                    before_id = self._find_next_stable_html_id(i + 1, new_children_widgets, old_key_to_index, result.new_rendered_map)
-                    result.patches.append(Patch("MOVE", moved_html_id, {"parent_html_id": parent_html_id, "before_id": before_id}))
-                last_placed_old_idx = max(last_placed_old_idx, old_idx)
-            else:
-                # It's a new widget, so insert it, passing the parent_key.
-                before_id = self._find_next_stable_html_id(i + 1, new_children_widgets, old_key_to_index, result.new_rendered_map)
-                self._insert_node_recursive(new_widget, parent_html_id, parent_key, result, previous_map, before_id=before_id)
+    def unmount_subtree(self, root_key, rendered_map: Dict) -> List[Union[Key, str]]:
+        """
+        Unmounts a subtree that is discarded outside of a reconcile pass, such
+        as a virtual-list item that is rebuilt or evicted. Disposes its States
+        and returns the keys to prune; the map itself is left to the caller.
+        """
+        result = ReconciliationResult()
+        self._unmount_subtree(root_key, rendered_map, result)
+        self._finish_unmount(result, rendered_map)
+        return result.unmounted_keys
 
-    def _find_next_stable_html_id(self, start_index, new_widgets, old_key_map, new_rendered_map):
-        for j in range(start_index, len(new_widgets)):
-            key = new_widgets[j].get_unique_id()
-            if key in old_key_map and key in new_rendered_map:
-                return new_rendered_map[key]["html_id"]
-        return None
+    def _carry_over_subtree(self, key, previous_map: Dict, result: ReconciliationResult):
+        """
+        Reuses the rendered entries of a subtree whose widget is the identical
+        instance that was mounted last time.
+
+        The framework does not rebuild such instances (see
+        `Framework._build_widget_tree`), so neither props nor children can have
+        changed and no patches are needed. On a full reconciliation the whole
+        subtree is copied so its keys are not treated as stale; on a partial
+        one the framework merges into the existing map, so the root is enough.
+        """
+        result.new_rendered_map[key] = previous_map[key]
+        if not self._carry_over_descendants:
+            return
+        stack = list(previous_map[key].children_keys)
+        while stack:
+            child_key = stack.pop()
+            child_data = previous_map.get(child_key)
+            if child_data is None:
+                continue
+            result.new_rendered_map[child_key] = child_data
+            stack.extend(child_data.children_keys)
 
     def _collect_details(self, widget, props, result):
         """Collects CSS classes and callbacks."""
@@ -595,181 +1034,15 @@ class Reconciler:
     # No changes are needed in the methods below this point.
 
     def _get_widget_render_tag(self, widget: "Widget") -> str:
-        widget_type_name = type(widget).__name__
-        tag_map = {
-            "Text": "p",
-            "Image": "img",
-            "Icon": "i",
-            "Spacer": "div",
-            "SizedBox": "div",
-            "TextButton": "button",
-            "ElevatedButton": "button",
-            "IconButton": "button",
-            "FloatingActionButton": "button",
-            "SnackBarAction": "button",
-            "ListTile": "div",
-            "Divider": "div",
-            "Dialog": "div",
-            "AspectRatio": "div",
-            "ClipPath": "div",
-        }
-        if widget_type_name == "Icon" and getattr(widget, "custom_icon_source", None):
-            return "img"
-        return tag_map.get(widget_type_name, "div")
+        return stub_renderer_for(widget).tag_for(widget)
 
     def _generate_html_stub(self, widget: "Widget", html_id: str, props: Dict) -> str:
-        tag, classes = self._get_widget_render_tag(widget), props.get("css_class", "")
-
-        widget_type_name = type(widget).__name__
-
-        inline_styles = {}
-
-        if hasattr(type(widget), "_generate_html_stub"):
-            return type(widget)._generate_html_stub(widget, html_id, props)
-
-        # --- MODIFICATION TO HANDLE GENERIC ATTRIBUTES ---
-        attrs = ""
-        # Add attributes from a dedicated 'attributes' prop if it exists
-        if "attributes" in props:
-            for attr_name, attr_value in props["attributes"].items():
-                attrs += f' {html.escape(attr_name)}="{html.escape(str(attr_value), quote=True)}"'
-        # --- END MODIFICATION ---
-
-        inner_html = ""
-
-        if widget_type_name == "VirtualListView":
-            return f"""
-            <div id="{html_id}" class="{props.get('css_class','')}" style="color: peach;">
-            <div class="viewport" id="{html_id}_viewport">
-                <div class="phantom"></div>
-            </div>
-            </div>
-            """
-
-        # --- THIS IS THE FIX ---
-        # Special handling for Font Awesome icons.
-        if widget_type_name == "Icon":
-            icon_name = props.get("data")
-            if icon_name:
-                # Prepend the necessary Font Awesome classes.
-                inner_html = f"{icon_name}".strip()
-                # print("Icon FA: ", icon_name)
-            # else:
-            #     print("Data: ",props.get('data'))
-        # --- END OF FIX ---
-
-        if widget_type_name == "ClipPath":
-            if "width" in props:
-                inline_styles["width"] = props["width"]
-            if "height" in props:
-                # print(f"height: {props["height"]}")
-                inline_styles["height"] = props["height"]
-            if "clip_path_string" in props:
-                inline_styles["clip-path"] = props["clip_path_string"]
-            # print("CLIP-PATH STRING: ", props)
-            if (
-                "aspectRatio" in props and props["aspectRatio"] is not None
-            ):  # <-- ADD THIS
-                inline_styles["aspect-ratio"] = props["aspectRatio"]
-        elif widget_type_name == "SizedBox":
-            if (w := props.get("width")) is not None:
-                inline_styles["width"] = f"{w}px" if isinstance(w, (int, float)) else w
-            if (h := props.get("height")) is not None:
-                inline_styles["height"] = f"{h}px" if isinstance(h, (int, float)) else h
-        elif widget_type_name == "Divider":
-            if "height" in props:
-                inline_styles["height"] = f"{props['height']}px"
-            if "color" in props:
-                inline_styles["background-color"] = props["color"]
-            if "margin" in props:
-                inline_styles["margin"] = props["margin"]
-        elif widget_type_name == "AspectRatio":
-            if "aspectRatio" in props:
-                inline_styles["aspect-ratio"] = props["aspectRatio"]
-
-        # --- THIS IS THE ARCHITECTURAL FIX ---
-        # Generic handling for a 'style' dictionary from render_props.
-        # This makes the initial render consistent with the update patcher.
-        if "style" in props and isinstance(props["style"], dict):
-            for key, value in props["style"].items():
-                # print("css kebab-case: ",props["style"].items())
-                # Convert python camelCase to css kebab-case
-                css_key = "".join(["-" + c.lower() if c.isupper() else c for c in key]).lstrip("-")
-                inline_styles[css_key] = value
-        # --- END OF FIX ---
-
-        if 'position_type' in props:
-            # print("position_type:", props["position_type"])
-            inline_styles["position"] = props["position_type"]
-
-        if widget_type_name == "Positioned":
-            inline_styles["height"] = props["height"] if props["height"] else ""
-            inline_styles["width"] = props["width"] if props["width"] else ""
-            inline_styles["bottom"] = props["bottom"] if props["bottom"] else ""
-            inline_styles["top"] = props["top"] if props["top"] else ""
-            inline_styles["right"] = props["right"] if props["right"] else ""
-            inline_styles["left"] = props["left"] if props["left"] else ""
-            # print(props, " with attrs: ", attrs," with inline_styles: ", inline_styles)
-
-        if inline_styles:
-            style_str = "; ".join(
-                f"{k.replace('_','-')}: {v}"
-                for k, v in inline_styles.items()
-                if v is not None
-            )
-            if style_str:
-                attrs += f' style="{html.escape(style_str, quote=True)}"'
-
-        # Add event handlers
-        if "onPressedName" in props and props.get("enabled", True):
-            
-            if cb_name := props["onPressedName"]:
-                if props["onPressedArgs"] != []:
-                    # [print("arg: ", x) for x in props["onPressedArgs"]]
-                    # print("ARGS: ",props["onPressedArgs"] if props["onPressedArgs"] else 'None') #["onPressedArgs"] if props["onPressedArgs"] else 'None'
-                    attrs += (
-                        f" onclick=\"handleClickWithArgs('{html.escape(cb_name, quote=True)}', {props['onPressedArgs']})\""
-                    )
-                else:
-                    attrs += (
-                        f" onclick=\"handleClick('{html.escape(cb_name, quote=True)}')\""
-                    )
-        elif "onTapName" in props and props.get("enabled", True):
-            if cb_name := props.get("onTapName"):
-                if props["onTapArg"] != []:
-                    # [print("arg: ", x) for x in props["onPressedArgs"]]
-                    # print("ARGS: ",props["onPressedArgs"] if props["onPressedArgs"] else 'None') #["onPressedArgs"] if props["onPressedArgs"] else 'None'
-                    attrs += (
-                        f" onclick=\"handleClickWithArgs('{html.escape(cb_name, quote=True)}', {props['onTapArg']})\""
-                    )
-                else:
-                    attrs += (
-                        f" onclick=\"handleClick('{html.escape(cb_name, quote=True)}')\""
-                    )
-        elif "onItemTapName" in props and props.get("enabled", True):
-            if cb_name := props.get("onItemTapName"):
-                attrs += f' onclick="handleItemTap(\'{html.escape(cb_name, quote=True)}\', {props.get("item_index", -1)})"'
-
-        if props.get("tooltip"):
-            attrs += f' title="{html.escape(props["tooltip"], quote=True)}"'
-
-        if widget_type_name == "Text":
-            inner_html = html.escape(str(props.get("data", "")))
-            # print("Text style props: ",props.get('style'))
-        elif widget_type_name == "Image":
-            attrs += f' src="{html.escape(props.get("src", ""), quote=True)}" alt=""'
-        elif widget_type_name == "Icon" and props.get("render_type") == "img":
-            attrs += f' src="{html.escape(props.get("custom_icon_src", ""), quote=True)}" alt=""'
-
-
-        
-
-        # if hasattr(type(widget), '_generate_html_stub'):
-        #     return type(widget)._generate_html_stub(widget, html_id, props)
-
-        if tag in ["img", "hr", "br"]:
-            return f'<{tag} id="{html_id}" class="{classes}"{attrs}>'
-        return f'<{tag} id="{html_id}" class="{classes}"{attrs}>{inner_html}</{tag}>'
+        """The HTML of one element, without its children (see html_stubs)."""
+        out: List[str] = []
+        closing_tag = stub_renderer_for(widget).open(widget, html_id, props, out)
+        if closing_tag:
+            out.append(closing_tag)
+        return "".join(out)
 
     # def _diff_props(self, old_props: Dict, new_props: Dict) -> Optional[Dict]:
     #     changes = {}
@@ -780,12 +1053,45 @@ class Reconciler:
     #             changes[key] = new_val
     #     return changes if changes else None
 
+    def _props_signature(self, props: Dict) -> Tuple[Optional[Tuple], Optional[int]]:
+        """
+        Returns the props that `_diff_props` compares as a hashable tuple, and
+        its hash (the fingerprint).
+
+        Both are stored next to the props in the rendered map, so the next diff
+        of the node starts with a single integer comparison and only walks the
+        props when the fingerprints differ. Different props can share a hash
+        (`hash(-1) == hash(-2)`), so equal fingerprints are confirmed against
+        the stored tuple before the diff is skipped (see `_props_unchanged`).
+        Returns (None, None) when the props cannot be hashed, which simply
+        forces the full comparison.
+        """
+        try:
+            signature = tuple(sorted(
+                (key, make_hashable(value))
+                for key, value in props.items()
+                if key not in DIFF_IGNORED_PROPS
+            ))
+            return signature, hash(signature)
+        except TypeError:
+            return None, None
+
+    def _props_fingerprint(self, props: Dict) -> Optional[int]:
+        """Returns only the hash of `_props_signature`."""
+        return self._props_signature(props)[1]
+
+    @staticmethod
+    def _props_unchanged(old_data, new_signature: Optional[Tuple], new_fingerprint: Optional[int]) -> bool:
+        """Whether a node's new props are the ones stored in `old_data`, so the diff can be skipped."""
+        if new_fingerprint is None or new_fingerprint != old_data.get("props_fingerprint"):
+            return False
+        return new_signature == old_data.get("props_signature")
+
     def _diff_props(self, old_props: Dict, new_props: Dict) -> Optional[Dict]:
         changes = {}
         # --- THIS IS THE FIX ---
-        # Define a set of properties to ignore during the diffing process.
-        # These are typically function references that are re-created on every build.
-        ignored_keys = {'widget_instance', 'itemBuilder', 'onChanged', 'onPressed', 'onTap', 'onDrag'}
+        # Properties to ignore during the diffing process (see DIFF_IGNORED_PROPS).
+        ignored_keys = DIFF_IGNORED_PROPS
         # --- END OF FIX ---
             # Combine keys, but exclude 'widget_instance' from the check
         all_keys = (set(old_props.keys()) | set(new_props.keys())) - ignored_keys
@@ -799,6 +1105,34 @@ class Reconciler:
                 changes[key] = new_val
         return changes if changes else None
 
+    def _update_props(self, old_props: Dict, new_props: Dict, prop_changes: Dict) -> Dict:
+        """
+        Builds the props an UPDATE patch carries: only the changed keys
+        (removed ones as None), plus the little context the browser needs to
+        apply them:
+        - `old_shared_class`: the previous classes, so only the ones that
+          went away are removed.
+        - `style`: only the entries that changed (removed ones as None), with
+          `isDragEnded`, which decides whether custom properties are written.
+        - `widget_instance`: only for widgets with a `_style_override`.
+        A ticking clock's Text therefore sends just `{"data": "12:01"}`.
+        """
+        delta = dict(prop_changes)
+        if "css_class" in delta:
+            delta["old_shared_class"] = old_props.get("css_class")
+        if "style" in delta:
+            old_style, new_style = old_props.get("style"), new_props.get("style")
+            if isinstance(old_style, dict) and isinstance(new_style, dict):
+                changed = {k: v for k, v in new_style.items() if k not in old_style or old_style[k] != v}
+                changed.update((k, None) for k in old_style if k not in new_style)
+                delta["style"] = changed
+            if "isDragEnded" in new_props:
+                delta["isDragEnded"] = new_props["isDragEnded"]
+        widget_instance = new_props.get("widget_instance")
+        if widget_instance is not None and hasattr(type(widget_instance), "_style_override"):
+            delta["widget_instance"] = widget_instance
+        return delta
+
     def register_js_initializer(self, initializer: Dict[str, Any], context_key: str = "main") -> str:
         """
         Register an external JS initializer to be emitted on the next reconcile call.
@@ -842,7 +1176,7 @@ class Reconciler:
         self._registered_js_initializers[context_key][initializer_id] = init
         self._external_js_init_queue[context_key].append(init)
 
-        print(f"Registered JS initializer [{initializer_id}] for context [{context_key}]: {init}")
+        logger.debug("Registered JS initializer [%s] for context [%s]: %s", initializer_id, context_key, init)
 
         # Return the id so the caller can reference or cancel later
         return initializer_id
@@ -1,74 +1,143 @@
 """
 Adapter to use the Rust-based reconciler as an optional performance boost.
 Preserves the PyThra framework's widget/patch API while using Rust for the core diffing.
+
+The adapter is a `DiffBackend` that lives as long as its Reconciler. It keeps
+a mirror of the old tree in the format the Rust module reads, so a frame only
+marshals the nodes that changed since the last one, and a partial rebuild only
+hands Rust the subtree being rebuilt.
 """
 import time
+import logging
 
-from typing import Dict, List, Optional, Union, Any
-from dataclasses import dataclass, field
-import importlib.util
+from typing import Dict, List, Optional, Union, Any, Tuple
 
 from .base import Widget
-from .reconciler import Reconciler, ReconciliationResult, Patch
+from .diff_backends import DiffBackend, load_rust_reconciler
+from .reconciler import Reconciler, ReconciliationResult, Patch, NodeData
+
+logger = logging.getLogger(__name__)
+
+HOST_TYPES = ("StatefulWidget", "StatelessWidget")
+
+
+class RustReconcilerAdapter(DiffBackend):
+    name = "rust"
 
-class RustReconcilerAdapter:
     def __init__(self, reconciler: Reconciler):
         """Initialize with reference to main Reconciler for helper methods."""
-        self.reconciler = reconciler
-        self._rust_mod = None
-        try:
-            # Try a normal import of the rust module. Wrap in broad Exception handler
-            # because a faulty installed package may raise inside its package __init__.
-            self._rust_mod = importlib.import_module('rust_reconciler')
-            print("✨ Rust reconciler loaded for performance boost")
-        except Exception as e:
-            # If any error occurs during import (including NameError inside package __init__),
-            # fall back to Python reconciler and print a helpful message.
-            print("⚠️ Rust reconciler import failed; falling back to pure Python. Error:", e)
-            self._rust_mod = None
+        super().__init__(reconciler)
+        self._rust_mod = load_rust_reconciler()
+        # key -> (the rendered-map node it was built from, Rust-format record).
+        # A record is reused for as long as the map still holds that very node.
+        self._mirror: Dict[Any, Tuple[Any, Dict]] = {}
 
     def is_available(self) -> bool:
         """Check if the Rust reconciler is available."""
         return self._rust_mod is not None
 
-    def _build_old_tree_map(self, previous_map: Dict) -> Dict:
-        """Convert framework's previous_map to Rust-compatible old_tree format."""
+    def reset(self):
+        self._mirror.clear()
+
+    def _old_record(self, key, data) -> Dict:
+        mirrored = self._mirror.get(key)
+        if mirrored is not None and mirrored[0] is data:
+            return mirrored[1]
+        record = {
+            "key": key,
+            "type": data.get("widget_type"),
+            "props": data.get("props", {}),
+            "children": list(data.get("children_keys") or ()),
+        }
+        self._mirror[key] = (data, record)
+        return record
+
+    def _build_old_tree_map(self, previous_map: Dict, root_key=None) -> Dict:
+        """
+        Convert framework's previous_map to Rust-compatible old_tree format.
+
+        With a `root_key` only that node's subtree is included, which is all a
+        partial reconciliation diffs.
+        """
+        if root_key is None:
+            return {key: self._old_record(key, data) for key, data in previous_map.items()}
         old_tree = {}
-        for key, data in previous_map.items():
-            # Only include serializable data the Rust reconciler needs
-            old_tree[key] = {
-                "key": key,
-                "type": data.get("widget_type"),
-                "props": data.get("props", {}),
-                "children": data.get("children_keys", []),
-            }
+        stack = [root_key]
+        while stack:
+            key = stack.pop()
+            data = previous_map.get(key)
+            if data is None or key in old_tree:
+                continue
+            record = self._old_record(key, data)
+            old_tree[key] = record
+            stack.extend(record["children"])
         return old_tree
 
-    def _build_new_tree_map(self, root_widget: Widget) -> tuple[Dict, Dict[str, Widget]]:
-        """Convert Widget tree to Rust-compatible format and build lookup map."""
+    def _build_new_tree_map(
+        self, root_widget: Widget, previous_map: Dict, result: Optional[ReconciliationResult] = None
+    ) -> Tuple[Dict, Dict[str, Widget], Dict, set]:
+        """
+        Convert Widget tree to Rust-compatible format and build lookup maps.
+
+        Each node's props are rendered once here and reused by the patch
+        translation below. When `result` is given, CSS classes and callbacks
+        are collected from the same props. Also returns each key's parent key
+        and the keys that were carried over.
+
+        The walk makes the same identity decisions as the Python diff, so Rust
+        compares the same keys: unkeyed children of an updated node take over
+        the ids of the old children in their slots, and an identical, already
+        built instance keeps its old subtree (as records, without rendering).
+        """
         new_tree = {}
         widget_lookup = {}  # For generating HTML stubs later
+        parents = {root_widget.get_unique_id(): None}
+        carried = set()
 
-        def walk(widget: Optional[Widget]) -> None:
-            if widget is None:
-                return
+        stack = [root_widget]
+        while stack:
+            widget = stack.pop()
             key = widget.get_unique_id()
+            old = previous_map.get(key)
+            if old is not None and widget is not root_widget and widget is old.get("widget_instance"):
+                self._carry_over(key, previous_map, new_tree, parents, carried)
+                continue
             props = widget.render_props()
-            children = [c.get_unique_id() for c in widget.get_children()]
-            
+            if result is not None:
+                self.reconciler._collect_details(widget, props, result)
+            widget_type = type(widget).__name__
+            if old is not None and old.get("widget_type") == widget_type and old.get("key") == widget.key:
+                self.reconciler._adopt_positional_ids(
+                    old.get("children_keys") or (), widget.get_children(), previous_map
+                )
+            children = [c for c in widget.get_children() if c is not None]
+            child_keys = [c.get_unique_id() for c in children]
             new_tree[key] = {
                 "key": key,
-                "type": type(widget).__name__,
+                "type": widget_type,
                 "props": props,
-                "children": children
+                "children": child_keys,
             }
             widget_lookup[key] = widget
-            for child in widget.get_children():
-                walk(child)
+            for child_key in child_keys:
+                parents[child_key] = key
+            stack.extend(reversed(children))
+        return new_tree, widget_lookup, parents, carried
 
-        walk(root_widget)
-        # print(f'New tree: {new_tree}, \nWidget lookup: {widget_lookup}')
-        return new_tree, widget_lookup
+    def _carry_over(self, root_key, previous_map: Dict, new_tree: Dict, parents: Dict, carried: set):
+        """Puts the old records of an unchanged subtree into the new tree."""
+        stack = [root_key]
+        while stack:
+            key = stack.pop()
+            data = previous_map.get(key)
+            if data is None:
+                continue
+            record = self._old_record(key, data)
+            new_tree[key] = record
+            carried.add(key)
+            for child_key in record["children"]:
+                parents[child_key] = key
+            stack.extend(reversed(record["children"]))
 
     def reconcile(
         self,
@@ -81,6 +150,12 @@ class RustReconcilerAdapter:
         """
         Use Rust reconciler for diffing but preserve PyThra's patch format and HTML generation.
         Falls back to Python implementation if Rust module not available.
+
+        Rust only decides what moved, what is new and what is gone. Everything
+        else goes through the Reconciler's own helpers, so the result is the
+        one the Python diff gives: new subtrees are mounted with their JS
+        initializers and inserted as one fragment, and unchanged instances are
+        carried over.
         """
         if not self.is_available() or new_widget_root is None:
             # Fallback to pure Python if Rust not available or for edge cases
@@ -89,11 +164,19 @@ class RustReconcilerAdapter:
                 old_root_key, is_partial_reconciliation
             )
 
+        # Initialize result with framework's format
+        result = ReconciliationResult()
+        old_root_key = self.reconciler._adopt_root(
+            previous_map, new_widget_root, parent_html_id, old_root_key, is_partial_reconciliation
+        )
+
         # Convert to Rust-compatible formats
         t0 = time.perf_counter()
-        old_tree = self._build_old_tree_map(previous_map)
+        old_tree = self._build_old_tree_map(
+            previous_map, old_root_key if is_partial_reconciliation else None
+        )
         t1 = time.perf_counter()
-        new_tree, widget_lookup = self._build_new_tree_map(new_widget_root)
+        new_tree, widget_lookup, parents, carried = self._build_new_tree_map(new_widget_root, previous_map, result)
         t2 = time.perf_counter()
 
         # Call Rust reconciler
@@ -101,22 +184,66 @@ class RustReconcilerAdapter:
         rust_patches = self._rust_mod.reconcile(old_tree, new_tree)
         rust_call_end = time.perf_counter()
 
+        rust_patches = [
+            (p.action, p.target_id, None if p.data is None else dict(p.data)) for p in rust_patches
+        ]
+        signatures = {}  # key -> (props signature, fingerprint)
+        mounted = result.new_rendered_map  # Filled by the Python mount helpers first.
 
-        # Initialize result with framework's format
-        result = ReconciliationResult()
-        new_html_ids = {}  # Track html_ids for new nodes
+        def html_id_of(key):
+            if key in mounted:
+                return mounted[key].html_id
+            return previous_map.get(key, {}).get("html_id")
 
-        # Copy existing entries to new_rendered_map (for html_id lookups)
-        for k, d in previous_map.items():
-            result.new_rendered_map[k] = dict(d)
+        def parent_html_of(key):
+            # Hosts have no element of their own; their children go into the
+            # nearest rendered ancestor.
+            parent_key = parents.get(key)
+            while parent_key is not None:
+                if new_tree[parent_key]["type"] not in HOST_TYPES:
+                    return html_id_of(parent_key)
+                parent_key = parents.get(parent_key)
+            return parent_html_id
 
-        # Convert Rust patches to framework Patch objects
-        for rust_patch in rust_patches:
-            action, key, patch_data = (
-                rust_patch.action,
-                rust_patch.target_id,
-                None if rust_patch.data is None else dict(rust_patch.data)
+        # New nodes are the ones Rust inserts plus any it didn't list, and, as
+        # in the Python diff (which matches children per parent), nodes that
+        # now sit under another parent. Only the topmost of them are mounted;
+        # their descendants come along in the same fragment.
+        old_parents = {child: key for key, record in old_tree.items() for child in record["children"]}
+        inserted = {key for action, key, _ in rust_patches if action == "INSERT"}
+        inserted.update(
+            key for key in new_tree
+            if key not in old_tree or old_parents.get(key) != parents.get(key)
+        )
+
+        def has_inserted_ancestor(key):
+            parent_key = parents.get(key)
+            while parent_key is not None:
+                if parent_key in inserted:
+                    return True
+                parent_key = parents.get(parent_key)
+            return False
+
+        insert_roots = [key for key in new_tree if key in inserted and not has_inserted_ancestor(key)]
+        fresh = set()
+        stack = list(insert_roots)
+        while stack:
+            key = stack.pop()
+            fresh.add(key)
+            stack.extend(new_tree[key]["children"])
+        known_props = {key: record["props"] for key, record in new_tree.items()} if insert_roots else None
+
+        def insert(key, before_html):
+            parent_html = parent_html_of(key)
+            self.reconciler._mount_node_recursive(
+                widget_lookup[key], parent_html, parents.get(key), result, known_props=known_props
             )
+            self.reconciler._emit_subtree_insert(key, parent_html, before_html, result)
+
+        # Convert Rust patches to framework Patch objects
+        pending_roots = dict.fromkeys(insert_roots)
+        for action, key, patch_data in rust_patches:
+            before_key = patch_data.get("before_id") if patch_data else None
 
             if action == "REMOVE":
                 # Simple removal - just map key to html_id
@@ -126,84 +253,105 @@ class RustReconcilerAdapter:
                     html_id=old_html,
                     data={}
                 ))
-                result.new_rendered_map.pop(key, None)
+                self.reconciler._unmount_subtree(key, previous_map, result)
 
             elif action == "INSERT":
-                # Generate HTML stub and track new node
-                widget = widget_lookup[key]
-                new_html_id = self.reconciler.id_generator.next_id()
-                props = widget.render_props()
-                
-                # Use framework's HTML generation
-                stub = self.reconciler._generate_html_stub(widget, new_html_id, props)
-                
-                # Map before_id from widget key to html_id
-                before_key = patch_data.get("before_id") if patch_data else None
-                before_html = (
-                    previous_map.get(before_key, {}).get("html_id")
-                    if before_key else None
-                )
-
-                # Create framework-style INSERT patch
-                result.patches.append(Patch(
-                    action="INSERT",
-                    html_id=new_html_id,
-                    data={
-                        "html": stub,
-                        "parent_html_id": parent_html_id,
-                        "props": props,
-                        "before_id": before_html
-                    }
-                ))
-
-                # Track in new_rendered_map for children
-                result.new_rendered_map[key] = {
-                    "html_id": new_html_id,
-                    "widget_type": type(widget).__name__,
-                    "key": getattr(widget, 'key', None),
-                    "widget_instance": widget,
-                    "props": props,
-                    "parent_html_id": parent_html_id,
-                    "parent_key": None,  # Parent relation tracked elsewhere
-                    "children_keys": [c.get_unique_id() for c in widget.get_children()],
-                }
-                new_html_ids[key] = new_html_id
+                if key in pending_roots:
+                    del pending_roots[key]
+                    insert(key, html_id_of(before_key) if before_key else None)
 
             elif action == "MOVE":
+                if key in fresh:
+                    continue  # Inside a new subtree, which was mounted in place.
                 # Map widget keys to html_ids for move operation
-                html_id = (
-                    previous_map.get(key, {}).get("html_id") or
-                    new_html_ids.get(key)
-                )
-                before_key = patch_data.get("before_id") if patch_data else None
-                before_html = (
-                    previous_map.get(before_key, {}).get("html_id") or
-                    new_html_ids.get(before_key)
-                )
-                
+                before_html = html_id_of(before_key) if before_key else None
                 result.patches.append(Patch(
                     action="MOVE",
-                    html_id=html_id,
-                    data={"before_id": before_html} if before_html else None
+                    html_id=html_id_of(key),
+                    data={"parent_html_id": parent_html_of(key), "before_id": before_html}
                 ))
 
             elif action == "UPDATE":
+                if key in fresh or key in carried:
+                    continue
                 # Property updates - compute diffs using framework helper
                 html_id = previous_map[key]["html_id"]
-                widget = widget_lookup[key]
-                new_props = widget.render_props()
+                new_props = new_tree[key]["props"]
                 old_props = previous_map[key].get("props", {})
-                
+                signatures[key] = self.reconciler._props_signature(new_props)
+                if self.reconciler._props_unchanged(previous_map[key], *signatures[key]):
+                    continue
+
                 # Use framework's prop diffing
                 prop_changes = self.reconciler._diff_props(old_props, new_props)
-                if prop_changes:
+                widget = widget_lookup[key]
+                if prop_changes and new_tree[key]["type"] == "StatefulWidget":
+                    old_widget = previous_map[key].get("widget_instance")
+                    state = widget.get_state()
+                    if state and old_widget:
+                        state.didUpdateWidget(old_widget, widget)
+                if prop_changes and new_tree[key]["type"] not in HOST_TYPES:
                     result.patches.append(Patch(
                         action="UPDATE",
                         html_id=html_id,
-                        data=prop_changes
+                        data={"props": self.reconciler._update_props(old_props, new_props, prop_changes)}
                     ))
-                    if key in result.new_rendered_map:
-                        result.new_rendered_map[key]["props"] = new_props
+
+        # New nodes Rust didn't list get appended to their parent, in order
+        # (new_tree is in document order).
+        for key in pending_roots:
+            insert(key, None)
+
+        # An old keyed node that was mounted again under a new parent leaves
+        # its old place, like a child the Python diff no longer finds there.
+        removed = set(result.unmounted_keys)
+        for key in fresh:
+            old = previous_map.get(key)
+            if old is None or key in removed or key not in old_tree:
+                continue
+            old_parent = old_parents.get(key)
+            if old_parent in new_tree and old_parent not in fresh:
+                result.patches.append(Patch(action="REMOVE", html_id=old["html_id"], data={}))
+                self.reconciler._unmount_subtree(key, previous_map, result)
+
+        # The new map holds exactly the nodes of the new (sub)tree, as the
+        # Python diff's does.
+        for key, record in new_tree.items():
+            if key in mounted:
+                continue
+            if key in carried:
+                result.new_rendered_map[key] = previous_map[key]
+                continue
+            widget = widget_lookup[key]
+            props = record["props"]
+            if key not in signatures:
+                old = previous_map.get(key)
+                if old is not None and old.get("props") is props:
+                    signatures[key] = (old.get("props_signature"), old.get("props_fingerprint"))
+                else:
+                    signatures[key] = self.reconciler._props_signature(props)
+            result.new_rendered_map[key] = NodeData(
+                html_id=html_id_of(key),
+                widget_type=record["type"],
+                key=getattr(widget, 'key', None),
+                widget_instance=widget,
+                props=props,
+                props_signature=signatures[key][0],
+                props_fingerprint=signatures[key][1],
+                parent_html_id=parent_html_of(key),
+                parent_key=parents.get(key),
+                children_keys=record["children"],
+            )
+
+        if not is_partial_reconciliation:
+            # Anything not in the new tree is gone, like in the Python diff.
+            already_removed = set(result.unmounted_keys)
+            for key, data in previous_map.items():
+                if key in result.new_rendered_map or key in already_removed:
+                    continue
+                result.unmounted_keys.append(key)
+                if data.get("html_id"):
+                    result.patches.append(Patch(action="REMOVE", html_id=data.get("html_id"), data={}))
 
         t_done = time.perf_counter()
 
@@ -215,15 +363,21 @@ class RustReconcilerAdapter:
             "translate_ms": (t_done - rust_call_end) * 1000.0,
             "total_ms": (t_done - t0) * 1000.0,
         }
-        print("[rust_adapter timings] build_old={:.3f}ms build_new={:.3f}ms rust={:.3f}ms translate={:.3f}ms total={:.3f}ms".format(
+        logger.debug(
+            "[rust_adapter timings] build_old=%.3fms build_new=%.3fms rust=%.3fms translate=%.3fms total=%.3fms",
             timings["build_old_tree_ms"], timings["build_new_tree_ms"],
-            timings["rust_call_ms"], timings["translate_ms"], timings["total_ms"]
-        ))
+            timings["rust_call_ms"], timings["translate_ms"], timings["total_ms"],
+        )
         # Attach timings into result for programmatic inspection
-        result.new_rendered_map["__rust_adapter_timing__"] = timings
-        # Handle framework-specific updates (lifecycle, CSS, callbacks)
-        self.reconciler._collect_details(new_widget_root, new_widget_root.render_props(), result)
+        result.timings = timings
+        # CSS classes and callbacks were collected while walking the new tree.
+        self.reconciler._finish_unmount(result, previous_map)
 
-        # print(f'Result: {result}')
+        # The next frame's previous map holds these very nodes, so their
+        # records are valid until the nodes are replaced.
+        for key in result.unmounted_keys:
+            self._mirror.pop(key, None)
+        for key, node in result.new_rendered_map.items():
+            self._mirror[key] = (node, new_tree[key])
 
-        return result
\ No newline at end of file
+        return result
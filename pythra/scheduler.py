@@ -0,0 +1,259 @@
+# =============================================================================
+# PYTHRA FRAME SCHEDULER - Decides Which States Rebuild, When, and In What Order
+# =============================================================================
+"""
+PyThra Frame Scheduler
+
+Every `setState()` call marks a State as "dirty". The scheduler collects those
+dirty states and hands them to the framework once per frame, so a burst of
+updates (a data feed pushing twenty ticks before the UI gets a chance to
+paint) turns into a single rebuild of each affected subtree.
+
+**The rules of a frame:**
+1. **Coalesce**: A State marked dirty several times before the frame runs is
+   rebuilt once.
+2. **Parents first**: Dirty states are processed from the top of the tree
+   down (by depth in the rendered map).
+3. **No double work**: When a parent rebuild already rebuilt a dirty child,
+   the child is dropped from the frame instead of being rebuilt (and patched)
+   a second time.
+4. **No re-entrancy**: A `setState()` made while a frame is building is not
+   allowed to change the frame in flight. It is queued for the next frame,
+   which is requested as soon as the current one finishes.
+
+**Lanes - not every update is equally urgent:**
+- `Lane.INPUT`: Updates caused by the user (typing, dragging a slider, a tap).
+  They get a frame right away, without waiting for the frame pacing.
+- `Lane.NORMAL`: Regular `setState()` calls. Frames are paced to the
+  configured `frame_rate` (60 Hz by default), however many calls arrive.
+- `Lane.BACKGROUND`: Work that can wait (refreshing a big table from a data
+  feed). It runs after the other lanes and only while the frame still has
+  budget left; whatever does not fit is carried over to the next frame.
+
+A `setState()` without an explicit priority lands in the INPUT lane while the
+framework is dispatching a UI event, and in the NORMAL lane otherwise:
+
+```python
+def on_text_changed(self, value):   # Called from a TextField -> INPUT lane
+    self.query = value
+    self.setState()
+
+def on_feed_tick(self, rows):       # Called from a background timer
+    self.rows = rows
+    self.setState(priority=Lane.BACKGROUND)
+```
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Set, TYPE_CHECKING, Union
+
+if TYPE_CHECKING:
+    from .base import Key
+    from .state import State
+
+
+class Lane(IntEnum):
+    """Update priorities, most urgent first."""
+    INPUT = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+# The lane used by setState() calls that don't pass a priority.
+_ambient_lane = Lane.NORMAL
+
+
+@contextmanager
+def handling_input():
+    """Marks setState() calls made inside the block as input-driven."""
+    global _ambient_lane
+    previous, _ambient_lane = _ambient_lane, Lane.INPUT
+    try:
+        yield
+    finally:
+        _ambient_lane = previous
+
+
+def current_lane() -> Lane:
+    """The lane a setState() call without an explicit priority lands in."""
+    return _ambient_lane
+
+
+class FrameScheduler:
+    """
+    Collects dirty States and orders them into paced, budgeted frames.
+
+    `request_frame(delay_ms, callback)` is called (at most once per pending
+    frame) with the callback that should run the frame; the framework passes
+    `QTimer.singleShot`. `frame_rate` is the target number of frames per
+    second; a falsy value disables pacing.
+    """
+
+    def __init__(
+        self,
+        request_frame: Callable[[int, Callable[[], None]], None],
+        frame_rate: Optional[float] = 60,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self._request_frame = request_frame
+        self._clock = clock
+        self._frame_callback: Optional[Callable[[], None]] = None
+        self._dirty: Dict["State", Lane] = {}  # Insertion-ordered.
+        self._in_frame = False
+        self._built_this_frame: Set["State"] = set()
+        self._lanes: Dict["State", Lane] = {}
+        self._frame_start = 0.0
+        self._last_frame_start: Optional[float] = None
+        self._admitted = 0
+        # Requests can't be cancelled, so each one carries a generation and
+        # only the newest is allowed to run a frame.
+        self._generation = 0
+        self._requested_delay: Optional[int] = None
+        self.set_frame_rate(frame_rate)
+
+    def set_frame_rate(self, frame_rate: Optional[float]):
+        """Sets the target frame rate (frames per second; 0/None = unpaced)."""
+        self.frame_interval = 1.0 / frame_rate if frame_rate else 0.0
+        self.frame_budget = self.frame_interval or 1.0 / 60
+
+    def set_frame_callback(self, callback: Callable[[], None]):
+        """Sets the function that processes a frame (the framework's update cycle)."""
+        self._frame_callback = callback
+
+    @property
+    def is_building(self) -> bool:
+        """True while a frame is being built and reconciled."""
+        return self._in_frame
+
+    def mark_dirty(self, state: "State", priority: Optional[Lane] = None):
+        """
+        Marks a State as needing a rebuild in the given lane (the ambient lane
+        by default). A State dirty in several lanes is rebuilt once, in the most
+        urgent one. Calls made during a frame are deferred to the next frame.
+        """
+        lane = Lane(priority) if priority is not None else _ambient_lane
+        current = self._dirty.get(state)
+        self._dirty[state] = lane if current is None else min(current, lane)
+        if not self._in_frame:
+            self._schedule()
+
+    def _next_delay_ms(self) -> int:
+        """Milliseconds until the pending work may run."""
+        if Lane.INPUT in self._dirty.values() or self._last_frame_start is None:
+            return 0
+        next_start = self._last_frame_start + self.frame_interval
+        return max(0, math.ceil((next_start - self._clock()) * 1000))
+
+    def _schedule(self):
+        if self._frame_callback is None or not self._dirty:
+            return
+        delay = self._next_delay_ms()
+        if self._requested_delay is not None and self._requested_delay <= delay:
+            return  # The frame already requested runs soon enough.
+        self._generation += 1
+        self._requested_delay = delay
+        generation = self._generation
+        self._request_frame(delay, lambda: self._run_frame(generation))
+
+    def _run_frame(self, generation: int):
+        if generation != self._generation:
+            return  # Superseded by a sooner request.
+        self._frame_callback()
+
+    def begin_frame(
+        self,
+        rendered_map: Dict[Union["Key", str], object],
+        root_widget: Optional[object] = None,
+    ) -> List["State"]:
+        """
+        Starts a frame and returns its dirty States: INPUT and NORMAL work
+        shallowest first, followed by BACKGROUND work shallowest first.
+
+        The pending set is swapped out, so anything marked dirty from here on
+        belongs to the next frame. States whose widget is gone or was never
+        mounted are dropped; the root widget (which has no rendered entry of
+        its own) sorts before everything else.
+        """
+        self._requested_delay = None
+        self._in_frame = True
+        self._frame_start = self._last_frame_start = self._clock()
+        self._admitted = 0
+        self._built_this_frame.clear()
+        dirty, self._dirty = self._dirty, {}
+
+        ordered = []
+        for state, lane in dirty.items():
+            widget = state.get_widget()
+            if widget is None:
+                continue
+            if widget is root_widget:
+                depth = -1
+            else:
+                depth = self._depth(widget.get_unique_id(), rendered_map)
+                if depth is None:
+                    continue
+            ordered.append((lane == Lane.BACKGROUND, depth, state, lane))
+        ordered.sort(key=lambda item: item[:2])
+        self._lanes = {state: lane for _, _, state, lane in ordered}
+        return [state for _, _, state, _ in ordered]
+
+    def skip_frame(self):
+        """
+        Gives up the requested frame without building it. Dirty states stay
+        queued and are scheduled again by the next `mark_dirty()`.
+        """
+        self._requested_delay = None
+
+    @staticmethod
+    def _depth(key, rendered_map) -> Optional[int]:
+        """Counts the parent links above `key`, or None if it is not mounted."""
+        node = rendered_map.get(key)
+        if node is None:
+            return None
+        depth = 0
+        while node.parent_key is not None:
+            node = rendered_map.get(node.parent_key)
+            if node is None:
+                break
+            depth += 1
+        return depth
+
+    def note_built(self, state: "State"):
+        """Records that `state.build()` ran as part of the current frame."""
+        if self._in_frame:
+            self._built_this_frame.add(state)
+
+    def needs_build(self, state: "State") -> bool:
+        """False if an ancestor's rebuild already rebuilt this State in this frame."""
+        return state not in self._built_this_frame
+
+    def admit(self, state: "State") -> bool:
+        """
+        Decides whether `state` is rebuilt in the current frame.
+
+        States already rebuilt by an ancestor are dropped. BACKGROUND states
+        are carried over to the next frame once the frame budget is spent
+        (a frame always does at least one piece of work, so background work
+        can't starve itself).
+        """
+        if not self.needs_build(state):
+            return False
+        if (
+            self._lanes.get(state) == Lane.BACKGROUND
+            and self._admitted
+            and self._clock() - self._frame_start >= self.frame_budget
+        ):
+            self._dirty.setdefault(state, Lane.BACKGROUND)
+            return False
+        self._admitted += 1
+        return True
+
+    def end_frame(self):
+        """Finishes the frame and requests the next one if work is left over."""
+        self._in_frame = False
+        self._built_this_frame.clear()
+        self._lanes = {}
+        self._schedule()
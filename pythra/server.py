@@ -4,9 +4,12 @@ import http.server
 import socketserver
 import threading
 import os
+import logging
 from pathlib import Path
 from typing import Dict
 
+logger = logging.getLogger(__name__)
+
 class MultiDirectoryRequestHandler(http.server.SimpleHTTPRequestHandler):
     """
     A custom request handler that can serve files from multiple directories
@@ -40,15 +43,19 @@ class MultiDirectoryRequestHandler(http.server.SimpleHTTPRequestHandler):
                 # Example: /plugins/editor/style.css -> C:/project/plugins/editor/public/style.css
                 relative_path = path[len(url_prefix):]
                 translated_path = os.path.join(fs_path, relative_path)
-                print(f"[AssetServer] Plugin request: '{path}' -> '{translated_path}'")
+                logger.debug("[AssetServer] Plugin request: '%s' -> '%s'", path, translated_path)
                 return translated_path
 
         # If no prefix matched, it's a standard asset.
         # Let the parent class handle it relative to the base directory.
         translated_path = super().translate_path(path)
-        print(f"[AssetServer] Base asset request: '{path}' -> '{translated_path}'")
+        logger.debug("[AssetServer] Base asset request: '%s' -> '%s'", path, translated_path)
         return translated_path
 
+    def log_message(self, format, *args):
+        """Routes the per-request access log through `logging` instead of stderr."""
+        logger.debug("[AssetServer] %s - " + format, self.address_string(), *args)
+
     def end_headers(self):
         """Add CORS headers to allow cross-origin requests (e.g., for fonts)."""
         self.send_header('Access-Control-Allow-Origin', '*')
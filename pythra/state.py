@@ -25,11 +25,15 @@ remember things and change over time (like counters, form inputs, shopping carts
 
 import weakref
 import time
+import logging
 from PySide6.QtCore import QTimer
 from typing import Optional, TYPE_CHECKING
 
 # Import base classes needed at runtime
 from .base import Widget, Key
+from .scheduler import Lane
+
+logger = logging.getLogger(__name__)
 
 # Use TYPE_CHECKING to prevent circular imports for type hints
 if TYPE_CHECKING:
@@ -261,21 +265,27 @@ class State:
         """Describes the part of the user interface represented by this state."""
         raise NotImplementedError(f"{self.__class__.__name__} must implement build()")
 
-    def setState(self):
-        """Notify the framework that the internal state of this object has changed."""
+    def setState(self, priority: Optional[Lane] = None):
+        """
+        Notify the framework that the internal state of this object has changed.
+
+        `priority` is the scheduler lane for the rebuild: `Lane.INPUT`,
+        `Lane.NORMAL` or `Lane.BACKGROUND` (work that may be spread over several
+        frames). Left as None, updates made while handling a UI event are
+        treated as input and everything else as normal.
+        """
         widget = self.get_widget()
         if not widget:
-            print(f"⚠️ PyThra State | Cannot setState for {self.__class__.__name__} - widget reference lost")
+            logger.warning("Cannot setState for %s - widget reference lost", type(self).__name__)
             return
 
         if self.framework:
             # Use getattr for safety, though framework should exist if widget exists
-            key_info = getattr(widget, 'key', None)
-            print(f"🔄 PyThra State | setState triggered: {self.__class__.__name__} (Widget Key: {key_info})")
+            logger.debug("🔄 setState triggered: %s (Widget Key: %s)", type(self).__name__, getattr(widget, 'key', None))
             # Pass 'self' (the State instance) to the framework
-            self.framework.request_reconciliation(self)
+            self.framework.request_reconciliation(self, priority)
         else:
-            print(f"❌ PyThra State | setState failed for {self.__class__.__name__}: Framework not available")
+            logger.error("setState failed for %s: Framework not available", type(self).__name__)
 
 
     # --- Drawer/Snackbar/etc. Methods ---
@@ -6,13 +6,129 @@ import re # For hex validation
 
 from .base import make_hashable
 
+
+# =============================================================================
+# STYLE VALUES - Immutable, Shared Building Blocks for Styles
+# =============================================================================
+
+class _InternedStyle(type):
+    """
+    Metaclass that makes equal style values the same object (a "flyweight").
+
+    `EdgeInsets.all(8)` written in ten thousand list rows builds one EdgeInsets,
+    not ten thousand: a call with arguments seen before returns the existing
+    instance without running `__init__` again, and a new instance equal to a
+    known one (e.g. `EdgeInsets(8, 8, 8, 8)`) is swapped for it. Each class
+    keeps at most `cache_size` of them; when full the tables start over, which
+    only costs a few rebuilds (equality never depends on identity).
+    """
+
+    cache_size = 4096
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        cls._by_args = {}
+        cls._by_value = {}
+
+    def __call__(cls, *args, **kwargs):
+        call_key = (args, tuple(kwargs.items()))
+        try:
+            return cls._by_args[call_key]
+        except KeyError:
+            pass
+        except TypeError:  # An unhashable argument, e.g. a list of BoxShadows.
+            call_key = None
+
+        instance = super().__call__(*args, **kwargs)
+        value = instance.to_tuple()
+        try:
+            hash_value = hash(value)
+        except TypeError:  # Holds something unhashable: keep it to itself.
+            object.__setattr__(instance, "_hash", None)
+            object.__setattr__(instance, "_key", value)
+            return instance
+        object.__setattr__(instance, "_hash", hash_value)
+        object.__setattr__(instance, "_key", value)  # Frozen from here on.
+
+        if len(cls._by_value) >= cls.cache_size:
+            cls._by_value.clear()
+            cls._by_args.clear()
+        instance = cls._by_value.setdefault(value, instance)
+        if call_key is not None:
+            cls._by_args[call_key] = instance
+        return instance
+
+
+class StyleValue(metaclass=_InternedStyle):
+    """
+    Base for the immutable style value classes (EdgeInsets, TextStyle, ...).
+
+    **Why immutable?**
+    Widgets turn their styles into a `style_key` on every build. Because a
+    style value can't change after it's made, its `to_tuple()` and hash are
+    worked out once and reused, so `make_hashable(EdgeInsets.all(8))` is a
+    lookup rather than a rebuild. It also makes sharing one instance between
+    every widget that asks for the same style safe.
+
+    To "change" a style, build a new one:
+    ```python
+    padding = EdgeInsets.all(8)
+    padding.left = 4                        # AttributeError
+    padding = EdgeInsets.only(left=4, top=8, right=8, bottom=8)
+    ```
+
+    Subclasses declare their fields in `__slots__`, set them in `__init__` and
+    define `to_tuple()` as before; equality and hashing come from here.
+    """
+
+    __slots__ = ("_key", "_hash")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        compute = cls.__dict__.get("to_tuple")
+        if compute is not None:
+            cls._compute_tuple = compute
+            cls.to_tuple = StyleValue.to_tuple
+
+    def to_tuple(self) -> Tuple:
+        """Returns the hashable tuple representation, computed once per instance."""
+        try:
+            return self._key
+        except AttributeError:  # Still inside __init__ / the metaclass.
+            return self._compute_tuple()
+
+    def __setattr__(self, name, value):
+        if hasattr(self, "_key"):
+            raise AttributeError(f"{type(self).__name__} is immutable; create a new one instead")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self):
+        return self._hash if self._hash is not None else hash(self._key)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
 #Colors = Color()
 
 # framework/styles.py
 
 from typing import Union
 
-class EdgeInsets:
+class EdgeInsets(StyleValue):
     left_c=0
     top_c=0
     right_c=0 
@@ -21,6 +137,8 @@ class EdgeInsets:
     Represents padding or margin for a widget's edges.
     Compatible with reconciliation (hashable).
     """
+    __slots__ = ('left', 'top', 'right', 'bottom')
+
     def __init__(self, left: float = 0.0, top: float = 0.0, right: float = 0.0, bottom: float = 0.0):
         """
         Initializes EdgeInsets. Values assumed to be pixels.
@@ -115,17 +233,6 @@ class EdgeInsets:
         return self.right + self.left
 
     # --- Compatibility Methods ---
-    def __eq__(self, other):
-        if not isinstance(other, EdgeInsets):
-            return NotImplemented
-        return (self.left == other.left and
-                self.top == other.top and
-                self.right == other.right and
-                self.bottom == other.bottom)
-
-    def __hash__(self):
-        return hash((self.left, self.top, self.right, self.bottom))
-
     def __repr__(self):
          if self.left == self.top == self.right == self.bottom:
               return f"EdgeInsets.all({self.left})"
@@ -155,7 +262,7 @@ class EdgeInsets:
 
 # print("Edge Insets", EdgeInsets.only(top=40, left=20).edit(operation='-',top=10))
 
-class Alignment:
+class Alignment(StyleValue):
     """
     Represents alignment for widgets using flexbox concepts (justify-content, align-items).
     Ensures compatibility with reconciliation by being hashable.
@@ -164,6 +271,8 @@ class Alignment:
         justify_content (str): CSS value for justify-content (main axis alignment).
         align_items (str): CSS value for align-items (cross axis alignment).
     """
+    __slots__ = ('justify_content', 'align_items')
+
     def __init__(self, justify_content: str, align_items: str):
         """
         Initializes Alignment. It's recommended to use the static methods
@@ -241,17 +350,6 @@ class Alignment:
         """
         return f"display: flex; justify-content: {self.justify_content}; align-items: {self.align_items};"
 
-    # --- Add __eq__ and __hash__ for compatibility with style keys ---
-    def __eq__(self, other):
-        if not isinstance(other, Alignment):
-            return NotImplemented
-        return (self.justify_content == other.justify_content and
-                self.align_items == other.align_items)
-
-    def __hash__(self):
-        # Hash a tuple of the relevant attributes
-        return hash((self.justify_content, self.align_items))
-
     # --- Optional: Add representation for debugging ---
     def __repr__(self):
          # Try to find matching static method name for cleaner repr (optional)
@@ -276,7 +374,7 @@ class Alignment:
          """Returns a hashable tuple representation."""
          return (self.justify_content, self.align_items)
 
-class TextAlign:
+class TextAlign(StyleValue):
     """
     Represents horizontal text alignment options. Compatible with reconciliation.
 
@@ -291,6 +389,8 @@ class TextAlign:
     START = 'start' # Respects LTR/RTL directionality
     END = 'end'     # Respects LTR/RTL directionality
 
+    __slots__ = ('value',)
+
     def __init__(self, value: str):
         """
         Initializes TextAlign. Using class constants like TextAlign.CENTER is recommended.
@@ -329,15 +429,6 @@ class TextAlign:
         """Returns the CSS property string (e.g., 'text-align: center;')."""
         return f"text-align: {self.value};"
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, TextAlign):
-            return NotImplemented
-        return self.value == other.value
-
-    def __hash__(self):
-        return hash(self.value)
-
     # --- Representation ---
     def __repr__(self):
          # Try matching constants for cleaner representation
@@ -352,11 +443,13 @@ class TextAlign:
     def to_tuple(self): return (self.value,) # Tuple for make_hashable
 
 # --- BoxConstraints Refactored ---
-class BoxConstraints:
+class BoxConstraints(StyleValue):
     """
     Represents min/max width and height constraints for a widget.
     Compatible with reconciliation.
     """
+    __slots__ = ('minWidth', 'maxWidth', 'minHeight', 'maxHeight')
+
     def __init__(self,
                  minWidth: Optional[float] = 0.0, # Default min width is 0
                  maxWidth: Optional[float] = float('inf'), # Default max width is infinity
@@ -408,19 +501,6 @@ class BoxConstraints:
         style_dict = self.to_css_dict()
         return " ".join(f"{prop}: {value};" for prop, value in style_dict.items())
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, BoxConstraints):
-            return NotImplemented
-        return (self.minWidth == other.minWidth and
-                self.maxWidth == other.maxWidth and
-                self.minHeight == other.minHeight and
-                self.maxHeight == other.maxHeight)
-
-    def __hash__(self):
-        # Hash a tuple of the defining attributes
-        return hash((self.minWidth, self.maxWidth, self.minHeight, self.maxHeight))
-
     # --- Representation ---
     def __repr__(self):
         props = []
@@ -593,24 +673,26 @@ Colors = Color()
 
 # Assume Offset helper exists or define it here/import
 # Example definition if needed:
-class Offset:
+class Offset(StyleValue):
+     __slots__ = ('dx', 'dy')
+
      def __init__(self, dx: float, dy: float):
          self.dx = dx
          self.dy = dy
      def to_css(self):
          return f"{self.dx}px {self.dy}px"
-     def __eq__(self, other):
-         return isinstance(other, Offset) and self.dx == other.dx and self.dy == other.dy
-     def __hash__(self):
-         return hash((self.dx, self.dy))
      def __repr__(self):
          return f"Offset({self.dx}, {self.dy})"
+     def to_tuple(self):
+         return (self.dx, self.dy)
 # End Example Offset definition
 
-class BoxShadow:
+class BoxShadow(StyleValue):
     """
     Represents a CSS box-shadow effect. Compatible with reconciliation.
     """
+    __slots__ = ('color', 'offset', 'blurRadius', 'spreadRadius')
+
     def __init__(self,
                  color: str = 'rgba(0,0,0,0.2)', # Default shadow color
                  offset: Offset = Offset(0, 2), # Default offset (dx, dy)
@@ -648,20 +730,6 @@ class BoxShadow:
          """Returns the CSS property as a dictionary."""
          return {'box-shadow': self.to_css()}
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, BoxShadow):
-            return NotImplemented
-        return (self.color == other.color and
-                self.offset == other.offset and
-                self.blurRadius == other.blurRadius and
-                self.spreadRadius == other.spreadRadius)
-
-    def __hash__(self):
-        # Hash a tuple of the relevant attributes
-        # Ensure offset is hashable (Offset class needs __hash__)
-        return hash((self.color, self.offset, self.blurRadius, self.spreadRadius))
-
     # --- Representation ---
     def __repr__(self):
         return f"BoxShadow(color='{self.color}', offset={self.offset!r}, blurRadius={self.blurRadius}, spreadRadius={self.spreadRadius})"
@@ -734,11 +802,13 @@ class CrossAxisAlignment:
     STRETCH = 'stretch' # Make children fill the cross axis.
     BASELINE = 'baseline' # Align children along their text baseline.
 
-class TextStyle:
+class TextStyle(StyleValue):
     """
     Holds styling information for text (font, color, decoration, etc.).
     Compatible with reconciliation.
     """
+    __slots__ = ('color', 'fontFamily', 'fontSize', 'fontWeight', 'fontStyle', 'letterSpacing', 'wordSpacing', 'lineHeight', 'textDecoration', 'decorationColor', 'decorationStyle', 'decorationThickness')
+
     def __init__(self,
                  color: Optional[str] = None,
                  # Font properties
@@ -821,33 +891,6 @@ class TextStyle:
         style_dict = self.to_css_dict()
         return " ".join(f"{prop}: {value};" for prop, value in style_dict.items())
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, TextStyle):
-            return NotImplemented
-        # Compare all attributes
-        return (self.color == other.color and
-                self.fontFamily == other.fontFamily and
-                self.fontSize == other.fontSize and
-                self.fontWeight == other.fontWeight and
-                self.fontStyle == other.fontStyle and
-                self.letterSpacing == other.letterSpacing and
-                self.wordSpacing == other.wordSpacing and
-                self.lineHeight == other.lineHeight and
-                self.textDecoration == other.textDecoration and
-                self.decorationColor == other.decorationColor and
-                self.decorationStyle == other.decorationStyle and
-                self.decorationThickness == other.decorationThickness)
-
-    def __hash__(self):
-        # Hash a tuple of all attributes
-        return hash((
-            self.color, self.fontFamily, self.fontSize, self.fontWeight,
-            self.fontStyle, self.letterSpacing, self.wordSpacing, self.lineHeight,
-            self.textDecoration, self.decorationColor, self.decorationStyle,
-            self.decorationThickness
-        ))
-
     # --- Representation ---
     def __repr__(self):
         props = []
@@ -908,10 +951,12 @@ class BorderStyle:
 
 
 # --- BorderRadius Refactored ---
-class BorderRadius:
+class BorderRadius(StyleValue):
     """
     Represents the radius for the corners of a box. Compatible with reconciliation.
     """
+    __slots__ = ('topLeft', 'topRight', 'bottomRight', 'bottomLeft')
+
     def __init__(self,
                  topLeft: float = 0.0,
                  topRight: float = 0.0,
@@ -982,18 +1027,6 @@ class BorderRadius:
         """Returns the full CSS property string (e.g., 'border-radius: 10px;')."""
         return f"border-radius: {self.to_css_value()};"
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, BorderRadius):
-            return NotImplemented
-        return (self.topLeft == other.topLeft and
-                self.topRight == other.topRight and
-                self.bottomRight == other.bottomRight and
-                self.bottomLeft == other.bottomLeft)
-
-    def __hash__(self):
-        return hash((self.topLeft, self.topRight, self.bottomRight, self.bottomLeft))
-
     # --- Representation ---
     def __repr__(self):
          if self.topLeft == self.topRight == self.bottomRight == self.bottomLeft:
@@ -1010,7 +1043,7 @@ class BorderRadius:
          """Returns a hashable tuple representation."""
          return (self.topLeft, self.topRight, self.bottomRight, self.bottomLeft)
 
-class BorderSide:
+class BorderSide(StyleValue):
     """
     Represents the style of a single side of a border.
     Used by BoxDecoration or for individual border properties (border-top, etc.).
@@ -1019,6 +1052,8 @@ class BorderSide:
     # Define a constant for no border
     NONE = None # Or potentially an instance: BorderSide(width=0, style=BorderStyle.NONE)
 
+    __slots__ = ('width', 'style', 'color')
+
     def __init__(self,
                  width: float = 1.0, # Default width
                  style: str = BorderStyle.SOLID, # Default style
@@ -1077,20 +1112,6 @@ class BorderSide:
         style_dict = self.to_css_dict()
         return " ".join(f"{prop}: {value};" for prop, value in style_dict.items())
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, BorderSide):
-            return NotImplemented
-        # Treat width=0 or style=NONE as equivalent to no border for comparison? Optional.
-        # Simple comparison for now:
-        return (self.width == other.width and
-                self.style == other.style and
-                self.color == other.color)
-
-    def __hash__(self):
-        # Hash based on the defining attributes
-        return hash((self.width, self.style, self.color))
-
     # --- Representation ---
     def __repr__(self):
         # Show defaults only if non-standard
@@ -1121,7 +1142,7 @@ from typing import Optional, Union, Tuple, Dict, Any
 # Assuming other style classes are defined/imported and compatible:
 # from .styles import Colors, EdgeInsets, BorderSide, BorderRadius, TextStyle, Alignment, BoxShadow, Offset
 
-class ButtonStyle:
+class ButtonStyle(StyleValue):
     """
     Defines the visual properties of buttons (TextButton, ElevatedButton, etc.).
     Compatible with reconciliation. Aggregates other style objects.
@@ -1141,6 +1162,8 @@ class ButtonStyle:
             textStyle: TextStyle object for button label.
             alignment: Alignment object if button uses flex/grid for content.
     """
+    __slots__ = ('backgroundColor', 'foregroundColor', 'disabledBackgroundColor', 'disabledForegroundColor', 'shadowColor', 'hoverColor', 'activeColor', 'elevation', 'padding', 'margin', 'minimumSize', 'maximumSize', 'side', 'shape', 'textStyle', 'alignment')
+
     def __init__(self,
                  # --- Colors ---
                  backgroundColor: Optional[str] = None, # Button background
@@ -1246,7 +1269,6 @@ class ButtonStyle:
             styles['border'] = 'none'
 
         if self.shape:
-            print("Shape value in btnStyle: ", self.shape.to_css_value())
             if isinstance(self.shape, BorderRadius):
                 styles['border-radius'] = self.shape.to_css_value()
             elif isinstance(self.shape, (int, float)):
@@ -1275,40 +1297,6 @@ class ButtonStyle:
         style_dict = self.to_css_dict()
         return " ".join(f"{prop}: {value};" for prop, value in style_dict.items())
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, ButtonStyle):
-            return NotImplemented
-        # Compare all relevant attributes
-        # Ensure nested objects are comparable (__eq__ implemented)
-        return (self.backgroundColor == other.backgroundColor and
-                self.foregroundColor == other.foregroundColor and
-                self.disabledBackgroundColor == other.disabledBackgroundColor and
-                self.disabledForegroundColor == other.disabledForegroundColor and
-                self.shadowColor == other.shadowColor and
-                self.hoverColor == other.hoverColor and
-                self.activeColor == other.activeColor and
-                self.elevation == other.elevation and
-                self.padding == other.padding and
-                self.margin == other.margin and
-                self.minimumSize == other.minimumSize and
-                self.maximumSize == other.maximumSize and
-                self.side == other.side and
-                self.shape == other.shape and
-                self.textStyle == other.textStyle and
-                self.alignment == other.alignment)
-
-    def __hash__(self):
-        # Hash a tuple of hashable representations of attributes
-        # Ensure nested objects (EdgeInsets, BorderSide, BorderRadius, TextStyle, Alignment) are hashable
-        return hash((
-            self.backgroundColor, self.foregroundColor,
-            self.disabledBackgroundColor, self.disabledForegroundColor,
-            self.shadowColor, self.hoverColor, self.activeColor, self.elevation, self.padding, self.margin,
-            self.minimumSize, self.maximumSize, # Tuples are hashable
-            self.side, self.shape, self.textStyle, self.alignment
-        ))
-
     # --- Representation ---
     def __repr__(self):
         props = []
@@ -1572,11 +1560,13 @@ class BoxDecoration:
          return (self.color, self.border, self.borderRadius, shadow_tuple, self.transform)
 
 # --- BoxDecoration Refactored ---
-class BoxDecoration:
+class BoxDecoration(StyleValue):
     """
     Describes how to paint a box (background, border, shadow, shape).
     Compatible with reconciliation.
     """
+    __slots__ = ('color', 'border', 'borderRadius', 'boxShadow', 'transform')
+
     def __init__(self,
                  color: Optional[str] = None,
                  # image: Optional[DecorationImage] = None, # TODO: If image backgrounds needed
@@ -1606,8 +1596,8 @@ class BoxDecoration:
         # Ensure boxShadow is always a list for consistent handling
         if isinstance(boxShadow, BoxShadow):
             self.boxShadow = [boxShadow]
-        elif isinstance(boxShadow, list):
-            self.boxShadow = boxShadow
+        elif isinstance(boxShadow, (list, tuple)): # A tuple when rebuilt from a style key
+            self.boxShadow = list(boxShadow)
         else:
             self.boxShadow = None
         self.transform = transform
@@ -1653,31 +1643,6 @@ class BoxDecoration:
         style_dict = self.to_css_dict()
         return " ".join(f"{prop}: {value};" for prop, value in style_dict.items())
 
-    # --- Hashability & Equality ---
-    def __eq__(self, other):
-        if not isinstance(other, BoxDecoration):
-            return NotImplemented
-        # Compare all relevant attributes
-        # Note: Comparing lists requires order to be the same for equality
-        return (self.color == other.color and
-                self.border == other.border and
-                self.borderRadius == other.borderRadius and
-                self.boxShadow == other.boxShadow and # Relies on BoxShadow __eq__ and list order
-                self.transform == other.transform)
-
-    def __hash__(self):
-        # Hash a tuple of hashable representations of attributes
-        # Ensure nested objects (BorderSide, BorderRadius, BoxShadow) are hashable
-        # Convert list of shadows to tuple for hashing
-        shadow_tuple = tuple(self.boxShadow) if self.boxShadow else None
-        return hash((
-            self.color,
-            self.border, # Relies on BorderSide/str hash
-            self.borderRadius, # Relies on BorderRadius/number hash
-            shadow_tuple, # Relies on BoxShadow hash
-            self.transform
-        ))
-
     # --- Representation ---
     def __repr__(self):
         props = []
@@ -1923,7 +1888,6 @@ class SliderTheme:
 
     def to_tuple(self) -> Tuple:
         """Creates a hashable tuple for use in style keys."""
-        print("thumbBorderColor: ", self.thumbBorderColor)
         return (
             self.activeTrackColor, self.inactiveTrackColor, self.thumbColor,
             self.overlayColor, self.trackHeight, self.thumbSize,
@@ -0,0 +1,233 @@
+# =============================================================================
+# PYTHRA STYLESHEET MANAGER - Keeps the Dynamic Stylesheet in Step With the UI
+# =============================================================================
+"""
+PyThra Stylesheet Manager
+
+Widgets with the same look share one CSS class (`shared-container-3`, ...),
+whose rule is generated from the widget's `style_key`. This module keeps track
+of which of those classes are in use by mounted elements and tells the browser
+only what changed.
+
+**How it works:**
+- Every mounted node holds a reference on each class in its `css_class` prop.
+  The framework calls `retain()` when a node is merged into the rendered map
+  and `release()` when it leaves it.
+- A class whose count goes from 0 to 1 (or back to 0) is remembered.
+- Once per frame `flush()` turns those into stylesheet operations: rules to
+  insert for classes that appeared, classes whose rules should be deleted.
+  The patch runtime applies them with `insertRule` / `deleteRule`, so adding
+  one styled row to a big page doesn't make the browser re-parse and re-match
+  the whole sheet.
+
+A class that disappears and comes back within the same frame (a node replaced
+by an identical-looking one) costs nothing.
+
+**Keeping the registries small:** Each widget class maps `style_key ->
+css_class` in its `shared_styles` registry (a `SharedStyles`). Apps whose
+styles follow their data (heatmap colors, animated sizes) keep producing new
+keys, so a class that no mounted node has used for `grace_period` seconds is
+evicted: from its widget's registry, from the known CSS details, and from the
+cache of generated rule text. Class names come from a counter that never goes
+back, so an evicted name is never handed to a different style; a widget built
+with an evicted class still renders fine, its rule is simply generated again.
+`stats()` reports the sizes (they also appear in the per-frame profile).
+"""
+
+import logging
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+CssDetails = Dict[str, Tuple[Callable, Any]]
+
+
+class SharedStyles(dict):
+    """
+    A widget class's `style_key -> css_class` registry.
+
+    ```python
+    if self.style_key not in Container.shared_styles:
+        self.css_class = f"shared-container-{Container.shared_styles.next_index()}"
+        Container.shared_styles[self.style_key] = self.css_class
+    ```
+    `next_index()` only ever counts up, so class names stay unique after
+    entries are evicted (`len()` would hand out a live name again).
+    """
+
+    # css_class -> (registry, style_key), so a class can be evicted by name.
+    _owners: Dict[str, Tuple["SharedStyles", Any]] = {}
+
+    def __init__(self):
+        super().__init__()
+        self._next_index = 0
+
+    def next_index(self) -> int:
+        index = self._next_index
+        self._next_index += 1
+        return index
+
+    def __setitem__(self, style_key, css_class):
+        super().__setitem__(style_key, css_class)
+        SharedStyles._owners[css_class] = (self, style_key)
+
+    @classmethod
+    def evict(cls, css_class: str) -> bool:
+        """Forgets the style that `css_class` was created for."""
+        owner = cls._owners.pop(css_class, None)
+        if owner is None:
+            return False
+        registry, style_key = owner
+        if registry.get(style_key) == css_class:
+            del registry[style_key]
+        return True
+
+
+def node_classes(props: Dict[str, Any]) -> Set[str]:
+    """The CSS classes a rendered node puts on its element."""
+    css_class = props.get("css_class") if props else None
+    return set(css_class.split()) if isinstance(css_class, str) else set()
+
+
+class StyleSheetManager:
+    """Reference-counts the shared CSS classes of mounted nodes."""
+
+    def __init__(self, grace_period: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        # css_class -> (generate_css_rule, style_key) for every class in use or
+        # within its grace period. The rendered map only holds weak widget
+        # references, so rules are generated from these instead.
+        self.details: CssDetails = {}
+        self.grace_period = grace_period
+        self._clock = clock
+        self._refs: Counter = Counter()
+        # Classes a node needs (get_required_css_classes) beyond its css_class prop.
+        self._extra_classes: Dict[Any, Set[str]] = {}
+        self._rules: Dict[str, str] = {}
+        # Unused classes -> when they became unused, oldest first.
+        self._unused: Dict[str, float] = {}
+        self._in_sheet: Set[str] = set()
+        self._changed: Set[str] = set()
+        self.evicted = 0
+
+    def register(self, css_details: CssDetails):
+        """Remembers how to generate the rules of newly seen classes."""
+        for css_class, details in css_details.items():
+            known = self.details.get(css_class)
+            if known == details:
+                continue
+            if known is None and css_class in self._refs:
+                self._changed.add(css_class)
+            self.details[css_class] = details
+            self._rules.pop(css_class, None)
+            if css_class not in self._refs:
+                # Built but not (yet) mounted; evicted in due course if it never is.
+                self._unused.setdefault(css_class, self._clock())
+
+    def retain(self, key: Any, node: Any):
+        """Counts the classes of a node merged into the rendered map."""
+        classes = node_classes(node.props)
+        widget = node.widget_instance
+        if widget is not None and hasattr(widget, "get_required_css_classes"):
+            extra = set(widget.get_required_css_classes()) - classes
+            if extra:
+                self._extra_classes[key] = extra
+                classes |= extra
+        for css_class in classes:
+            self._refs[css_class] += 1
+            if self._refs[css_class] == 1:
+                self._changed.add(css_class)
+                self._unused.pop(css_class, None)
+
+    def release(self, key: Any, node: Any):
+        """Drops the references of a node leaving the rendered map."""
+        classes = node_classes(node.props) | self._extra_classes.pop(key, set())
+        for css_class in classes:
+            self._refs[css_class] -= 1
+            if self._refs[css_class] <= 0:
+                del self._refs[css_class]
+                self._changed.add(css_class)
+                self._unused[css_class] = self._clock()
+
+    def is_live(self, css_class: str) -> bool:
+        return css_class in self._refs
+
+    def rule_for(self, css_class: str) -> str:
+        """The CSS text for one shared class ("" if unknown), generated once."""
+        rule = self._rules.get(css_class)
+        if rule is not None:
+            return rule
+        details = self.details.get(css_class)
+        if details is None:
+            return ""
+        generator_func, style_key = details
+        try:
+            rule = generator_func(style_key, css_class) or ""
+        except Exception:
+            logger.exception("💥 Error generating CSS for class '%s'", css_class)
+            return ""
+        self._rules[css_class] = rule
+        return rule
+
+    def collect(self):
+        """Evicts the classes that have been unused for longer than the grace period."""
+        deadline = self._clock() - self.grace_period
+        expired = []
+        for css_class, since in self._unused.items():
+            if since > deadline:
+                break
+            expired.append(css_class)
+        for css_class in expired:
+            del self._unused[css_class]
+            self.details.pop(css_class, None)
+            self._rules.pop(css_class, None)
+            SharedStyles.evict(css_class)
+        if expired:
+            self.evicted += len(expired)
+            logger.debug("🧹 Evicted %d unused style classes", len(expired))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "style_classes": len(self.details),
+            "style_classes_live": len(self._refs),
+            "style_rules_cached": len(self._rules),
+            "style_classes_evicted": self.evicted,
+        }
+
+    def full_sheet(self) -> str:
+        """
+        The CSS for every live class, for a freshly written page. Marks them
+        all as present in the browser's sheet.
+        """
+        self._changed.clear()
+        self._in_sheet = {c for c in self._refs if c in self.details}
+        rules = [self.rule_for(c) for c in sorted(self._in_sheet)]
+        return "\n".join(rule for rule in rules if rule)
+
+    def flush(self) -> Optional[Dict[str, List]]:
+        """
+        Returns the stylesheet operations since the last flush, as
+        `{"insert": [[css_class, rule_text], ...], "delete": [css_class, ...]}`,
+        or None when the sheet is already up to date. Also evicts classes whose
+        grace period is over.
+        """
+        self.collect()
+        if not self._changed:
+            return None
+        insert, delete = [], []
+        for css_class in sorted(self._changed):
+            live, present = css_class in self._refs, css_class in self._in_sheet
+            if live and not present and css_class in self.details:
+                rule = self.rule_for(css_class)
+                if rule:
+                    insert.append([css_class, rule])
+                self._in_sheet.add(css_class)
+            elif present and not live:
+                delete.append(css_class)
+                self._in_sheet.discard(css_class)
+        self._changed.clear()
+        if not insert and not delete:
+            return None
+        logger.debug("🎨 Stylesheet update: +%d rules, -%d rules", len(insert), len(delete))
+        return {"insert": insert, "delete": delete}
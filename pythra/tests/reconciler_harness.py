@@ -0,0 +1,392 @@
+"""
+Differential fuzzing harness for the reconciler's diff backends.
+
+Generates random widget trees and random sequences of mutations (inserts,
+removes, keyed shuffles, type changes, prop edits), runs every frame through
+a diff backend and applies the resulting patch frames to `InMemoryDom`, a
+small model of what the browser runtime does with them.
+
+Two things are checked:
+- After every frame the DOM must match a fresh render of the same tree (the
+  INSERT frame of a reconcile from an empty map, applied to an empty DOM).
+- Every available backend must end each frame with the same DOM.
+
+`run_scenario()` also reports patch counts and the time spent diffing, which
+`benchmarks/bench_reconciler_backends.py` prints per scenario.
+"""
+
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..base import Key
+from ..diff_backends import DiffBackend, load_rust_reconciler
+from ..html_stubs import VOID_TAGS, css_property_name
+from ..patch_protocol import NO_ID, OP_INSERT, OP_MOVE, OP_REMOVE, OP_REPLACE, OP_UPDATE, encode_patches
+from ..reconciler import Reconciler
+from ..widgets import Column, Container, Row, Text
+
+ROOT_ID = "root-container"
+COLORS = ("#f00", "#0f0", "#00f", "#333")
+WORDS = ("alpha", "beta", "gamma", "delta", "<b>", "x & y")
+MUTATIONS = ("insert", "remove", "shuffle", "retype", "edit")
+
+
+class HarnessMismatch(AssertionError):
+    """A backend's DOM didn't match the expected one."""
+
+
+# --- In-memory DOM -----------------------------------------------------------
+
+class DomElement:
+    __slots__ = ("tag", "id", "classes", "text", "style", "children", "parent")
+
+    def __init__(self, tag: str, id: Optional[str] = None):
+        self.tag = tag
+        self.id = id
+        self.classes: List[str] = []
+        self.text = ""
+        self.style: Dict[str, str] = {}
+        self.children: List["DomElement"] = []
+        self.parent: Optional["DomElement"] = None
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def snapshot(self) -> tuple:
+        """The element without its ids, for comparing DOMs built from different patches."""
+        return (
+            self.tag, tuple(self.classes), self.text.strip(), tuple(sorted(self.style.items())),
+            tuple(child.snapshot() for child in self.children),
+        )
+
+
+class _FragmentParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.top: List[DomElement] = []
+        self.stack: List[DomElement] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        el = DomElement(tag, attrs.get("id"))
+        el.classes = (attrs.get("class") or "").split()
+        for declaration in (attrs.get("style") or "").split(";"):
+            name, _, value = declaration.partition(":")
+            if name.strip():
+                el.style[name.strip()] = value.strip()
+        if self.stack:
+            el.parent = self.stack[-1]
+            self.stack[-1].children.append(el)
+        else:
+            self.top.append(el)
+        if tag not in VOID_TAGS:
+            self.stack.append(el)
+
+    def handle_endtag(self, tag):
+        while self.stack:
+            if self.stack.pop().tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.stack:
+            self.stack[-1].text += data
+
+
+class InMemoryDom:
+    """
+    Applies patch-protocol frames the way the browser runtime does.
+
+    Whatever the runtime would log to the console (a missing parent, a
+    MOVE of an element that isn't there, ...) is collected in `errors`.
+    """
+
+    def __init__(self, root_id: str = ROOT_ID):
+        self.root = DomElement("div", root_id)
+        self.by_id: Dict[str, DomElement] = {root_id: self.root}
+        self.errors: List[str] = []
+
+    def snapshot(self) -> tuple:
+        return self.root.snapshot()
+
+    def _parse(self, html: str) -> Optional[DomElement]:
+        parser = _FragmentParser()
+        parser.feed(html.strip())
+        parser.close()
+        return parser.top[0] if parser.top else None
+
+    def _attach(self, el: DomElement, parent: DomElement, before: Optional[DomElement]):
+        self._detach(el)
+        index = parent.children.index(before) if before is not None else len(parent.children)
+        parent.children.insert(index, el)
+        el.parent = parent
+        for node in el.walk():
+            if node.id:
+                self.by_id[node.id] = node
+
+    def _detach(self, el: DomElement):
+        if el.parent is not None:
+            el.parent.children.remove(el)
+            el.parent = None
+        for node in el.walk():
+            if node.id and self.by_id.get(node.id) is node:
+                del self.by_id[node.id]
+
+    def _before(self, parent: DomElement, before_id: Optional[str]) -> Optional[DomElement]:
+        before = self.by_id.get(before_id) if before_id else None
+        if before is not None and before.parent is not parent:
+            if any(node is before for node in parent.walk()):
+                self.errors.append(f"insertBefore: {before_id} is not a child of {parent.id}")
+            return None
+        return before
+
+    def apply_props(self, el: DomElement, props: Dict):
+        styles = {}
+        for key, value in props.items():
+            if key == "data":
+                for child in list(el.children):
+                    self._detach(child)
+                el.text = value
+            elif key == "css_class":
+                new, old = (value or "").split(), (props.get("old_shared_class") or "").split()
+                el.classes = [c for c in el.classes if c in new or c not in old]
+                el.classes += [c for c in new if c not in old and c not in el.classes]
+            elif key in ("color", "backgroundColor"):
+                styles[key] = value
+            elif key in ("width", "height") and value is not None:
+                styles[key] = f"{value}px" if isinstance(value, (int, float)) else value
+            elif key == "aspectRatio":
+                styles["aspect-ratio"] = value
+            elif key == "clip_path_string":
+                styles["clip-path"] = value
+        styles.update(props.get("styleOverride") or {})
+        style = props.get("style")
+        if isinstance(style, dict):
+            for key, value in style.items():
+                if not css_property_name(key).startswith("-") or "isDragEnded" not in props:
+                    styles[key] = value
+        for key, value in styles.items():
+            name = css_property_name(key)
+            if value is None or value == "":
+                el.style.pop(name, None)
+            else:
+                el.style[name] = str(value)
+
+    def _hydrate(self, batch, ids):
+        for index, props in batch or ():
+            el = self.by_id.get(ids[index])
+            if el is not None:
+                self.apply_props(el, props)
+
+    def apply_frame(self, frame: Dict):
+        ids = frame["ids"]
+        ref = lambda i: ids[i] if i != NO_ID else None
+        for op in frame["ops"]:
+            code, target = op[0], ids[op[1]]
+            if code == OP_INSERT:
+                parent = self.by_id.get(ref(op[2]))
+                el = self._parse(op[4])
+                if parent is None or el is None:
+                    self.errors.append(f"INSERT: parent {ref(op[2])} or markup of {target} missing")
+                    continue
+                self._attach(el, parent, self._before(parent, ref(op[3])))
+                self.apply_props(el, op[5])
+                self._hydrate(op[6] if len(op) > 6 else None, ids)
+            elif code == OP_REMOVE:
+                if target in self.by_id:
+                    self._detach(self.by_id[target])
+            elif code == OP_UPDATE:
+                el = self.by_id.get(target)
+                if el is None:
+                    self.errors.append(f"UPDATE: {target} not found")
+                else:
+                    self.apply_props(el, op[2])
+            elif code == OP_MOVE:
+                el, parent = self.by_id.get(target), self.by_id.get(ref(op[2]))
+                if el is None or parent is None:
+                    self.errors.append(f"MOVE: {target} or parent {ref(op[2])} not found")
+                    continue
+                self._attach(el, parent, self._before(parent, ref(op[3])))
+            elif code == OP_REPLACE:
+                old, el = self.by_id.get(target), self._parse(op[2])
+                if old is None or el is None:
+                    self.errors.append(f"REPLACE: {target} not found")
+                    continue
+                parent, index = old.parent, old.parent.children.index(old)
+                self._detach(old)
+                before = parent.children[index] if index < len(parent.children) else None
+                self._attach(el, parent, before)
+                self.apply_props(el, op[3])
+                self._hydrate(op[4] if len(op) > 4 else None, ids)
+
+
+# --- Random trees and mutations ----------------------------------------------
+
+class TreeFuzzer:
+    """
+    Random widget-tree specs and mutations of them.
+
+    A spec node is a dict: `type` (Column, Row, Container or Text), `key`
+    (None for unkeyed widgets), `text` or `color`, and `children`.
+    """
+
+    def __init__(self, seed: int, max_nodes: int = 60):
+        self.rng = random.Random(seed)
+        self.max_nodes = max_nodes
+        self._keys = 0
+
+    def _key(self) -> Optional[str]:
+        if self.rng.random() < 0.3:
+            return None
+        self._keys += 1
+        return f"k{self._keys}"
+
+    def node(self, depth: int = 0) -> Dict:
+        kind = self.rng.choice(("Column", "Row", "Container", "Text") if depth < 3 else ("Container", "Text"))
+        node = {"type": kind, "key": self._key(), "text": self.rng.choice(WORDS),
+                "color": self.rng.choice(COLORS), "children": []}
+        if kind in ("Column", "Row"):
+            node["children"] = [self.node(depth + 1) for _ in range(self.rng.randint(0, 4))]
+        elif kind == "Container" and self.rng.random() < 0.6:
+            node["children"] = [self.node(depth + 1)]
+        return node
+
+    def tree(self) -> Dict:
+        root = self.node()
+        root["type"] = "Column"
+        return root
+
+    @staticmethod
+    def nodes(spec: Dict) -> List[Dict]:
+        found, stack = [], [spec]
+        while stack:
+            node = stack.pop()
+            found.append(node)
+            stack.extend(node["children"])
+        return found
+
+    def mutate(self, spec: Dict) -> str:
+        """Applies one random mutation to `spec` in place and names it."""
+        nodes = self.nodes(spec)
+        lists = [n for n in nodes if n["type"] in ("Column", "Row")]
+        kind = self.rng.choice(MUTATIONS)
+        if kind == "insert" and len(nodes) < self.max_nodes:
+            target = self.rng.choice(lists)
+            target["children"].insert(self.rng.randint(0, len(target["children"])), self.node(2))
+        elif kind == "remove" and any(n["children"] for n in lists):
+            target = self.rng.choice([n for n in lists if n["children"]])
+            target["children"].pop(self.rng.randrange(len(target["children"])))
+        elif kind == "shuffle":
+            self.rng.shuffle(self.rng.choice(lists)["children"])
+        elif kind == "retype" and len(nodes) > 1:
+            target = self.rng.choice(nodes[1:])
+            swap = {"Column": "Row", "Row": "Column", "Container": "Text", "Text": "Container"}
+            target["type"] = swap[target["type"]]
+            if target["type"] == "Text":
+                target["children"] = []
+        else:
+            kind = "edit"
+            target = self.rng.choice(nodes)
+            target["text"], target["color"] = self.rng.choice(WORDS), self.rng.choice(COLORS)
+        return kind
+
+
+def build_widgets(spec: Dict):
+    """A fresh widget tree for `spec`, as a `build()` would return."""
+    key = Key(spec["key"]) if spec["key"] else None
+    children = [build_widgets(child) for child in spec["children"]]
+    kind = spec["type"]
+    if kind == "Text":
+        return Text(spec["text"], key=key)
+    if kind == "Container":
+        return Container(child=children[0] if children else None, key=key, color=spec["color"])
+    return (Column if kind == "Column" else Row)(children=children, key=key)
+
+
+# --- Running scenarios -------------------------------------------------------
+
+def available_backends() -> Dict[str, Callable[[Reconciler], DiffBackend]]:
+    """Every diff backend that can run here, by name."""
+    backends: Dict[str, Callable[[Reconciler], DiffBackend]] = {"python": DiffBackend}
+    if load_rust_reconciler() is not None:
+        from ..rust_reconciler_adapter import RustReconcilerAdapter
+        backends["rust"] = RustReconcilerAdapter
+    return backends
+
+
+def fresh_snapshot(spec: Dict) -> tuple:
+    """The DOM a from-scratch render of `spec` produces."""
+    result = Reconciler().reconcile({}, build_widgets(spec), ROOT_ID)
+    dom = InMemoryDom()
+    dom.apply_frame(encode_patches(result.patches))
+    return dom.snapshot()
+
+
+@dataclass
+class ScenarioReport:
+    seed: int
+    backend: str
+    frames: int
+    patch_counts: Counter = field(default_factory=Counter)
+    diff_seconds: float = 0.0
+    snapshots: List[tuple] = field(default_factory=list)
+
+    @property
+    def patches(self) -> int:
+        return sum(self.patch_counts.values())
+
+
+def run_scenario(
+    seed: int,
+    backend: str = "python",
+    steps: int = 30,
+    max_nodes: int = 60,
+    check: bool = True,
+) -> ScenarioReport:
+    """
+    Renders a random tree, then `steps` random mutations of it, through one
+    backend. With `check`, every frame's DOM is compared to a fresh render.
+    """
+    reconciler = Reconciler()
+    reconciler.diff_backend = available_backends()[backend](reconciler)
+    fuzzer = TreeFuzzer(seed, max_nodes)
+    spec = fuzzer.tree()
+    dom = InMemoryDom()
+    report = ScenarioReport(seed=seed, backend=backend, frames=steps + 1)
+    rendered: Dict = {}
+    mutation = "initial render"
+    for frame in range(steps + 1):
+        if frame:
+            mutation = fuzzer.mutate(spec)
+        root = build_widgets(spec)
+        start = time.perf_counter()
+        result = reconciler.reconcile(rendered, root, ROOT_ID)
+        report.diff_seconds += time.perf_counter() - start
+        rendered = result.new_rendered_map
+        report.patch_counts.update(p.action for p in result.patches)
+        dom.apply_frame(encode_patches(result.patches))
+        snapshot = dom.snapshot()
+        report.snapshots.append(snapshot)
+        if dom.errors:
+            raise HarnessMismatch(f"seed {seed}, {backend}, frame {frame} ({mutation}): {dom.errors}")
+        if check and snapshot != fresh_snapshot(spec):
+            raise HarnessMismatch(
+                f"seed {seed}, {backend}, frame {frame} ({mutation}): DOM differs from a fresh render"
+            )
+    return report
+
+
+def compare_backends(seed: int, steps: int = 30, max_nodes: int = 60) -> Dict[str, ScenarioReport]:
+    """Runs one scenario through every available backend and checks they agree frame by frame."""
+    reports = {name: run_scenario(seed, name, steps, max_nodes) for name in available_backends()}
+    baseline = reports["python"]
+    for name, report in reports.items():
+        for frame, (expected, actual) in enumerate(zip(baseline.snapshots, report.snapshots)):
+            if expected != actual:
+                raise HarnessMismatch(f"seed {seed}: {name} and python differ at frame {frame}")
+    return reports
@@ -0,0 +1,36 @@
+"""Unit tests for the base Widget's identity and memory layout."""
+
+import unittest
+from ..base import Key, Widget
+from ..widgets import Container, Row, Text
+
+
+class Plain(Widget):
+    pass
+
+
+class TestWidget(unittest.TestCase):
+    def test_internal_ids_are_unique_and_stable(self):
+        first, second = Plain(), Plain()
+
+        self.assertNotEqual(first.get_unique_id(), second.get_unique_id())
+        self.assertEqual(first.get_unique_id(), first.get_unique_id())
+        self.assertEqual(Plain(key=Key("k")).get_unique_id(), Key("k"))
+
+    def test_adopted_id_replaces_the_generated_one(self):
+        widget = Plain()
+        widget._internal_id = "old-slot"
+
+        self.assertEqual(widget.get_unique_id(), "old-slot")
+
+    def test_core_widgets_have_no_instance_dict(self):
+        for widget in (Text("a"), Container(), Row(children=[])):
+            self.assertFalse(hasattr(widget, "__dict__"), type(widget).__name__)
+        # Subclasses that don't declare __slots__ keep working as before.
+        widget = Plain()
+        widget.anything = 1
+        self.assertEqual(widget.anything, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
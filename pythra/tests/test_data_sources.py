@@ -0,0 +1,107 @@
+"""Unit tests for list data sources and their change events."""
+
+import sqlite3
+import unittest
+from ..data_sources import ListChange, ListDataSource, SQLiteListDataSource
+
+
+class Items(ListDataSource):
+    def __init__(self, items):
+        super().__init__()
+        self.items = list(items)
+
+    @property
+    def itemCount(self):
+        return len(self.items)
+
+    def getItem(self, index):
+        return self.items[index]
+
+
+def log_table(rows):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE log (level TEXT, message TEXT)")
+    connection.executemany("INSERT INTO log VALUES (?, ?)", [("info", f"line {i}") for i in range(rows)])
+    return connection
+
+
+class TestListChange(unittest.TestCase):
+    def test_map_index_follows_the_item(self):
+        items = list("abcdefgh")
+        cases = [
+            (ListChange("insert", 2, 3), items[:2] + list("XYZ") + items[2:]),
+            (ListChange("remove", 2, 3), items[:2] + items[5:]),
+            (ListChange("move", 1, 2, 4), ["a", "d", "e", "f", "b", "c", "g", "h"]),
+            (ListChange("move", 5, 2, 1), ["a", "f", "g", "b", "c", "d", "e", "h"]),
+        ]
+        for change, after in cases:
+            with self.subTest(change=change):
+                for index, item in enumerate(items):
+                    moved = change.map_index(index)
+                    if moved is None:
+                        self.assertNotIn(item, after)
+                    else:
+                        self.assertEqual(after[moved], item)
+
+    def test_changed_items_keep_their_place_but_are_invalidated(self):
+        change = ListChange("change", 3, 2)
+        self.assertEqual(change.map_index(4), 4)
+        self.assertTrue(change.invalidates(4))
+        self.assertFalse(change.invalidates(5))
+
+
+class TestListDataSource(unittest.TestCase):
+    def test_batch_delivers_once_and_merges_appends(self):
+        source, received = Items("abc"), []
+        source.add_listener(received.append)
+        with source.batch():
+            for i in range(3):
+                source.notifyInserted(3 + i)
+            source.notifyRemoved(0)
+        self.assertEqual(received, [[ListChange("insert", 3, 3), ListChange("remove", 0, 1)]])
+
+        source.notifyChanged(1)
+        self.assertEqual(received[-1], [ListChange("change", 1, 1)])
+
+
+class TestSQLiteListDataSource(unittest.TestCase):
+    def test_reads_pages_from_either_end(self):
+        source = SQLiteListDataSource(log_table(1000), "log", pageSize=64, maxCachedPages=2)
+        self.assertEqual(source.itemCount, 1000)
+        self.assertEqual(source.getItem(999), ("info", "line 999"))
+        self.assertEqual(source.getItem(0), ("info", "line 0"))
+        self.assertEqual(source.getItem(500), ("info", "line 500"))
+        self.assertEqual(source.getItem(530), ("info", "line 530"))  # Seeks from a known page.
+        self.assertEqual(len(source._pages), 2)
+        with self.assertRaises(IndexError):
+            source.getItem(1000)
+
+    def test_extend_appends_and_notifies_one_range(self):
+        source, received = SQLiteListDataSource(log_table(100), "log", pageSize=64), []
+        source.add_listener(received.append)
+        self.assertEqual(source.getItem(99), ("info", "line 99"))
+
+        source.extend([("warn", f"tail {i}") for i in range(50)])
+
+        self.assertEqual(received, [[ListChange("insert", 100, 50)]])
+        self.assertEqual(source.itemCount, 150)
+        self.assertEqual(source.getItem(100), ("warn", "tail 0"))
+        self.assertEqual(source.getItem(149), ("warn", "tail 49"))
+
+    def test_reload_counts_rows_written_elsewhere(self):
+        connection = log_table(10)
+        source, received = SQLiteListDataSource(connection, "log", columns=("message",)), []
+        source.add_listener(received.append)
+        source.getItem(9)
+        with connection:
+            connection.execute("DELETE FROM log WHERE rowid <= 4")
+
+        source.reload()
+
+        self.assertEqual(received, [[ListChange("reset")]])
+        self.assertEqual(source.itemCount, 6)
+        self.assertEqual(source.getItem(0), ("line 4",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+"""Unit tests for choosing the diff backend and for the Rust adapter's tree mirror."""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from ..base import Widget
+from ..diff_backends import DiffBackend, select_diff_backend
+from ..reconciler import Reconciler
+from ..rust_reconciler_adapter import RustReconcilerAdapter
+from . import reconciler_harness
+
+
+class Box(Widget):
+    def __init__(self, key, children=None, color="red"):
+        super().__init__(children=children)
+        self._internal_id = key
+        self.color = color
+
+    def render_props(self):
+        return {"color": self.color}
+
+
+class Failing(DiffBackend):
+    name = "failing"
+
+    def __init__(self, reconciler):
+        super().__init__(reconciler)
+        self.resets = 0
+
+    def reconcile(self, *args):
+        raise RuntimeError("boom")
+
+    def reset(self):
+        self.resets += 1
+
+
+class Label(Widget):
+    """An unkeyed widget that counts its renders."""
+
+    def __init__(self, text="", children=None, js_init=None):
+        super().__init__(children=children)
+        self.text, self.js_init, self.renders = text, js_init, 0
+
+    def render_props(self):
+        self.renders += 1
+        props = {"data": self.text}
+        if self.js_init:
+            props["_js_init"] = self.js_init
+        return props
+
+
+def keyed_diff(old_tree, new_tree):
+    """
+    A stand-in for the Rust module: matches nodes by key, removes retyped
+    ones, and places the children of every changed child list back to front
+    in front of their next sibling.
+    """
+    retyped = {key for key in new_tree if key in old_tree and old_tree[key]["type"] != new_tree[key]["type"]}
+    patches = [SimpleNamespace(action="REMOVE", target_id=key, data=None)
+               for key in old_tree if key not in new_tree or key in retyped]
+    for key, record in new_tree.items():
+        if key in old_tree and key not in retyped and record["props"] != old_tree[key]["props"]:
+            patches.append(SimpleNamespace(action="UPDATE", target_id=key, data=None))
+        if key in old_tree and old_tree[key]["children"] == record["children"] and not retyped:
+            continue
+        before = None
+        for child in reversed(record["children"]):
+            action = "INSERT" if child not in old_tree or child in retyped else "MOVE"
+            patches.append(SimpleNamespace(action=action, target_id=child, data={"before_id": before}))
+            before = child
+    return patches
+
+
+def tree():
+    return Box("root", [Box("left", [Box("l1"), Box("l2")]), Box("right", [Box("r1")])])
+
+
+class TestDiffBackends(unittest.TestCase):
+    def test_python_choice_never_loads_rust(self):
+        backend = select_diff_backend(Reconciler(), "python")
+        self.assertIs(type(backend), DiffBackend)
+
+    def test_failing_backend_falls_back_to_python(self):
+        reconciler = Reconciler()
+        reconciler.diff_backend = Failing(reconciler)
+
+        with self.assertLogs("pythra.reconciler", "ERROR"):
+            result = reconciler.reconcile({}, tree(), "root-container")
+
+        self.assertEqual(set(result.new_rendered_map), {"root", "left", "l1", "l2", "right", "r1"})
+        self.assertEqual(reconciler.diff_backend.resets, 1)
+
+    def test_partial_rebuild_marshals_only_the_dirty_subtree(self):
+        reconciler = Reconciler()
+        rendered = reconciler.reconcile({}, tree(), "root-container").new_rendered_map
+        adapter = RustReconcilerAdapter(reconciler)
+        adapter._rust_mod = MagicMock()
+        adapter._rust_mod.reconcile.return_value = []
+
+        new_left = Box("left", [Box("l1"), Box("l2")])
+        result = adapter.reconcile(rendered, new_left, rendered["left"].parent_html_id,
+                                   old_root_key="left", is_partial_reconciliation=True)
+
+        old_tree, new_tree = adapter._rust_mod.reconcile.call_args[0]
+        self.assertEqual(set(old_tree), {"left", "l1", "l2"})
+        self.assertEqual(set(new_tree), {"left", "l1", "l2"})
+        self.assertEqual(set(result.new_rendered_map), {"left", "l1", "l2"})
+        self.assertEqual(result.new_rendered_map["l1"].html_id, rendered["l1"].html_id)
+        self.assertEqual(result.new_rendered_map["l1"].parent_key, "left")
+
+        # The next frame reuses the records of the nodes that were kept.
+        rendered.update(result.new_rendered_map)
+        adapter.reconcile(rendered, Box("left", [Box("l1"), Box("l2")]), rendered["left"].parent_html_id,
+                          old_root_key="left", is_partial_reconciliation=True)
+        self.assertIs(adapter._rust_mod.reconcile.call_args[0][0]["l1"], new_tree["l1"])
+
+    def test_update_with_colliding_fingerprint_is_diffed(self):
+        reconciler = Reconciler()
+        rendered = reconciler.reconcile({}, Box("root", color=-1), "root-container").new_rendered_map
+        adapter = RustReconcilerAdapter(reconciler)
+        adapter._rust_mod = MagicMock()
+        adapter._rust_mod.reconcile.return_value = [MagicMock(action="UPDATE", target_id="root", data=None)]
+
+        result = adapter.reconcile(rendered, Box("root", color=-2), "root-container")
+
+        self.assertEqual([(p.action, p.data) for p in result.patches], [("UPDATE", {"props": {"color": -2}})])
+
+    def _rust(self, reconciler):
+        adapter = RustReconcilerAdapter(reconciler)
+        adapter._rust_mod = MagicMock()
+        adapter._rust_mod.reconcile.side_effect = keyed_diff
+        return adapter
+
+    def test_mocked_rust_backend_matches_python_dom(self):
+        backends = {"python": DiffBackend, "rust": self._rust}
+        with patch.object(reconciler_harness, "available_backends", return_value=backends):
+            for seed in range(20):
+                with self.subTest(seed=seed):
+                    reconciler_harness.compare_backends(seed, steps=25)
+
+    def test_unkeyed_rebuild_updates_in_place(self):
+        reconciler = Reconciler()
+        adapter = self._rust(reconciler)
+        rendered = adapter.reconcile({}, Label("root", [Label("a"), Label("b")]), "root-container").new_rendered_map
+        old_ids = sorted(node.html_id for node in rendered.values())
+
+        result = adapter.reconcile(rendered, Label("root", [Label("a"), Label("B")]), "root-container")
+
+        self.assertEqual([(p.action, p.data) for p in result.patches], [("UPDATE", {"props": {"data": "B"}})])
+        self.assertEqual(sorted(node.html_id for node in result.new_rendered_map.values()), old_ids)
+        self.assertEqual(result.unmounted_keys, [])
+
+    def test_new_subtree_is_one_fragment_with_its_initializers(self):
+        reconciler = Reconciler()
+        adapter = self._rust(reconciler)
+        rendered = adapter.reconcile({}, Label("root"), "root-container").new_rendered_map
+        root_id = next(iter(rendered.values())).html_id
+
+        init = {"engine": "Chart", "points": 3}
+        result = adapter.reconcile(rendered, Label("root", [Label("card", [Label("chart", js_init=init)])]),
+                                   "root-container")
+
+        self.assertEqual([p.action for p in result.patches], ["INSERT"])
+        insert = result.patches[0]
+        self.assertEqual(insert.data["parent_html_id"], root_id)
+        self.assertEqual(len(insert.data["descendants"]), 1)
+        self.assertIn(insert.data["descendants"][0][0], insert.data["html"])
+        self.assertEqual([(i["type"], i["data"]) for i in result.js_initializers], [("Chart", init)])
+
+    def test_identical_instance_is_carried_over(self):
+        reconciler = Reconciler()
+        adapter = self._rust(reconciler)
+        kept = Label("kept", [Label("inner")])
+        rendered = adapter.reconcile({}, Label("root", [kept]), "root-container").new_rendered_map
+        renders = (kept.renders, kept.get_children()[0].renders)
+
+        result = adapter.reconcile(rendered, Label("root", [kept]), "root-container")
+
+        self.assertEqual(result.patches, [])
+        self.assertEqual((kept.renders, kept.get_children()[0].renders), renders)
+        self.assertIs(result.new_rendered_map[kept.get_unique_id()], rendered[kept.get_unique_id()])
+        self.assertEqual(set(result.new_rendered_map), set(rendered))
+
+
+if __name__ == "__main__":
+    unittest.main()
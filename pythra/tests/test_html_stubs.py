@@ -0,0 +1,73 @@
+"""Unit tests for the per-type HTML stub renderers."""
+
+import unittest
+from ..base import Widget
+from ..html_stubs import StubRenderer, css_property_name, register_stub_renderer, stub_renderer_for
+from ..reconciler import Reconciler
+
+
+class Text(Widget):
+    def __init__(self, data, children=None):
+        super().__init__(children=children)
+        self.data = data
+
+    def render_props(self):
+        return {"data": self.data, "css_class": "t", "style": {"fontSize": "2px"}}
+
+
+class Image(Text):
+    pass
+
+
+class Custom(Widget):
+    @staticmethod
+    def _generate_html_stub(widget, html_id, props):
+        return f'<div id="{html_id}"><input></div>'
+
+
+class Badge(Widget):
+    pass
+
+
+class BadgeStub(StubRenderer):
+    __slots__ = ()
+
+    def content(self, props, out):
+        out.append(' data-badge="1"')
+        return "!"
+
+
+class TestHtmlStubs(unittest.TestCase):
+    def test_css_property_names(self):
+        self.assertEqual(css_property_name("backgroundColor"), "background-color")
+        self.assertEqual(css_property_name("z_index"), "z-index")
+
+    def test_text_is_escaped_and_styled(self):
+        html = Reconciler()._generate_html_stub(Text("<b>"), "fw_id_1", Text("<b>").render_props())
+        self.assertEqual(html, '<p id="fw_id_1" class="t" style="font-size: 2px">&lt;b&gt;</p>')
+
+    def test_children_are_written_inside_the_parent(self):
+        reconciler = Reconciler()
+        custom, image = Custom(children=[Text("a")]), Image("i", children=[Text("b")])
+        spliced, lost = custom.get_children()[0], image.get_children()[0]
+        root = Text("x", children=[custom, image])
+        rendered = reconciler.reconcile({}, root, "root").new_rendered_map
+        ids = {w: rendered[w.get_unique_id()]["html_id"] for w in (root, custom, spliced, image, lost)}
+
+        page = reconciler.generate_html(root.get_unique_id(), rendered)
+
+        self.assertTrue(page.startswith(f'<p id="{ids[root]}" class="t" style="font-size: 2px">x<div id="{ids[custom]}"><input><p'))
+        self.assertIn(f'<p id="{ids[spliced]}"', page)  # Spliced into the custom stub.
+        self.assertNotIn(f'id="{ids[lost]}"', page)  # An <img> can't hold children.
+        self.assertTrue(page.endswith("</p>"))
+
+    def test_registered_renderer_is_used(self):
+        register_stub_renderer("Badge", BadgeStub("span"))
+
+        self.assertIsInstance(stub_renderer_for(Badge()), BadgeStub)
+        self.assertEqual(Reconciler()._generate_html_stub(Badge(), "fw_id_9", {}),
+                         '<span id="fw_id_9" class="" data-badge="1">!</span>')
+
+
+if __name__ == "__main__":
+    unittest.main()
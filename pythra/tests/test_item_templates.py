@@ -0,0 +1,99 @@
+"""Unit tests for compiling virtual list items into templates and data records."""
+
+import re
+import unittest
+from ..base import Widget
+from ..item_templates import ItemTemplates
+from ..reconciler import Reconciler
+from ..state import State, StatefulWidget
+
+
+class Text(Widget):
+    def __init__(self, data, css_class="t"):
+        super().__init__()
+        self.data = data
+        self.css_class = css_class
+
+    def render_props(self):
+        return {"data": self.data, "css_class": self.css_class}
+
+
+class Image(Widget):
+    def __init__(self, src):
+        super().__init__()
+        self.src = src
+
+    def render_props(self):
+        return {"src": self.src, "css_class": "img"}
+
+
+class Row(Widget):
+    def __init__(self, children, onPressedName=None, tooltip=None):
+        super().__init__(children=children)
+        self.onPressedName = onPressedName
+        self.tooltip = tooltip
+
+    def render_props(self):
+        return {"css_class": "row", "onPressedName": self.onPressedName,
+                "onPressedArgs": [], "tooltip": self.tooltip}
+
+
+class Counter(StatefulWidget):
+    def createState(self):
+        return CounterState()
+
+
+class CounterState(State):
+    def build(self):
+        return Text("0")
+
+
+def row(i, css_class="t"):
+    return Row([Image(f"/img/{i}.png"), Text(f"Row <{i}> & co", css_class)],
+               onPressedName=f"open_{i}", tooltip=f"Row {i}")
+
+
+def reconciled_html(widget):
+    reconciler = Reconciler()
+    result = reconciler.reconcile({}, widget, "root-container")
+    return reconciler.generate_html(widget.get_unique_id(), result.new_rendered_map)
+
+
+def with_ids(markup, prefix):
+    counter = iter(range(1000))
+    return re.sub(r'id="[^"]*"', lambda m: f'id="{prefix}{next(counter)}"', markup)
+
+
+class TestItemTemplates(unittest.TestCase):
+    def test_stamped_item_matches_the_reconciled_html(self):
+        templates = ItemTemplates()
+        for i in (1, 2):
+            compiled = templates.compile(row(i), Reconciler())
+            stamped = compiled.template.stamp(compiled.values, "list-7-")
+            self.assertEqual(stamped, with_ids(reconciled_html(row(i)), "list-7-"))
+
+    def test_items_of_one_shape_share_a_template(self):
+        templates = ItemTemplates()
+        first = templates.compile(row(1), Reconciler())
+        second = templates.compile(row(2), Reconciler())
+        restyled = templates.compile(row(3, css_class="t-bold"), Reconciler())
+
+        self.assertIs(first.template, second.template)
+        self.assertIsNot(first.template, restyled.template)
+        self.assertEqual(len(templates), 2)
+        self.assertEqual(second.record(), {"t": 0, "v": ["open_2", "Row 2", "/img/2.png", "Row &lt;2&gt; &amp; co"]})
+
+    def test_missing_callback_is_part_of_the_shape(self):
+        templates = ItemTemplates()
+        plain = Row([Text("x")])
+        compiled = templates.compile(plain, Reconciler())
+
+        self.assertNotIn("onclick", compiled.template.stamp(compiled.values, "p"))
+        self.assertIsNot(compiled.template, templates.compile(row(1), Reconciler()).template)
+
+    def test_stateful_items_are_not_templated(self):
+        self.assertIsNone(ItemTemplates().compile(Row([Counter()]), Reconciler()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Unit tests for the data-driven DOM patch protocol."""
+
+import json
+import os
+import tempfile
+import unittest
+from ..patch_protocol import (
+    NO_ID, OP_INSERT, OP_MOVE, OP_REMOVE, OP_UPDATE, PROTOCOL_VERSION,
+    PatchRecorder, apply_script, encode_patches, read_recording,
+)
+from ..reconciler import Patch
+
+
+class _Widget:
+    _style_override = {"opacity": 0.5}
+
+
+class TestPatchProtocol(unittest.TestCase):
+    def test_ids_are_interned_once_per_frame(self):
+        frame = encode_patches([
+            Patch("INSERT", "fw_id_2", {"html": "<p id=\"fw_id_2\"></p>", "parent_html_id": "fw_id_1",
+                                        "before_id": None, "props": {"data": "a"}}),
+            Patch("MOVE", "fw_id_3", {"parent_html_id": "fw_id_1", "before_id": "fw_id_2"}),
+            Patch("REMOVE", "fw_id_4", {}),
+        ])
+
+        self.assertEqual(frame["v"], PROTOCOL_VERSION)
+        self.assertEqual(frame["ids"], ["fw_id_2", "fw_id_1", "fw_id_3", "fw_id_4"])
+        self.assertEqual(frame["ops"][0][:4], [OP_INSERT, 0, 1, NO_ID])
+        self.assertEqual(frame["ops"][1], [OP_MOVE, 2, 1, 0])
+        self.assertEqual(frame["ops"][2], [OP_REMOVE, 3])
+
+    def test_only_runtime_props_are_sent(self):
+        props = {
+            "data": 42, "css_class": "shared-text-0", "onPressed": lambda: None,
+            "onPressedName": "cb_1", "widget_instance": _Widget(), "style": {"--x": 1},
+        }
+        frame = encode_patches([Patch("UPDATE", "fw_id_1", {"props": props})])
+
+        op, target, sent = frame["ops"][0]
+        self.assertEqual(op, OP_UPDATE)
+        self.assertEqual(sent, {
+            "data": "42", "css_class": "shared-text-0", "style": {"--x": 1},
+            "styleOverride": {"opacity": 0.5},
+        })
+        json.dumps(frame)  # The whole frame must be plain JSON.
+
+    def test_fragment_batch_skips_props_already_in_markup(self):
+        frame = encode_patches([Patch("INSERT", "fw_id_2", {
+            "html": "<div id=\"fw_id_2\"><p id=\"fw_id_3\">a</p><div id=\"fw_id_4\"></div></div>",
+            "parent_html_id": "fw_id_1", "before_id": None, "props": {},
+            "descendants": [("fw_id_3", {"data": "a", "css_class": "t"}),
+                            ("fw_id_4", {"css_class": "s", "init_slider": True, "slider_options": {}})],
+        })])
+
+        self.assertEqual(frame["ops"][0][6], [[frame["ids"].index("fw_id_4"), {"init_slider": True, "slider_options": {}}]])
+        self.assertNotIn("fw_id_3", frame["ids"])
+
+    def test_unknown_action_is_rejected(self):
+        with self.assertRaises(ValueError):
+            encode_patches([Patch("EXPLODE", "fw_id_1", {})])
+
+    def test_apply_script_round_trips_the_frame(self):
+        frame = encode_patches([Patch("UPDATE", "fw_id_1", {"props": {"data": "it's \"quoted\" </script>"}})])
+        script = apply_script(frame)
+
+        prefix, suffix = "window.PythraPatches.apply(JSON.parse(", "));"
+        self.assertTrue(script.startswith(prefix) and script.endswith(suffix))
+        self.assertEqual(json.loads(json.loads(script[len(prefix):-len(suffix)])), frame)
+
+    def test_recording_replays_frames_in_order(self):
+        frames = [encode_patches([Patch("REMOVE", f"fw_id_{i}", {})]) for i in range(3)]
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = PatchRecorder(os.path.join(tmp, "patches.jsonl"))
+            for frame in frames:
+                recorder.record(frame)
+
+            self.assertEqual(list(read_recording(recorder.path)), frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Unit tests for the optional frame profiler."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ..profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_profiler_hands_out_no_frames(self):
+        profiler = Profiler()
+
+        self.assertIsNone(profiler.start_frame())
+        profiler.finish_frame(None)
+
+    def test_sampling_profiles_every_nth_frame(self):
+        frames = []
+        profiler = Profiler()
+        profiler.enable(every=3, sinks=[frames.append])
+
+        for _ in range(7):
+            frame = profiler.start_frame()
+            if frame:
+                frame.lap("build")
+                frame.count("patches", 2)
+            profiler.finish_frame(frame)
+
+        self.assertEqual([f["frame"] for f in frames], [3, 6])
+        self.assertEqual(set(frames[0]["phases"]), {"build"})
+        self.assertEqual(frames[0]["counters"], {"patches": 2})
+
+    def test_env_enables_jsonl_sink(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "frames.jsonl")
+            env = {"PYTHRA_PROFILE": "1", "PYTHRA_PROFILE_SINK": path}
+            with mock.patch.dict(os.environ, env):
+                profiler = Profiler().configure({"profiling": {"enabled": False}})
+
+            frame = profiler.start_frame()
+            frame.lap("diff")
+            profiler.finish_frame(frame)
+
+            with open(path, encoding="utf-8") as fh:
+                record = json.loads(fh.readline())
+            self.assertIn("diff", record["phases"])
+            self.assertIsNone(record["cprofile"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+"""Unit tests for the Python Reconciler's diffing behaviour."""
+
+import contextlib
+import gc
+import io
+import random
+import unittest
+from ..reconciler import Reconciler, NodeData, longest_increasing_subsequence
+from ..base import Widget, Key
+
+
+class Box(Widget):
+    def __init__(self, label="", children=None, key=None):
+        super().__init__(key=key, children=children)
+        self.label = label
+
+    def render_props(self):
+        self.renders = getattr(self, "renders", 0) + 1
+        return {"data": self.label}
+
+
+class Label(Box):
+    pass
+
+
+class Styled(Box):
+    def __init__(self, label, css_class, style):
+        super().__init__(label)
+        self.css_class, self.style = css_class, style
+
+    def render_props(self):
+        return {**super().render_props(), "css_class": self.css_class, "style": self.style}
+
+
+class TestReconciler(unittest.TestCase):
+    def setUp(self):
+        self.reconciler = Reconciler()
+
+    def _mount(self, root):
+        result = self.reconciler.reconcile({}, root, "root-container")
+        return root, result.new_rendered_map
+
+    def _rebuild(self, previous_map, old_root, new_root):
+        # A rebuilt StatefulWidget keeps its instance, so the root keeps its id.
+        new_root._internal_id = old_root._internal_id
+        return self.reconciler.reconcile(
+            previous_map, new_root, "root-container",
+            old_root_key=old_root.get_unique_id(), is_partial_reconciliation=True
+        )
+
+    def _actions(self, result):
+        return [p.action for p in result.patches]
+
+    def test_unkeyed_children_update_in_place(self):
+        old_root, old_map = self._mount(Box(children=[Label("a"), Label("b"), Label("c")]))
+        old_ids = [old_map[k]["html_id"] for k in old_map[old_root.get_unique_id()]["children_keys"]]
+
+        new_root = Box(children=[Label("a"), Label("B"), Label("c")])
+        result = self._rebuild(old_map, old_root, new_root)
+
+        self.assertEqual(self._actions(result), ["UPDATE"])
+        self.assertEqual(result.patches[0].html_id, old_ids[1])
+        new_ids = [result.new_rendered_map[c.get_unique_id()]["html_id"] for c in new_root.get_children()]
+        self.assertEqual(new_ids, old_ids)
+
+    def test_unkeyed_type_change_is_reinserted(self):
+        old_root, old_map = self._mount(Box(children=[Label("a"), Label("b")]))
+
+        result = self._rebuild(old_map, old_root, Box(children=[Label("a"), Box("b")]))
+
+        self.assertEqual(sorted(self._actions(result)), ["INSERT", "REMOVE"])
+
+    def test_update_carries_only_changed_props(self):
+        old_root, old_map = self._mount(Box(children=[Styled("12:00", "clock", {"color": "red", "--x": 1})]))
+
+        result = self._rebuild(old_map, old_root, Box(children=[Styled("12:01", "clock", {"color": "red", "--x": 1})]))
+        self.assertEqual([p.data for p in result.patches], [{"props": {"data": "12:01"}}])
+
+        result = self._rebuild(old_map, old_root, Box(children=[Styled("12:00", "clock bold", {"color": "blue"})]))
+        self.assertEqual([p.data for p in result.patches], [{"props": {
+            "css_class": "clock bold", "old_shared_class": "clock",
+            "style": {"color": "blue", "--x": None},
+        }}])
+
+    def test_keyed_children_keep_identity(self):
+        old_root, old_map = self._mount(Box(children=[Label("a", key=Key("a")), Label("b", key=Key("b"))]))
+
+        result = self._rebuild(old_map, old_root, Box(children=[Label("a", key=Key("a")), Label("b", key=Key("b"))]))
+
+        self.assertEqual(result.patches, [])
+
+    def test_props_rendered_once_and_fingerprint_skips_diff(self):
+        old_root, old_map = self._mount(Box(children=[Label("a"), Label("b")]))
+        new_root = Box(children=[Label("a"), Label("b")])
+        self.reconciler._diff_props = lambda old, new: self.fail("fingerprints matched")
+
+        result = self._rebuild(old_map, old_root, new_root)
+
+        self.assertEqual(result.patches, [])
+        self.assertEqual([c.renders for c in new_root.get_children()], [1, 1])
+
+    def test_fingerprint_collision_still_diffs(self):
+        self.assertEqual(hash(-1), hash(-2))
+        old_root, old_map = self._mount(Box(children=[Label(-1)]))
+        label = old_map[old_map[old_root.get_unique_id()]["children_keys"][0]]
+
+        result = self._rebuild(old_map, old_root, Box(children=[Label(-2)]))
+
+        self.assertEqual([(p.action, p.html_id, p.data) for p in result.patches],
+                         [("UPDATE", label["html_id"], {"props": {"data": -2}})])
+
+    def _apply_child_patches(self, order, result):
+        order = list(order)
+        for patch in result.patches:
+            if patch.action == "REMOVE":
+                order.remove(patch.html_id)
+            elif patch.action in ("MOVE", "INSERT"):
+                if patch.html_id in order:
+                    order.remove(patch.html_id)
+                before_id = patch.data.get("before_id")
+                order.insert(order.index(before_id) if before_id else len(order), patch.html_id)
+        return order
+
+    def _keyed_rebuild(self, old_labels, new_labels):
+        old_root, old_map = self._mount(Box(children=[Label(l, key=Key(l)) for l in old_labels]))
+        order = [old_map[Key(l)]["html_id"] for l in old_labels]
+        new_root = Box(children=[Label(l, key=Key(l)) for l in new_labels])
+        result = self._rebuild(old_map, old_root, new_root)
+        final_order = self._apply_child_patches(order, result)
+        expected = [result.new_rendered_map[Key(l)]["html_id"] for l in new_labels]
+        self.assertEqual(final_order, expected)
+        return result
+
+    def test_keyed_reverse_uses_minimal_moves(self):
+        labels = [str(i) for i in range(8)]
+        result = self._keyed_rebuild(labels, labels[::-1])
+        self.assertEqual(self._actions(result), ["MOVE"] * 7)
+
+    def test_keyed_shuffle_with_inserts_and_removals(self):
+        rng = random.Random(7)
+        for _ in range(20):
+            old_labels = [str(i) for i in range(rng.randint(0, 12))]
+            new_labels = [l for l in old_labels if rng.random() > 0.3] + [f"n{i}" for i in range(rng.randint(0, 4))]
+            rng.shuffle(new_labels)
+            result = self._keyed_rebuild(old_labels, new_labels)
+            kept = [l for l in new_labels if l in old_labels]
+            lis = longest_increasing_subsequence([old_labels.index(l) for l in kept])
+            self.assertEqual(self._actions(result).count("MOVE"), len(kept) - len(lis))
+
+    def test_identical_child_subtree_is_skipped(self):
+        shared = Box(children=[Label("x"), Label("y")])
+        old_root, old_map = self._mount(Box(children=[shared, Label("a")]))
+        shared_ids = {c.get_unique_id() for c in shared.get_children()}
+        renders_before = [c.renders for c in shared.get_children()]
+
+        result = self._rebuild(old_map, old_root, Box(children=[shared, Label("b")]))
+
+        self.assertEqual(self._actions(result), ["UPDATE"])
+        self.assertEqual([c.renders for c in shared.get_children()], renders_before)
+        self.assertIs(result.new_rendered_map[shared.get_unique_id()], old_map[shared.get_unique_id()])
+        self.assertFalse(shared_ids & set(result.new_rendered_map))
+
+    def test_full_reconcile_carries_skipped_descendants(self):
+        shared = Box(children=[Label("x")])
+        old_root, old_map = self._mount(Box(children=[shared]))
+        new_root = Box(children=[shared])
+        new_root._internal_id = old_root._internal_id
+
+        result = self.reconciler.reconcile(old_map, new_root, "root-container")
+
+        self.assertEqual(result.patches, [])
+        self.assertEqual(set(result.new_rendered_map), set(old_map))
+
+    def test_removed_subtree_reports_all_descendants_unmounted(self):
+        gone = Box(children=[Label("x"), Box(children=[Label("y")])])
+        old_root, old_map = self._mount(Box(children=[Label("a", key=Key("a")), gone]))
+        gone_keys = {gone.get_unique_id()}
+        stack = list(gone.get_children())
+        while stack:
+            widget = stack.pop()
+            gone_keys.add(widget.get_unique_id())
+            stack.extend(widget.get_children())
+
+        result = self._rebuild(old_map, old_root, Box(children=[Label("a", key=Key("a"))]))
+
+        self.assertEqual(self._actions(result), ["REMOVE"])
+        self.assertEqual(set(result.unmounted_keys), gone_keys)
+
+    def test_keyed_widget_moved_to_new_parent_is_not_unmounted(self):
+        old_root, old_map = self._mount(Box(children=[Box(children=[Label("m", key=Key("m"))]), Box()]))
+
+        result = self._rebuild(old_map, old_root, Box(children=[Box(), Box(children=[Label("m", key=Key("m"))])]))
+
+        self.assertNotIn(Key("m"), result.unmounted_keys)
+        self.assertIn(Key("m"), result.new_rendered_map)
+
+    def test_rendered_map_holds_slotted_weak_records(self):
+        root, rendered = self._mount(Box(children=[Label("a")]))
+        child_key = root.get_children()[0].get_unique_id()
+        node = rendered[child_key]
+
+        self.assertIsInstance(node, NodeData)
+        self.assertEqual(node["widget_type"], "Label")
+        self.assertEqual(node.get("props", {}), {"data": "a"})
+        self.assertIs(node.widget_instance, root.get_children()[0])
+
+        root._children = []
+        gc.collect()
+        self.assertIsNone(node.widget_instance)
+
+    def test_new_subtree_is_inserted_as_one_fragment(self):
+        old_root, old_map = self._mount(Box(children=[Label("a")]))
+        added = Box(children=[Label("x"), Box(children=[Label("y")])])
+
+        result = self._rebuild(old_map, old_root, Box(children=[Label("a"), added]))
+
+        self.assertEqual(self._actions(result), ["INSERT"])
+        patch = result.patches[0]
+        ids = [result.new_rendered_map[k]["html_id"] for k in self._subtree_keys(added)]
+        self.assertEqual(patch.html_id, ids[0])
+        self.assertEqual([html_id for html_id, _ in patch.data["descendants"]], ids[1:])
+        positions = [patch.data["html"].index(f'id="{html_id}"') for html_id in ids]
+        self.assertEqual(positions, sorted(positions))
+        self.assertEqual(patch.data["html"].count("</div>"), 4)
+
+    def test_type_change_replaces_element_with_whole_subtree(self):
+        old_root, old_map = self._mount(Label("page one"))
+        page = Box(children=[Label("page two")])
+
+        result = self._rebuild(old_map, old_root, page)
+
+        self.assertEqual(self._actions(result), ["REPLACE"])
+        patch = result.patches[0]
+        self.assertEqual(patch.html_id, old_map[old_root.get_unique_id()]["html_id"])
+        new_ids = [result.new_rendered_map[k]["html_id"] for k in self._subtree_keys(page)]
+        self.assertTrue(patch.data["new_html"].startswith(f'<div id="{new_ids[0]}"'))
+        self.assertIn(f'id="{new_ids[1]}"', patch.data["new_html"])
+
+    def _subtree_keys(self, widget):
+        keys = [widget.get_unique_id()]
+        for child in widget.get_children():
+            keys.extend(self._subtree_keys(child))
+        return keys
+
+    def test_reconcile_writes_nothing_to_stdout(self):
+        old_root, old_map = self._mount(Box(children=[Label("a")]))
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self._rebuild(old_map, old_root, Box(children=[Label("b")]))
+
+        self.assertEqual(output.getvalue(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+"""Differential fuzzing of the diff backends (see reconciler_harness)."""
+
+import unittest
+from ..patch_protocol import encode_patches
+from ..reconciler import Patch
+from .reconciler_harness import ROOT_ID, InMemoryDom, TreeFuzzer, compare_backends, fresh_snapshot
+
+
+class TestReconcilerFuzz(unittest.TestCase):
+    def test_random_mutations_match_a_fresh_render(self):
+        for seed in range(25):
+            with self.subTest(seed=seed):
+                reports = compare_backends(seed, steps=25)
+                self.assertGreater(reports["python"].patches, 0)
+
+    def test_dom_model_follows_the_runtime(self):
+        dom = InMemoryDom()
+        dom.apply_frame(encode_patches([
+            Patch("INSERT", "a", {"html": '<div id="a" class="x"><p id="b">hi</p></div>', "parent_html_id": ROOT_ID}),
+            Patch("INSERT", "c", {"html": '<p id="c">yo</p>', "parent_html_id": ROOT_ID, "before_id": "a"}),
+            Patch("UPDATE", "b", {"props": {"data": "bye", "css_class": "y"}}),
+            Patch("UPDATE", "a", {"props": {"css_class": "z", "old_shared_class": "x"}}),
+            Patch("MOVE", "c", {"parent_html_id": "a", "before_id": "b"}),
+        ]))
+
+        self.assertEqual(dom.snapshot()[4], (
+            ("div", ("z",), "", (), (("p", (), "yo", (), ()), ("p", ("y",), "bye", (), ()))),
+        ))
+        dom.apply_frame(encode_patches([Patch("UPDATE", "gone", {"props": {"data": "?"}})]))
+        self.assertEqual(len(dom.errors), 1)
+
+    def test_fresh_render_differs_after_a_mutation(self):
+        fuzzer = TreeFuzzer(seed=3)
+        spec = fuzzer.tree()
+        before = fresh_snapshot(spec)
+        spec["children"].append(fuzzer.node())
+
+        self.assertNotEqual(fresh_snapshot(spec), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -53,8 +53,6 @@ class TestRustReconcilerAdapter(unittest.TestCase):
         mock_patch.data = {"before_id": None}
         self.rust_mock.reconcile.return_value = [mock_patch]
         
-        # Mock HTML stub generation
-        self.reconciler._generate_html_stub = MagicMock(return_value="<div>stub</div>")
         self.reconciler.id_generator.next_id = MagicMock(return_value="html_1")
         
         result = self.adapter.reconcile(previous_map, widget, "parent")
@@ -63,7 +61,8 @@ class TestRustReconcilerAdapter(unittest.TestCase):
         patch = result.patches[0]
         self.assertEqual(patch.action, "INSERT")
         self.assertEqual(patch.html_id, "html_1")
-        self.assertEqual(patch.data["html"], "<div>stub</div>")
+        # The fragment of a childless node is its own stub.
+        self.assertEqual(patch.data["html"], self.reconciler._generate_html_stub(widget, "html_1", {"color": "blue"}))
         self.assertEqual(patch.data["props"], {"color": "blue"})
     
     def test_move_children(self):
@@ -144,7 +143,7 @@ class TestRustReconcilerAdapter(unittest.TestCase):
         patch = result.patches[0]
         self.assertEqual(patch.action, "UPDATE")
         self.assertEqual(patch.html_id, "root_1")
-        self.assertEqual(patch.data, {"color": "red"})
+        self.assertEqual(patch.data, {"props": {"color": "red"}})
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""Unit tests for the frame scheduler that orders dirty States."""
+
+import unittest
+from ..scheduler import FrameScheduler, Lane, handling_input
+from ..reconciler import NodeData
+from ..state import State, StatefulWidget
+
+
+class _State(State):
+    def build(self):
+        return None
+
+
+class Node(StatefulWidget):
+    def createState(self):
+        return _State()
+
+
+class TestFrameScheduler(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.now = 0.0
+        self.scheduler = FrameScheduler(
+            lambda delay, run: self.requests.append(delay), frame_rate=50, clock=lambda: self.now
+        )
+        self.scheduler.set_frame_callback(lambda: None)
+        # root -> middle -> leaf, each mounted under its parent's key.
+        self.root, self.middle, self.leaf = Node(), Node(), Node()
+        self.rendered_map = {}
+        parent = None
+        for widget in (self.root, self.middle, self.leaf):
+            key = widget.get_unique_id()
+            self.rendered_map[key] = NodeData(
+                html_id=str(key), widget_type="Node", key=None, widget_instance=widget,
+                props={}, parent_html_id="root-container", parent_key=parent,
+            )
+            parent = key
+
+    def test_burst_of_updates_requests_one_frame(self):
+        for _ in range(5):
+            self.scheduler.mark_dirty(self.leaf.get_state())
+            self.scheduler.mark_dirty(self.middle.get_state())
+
+        self.assertEqual(len(self.requests), 1)
+        states = self.scheduler.begin_frame(self.rendered_map)
+        self.assertEqual(states, [self.middle.get_state(), self.leaf.get_state()])
+
+    def test_states_are_ordered_by_depth(self):
+        for widget in (self.leaf, self.root, self.middle):
+            self.scheduler.mark_dirty(widget.get_state())
+
+        states = self.scheduler.begin_frame(self.rendered_map)
+
+        self.assertEqual(states, [w.get_state() for w in (self.root, self.middle, self.leaf)])
+
+    def test_state_rebuilt_by_ancestor_is_skipped(self):
+        self.scheduler.mark_dirty(self.middle.get_state())
+        self.scheduler.mark_dirty(self.leaf.get_state())
+        self.scheduler.begin_frame(self.rendered_map)
+
+        self.scheduler.note_built(self.middle.get_state())
+        self.scheduler.note_built(self.leaf.get_state())
+
+        self.assertFalse(self.scheduler.needs_build(self.leaf.get_state()))
+        self.scheduler.end_frame()
+        self.assertTrue(self.scheduler.needs_build(self.leaf.get_state()))
+
+    def test_set_state_during_build_is_deferred_to_next_frame(self):
+        self.scheduler.mark_dirty(self.root.get_state())
+        self.scheduler.begin_frame(self.rendered_map, root_widget=self.root)
+
+        self.scheduler.mark_dirty(self.leaf.get_state())
+        self.assertEqual(len(self.requests), 1)
+
+        self.scheduler.end_frame()
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.scheduler.begin_frame(self.rendered_map), [self.leaf.get_state()])
+
+    def test_unmounted_states_are_dropped(self):
+        self.scheduler.mark_dirty(Node().get_state())
+
+        self.assertEqual(self.scheduler.begin_frame(self.rendered_map), [])
+
+    def test_frames_are_paced_but_input_is_not(self):
+        self.scheduler.mark_dirty(self.leaf.get_state())
+        self.scheduler.begin_frame(self.rendered_map)
+        self.scheduler.end_frame()
+
+        self.now = 0.005
+        self.scheduler.mark_dirty(self.leaf.get_state())
+        self.assertEqual(self.requests[-1], 15)  # Rest of the 20 ms frame.
+
+        with handling_input():
+            self.scheduler.mark_dirty(self.middle.get_state())
+        self.assertEqual(self.requests[-1], 0)
+
+    def test_background_work_is_carried_over_when_budget_is_spent(self):
+        self.scheduler.mark_dirty(self.leaf.get_state(), Lane.BACKGROUND)
+        self.scheduler.mark_dirty(self.middle.get_state(), Lane.BACKGROUND)
+        self.scheduler.mark_dirty(self.root.get_state(), Lane.INPUT)
+        states = self.scheduler.begin_frame(self.rendered_map)
+        self.assertEqual(states, [w.get_state() for w in (self.root, self.middle, self.leaf)])
+
+        self.assertTrue(self.scheduler.admit(self.root.get_state()))
+        self.now = 0.025  # The input work used up the frame.
+        self.assertFalse(self.scheduler.admit(self.middle.get_state()))
+        self.assertFalse(self.scheduler.admit(self.leaf.get_state()))
+        self.scheduler.end_frame()
+
+        self.assertEqual(
+            self.scheduler.begin_frame(self.rendered_map),
+            [self.middle.get_state(), self.leaf.get_state()],
+        )
+        self.assertTrue(self.scheduler.admit(self.middle.get_state()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""Unit tests for the immutable, interned style value classes."""
+
+import copy
+import unittest
+from ..base import make_hashable
+from ..styles import BorderRadius, BoxDecoration, BoxShadow, ButtonStyle, EdgeInsets, TextStyle
+
+
+class TestStyleValues(unittest.TestCase):
+    def test_equal_styles_share_one_instance(self):
+        self.assertIs(EdgeInsets.all(8), EdgeInsets.all(8))
+        self.assertIs(EdgeInsets.all(8), EdgeInsets(8, 8, 8, 8))
+        self.assertIs(TextStyle(color="red", fontSize=12), TextStyle(fontSize=12, color="red"))
+        self.assertIsNot(EdgeInsets.all(8), EdgeInsets.all(4))
+
+    def test_styles_are_immutable(self):
+        padding = EdgeInsets.all(8)
+        with self.assertRaises(AttributeError):
+            padding.left = 4
+        with self.assertRaises(AttributeError):
+            padding.extra = 1
+        self.assertIs(copy.deepcopy(padding), padding)
+
+    def test_key_is_computed_once(self):
+        style = ButtonStyle(padding=EdgeInsets.all(4), shape=BorderRadius.all(2))
+
+        self.assertIs(make_hashable(style), make_hashable(style))
+        self.assertEqual(make_hashable(style)[8], (4, 4, 4, 4))
+        self.assertEqual(hash(style), hash(ButtonStyle(padding=EdgeInsets.all(4), shape=BorderRadius.all(2))))
+
+    def test_decoration_round_trips_through_its_tuple(self):
+        decoration = BoxDecoration(color="red", boxShadow=[BoxShadow(color="black")])
+
+        self.assertIs(BoxDecoration(*decoration.to_tuple()), decoration)
+        self.assertEqual(decoration, BoxDecoration(color="red", boxShadow=[BoxShadow(color="black")]))
+
+    def test_unhashable_fields_are_still_usable(self):
+        style = ButtonStyle(minimumSize=[40, 20])
+
+        self.assertIn("min-width: 40px", style.to_css())
+        self.assertEqual(style, ButtonStyle(minimumSize=[40, 20]))
+
+    def test_text_button_with_unhashable_style(self):
+        from ..widgets import Text, TextButton
+
+        first = TextButton(child=Text("A"), style=ButtonStyle(minimumSize=[40, 20]))
+        second = TextButton(child=Text("B"), style=ButtonStyle(minimumSize=[40, 20]))
+
+        self.assertEqual(first.css_class, second.css_class)
+        self.assertIn("min-width: 40px", TextButton.generate_css_rule(first.style_key, first.css_class))
+
+
+if __name__ == "__main__":
+    unittest.main()
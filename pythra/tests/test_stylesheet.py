@@ -0,0 +1,112 @@
+"""Unit tests for the refcounted dynamic stylesheet and style registries."""
+
+import unittest
+from ..base import Widget
+from ..reconciler import NodeData
+from ..stylesheet import SharedStyles, StyleSheetManager
+
+calls = []
+
+
+def rule(style_key, css_class):
+    calls.append(css_class)
+    return f".{css_class} {{ color: {style_key}; }}"
+
+
+class Themed(Widget):
+    """Needs a class that isn't on its element, like GlobalScrollbarStyle."""
+
+    def get_required_css_classes(self):
+        return {"theme"}
+
+
+def node(css_class, widget=None):
+    return NodeData(
+        html_id="fw_id_1", widget_type="Box", key=None, widget_instance=widget,
+        props={"css_class": css_class}, parent_html_id=None, parent_key=None,
+    )
+
+
+class TestStyleSheetManager(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.sheet = StyleSheetManager(grace_period=10, clock=lambda: self.now)
+        self.sheet.register({"red": (rule, "red"), "blue": (rule, "blue")})
+
+    def test_initial_sheet_holds_live_classes_only(self):
+        self.sheet.retain("a", node("red static-class"))
+
+        self.assertEqual(self.sheet.full_sheet(), ".red { color: red; }")
+        self.assertIsNone(self.sheet.flush())
+
+    def test_only_appearing_and_disappearing_classes_are_flushed(self):
+        row = node("red")
+        self.sheet.retain("a", row)
+        self.sheet.full_sheet()
+
+        self.sheet.retain("b", row)  # A second red row: nothing new.
+        self.sheet.retain("c", node("blue"))
+        self.assertEqual(self.sheet.flush(), {"insert": [["blue", ".blue { color: blue; }"]], "delete": []})
+
+        self.sheet.release("a", row)
+        self.assertIsNone(self.sheet.flush())
+        self.sheet.release("b", row)
+        self.assertEqual(self.sheet.flush(), {"insert": [], "delete": ["red"]})
+
+    def test_class_replaced_within_a_frame_costs_nothing(self):
+        self.sheet.retain("a", node("red"))
+        self.sheet.full_sheet()
+
+        self.sheet.retain("a", node("red"))
+        self.sheet.release("a", node("red"))
+
+        self.assertIsNone(self.sheet.flush())
+        self.assertTrue(self.sheet.is_live("red"))
+
+    def test_required_classes_are_counted_per_node(self):
+        widget = Themed()
+        self.sheet.register({"theme": (rule, "theme")})
+        self.sheet.retain("t", node("", widget))
+        self.assertIn(".theme", self.sheet.full_sheet())
+
+        del widget  # The map only holds a weak reference.
+        self.sheet.release("t", node(""))
+
+        self.assertEqual(self.sheet.flush(), {"insert": [], "delete": ["theme"]})
+
+    def test_rule_text_is_generated_once(self):
+        del calls[:]
+        self.sheet.retain("a", node("red"))
+        self.sheet.full_sheet()
+        self.sheet.release("a", node("red"))
+        self.sheet.flush()
+        self.sheet.retain("a", node("red"))
+        self.sheet.flush()
+
+        self.assertEqual(calls, ["red"])
+
+    def test_unused_classes_are_evicted_after_the_grace_period(self):
+        registry = SharedStyles()
+        for key in ("k0", "k1"):
+            css_class = f"shared-test-{registry.next_index()}"
+            registry[key] = css_class
+            self.sheet.register({css_class: (rule, key)})
+        self.sheet.retain("a", node("shared-test-0"))
+        self.sheet.retain("b", node("shared-test-1"))
+        self.sheet.release("b", node("shared-test-1"))
+
+        self.now = 5
+        self.sheet.flush()
+        self.assertIn("k1", registry)
+        self.now = 11
+        self.sheet.flush()
+
+        self.assertEqual(registry, {"k0": "shared-test-0"})
+        self.assertNotIn("shared-test-1", self.sheet.details)
+        # "red" and "blue" from setUp were registered but never mounted.
+        self.assertEqual(self.sheet.stats()["style_classes_evicted"], 3)
+        self.assertEqual(registry.next_index(), 2)  # Names are never reused.
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""Unit tests for building virtual list items on demand, with a headless Framework."""
+
+import json
+import re
+import shutil
+import subprocess
+import unittest
+import weakref
+from collections import Counter
+from pathlib import Path
+from unittest.mock import Mock, patch
+from ..base import Key
+from ..controllers import VirtualListController
+from ..core import Framework
+from ..reconciler import Reconciler
+from ..scheduler import FrameScheduler
+from ..state import StatefulWidget
+from ..stylesheet import StyleSheetManager
+from ..window import webwidget
+from ..widgets import Text, TextButton, VirtualListView
+
+
+class HeadlessFramework(Framework):
+    """The parts of the Framework a virtual list talks to, without a window or a server."""
+
+    def __init__(self):
+        self.reconciler = Reconciler()
+        self.stylesheet = StyleSheetManager()
+        self.scheduler = FrameScheduler(request_frame=lambda delay, run: None)
+        # The Framework creates the one Api instance; QObject can't be initialized twice.
+        self.api = webwidget.Api._instance or webwidget.Api()
+        self._callback_refs = Counter()
+        self._reconciler_callbacks = set()
+        self.window = None
+        self.id = "window"
+
+
+def open_row():
+    pass
+
+
+def row(index):
+    return TextButton(child=Text(f"Row {index}"), onPressed=open_row, onPressedName=f"open_row_{index}")
+
+
+class TestVirtualList(unittest.TestCase):
+    def make_list(self, **options):
+        options = {"itemCount": 1000, "itemBuilder": row, "initialItemCount": 0, "maxCachedItems": 20, **options}
+        framework = HeadlessFramework()
+        with patch.object(StatefulWidget, "_framework_ref", weakref.ref(framework)):
+            self.widget = VirtualListView(key=Key("rows"), controller=VirtualListController(), **options)
+        state = self.widget.get_state()
+        self.addCleanup(state.dispose)
+        return state
+
+    def main_map(self, state):
+        return state.framework.reconciler.get_map_for_context("main")
+
+    def test_range_is_built_once_then_served_from_the_cache(self):
+        built = []
+        state = self.make_list(itemBuilder=lambda index: built.append(index) or row(index))
+
+        first = state.build_items_for_js(0, 10)
+        again = state.build_items_for_js(0, 10)
+
+        self.assertEqual(built, list(range(10)))
+        self.assertEqual(again["items"], first["items"])
+        self.assertIn("open_row_4", first["items"]["4"]["callback_names"])
+        self.assertEqual(again["evicted"], [])
+
+    def test_items_beyond_the_cache_limit_are_unmounted_and_reported(self):
+        state = self.make_list()
+        state.build_items_for_js(0, 10)
+        first_roots = [state._item_root_keys[index] for index in range(10)]
+        self.assertTrue(all(key in self.main_map(state) for key in first_roots))
+
+        state.build_items_for_js(10, 20)
+        self.assertEqual(state.build_items_for_js(20, 25)["evicted"], [0, 1, 2, 3, 4])
+
+        self.assertEqual(len(state._item_cache), 20)
+        self.assertEqual(sorted(state._item_root_keys), list(range(5, 25)))
+        for index, key in enumerate(first_roots):
+            self.assertEqual(key in self.main_map(state), index >= 5, index)
+        self.assertNotIn("open_row_0", state.framework.api.callbacks)
+        self.assertIn("open_row_5", state.framework.api.callbacks)
+
+    def test_full_refresh_bumps_the_version_and_drops_stale_items(self):
+        built = []
+        state = self.make_list(itemBuilder=lambda index: built.append(index) or row(index))
+        state.framework.window = Mock()
+        state.build_items_for_js(0, 5)
+        root_key = state._item_root_keys[0]
+
+        state.refresh_js()
+
+        self.assertEqual(state._data_version, 1)
+        self.assertEqual(len(state._item_cache), 0)
+        self.assertEqual(state._item_root_keys, {})
+        self.assertNotIn(root_key, self.main_map(state))
+        state.framework.window.evaluate_js.assert_called_once_with(
+            "window", "window._pythra_instances['rows_vlist']?.refresh(1);")
+
+        self.assertEqual(state.build_items_for_js(0, 5)["version"], 1)
+        self.assertEqual(built, list(range(5)) * 2)
+        self.assertEqual({version for _, version in state._item_cache}, {1})
+
+    def test_range_end_is_clamped(self):
+        state = self.make_list(itemCount=30)
+        self.assertEqual(list(state.build_items_for_js(25, 40)["items"]), ["25", "26", "27", "28", "29"])
+        # Half the cache at most, so a batch never evicts its own items.
+        self.assertEqual(list(state.build_items_for_js(-5, 30)["items"]), [str(i) for i in range(10)])
+
+    def test_evicted_template_records_unregister_their_callbacks(self):
+        state = self.make_list(useItemTemplates=True)
+        callbacks = state.framework.api.callbacks
+
+        first = state.build_items_for_js(0, 10)
+        self.assertEqual(first["items"]["3"]["t"], 0)
+        self.assertIs(callbacks["open_row_3"], open_row)
+
+        evicted = state.build_items_for_js(10, 20)["evicted"] + state.build_items_for_js(20, 30)["evicted"]
+
+        self.assertEqual(sorted(evicted), list(range(10)))
+        self.assertNotIn("open_row_3", callbacks)
+        self.assertIn("open_row_25", callbacks)
+        self.assertNotIn("open_row_3", state.framework._callback_refs)
+
+
+ENGINE = Path(__file__).resolve().parent.parent / "render_template" / "js" / "virtual_list.js"
+
+# Runs the JS engine against a minimal DOM and a bridge that answers with
+# template records, inserts a row at the top, scrolls up to it and prints
+# the HTML of the visible rows.
+INSERT_AT_TOP = r"""
+import { readFileSync } from 'node:fs';
+
+class El {
+    constructor() { this.style = {}; this.dataset = {}; this.scrollTop = 0; this.clientHeight = 100; this.innerHTML = ''; }
+    get offsetHeight() { return 20; }
+    appendChild() {}
+    querySelectorAll() { return []; }
+    addEventListener() {}
+}
+const container = new El(), scroller = new El(), content = new El();
+container.id = 'rows';
+globalThis.document = { getElementById: () => container, createElement: () => new El(), head: new El() };
+globalThis.SimpleBar = class { getScrollElement() { return scroller; } getContentElement() { return content; } };
+globalThis.requestAnimationFrame = run => run();
+
+const templates = { 0: { parts: ['<button id="', '"><p id="', '">', '</p></button>'], slots: [-1, -1, 0] } };
+let rows = Array.from({ length: 20 }, (_, i) => `Row ${i}`);
+let version = 0;
+globalThis.window = { pywebview: { build_list_items: async (name, start, end) => {
+    const items = {};
+    for (let i = start; i < end; i++) items[i] = { t: 0, v: [rows[i]] };
+    return { items, templates, css: '', evicted: [], version };
+} } };
+
+const source = readFileSync(process.argv.at(-1), 'utf8');
+const { PythraVirtualList } = await import('data:text/javascript,' + encodeURIComponent(source));
+const settle = () => new Promise(resolve => setTimeout(resolve, 10));
+
+const list = new PythraVirtualList('rows', { itemCount: rows.length, itemExtent: 20, itemBuilderName: 'build', batchSize: 10 });
+await settle();
+rows = ['New row', ...rows];
+version = 1;
+list.applyChanges([{ kind: 'insert', start: 0, count: 1, to: 0 }], rows.length, version);
+// The rows on screen stay put; scroll up to the new one.
+scroller.scrollTop = 0;
+list.render();
+await settle();
+console.log(JSON.stringify(list.visibleItemElements.filter(el => el.dataset.loaded === '1').map(el => el.innerHTML)));
+"""
+
+
+@unittest.skipUnless(shutil.which("node"), "needs node to run the JS engine")
+class TestVirtualListEngine(unittest.TestCase):
+    def test_rows_moved_by_an_insert_keep_unique_ids(self):
+        output = subprocess.run(
+            ["node", "--input-type=module", "-", str(ENGINE)],
+            input=INSERT_AT_TOP, capture_output=True, text=True, check=True,
+        ).stdout
+        visible = json.loads(output.splitlines()[-1])
+
+        self.assertEqual(re.findall(r"<p id=\"[^\"]+\">([^<]*)", "".join(visible))[:2], ["New row", "Row 0"])
+        ids = re.findall(r'id="([^"]+)"', "".join(visible))
+        self.assertEqual(len(ids), 2 * len(visible))
+        self.assertEqual(len(set(ids)), len(ids))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -46,6 +46,7 @@ Column(children=[
 import html
 import json
 from .api import Api
+from .window.webwidget import RANGE_BUILDER_SUFFIX
 from .widgets_more import *
 from .base import *
 from .state import *
@@ -53,10 +54,15 @@ from .styles import *
 from .icons import *
 from .icons.base import IconData # Import the new data class
 from .controllers import *
+from .stylesheet import SharedStyles
 from .config import Config
+from .data_sources import ListChange, ListDataSource
 import weakref
+import logging
 from typing import Any, Dict, List, Optional, Set, Tuple, Union, Callable
+from collections import OrderedDict
 
+logger = logging.getLogger(__name__)
 
 config = Config()
 assets_dir = config.get('assets_dir', 'assets')
@@ -134,7 +140,12 @@ class Container(Widget):
     - decoration: Advanced styling (borders, shadows, etc.)
     - gradient: Animated gradient backgrounds
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
+    __slots__ = (
+        "padding", "color", "decoration", "width", "height", "constraints", "margin",
+        "transform", "alignment", "clipBehavior", "visible", "gradient", "zAxisIndex",
+        "js_init", "cssClass", "style_key", "css_class",
+    )
 
     def __init__(self,
                  child: Optional[Widget] = None,
@@ -186,7 +197,7 @@ class Container(Widget):
         ))
 
         if self.style_key not in Container.shared_styles:
-            self.css_class = f"shared-container-{len(Container.shared_styles)}"
+            self.css_class = f"shared-container-{Container.shared_styles.next_index()}"
             Container.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Container.shared_styles[self.style_key]
@@ -384,7 +395,8 @@ class Text(Widget):
     Text widget is smart about styling - if multiple Text widgets use the same style,
     they share the same CSS class to keep your app running fast!
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
+    __slots__ = ("data", "style", "textAlign", "overflow", "style_key", "css_class")
 
     def __init__(self, data: str, key: Optional[Key] = None, style=None, textAlign=None, overflow=None):
         super().__init__(key=key)
@@ -394,12 +406,16 @@ class Text(Widget):
         self.overflow = overflow
 
         # --- CSS Class Management ---
-        self.style_key = tuple(make_hashable(prop) for prop in (
-            self.style.to_css() if self.style else self.style, self.textAlign, self.overflow
-        ))
+        # A TextStyle is an interned value with a cached hash: key on it directly
+        # instead of rendering its CSS for every Text built.
+        style = self.style
+        self.style_key = (
+            style if isinstance(style, StyleValue) else make_hashable(style.to_css() if style else style),
+            make_hashable(self.textAlign), make_hashable(self.overflow),
+        )
 
         if self.style_key not in Text.shared_styles:
-            self.css_class = f"shared-text-{len(Text.shared_styles)}"
+            self.css_class = f"shared-text-{Text.shared_styles.next_index()}"
             Text.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Text.shared_styles[self.style_key]
@@ -425,8 +441,8 @@ class Text(Widget):
         try:
             (style, textAlign, overflow) = style_key
 
-            # Assume style.to_css() returns combined font/color etc. rules
-            style_str = style if style else ''
+            # The TextStyle itself, or the CSS string of a style that isn't one
+            style_str = style.to_css() if isinstance(style, StyleValue) else (style or '')
             # print("Style str: ", style)
             text_align_str = f"text-align: {textAlign};" if textAlign else ''
             overflow_str = f"overflow: {overflow}; white-space: nowrap; text-overflow: ellipsis;" if overflow == 'ellipsis' else (f"overflow: {overflow};" if overflow else '')
@@ -512,7 +528,7 @@ class TextButton(Widget):
     - **style**: How the button should look (colors, padding, shape, etc.)
     - **onPressedName**: Custom name for the click handler (for debugging)
     """
-    shared_styles: Dict[Tuple, str] = {} # Class variable for shared CSS
+    shared_styles: Dict[Tuple, str] = SharedStyles() # Class variable for shared CSS
 
     def __init__(self,
                  child: Widget, # Button usually requires a child (e.g., Text)
@@ -537,12 +553,17 @@ class TextButton(Widget):
         self.onPressedArgs = onPressedArgs
 
         # --- CSS Class Management ---
-        # Use make_hashable or ensure ButtonStyle itself is hashable
-        # For TextButton, often only a subset of ButtonStyle matters, but let's hash the whole object for now
-        self.style_key = (make_hashable(self.style.to_css()),)
+        # ButtonStyle is an immutable, interned value with a cached hash, so the
+        # object itself is the key (no need to render its CSS on every build).
+        # A style holding something unhashable (e.g. a list) is keyed by its CSS.
+        try:
+            hash(self.style)
+            self.style_key = (self.style,)
+        except TypeError:
+            self.style_key = (make_hashable(self.style.to_css()),)
 
         if self.style_key not in TextButton.shared_styles:
-            self.css_class = f"shared-textbutton-{len(TextButton.shared_styles)}"
+            self.css_class = f"shared-textbutton-{TextButton.shared_styles.next_index()}"
             TextButton.shared_styles[self.style_key] = self.css_class
             # Register the actual callback function when the style/class is first created
             # This is one approach, another is during tree traversal in Framework
@@ -586,7 +607,6 @@ class TextButton(Widget):
             try:
                 # Option A: style_key = (hashable_button_style_repr,)
                 style_repr = style_key[0] # Get the representation
-                print(style_repr)
 
                 # Option B: style_key = (prop1, prop2, ...) - unpack directly
                 # (textColor, textStyle_tuple, padding_tuple, ...) = style_key # Example unpack
@@ -652,7 +672,8 @@ class TextButton(Widget):
             }
 
             # --- Assemble Main Rule ---
-            main_rule = f".{css_class} {{ {' '.join(f'{k}: {v};' for k, v in base_styles_dict.items())} {style_repr}}}"
+            style_css = style_repr.to_css() if isinstance(style_repr, ButtonStyle) else (style_repr or "")
+            main_rule = f".{css_class} {{ {' '.join(f'{k}: {v};' for k, v in base_styles_dict.items())} {style_css}}}"
 
             # --- State Styles ---
             # M3 uses semi-transparent state layers matching the text color
@@ -766,7 +787,7 @@ class ElevatedButton(Widget):
     **Visual hierarchy tip:**
     Use only ONE ElevatedButton per screen/section to maintain clear visual hierarchy!
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  child: Widget,
@@ -799,7 +820,7 @@ class ElevatedButton(Widget):
         self.style_key = make_hashable(self.style) # Requires ButtonStyle -> hashable tuple/dict
 
         if self.style_key not in ElevatedButton.shared_styles:
-            self.css_class = f"shared-elevatedbutton-{len(ElevatedButton.shared_styles)}"
+            self.css_class = f"shared-elevatedbutton-{ElevatedButton.shared_styles.next_index()}"
             ElevatedButton.shared_styles[self.style_key] = self.css_class # type: ignore
             # Register callback - see note in TextButton about timing/location
             if self.onPressed and self.onPressed_id:
@@ -1076,7 +1097,7 @@ class IconButton(Widget):
     Always include a tooltip for IconButton to help users understand what it does!
     """
     # Class-level cache for mapping unique style definitions to a CSS class name.
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  icon: Widget,  # The Icon widget is the required child
@@ -1113,7 +1134,7 @@ class IconButton(Widget):
 
         # 2. Check the cache to reuse or create a new CSS class.
         if self.style_key not in IconButton.shared_styles:
-            self.css_class = f"shared-iconbutton-{len(IconButton.shared_styles)}"
+            self.css_class = f"shared-iconbutton-{IconButton.shared_styles.next_index()}"
             IconButton.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = IconButton.shared_styles[self.style_key]
@@ -1341,7 +1362,7 @@ class FloatingActionButton(Widget):
     FABs are lightweight and efficient since they're typically just a button with an icon.
     The floating positioning and shadows are handled efficiently by CSS.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  child: Optional[Widget] = None, # Typically an Icon widget
@@ -1373,7 +1394,7 @@ class FloatingActionButton(Widget):
         self.style_key = make_hashable(self.style)
 
         if self.style_key not in FloatingActionButton.shared_styles:
-            self.css_class = f"shared-fab-{len(FloatingActionButton.shared_styles)}"
+            self.css_class = f"shared-fab-{FloatingActionButton.shared_styles.next_index()}"
             FloatingActionButton.shared_styles[self.style_key] = self.css_class # type: ignore
             # Register callback (Move to Framework recommended)
             # if self.onPressed and self.onPressed_id:
@@ -1623,7 +1644,7 @@ class SingleChildScrollView(Widget):
     Only use this for single widgets! For lists of items, use ListView which is optimized
     to only render visible items and can handle thousands of items efficiently.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  child: Widget,
@@ -1656,7 +1677,7 @@ class SingleChildScrollView(Widget):
 
         # Use the standard pattern to get a shared CSS class
         if self.style_key not in SingleChildScrollView.shared_styles:
-            self.css_class = f"shared-scrollview-{len(SingleChildScrollView.shared_styles)}"
+            self.css_class = f"shared-scrollview-{SingleChildScrollView.shared_styles.next_index()}"
             SingleChildScrollView.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = SingleChildScrollView.shared_styles[self.style_key]
@@ -1802,7 +1823,7 @@ class GlobalScrollbarStyle(Widget):
     # Use a class-level cache to ensure the global style is only generated once
     # per unique theme. The key here can be simple, as there's only one global
     # scrollbar per window.
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self, key: Optional[Key] = None, theme: Optional[ScrollbarTheme] = None):
         # This widget has no children and renders nothing itself.
@@ -1818,7 +1839,7 @@ class GlobalScrollbarStyle(Widget):
         # triggering the static method.
         if self.style_key not in GlobalScrollbarStyle.shared_styles:
             # The class name is just a placeholder to trigger the generation
-            self.css_class = f"global-scrollbar-theme-{len(GlobalScrollbarStyle.shared_styles)}"
+            self.css_class = f"global-scrollbar-theme-{GlobalScrollbarStyle.shared_styles.next_index()}"
             GlobalScrollbarStyle.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = GlobalScrollbarStyle.shared_styles[self.style_key]
@@ -1957,7 +1978,7 @@ class Scrollbar(Widget):
     - For lists with hundreds or thousands of items, **virtualization is essential**. By providing `virtualization_options`, you switch to a mode that only renders the DOM nodes currently in view, resulting in massive performance gains and instant scrolling, regardless of list size.
     """
     # A class-level cache to share CSS for identical themes.
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  child: Widget,
@@ -1990,7 +2011,7 @@ class Scrollbar(Widget):
         self.style_key = self.theme.to_tuple()
 
         if self.style_key not in Scrollbar.shared_styles:
-            self.css_class = f"simplebar-themed-{len(Scrollbar.shared_styles)}"
+            self.css_class = f"simplebar-themed-{Scrollbar.shared_styles.next_index()}"
             Scrollbar.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Scrollbar.shared_styles[self.style_key]
@@ -2007,7 +2028,7 @@ class Scrollbar(Widget):
         # --- THIS IS THE CHANGE ---
         # Only initialize SimpleBar OR VirtualList, not both.
         # VirtualList will now handle the SimpleBar initialization internally.
-        print("virtualization_options: ", self.virtualization_options)
+        logger.debug("Scrollbar virtualization options: %s", self.virtualization_options)
         if self.virtualization_options:
             
             props['init_virtual_list'] = True
@@ -2189,7 +2210,7 @@ class Column(Widget):
     **Layout tip:**
     Column is perfect for mobile-first design since phones are taller than they are wide!
     """
-    shared_styles: Dict[Tuple, str] = {} # Class variable for shared CSS
+    shared_styles: Dict[Tuple, str] = SharedStyles() # Class variable for shared CSS
 
     def __init__(self,
                  children: List[Widget], # Children are mandatory for Column usually
@@ -2228,7 +2249,7 @@ class Column(Widget):
         # Use shared_styles dictionary to manage CSS classes
         if self.style_key not in Column.shared_styles:
             # Assign a new shared class name if style combo is new
-            self.css_class = f"shared-column-{len(Column.shared_styles)}"
+            self.css_class = f"shared-column-{Column.shared_styles.next_index()}"
             Column.shared_styles[self.style_key] = self.css_class
         else:
             # Reuse existing class name for identical styles
@@ -2427,7 +2448,11 @@ class Row(Widget):
     **Layout tip:**
     Use Expanded widget around Row children to control how they share the available width!
     """
-    shared_styles: Dict[Tuple, str] = {} # Class variable for shared CSS
+    shared_styles: Dict[Tuple, str] = SharedStyles() # Class variable for shared CSS
+    __slots__ = (
+        "mainAxisAlignment", "mainAxisSize", "crossAxisAlignment", "textDirection",
+        "verticalDirection", "textBaseline", "style_key", "css_class",
+    )
 
     def __init__(self,
                  children: List[Widget], # Children are usually expected for Row
@@ -2466,7 +2491,7 @@ class Row(Widget):
         # Use shared_styles dictionary to manage CSS classes
         if self.style_key not in Row.shared_styles:
             # Assign a new shared class name if style combo is new
-            self.css_class = f"shared-row-{len(Row.shared_styles)}"
+            self.css_class = f"shared-row-{Row.shared_styles.next_index()}"
             Row.shared_styles[self.style_key] = self.css_class
         else:
             # Reuse existing class name for identical styles
@@ -2762,7 +2787,7 @@ class Image(Widget):
     **Performance tip:**
     Always specify width and height to prevent layout jumps while images load!
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  image: Union[AssetImage, NetworkImage], # Image source object
@@ -2799,7 +2824,7 @@ class Image(Widget):
         )
 
         if self.style_key not in Image.shared_styles:
-            self.css_class = f"shared-image-{len(Image.shared_styles)}"
+            self.css_class = f"shared-image-{Image.shared_styles.next_index()}"
             Image.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Image.shared_styles[self.style_key]
@@ -2967,7 +2992,7 @@ class Icon(Widget):
     Icons are vector-based and super lightweight - use them liberally!
     They're much more efficient than image files for simple symbols.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  icon: IconData, # The required IconData object
@@ -3010,7 +3035,7 @@ class Icon(Widget):
         )
 
         if self.style_key not in Icon.shared_styles:
-            self.css_class = f"material-icon-{len(Icon.shared_styles)}"
+            self.css_class = f"material-icon-{Icon.shared_styles.next_index()}"
             Icon.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Icon.shared_styles[self.style_key]
@@ -3129,6 +3154,13 @@ class _VirtualListViewState(State):
         - It returns this payload in a dictionary, which the JavaScript side then injects
           into the DOM.
 
+    - **`build_items_for_js(start, end)`**:
+        - The range version JavaScript normally uses: one round trip for a whole run of
+          missing items (the visible ones plus the prefetched next viewport).
+        - Built items are kept in a bounded LRU keyed by index and data version, so
+          scrolling back is free. Items pushed out of it are unmounted, and their indices
+          are sent along so JavaScript forgets their HTML too.
+
     - **`refresh_js(indices)`**:
         - This method is the Python-to-JavaScript command channel.
         - It is called by the `VirtualListController` when a developer wants to update the list.
@@ -3156,6 +3188,20 @@ class _VirtualListViewState(State):
         super().__init__()
         self.item_builder_name = None
         self._virtualization_options = None
+        # index -> root key of the item subtree last built for it, so a rebuilt
+        # or discarded item can be unmounted from the main context map.
+        self._item_root_keys: Dict[int, Any] = {}
+        # Bumped on every full refresh; built items are cached per version.
+        self._data_version = 0
+        # (index, data version) -> (payload sent to JS, its CSS details, the
+        # callback names the entry itself holds), least recently used first.
+        # Evicted items are unmounted and reported to JS.
+        self._item_cache: "OrderedDict[Tuple[int, int], Tuple[Dict[str, Any], Dict, Tuple[str, ...]]]" = OrderedDict()
+        self._evicted: List[int] = []
+        # With `useItemTemplates`, the compiled shapes of the items (see pythra.item_templates).
+        self._item_templates = None
+        # The widget's `dataSource` this state listens to, if any.
+        self._data_source: Optional[ListDataSource] = None
 
     def initState(self):
         """
@@ -3170,32 +3216,85 @@ class _VirtualListViewState(State):
             widget.controller._attach(self) # type: ignore
 
         # --- MOVE ALL SETUP LOGIC HERE ---
+        if widget.dataSource is not None: # type: ignore
+            self._data_source = widget.dataSource # type: ignore
+            self._data_source.add_listener(self._on_data_changed)
+        if widget.useItemTemplates: # type: ignore
+            # Imported here: item_templates needs the reconciler, which imports this module.
+            from .item_templates import ItemTemplates
+            self._item_templates = ItemTemplates()
         self.item_builder_name = f"vlist_item_builder_{widget.key.value}" # type: ignore
         Api().register_callback(self.item_builder_name, self.build_item_for_js)
+        Api().register_callback(f"{self.item_builder_name}{RANGE_BUILDER_SUFFIX}", self.build_items_for_js)
 
         # Pre-render the initial items once during initialization.
         initial_items_html = {}
-        initial_item_count = min(widget.initialItemCount, widget.itemCount) # type: ignore
+        initial_item_count = min(widget.initialItemCount, self._item_count()) # type: ignore
         for i in range(initial_item_count):
             initial_items_html[i] = self.build_item_for_js(i)
         
         self._virtualization_options = {
-            "itemCount": widget.itemCount, # type: ignore
-            "itemExtent": widget.itemExtent, # type: ignore
+            "itemCount": self._item_count(),
+            **self._layout_options(widget),
             "itemBuilderName": self.item_builder_name,
-            "initialItems": initial_items_html
+            "initialItems": initial_items_html,
+            "dataVersion": self._data_version,
+            "prefetchViewports": widget.prefetchViewports, # type: ignore
+            # Never more per request than the cache holds without evicting the batch itself.
+            "batchSize": max(1, widget.maxCachedItems // 2), # type: ignore
+            "followTail": widget.followTail, # type: ignore
         }
 
         # --- END OF MOVED LOGIC ---
 
+    def _item_count(self) -> int:
+        if self._data_source is not None:
+            return self._data_source.itemCount
+        return self.get_widget().itemCount # type: ignore
+
+    def _layout_options(self, widget) -> Dict[str, Any]:
+        """The options that tell the JS engine where each item goes."""
+        return {
+            "itemExtent": widget.itemExtent,
+            "estimatedItemExtent": widget.estimatedItemExtent,
+        }
+
     
     def dispose(self):
         # Clean up the controller link to prevent memory leaks
         widget = self.get_widget()
         if widget and widget.controller: # type: ignore
             widget.controller._detach() # type: ignore
+        if self._data_source is not None:
+            self._data_source.remove_listener(self._on_data_changed)
+            self._data_source = None
+        self._release_items()
+        self._forget_cached(self._item_cache.values())
+        self._item_cache.clear()
         super().dispose()
 
+    def _release_items(self, indices: Optional[List[int]] = None):
+        """Unmounts the rendered subtrees of the given items (all if None)."""
+        if not self.framework:
+            return
+        if indices is None:
+            indices = list(self._item_root_keys)
+        for index in indices:
+            root_key = self._item_root_keys.pop(index, None)
+            if root_key is not None:
+                self.framework._release_subtree(root_key)
+
+    def _forget_cached(self, entries):
+        """
+        Releases the callbacks held by cache entries that are being dropped.
+        Only template records hold any: a regular item's callbacks belong to
+        its nodes in the rendered map and go when the item is unmounted.
+        """
+        if not self.framework:
+            return
+        for _, _, callback_names in entries:
+            if callback_names:
+                self.framework._release_callbacks(callback_names)
 
     def refresh_js(self, indices: Optional[List[int]] = None):
         """
@@ -3208,17 +3307,78 @@ class _VirtualListViewState(State):
 
         instance_name = f"{widget.key.value}_vlist" # type: ignore
         
+        # The JS side drops its cached HTML and asks for these items again.
+        self._release_items(indices)
+
         if indices is None:
-            print(f"Python: Commanding JS instance '{instance_name}' to perform a FULL refresh.")
-            js_command = f"window._pythra_instances['{instance_name}']?.refreshAll();"
+            self._forget_cached(self._item_cache.values())
+            self._item_cache.clear()
+            self._data_version += 1
+            logger.debug("Commanding JS instance '%s' to perform a FULL refresh.", instance_name)
+            js_command = f"window._pythra_instances['{instance_name}']?.refresh({self._data_version});"
         else:
-            print(f"Python: Commanding JS instance '{instance_name}' to refresh items at indices: {indices}")
+            logger.debug("Commanding JS instance '%s' to refresh items at indices: %s", instance_name, indices)
+            for index in indices:
+                entry = self._item_cache.pop((index, self._data_version), None)
+                if entry is not None:
+                    self._forget_cached([entry])
             indices_json = json.dumps(indices)
             js_command = f"window._pythra_instances['{instance_name}']?.refreshItems({indices_json});"
 
         self.framework.window.evaluate_js(self.framework.id, js_command)
 
 
+    def _on_data_changed(self, changes: List[ListChange]):
+        """
+        Called by the data source. Built items move along with the changes
+        (only removed and changed ones are dropped), and the JS engine is told
+        to do the same with its cache and to keep the rows on screen in place.
+        """
+        version = self._data_version + 1
+
+        def follow(index: Optional[int]) -> Optional[int]:
+            for change in changes:
+                if index is None or change.invalidates(index):
+                    return None
+                index = change.map_index(index)
+            return index
+
+        cache: "OrderedDict[Tuple[int, int], Tuple[Dict[str, Any], Dict, Tuple[str, ...]]]" = OrderedDict()
+        dropped = []
+        for (index, built_version), entry in self._item_cache.items():
+            new_index = follow(index) if built_version == self._data_version else None
+            if new_index is None:
+                dropped.append(entry)
+            else:
+                cache[(new_index, version)] = entry
+        self._item_cache = cache
+        self._forget_cached(dropped)
+
+        roots: Dict[int, Any] = {}
+        released = []
+        for index, root_key in self._item_root_keys.items():
+            new_index = follow(index)
+            if new_index is None:
+                released.append(root_key)
+            else:
+                roots[new_index] = root_key
+        self._item_root_keys = roots
+        if self.framework:
+            for root_key in released:
+                self.framework._release_subtree(root_key)
+
+        self._evicted = [index for index in map(follow, self._evicted) if index is not None]
+        self._data_version = version
+
+        widget = self.get_widget()
+        if not (self.framework and self.framework.window and widget):
+            return
+        instance_name = f"{widget.key.value}_vlist" # type: ignore
+        changes_json = json.dumps([change.to_js() for change in changes])
+        js_command = (f"window._pythra_instances['{instance_name}']"
+                      f"?.applyChanges({changes_json}, {self._item_count()}, {version});")
+        self.framework.window.evaluate_js(self.framework.id, js_command)
+
     def build_item_for_js(self, index: int) -> Dict[str, Any]:
         """
         This method is called by the API.
@@ -3227,10 +3387,79 @@ class _VirtualListViewState(State):
         # The check for widget and framework is still good practice here.
         if not widget or not self.framework:
             return {"html": "<div>Error</div>", "css": "", "callbacks": {}}
-            
+
+        css_details: Dict = {}
+        payload = self._item_payload(index, css_details)
+        evicted, self._evicted = self._evicted, []
+        return {
+            **payload,
+            "css": self.framework._generate_css_from_details(css_details),
+            "evicted": evicted,
+            "templates": self._templates_for([payload]),
+        }
+
+    def build_items_for_js(self, start: int, end: int) -> Dict[str, Any]:
+        """
+        Builds the items in [start, end) for one bridge round trip.
+
+        Returns `items` (index -> html and callback names, or a template data
+        record), the `templates` those records are stamped into, the CSS of
+        all of them at once, the `evicted` indices JS must forget (their
+        callbacks are gone) and the data `version` the items were built from.
+        """
+        widget = self.get_widget()
+        if not widget or not self.framework:
+            return {"items": {}, "templates": {}, "css": "", "evicted": [], "version": self._data_version}
+
+        # A batch never evicts its own items.
+        start = max(0, start)
+        end = min(end, self._item_count(), start + max(1, widget.maxCachedItems // 2)) # type: ignore
+        css_details: Dict = {}
+        items = {str(index): self._item_payload(index, css_details) for index in range(start, end)}
+        evicted, self._evicted = self._evicted, []
+        return {
+            "items": items,
+            "templates": self._templates_for(items.values()),
+            "css": self.framework._generate_css_from_details(css_details),
+            "evicted": evicted,
+            "version": self._data_version,
+        }
+
+    def _templates_for(self, payloads) -> Dict[str, Any]:
+        """The templates the data records among `payloads` are stamped into."""
+        if self._item_templates is None:
+            return {}
+        used = {payload["t"] for payload in payloads if "t" in payload}
+        return {str(t): self._item_templates.templates[t].to_js() for t in used}
+
+    def _item_payload(self, index: int, css_details: Dict) -> Dict[str, Any]:
+        """The HTML and callback names (or template record) of one item, from the cache or freshly built."""
+        cache_key = (index, self._data_version)
+        cached = self._item_cache.get(cache_key)
+        if cached is not None:
+            self._item_cache.move_to_end(cache_key)
+            css_details.update(cached[1])
+            return cached[0]
+
+        # A rebuilt item replaces whatever was built for this index before.
+        self._release_items([index])
+
+        widget = self.get_widget()
         widget_to_build = widget.itemBuilder(index) # type: ignore
         built_tree = self.framework._build_widget_tree(widget_to_build)
-        
+
+        if self._item_templates is not None:
+            # Items of a known shape skip the reconciler: no ids, no map entries,
+            # just the values that go into the template's slots.
+            compiled = self._item_templates.compile(built_tree, self.framework.reconciler)
+            if compiled is not None:
+                # No nodes hold these callbacks, so the cache entry does.
+                self.framework._register_callbacks(compiled.callbacks)
+                self.framework._retain_callbacks(compiled.callbacks)
+                payload = compiled.record()
+                return self._cache_item(cache_key, payload, compiled.css_details, css_details,
+                                        tuple(compiled.callbacks))
+
         main_context_map = self.framework.reconciler.get_map_for_context("main")
         result = self.framework.reconciler.reconcile(
             previous_map=main_context_map,
@@ -3238,22 +3467,40 @@ class _VirtualListViewState(State):
             parent_html_id='__limbo__',
             is_partial_reconciliation=True
         )
-        
-        main_context_map.update(result.new_rendered_map)
-        
+
+        self.framework.stylesheet.register(result.active_css_details)
+        self.framework._merge_rendered_nodes(result.new_rendered_map)
+
         root_key = built_tree.get_unique_id() if built_tree else None
+        if root_key is not None:
+            self._item_root_keys[index] = root_key
         html_string = self.framework._generate_html_from_map(root_key, result.new_rendered_map)
-        css_string = self.framework._generate_css_from_details(result.active_css_details)
         callbacks = result.registered_callbacks
-        
-        for name, func in callbacks.items():
-            self.framework.api.register_callback(name, func)
 
-        return {
+        self.framework._register_callbacks(callbacks)
+
+        payload = {
             "html": html_string,
-            "css": css_string,
             "callback_names": list(callbacks.keys())
         }
+        return self._cache_item(cache_key, payload, result.active_css_details, css_details)
+
+    def _cache_item(self, cache_key, payload: Dict[str, Any], item_css: Dict, css_details: Dict,
+                    callback_names: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        self._item_cache[cache_key] = (payload, item_css, callback_names)
+        css_details.update(item_css)
+        self._evict_items()
+        return payload
+
+    def _evict_items(self):
+        """Unmounts the least recently used items beyond the widget's `maxCachedItems`."""
+        limit = self.get_widget().maxCachedItems # type: ignore
+        while len(self._item_cache) > limit:
+            (index, version), entry = self._item_cache.popitem(last=False)
+            self._forget_cached([entry])
+            if version == self._data_version:
+                self._release_items([index])
+                self._evicted.append(index)
 
 
     def build(self) -> Widget:
@@ -3263,7 +3510,7 @@ class _VirtualListViewState(State):
         # print("virtualization_options: ", self._virtualization_options)
         widget = self.get_widget()
         if not widget:
-            print('!!widget is not found!! vlist')
+            logger.warning("Virtual list widget not found; rendering a placeholder.")
             # Return a placeholder if the widget is somehow gone
             return Container(width=0, height=0)
 
@@ -3310,7 +3557,7 @@ class VirtualListView(StatefulWidget):
     **Key Concepts:**
     1.  **Virtualization**: The core technique. Only visible items exist in the DOM, keeping the app fast and lightweight.
     2.  **`itemBuilder`**: A function you provide that acts as a factory. The list calls it on-demand with an `index` to get the widget for that specific item.
-    3.  **`itemExtent`**: The fixed height (for vertical lists) of each item. This is **crucial** for the virtualization logic to calculate which items should be visible and where to position the scrollbar. All items *must* have the same size.
+    3.  **`itemExtent`**: The fixed height (for vertical lists) of each item. When every item has the same size, this lets the list compute positions directly. Leave it out for rows of different heights (chats, logs): the list then starts from `estimatedItemExtent`, measures each row once it is rendered and keeps the offsets in a prefix-sum index, holding the rows on screen still while estimates are corrected.
     4.  **`VirtualListController`**: An object you create to programmatically control the list, such as forcing it to refresh its data.
 
     **Examples:**
@@ -3335,6 +3582,15 @@ class VirtualListView(StatefulWidget):
         itemExtent=72             # The fixed height of each ListTile
     )
 
+    # Rows of different heights: give an estimate instead of a fixed extent
+    VirtualListView(
+        key=Key("chat"),
+        controller=chat_controller,
+        itemCount=len(messages),
+        itemBuilder=lambda i: MessageBubble(messages[i]),
+        estimatedItemExtent=64
+    )
+
     # Later, to refresh the list after data changes:
     # list_controller.refresh()
     ```
@@ -3342,34 +3598,64 @@ class VirtualListView(StatefulWidget):
     **Key parameters:**
     - **key**: A **required** unique `Key` to identify this stateful widget.
     - **controller**: A **required** `VirtualListController` instance to manage the list.
-    - **itemCount**: The total number of items in the list.
+    - **itemCount**: The total number of items in the list (None with a `dataSource`).
     - **itemBuilder**: A function that takes an `int` (index) and returns a `Widget`.
-    - **itemExtent**: The fixed size (usually height) in pixels of each item.
+    - **itemExtent**: The fixed size (usually height) in pixels of each item, or None
+      for measured, variable heights.
+    - **estimatedItemExtent**: The height assumed for rows not measured yet (variable mode).
     - **theme**: An optional `ScrollbarTheme` for the scrollbar's appearance.
     - **width**, **height**: The dimensions of the scrollable container.
+    - **maxCachedItems**: How many built items are kept (least recently used go first).
+    - **prefetchViewports**: How many screens ahead, in the scroll direction, are built early.
+    - **useItemTemplates**: Opt-in. The first item of each shape is compiled into an HTML
+      template and later items are sent as the few values that differ (texts, image
+      sources, callback names), skipping the reconciler. Best for long lists of similar
+      rows; rows with StatefulWidgets or JS-backed widgets are still built in full.
+    - **dataSource**: A `ListDataSource` (see `pythra.data_sources`). Its insert, remove,
+      change and move notifications shift the built items instead of rebuilding them,
+      and the rows on screen stay put. `itemCount` may then be None.
+    - **followTail**: When the list is scrolled to its end, items added there keep it at
+      the end (log views).
 
     **Performance notes:**
     This is the definitive solution for performance with large lists. Its memory and CPU usage
     remain flat and low, regardless of whether `itemCount` is 100 or 1,000,000, because it
-    only ever renders a small, constant number of DOM elements.
+    only ever renders a small, constant number of DOM elements. Items are fetched a whole
+    range per round trip and the next screen is built before it scrolls into view.
     """
     def __init__(self,
                  key: Key,
                  controller: VirtualListController, # <-- Requires a controller
-                 itemCount: int,
+                 itemCount: Optional[int],
                  itemBuilder: Callable[[int], Widget],
-                 itemExtent: float,
+                 itemExtent: Optional[float] = None,
                  # --- REMOVE data_version ---
                  initialItemCount: int = 20,
                  theme: Optional[ScrollbarTheme] = None,
                  width: Optional[Any] = '100%',
-                 height: Optional[Any] = '100%'):
+                 height: Optional[Any] = '100%',
+                 maxCachedItems: int = 500,
+                 prefetchViewports: float = 1,
+                 estimatedItemExtent: float = 48,
+                 useItemTemplates: bool = False,
+                 dataSource: Optional[ListDataSource] = None,
+                 followTail: bool = False):
+        if itemCount is None:
+            if dataSource is None:
+                raise ValueError("VirtualListView needs an itemCount or a dataSource.")
+            itemCount = dataSource.itemCount
 
         self.controller = controller
         self.itemCount = itemCount
         self.itemBuilder = itemBuilder
         self.itemExtent = itemExtent
+        self.estimatedItemExtent = estimatedItemExtent
         self.initialItemCount = initialItemCount
+        self.maxCachedItems = max(1, maxCachedItems)
+        self.prefetchViewports = prefetchViewports
+        self.useItemTemplates = useItemTemplates
+        self.dataSource = dataSource
+        self.followTail = followTail
         self.theme = theme
         self.width = width
         self.height = height
@@ -3379,6 +3665,107 @@ class VirtualListView(StatefulWidget):
         return _VirtualListViewState()
 
 
+class _VirtualGridViewState(_VirtualListViewState):
+    """
+    The state behind `VirtualGridView`. Items are built, cached and sent to JS
+    exactly as for `VirtualListView`; only the layout options differ, so the JS
+    engine places the items in cells instead of rows.
+    """
+    def _layout_options(self, widget) -> Dict[str, Any]:
+        return {
+            "grid": {
+                "crossAxisCount": widget.crossAxisCount,
+                "maxCrossAxisExtent": widget.maxCrossAxisExtent,
+                "crossAxisExtent": widget.crossAxisExtent,
+                "mainAxisExtent": widget.mainAxisExtent,
+                "mainAxisSpacing": widget.mainAxisSpacing,
+                "crossAxisSpacing": widget.crossAxisSpacing,
+                "childAspectRatio": widget.childAspectRatio,
+            }
+        }
+
+
+class VirtualGridView(VirtualListView):
+    """
+    A scrollable grid that only renders the cells currently on screen. It is
+    the grid counterpart of `VirtualListView`, and is usually created with
+    `GridView.builder(...)`.
+
+    **Real-world analogy:**
+    A wall of post office boxes seen through a small window. Only the boxes in
+    the window are lit and filled; as the window slides over the wall (in
+    either direction), the boxes that come into view are filled and the ones
+    that leave it are emptied and reused.
+
+    **How the layout works:**
+    - Columns are either fixed (`crossAxisCount`) or as many as fit, each at
+      most `maxCrossAxisExtent` wide.
+    - A cell is as wide as its column. Give `crossAxisExtent` as well as
+      `crossAxisCount` for fixed-width columns; a grid wider than its viewport
+      then scrolls sideways and its columns are virtualized too.
+    - A cell is `mainAxisExtent` tall, or its width divided by `childAspectRatio`.
+    - The list engine's channel does the building: cells are fetched a range
+      at a time, cached (least recently used go first) and prefetched ahead
+      of the scroll.
+
+    **Key parameters (beyond `VirtualListView`'s):**
+    - **crossAxisCount**: The number of columns.
+    - **maxCrossAxisExtent**: The widest a column may be; the column count
+      follows the viewport width. Used when `crossAxisCount` is None.
+    - **crossAxisExtent**: A fixed column width (with `crossAxisCount`).
+    - **mainAxisExtent**: A fixed cell height; overrides `childAspectRatio`.
+    - **mainAxisSpacing**, **crossAxisSpacing**: The gaps between rows and columns.
+    - **childAspectRatio**: Cell width / height.
+    """
+    def __init__(self,
+                 key: Key,
+                 itemCount: Optional[int],
+                 itemBuilder: Callable[[int], Widget],
+                 controller: Optional[VirtualListController] = None,
+                 crossAxisCount: Optional[int] = None,
+                 maxCrossAxisExtent: Optional[float] = None,
+                 crossAxisExtent: Optional[float] = None,
+                 mainAxisExtent: Optional[float] = None,
+                 mainAxisSpacing: float = 0,
+                 crossAxisSpacing: float = 0,
+                 childAspectRatio: float = 1.0,
+                 initialItemCount: int = 20,
+                 theme: Optional[ScrollbarTheme] = None,
+                 width: Optional[Any] = '100%',
+                 height: Optional[Any] = '100%',
+                 maxCachedItems: int = 500,
+                 prefetchViewports: float = 1,
+                 useItemTemplates: bool = False,
+                 dataSource: Optional[ListDataSource] = None,
+                 followTail: bool = False):
+        if crossAxisCount is None and maxCrossAxisExtent is None:
+            raise ValueError("VirtualGridView needs crossAxisCount or maxCrossAxisExtent.")
+
+        self.crossAxisCount = max(1, crossAxisCount) if crossAxisCount is not None else None
+        self.maxCrossAxisExtent = maxCrossAxisExtent
+        self.crossAxisExtent = crossAxisExtent
+        self.mainAxisExtent = mainAxisExtent
+        self.mainAxisSpacing = mainAxisSpacing
+        self.crossAxisSpacing = crossAxisSpacing
+        self.childAspectRatio = max(0.01, childAspectRatio) # Ensure positive aspect ratio
+        super().__init__(key=key,
+                         controller=controller, # type: ignore
+                         itemCount=itemCount,
+                         itemBuilder=itemBuilder,
+                         initialItemCount=initialItemCount,
+                         theme=theme,
+                         width=width,
+                         height=height,
+                         maxCachedItems=maxCachedItems,
+                         prefetchViewports=prefetchViewports,
+                         useItemTemplates=useItemTemplates,
+                         dataSource=dataSource,
+                         followTail=followTail)
+
+    def createState(self) -> _VirtualGridViewState:
+        return _VirtualGridViewState()
+
+
 # =============================================================================
 # LIST VIEW - The Simple, Standard Scrollable List
 # =============================================================================
@@ -3448,7 +3835,7 @@ class ListView(Widget):
     building, laying out, and painting every widget can lead to a slow UI.
     **Always profile and switch to `VirtualListView` if performance suffers.**
     """
-    shared_styles: Dict[Tuple, str] = {} # Class variable for shared CSS
+    shared_styles: Dict[Tuple, str] = SharedStyles() # Class variable for shared CSS
 
     def __init__(self,
                  children: List[Widget], # Children are core to ListView
@@ -3493,7 +3880,7 @@ class ListView(Widget):
         )
 
         if self.style_key not in ListView.shared_styles:
-            self.css_class = f"shared-listview-{len(ListView.shared_styles)}"
+            self.css_class = f"shared-listview-{ListView.shared_styles.next_index()}"
             ListView.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = ListView.shared_styles[self.style_key]
@@ -3575,11 +3962,9 @@ class ListView(Widget):
             padding_obj = padding_repr
             padding_style = ""
             if isinstance(padding_obj, EdgeInsets):
-                print(f"padding: {padding_repr};")
                 padding_style = f"padding: {padding_obj.to_css_value()};"
             elif padding_repr: # Handle fallback if not EdgeInsets obj
                 padding_style = f"padding: {padding_repr};" # Assumes it's already CSS string? Risky.
-                print(f"padding: {padding_repr};")
 
 
             # Combine styles
@@ -3668,9 +4053,19 @@ class GridView(Widget):
     - **scrollDirection**: `Axis.VERTICAL` (default) or `Axis.HORIZONTAL`.
 
     **Performance notes:**
-    Like `ListView`, the standard `GridView` renders all of its children at once. This is perfectly fine for dozens of items, but it can cause performance issues with hundreds or thousands of items. For very large grids, a virtualized version (`VirtualGridView`, if available) would be necessary to maintain a smooth user experience.
+    Like `ListView`, the standard `GridView` renders all of its children at once. This is perfectly fine for dozens of items, but it can cause performance issues with hundreds or thousands of items. For very large grids, use `GridView.builder(...)`, which returns a `VirtualGridView` that only builds the cells on screen:
+    ```python
+    GridView.builder(
+        key=Key("gallery"),
+        itemCount=len(photos),
+        itemBuilder=lambda i: Image(src=photos[i]),
+        maxCrossAxisExtent=160,
+        mainAxisSpacing=8,
+        crossAxisSpacing=8,
+    )
+    ```
     """
-    shared_styles: Dict[Tuple, str] = {} # Class variable for shared CSS
+    shared_styles: Dict[Tuple, str] = SharedStyles() # Class variable for shared CSS
 
     def __init__(self,
                  children: List[Widget], # Grid items
@@ -3722,11 +4117,24 @@ class GridView(Widget):
         )
 
         if self.style_key not in GridView.shared_styles:
-            self.css_class = f"shared-gridview-{len(GridView.shared_styles)}"
+            self.css_class = f"shared-gridview-{GridView.shared_styles.next_index()}"
             GridView.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = GridView.shared_styles[self.style_key]
 
+    @staticmethod
+    def builder(key: Key,
+                itemCount: Optional[int],
+                itemBuilder: Callable[[int], Widget],
+                **kwargs) -> 'VirtualGridView':
+        """
+        A grid whose cells are built on demand by `itemBuilder`, only while
+        they are on screen. Takes the layout arguments of `VirtualGridView`
+        (`crossAxisCount` or `maxCrossAxisExtent`, spacings, `childAspectRatio`,
+        `mainAxisExtent`, ...).
+        """
+        return VirtualGridView(key=key, itemCount=itemCount, itemBuilder=itemBuilder, **kwargs)
+
     def render_props(self) -> Dict[str, Any]:
         """Return properties for diffing by the Reconciler."""
         props = {
@@ -3791,10 +4199,8 @@ class GridView(Widget):
             padding_style = ""
             if isinstance(padding_obj, EdgeInsets):
                  padding_style = f"padding: {padding_obj.to_css()};"
-                 print(padding_style)
             elif padding_repr:
                  padding_style = f"padding: {padding_repr};" # Fallback
-                 print(padding_style)
 
 
             # Grid Layout Properties
@@ -3931,7 +4337,7 @@ class Stack(Widget):
     **Using with `Positioned`:**
     The true power of `Stack` is unlocked with the `Positioned` widget. Wrap any child of a `Stack` in `Positioned` and provide properties like `top`, `bottom`, `left`, or `right` to anchor it to the stack's edges.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  children: List[Widget],
@@ -3962,7 +4368,7 @@ class Stack(Widget):
         )
 
         if self.style_key not in Stack.shared_styles:
-            self.css_class = f"shared-stack-{len(Stack.shared_styles)}"
+            self.css_class = f"shared-stack-{Stack.shared_styles.next_index()}"
             Stack.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Stack.shared_styles[self.style_key]
@@ -4559,7 +4965,7 @@ class AppBar(Widget):
        slot wrappers like .appbar-leading, .appbar-title, .appbar-actions, .appbar-bottom
        which are styled by the generated CSS for predictable layout.
     """
-    shared_styles: Dict[Tuple, str] = {} # Class variable for shared CSS
+    shared_styles: Dict[Tuple, str] = SharedStyles() # Class variable for shared CSS
 
     def __init__(self,
                  key: Optional[Key] = None,
@@ -4619,7 +5025,7 @@ class AppBar(Widget):
         )
 
         if self.style_key not in AppBar.shared_styles:
-            self.css_class = f"shared-appbar-{len(AppBar.shared_styles)}"
+            self.css_class = f"shared-appbar-{AppBar.shared_styles.next_index()}"
             AppBar.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = AppBar.shared_styles[self.style_key]
@@ -5014,7 +5420,7 @@ class BottomNavigationBar(Widget):
     - **elevation**: The z-axis elevation of the bar, which controls its shadow.
     - **height**: The height of the navigation bar container.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  items: List[BottomNavigationBarItem],
@@ -5094,7 +5500,7 @@ class BottomNavigationBar(Widget):
         )
 
         if self.style_key not in BottomNavigationBar.shared_styles:
-            self.css_class = f"shared-bottomnav-{len(BottomNavigationBar.shared_styles)}"
+            self.css_class = f"shared-bottomnav-{BottomNavigationBar.shared_styles.next_index()}"
             BottomNavigationBar.shared_styles[self.style_key] = self.css_class
              # Register callback centrally (Framework approach preferred)
              # if onTap and self.onTapName:
@@ -5245,7 +5651,7 @@ class Scaffold(Widget):
        .scaffold-scrim which are styled by generated CSS to ensure correct
        placement and interaction.
     """
-    shared_styles: Dict[Tuple, str] = {} # For Scaffold container styles
+    shared_styles: Dict[Tuple, str] = SharedStyles() # For Scaffold container styles
 
     def __init__(self,
                  key: Optional[Key] = None,
@@ -5309,7 +5715,7 @@ class Scaffold(Widget):
         )
 
         if self.style_key not in Scaffold.shared_styles:
-            self.css_class = f"shared-scaffold-{len(Scaffold.shared_styles)}"
+            self.css_class = f"shared-scaffold-{Scaffold.shared_styles.next_index()}"
             Scaffold.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Scaffold.shared_styles[self.style_key]
@@ -5560,7 +5966,7 @@ class TextField(Widget):
     3. **Validate input** and show errors using decoration.errorText
     4. **Consider accessibility** with proper labels and hints
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  # value: str,
@@ -5602,7 +6008,7 @@ class TextField(Widget):
         self.style_key = make_hashable(self.decoration)
 
         if self.style_key not in TextField.shared_styles:
-            self.css_class = f"shared-textfield-{len(TextField.shared_styles)}"
+            self.css_class = f"shared-textfield-{TextField.shared_styles.next_index()}"
             TextField.shared_styles[self.style_key] = self.css_class # type: ignore
         else:
             self.css_class = TextField.shared_styles[self.style_key] # type: ignore
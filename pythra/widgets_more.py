@@ -37,6 +37,7 @@ then widgets_more.py is your "power tools workshop" (table saw, router, advanced
 - When the basic widgets aren't specialized enough for your needs
 """
 
+import logging
 import uuid
 import yaml
 import os
@@ -49,6 +50,7 @@ from .styles import *
 from .icons import *
 from .icons.base import IconData # Import the new data class
 from .controllers import *
+from .stylesheet import SharedStyles
 from .config import Config
 from .events import TapDetails, PanUpdateDetails
 import weakref
@@ -64,6 +66,8 @@ from .drawing import (
 ) # Import the new command widgets
 #from .drawing import Path
 
+logger = logging.getLogger(__name__)
+
 config = Config()
 assets_dir = config.get('assets_dir', 'assets')
 port = config.get('assets_server_port')
@@ -301,7 +305,7 @@ class Drawer(Widget):
     Keep drawer content organized and prioritize the most important navigation
     items at the top. Users' eyes naturally scan from top to bottom!
     """
-    shared_styles: Dict[Tuple, str] = {} # For shared Drawer styling
+    shared_styles: Dict[Tuple, str] = SharedStyles() # For shared Drawer styling
 
     # Remove Singleton pattern (__new__) - Allow multiple instances
 
@@ -341,7 +345,7 @@ class Drawer(Widget):
         )
 
         if self.style_key not in Drawer.shared_styles:
-            self.css_class = f"shared-drawer-content-{len(Drawer.shared_styles)}" # Class for *content* styling
+            self.css_class = f"shared-drawer-content-{Drawer.shared_styles.next_index()}" # Class for *content* styling
             Drawer.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Drawer.shared_styles[self.style_key]
@@ -480,7 +484,7 @@ class EndDrawer(Widget):
     **Note on State:**
     You do not control the visibility of the `EndDrawer` directly with a boolean flag. The `Scaffold` manages its open/closed state internally. You interact with it programmatically through a `ScaffoldState` object.
     """
-    shared_styles: Dict[Tuple, str] = {} # For shared EndDrawer styling (if any distinct from Drawer)
+    shared_styles: Dict[Tuple, str] = SharedStyles() # For shared EndDrawer styling (if any distinct from Drawer)
 
     # Remove Singleton pattern (__new__)
 
@@ -517,7 +521,7 @@ class EndDrawer(Widget):
 
         # Could reuse Drawer.shared_styles if styling is identical
         if self.style_key not in EndDrawer.shared_styles:
-            self.css_class = f"shared-enddrawer-content-{len(EndDrawer.shared_styles)}"
+            self.css_class = f"shared-enddrawer-content-{EndDrawer.shared_styles.next_index()}"
             EndDrawer.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = EndDrawer.shared_styles[self.style_key]
@@ -653,7 +657,7 @@ class BottomSheet(Widget):
     **Note on State:**
     Similar to a `Drawer`, the state (open/closed) of a `BottomSheet` is managed externally by its parent. You don't set an `is_open` property directly on the widget itself.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     # Remove Singleton pattern (__new__)
 
@@ -713,7 +717,7 @@ class BottomSheet(Widget):
         )
 
         if self.style_key not in BottomSheet.shared_styles:
-            self.css_class = f"shared-bottomsheet-{len(BottomSheet.shared_styles)}"
+            self.css_class = f"shared-bottomsheet-{BottomSheet.shared_styles.next_index()}"
             BottomSheet.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = BottomSheet.shared_styles[self.style_key]
@@ -887,7 +891,7 @@ class SnackBarAction(Widget):
     The styling of the `SnackBarAction` is heavily guided by Material Design principles to ensure it looks
     like a button and has adequate touch targets. You primarily control the label text and its color.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     # Remove Singleton pattern (__new__)
 
@@ -916,7 +920,7 @@ class SnackBarAction(Widget):
         )
 
         if self.style_key not in SnackBarAction.shared_styles:
-            self.css_class = f"shared-snackbar-action-{len(SnackBarAction.shared_styles)}"
+            self.css_class = f"shared-snackbar-action-{SnackBarAction.shared_styles.next_index()}"
             SnackBarAction.shared_styles[self.style_key] = self.css_class
             # Register callback centrally (Framework approach preferred)
             # if self.onPressed and self.onPressed_id:
@@ -1043,7 +1047,7 @@ class SnackBar(Widget):
     - **shapeRadius**: The roundness of the corners.
     - **elevation**: The z-axis elevation, which controls the shadow's prominence.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     # Remove Singleton pattern (__new__)
 
@@ -1102,7 +1106,7 @@ class SnackBar(Widget):
         )
 
         if self.style_key not in SnackBar.shared_styles:
-            self.css_class = f"shared-snackbar-{len(SnackBar.shared_styles)}"
+            self.css_class = f"shared-snackbar-{SnackBar.shared_styles.next_index()}"
             SnackBar.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = SnackBar.shared_styles[self.style_key]
@@ -1318,7 +1322,7 @@ class Center(Widget):
     - Empty states and placeholder content
     - Modal dialogs and popups
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  child: Widget, # Requires exactly one child
@@ -1336,7 +1340,7 @@ class Center(Widget):
         self.style_key = ('center-widget',) # Simple key, always the same style
 
         if self.style_key not in Center.shared_styles:
-            self.css_class = f"shared-center-{len(Center.shared_styles)}"
+            self.css_class = f"shared-center-{Center.shared_styles.next_index()}"
             Center.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Center.shared_styles[self.style_key]
@@ -1437,7 +1441,7 @@ class Placeholder(Widget):
     - **strokeWidth**: The thickness of the dashed border.
     - **fallbackText**: The text to display inside the placeholder box.
     """
-    shared_styles: Dict[Tuple, str] = {} # For the placeholder box style
+    shared_styles: Dict[Tuple, str] = SharedStyles() # For the placeholder box style
 
     def __init__(self,
                  key: Optional[Key] = None,
@@ -1470,7 +1474,7 @@ class Placeholder(Widget):
         )
 
         if self.style_key not in Placeholder.shared_styles:
-            self.css_class = f"shared-placeholder-{len(Placeholder.shared_styles)}"
+            self.css_class = f"shared-placeholder-{Placeholder.shared_styles.next_index()}"
             Placeholder.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Placeholder.shared_styles[self.style_key]
@@ -2040,7 +2044,7 @@ class Flex(Widget):
     - **crossAxisAlignment**: How the children should be placed along the axis perpendicular to the `direction`. Options include `START`, `CENTER`, `END`, `STRETCH`.
     - **padding**: Optional `EdgeInsets` to create space around the flex container.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  children: List[Widget],
@@ -2072,7 +2076,7 @@ class Flex(Widget):
         )
 
         if self.style_key not in Flex.shared_styles:
-            self.css_class = f"shared-flex-{len(Flex.shared_styles)}"
+            self.css_class = f"shared-flex-{Flex.shared_styles.next_index()}"
             Flex.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Flex.shared_styles[self.style_key]
@@ -2190,7 +2194,7 @@ class Wrap(Widget):
     - **alignment**: How the children are aligned within a single run (e.g., `MainAxisAlignment.START`).
     - **runAlignment**: How the runs themselves are aligned within the `Wrap` (e.g., `MainAxisAlignment.CENTER`).
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  children: List[Widget],
@@ -2230,7 +2234,7 @@ class Wrap(Widget):
         )
 
         if self.style_key not in Wrap.shared_styles:
-            self.css_class = f"shared-wrap-{len(Wrap.shared_styles)}"
+            self.css_class = f"shared-wrap-{Wrap.shared_styles.next_index()}"
             Wrap.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Wrap.shared_styles[self.style_key]
@@ -2385,7 +2389,7 @@ class Dialog(Widget):
     - **shape**: The `BorderRadius` of the dialog's corners.
     - **barrierColor**: The color of the scrim that overlays the background content.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     # Remove Singleton pattern (__new__)
 
@@ -2460,7 +2464,7 @@ class Dialog(Widget):
         )
 
         if self.style_key not in Dialog.shared_styles:
-            self.css_class = f"shared-dialog-{len(Dialog.shared_styles)}"
+            self.css_class = f"shared-dialog-{Dialog.shared_styles.next_index()}"
             Dialog.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Dialog.shared_styles[self.style_key]
@@ -2802,7 +2806,7 @@ class ListTile(Widget):
     and `trailing` children. State changes (like `selected` or `disabled`) are handled by
     dynamically adding CSS classes, allowing for efficient and clean styling.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Optional[Key] = None,
@@ -2846,7 +2850,7 @@ class ListTile(Widget):
         self.style_key = (self.dense, make_hashable(self.contentPadding))
 
         if self.style_key not in ListTile.shared_styles:
-            self.css_class = f"shared-listtile-{len(ListTile.shared_styles)}"
+            self.css_class = f"shared-listtile-{ListTile.shared_styles.next_index()}"
             ListTile.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = ListTile.shared_styles[self.style_key]
@@ -3011,7 +3015,7 @@ class Slider(Widget):
     - **divisions**: If set to an integer, the slider becomes discrete, snapping to a number of evenly spaced intervals.
     - **theme**: A `SliderTheme` object for comprehensive styling of the track, thumb, and overlay.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -3062,8 +3066,6 @@ class Slider(Widget):
         self.thumbBorderRadius = thumbBorderRadius.to_css_value() if thumbBorderRadius else "50%"
         self.overlaySize = theme.overlaySize
 
-        print("thumbBorderRadius: ", self.thumbBorderRadius)
-
         # --- Callback Management (no change) ---
         self.on_drag_update_name = f"slider_update_{id(self.controller)}"
         # Api.instance().register_callback(self.on_drag_update_name, self._handle_drag_update)
@@ -3077,7 +3079,7 @@ class Slider(Widget):
         )
         
         if self.style_key not in Slider.shared_styles:
-            self.css_class = f"shared-slider-{len(Slider.shared_styles)}"
+            self.css_class = f"shared-slider-{Slider.shared_styles.next_index()}"
             Slider.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Slider.shared_styles[self.style_key]
@@ -3086,7 +3088,7 @@ class Slider(Widget):
 
     def _handle_drag_update(self, new_value: float, drag_ended: bool):
         # This method remains the same
-        print(f'HANDLE DRAG TRIGGERD WITH VALUE: {new_value}')
+        logger.debug("Slider drag update: %s (ended: %s)", new_value, drag_ended)
         self.controller.isDragEnded = drag_ended
         clamped_value = max(self.min, min(self.max, new_value))
         
@@ -3302,7 +3304,7 @@ class Checkbox(Widget):
     This checkbox follows Material Design 3 guidelines with proper
     animations, ripple effects, and theming support.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -3348,7 +3350,7 @@ class Checkbox(Widget):
         )
 
         if self.style_key not in Checkbox.shared_styles:
-            self.css_class = f"shared-checkbox-{len(Checkbox.shared_styles)}"
+            self.css_class = f"shared-checkbox-{Checkbox.shared_styles.next_index()}"
             Checkbox.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Checkbox.shared_styles[self.style_key]
@@ -3585,7 +3587,7 @@ class Switch(Widget):
     Follows Material Design 3 guidelines with proper colors, animations,
     and interaction patterns for consistency across your app.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -3628,7 +3630,7 @@ class Switch(Widget):
         )
 
         if self.style_key not in Switch.shared_styles:
-            self.css_class = f"shared-switch-{len(Switch.shared_styles)}"
+            self.css_class = f"shared-switch-{Switch.shared_styles.next_index()}"
             Switch.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Switch.shared_styles[self.style_key]
@@ -3788,7 +3790,7 @@ class Radio(Widget):
     - **onChanged**: A callback function that is invoked with the radio's `value` when it is tapped.
     - **theme**: An optional `RadioTheme` to customize the colors and appearance.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -3831,7 +3833,7 @@ class Radio(Widget):
         )
 
         if self.style_key not in Radio.shared_styles:
-            self.css_class = f"shared-radio-{len(Radio.shared_styles)}"
+            self.css_class = f"shared-radio-{Radio.shared_styles.next_index()}"
             Radio.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Radio.shared_styles[self.style_key]
@@ -3983,7 +3985,7 @@ class Dropdown(Widget):
     - **hintText**: The placeholder text to display when no value is selected.
     - **theme**: An optional `DropdownTheme` for detailed styling of the button and the menu.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -4044,7 +4046,7 @@ class Dropdown(Widget):
                             self.dropdownMargin, self.itemPadding, self.dropDirection)
         
         if self.style_key not in Dropdown.shared_styles:
-            self.css_class = f"shared-dropdown-{len(Dropdown.shared_styles)}"
+            self.css_class = f"shared-dropdown-{Dropdown.shared_styles.next_index()}"
             Dropdown.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = Dropdown.shared_styles[self.style_key]
@@ -4264,7 +4266,7 @@ class GestureDetector(Widget):
     - **onLongPress**: Called when the user holds their finger or mouse down for an extended period.
     - **onPanStart**, **onPanUpdate**, **onPanEnd**: A sequence of callbacks that fire when the user initiates, moves, and releases a drag gesture. `onPanUpdate` provides `PanUpdateDetails` with the delta (change in position).
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -4303,7 +4305,7 @@ class GestureDetector(Widget):
         self.style_key = (has_tap, has_pan)
 
         if self.style_key not in GestureDetector.shared_styles:
-            self.css_class = f"shared-gesture-{len(GestureDetector.shared_styles)}"
+            self.css_class = f"shared-gesture-{GestureDetector.shared_styles.next_index()}"
             GestureDetector.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = GestureDetector.shared_styles[self.style_key]
@@ -4438,7 +4440,7 @@ class GradientBorderContainer(Widget):
     - **borderWidth**: The thickness of the gradient border in pixels.
     - **theme**: A `GradientBorderTheme` object that controls the `colors`, `direction`, `speed`, and animation `timing` of the gradient.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -4457,7 +4459,7 @@ class GradientBorderContainer(Widget):
         self.style_key = self.theme.to_tuple()
 
         if self.style_key not in GradientBorderContainer.shared_styles:
-            self.css_class = f"shared-gradient-border-{len(GradientBorderContainer.shared_styles)}"
+            self.css_class = f"shared-gradient-border-{GradientBorderContainer.shared_styles.next_index()}"
             GradientBorderContainer.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = GradientBorderContainer.shared_styles[self.style_key]
@@ -4606,7 +4608,7 @@ class GradientClipPathBorder(Widget):
     - **borderWidth**: The thickness of the animated gradient border in pixels.
     - **theme**: A `GradientBorderTheme` object that controls the `colors`, `direction`, `speed`, and animation `timing` of the gradient.
     """
-    shared_styles: Dict[Tuple, str] = {}
+    shared_styles: Dict[Tuple, str] = SharedStyles()
 
     def __init__(self,
                  key: Key,
@@ -4631,7 +4633,7 @@ class GradientClipPathBorder(Widget):
         self.style_key = self.theme.to_tuple()
 
         if self.style_key not in GradientClipPathBorder.shared_styles:
-            self.css_class = f"shared-gradient-clip-{len(GradientClipPathBorder.shared_styles)}"
+            self.css_class = f"shared-gradient-clip-{GradientClipPathBorder.shared_styles.next_index()}"
             GradientClipPathBorder.shared_styles[self.style_key] = self.css_class
         else:
             self.css_class = GradientClipPathBorder.shared_styles[self.style_key]
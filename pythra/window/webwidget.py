@@ -88,6 +88,7 @@ import io                                       # Input/Output operations
 from contextlib import redirect_stdout, redirect_stderr  # Context managers for stream redirection
 
 import threading
+import logging
 import wmi
 
 # =============================================================================
@@ -98,6 +99,9 @@ import wmi
 # These classes define the data structures for touch and gesture events
 # that get passed between the JavaScript frontend and Python backend
 from ..events import TapDetails, PanUpdateDetails
+from ..scheduler import handling_input
+
+logger = logging.getLogger(__name__)
 
 QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
 QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
@@ -333,6 +337,10 @@ class WindowManager:
             print(f"Window ID {window_id} not found.")
 
 
+# A virtual list registers its range builder under its item builder's name plus this.
+RANGE_BUILDER_SUFFIX = "__range"
+
+
 class Api(QObject):
     def __init__(self):
         super().__init__()
@@ -349,6 +357,10 @@ class Api(QObject):
         self.callbacks[name] = callback
         # print("Callbacks: ", self.callbacks)
 
+    def unregister_callback(self, name):
+        """Removes a single callback; unknown names are ignored."""
+        self.callbacks.pop(name, None)
+
     def clear_callbacks(self):
         """Removes all registered callbacks."""
         print("API: Clearing all callbacks.")
@@ -360,7 +372,8 @@ class Api(QObject):
     def on_pressed(self, callback_name, *args):
         if callback_name in self.callbacks:
             for x in args[0]: f"webwiget arg: {x}"
-            self.callbacks[callback_name](*args)
+            with handling_input():
+                self.callbacks[callback_name](*args)
 
             return f"Callback '{callback_name}' executed successfully."
         else:
@@ -370,7 +383,8 @@ class Api(QObject):
     def on_pressed_str(self, callback_name):
         if callback_name in self.callbacks:
             # print("callbacks: ", self.callbacks)
-            self.callbacks[callback_name]()
+            with handling_input():
+                self.callbacks[callback_name]()
 
             return f"Callback '{callback_name}' executed successfully."
         else:
@@ -386,11 +400,12 @@ class Api(QObject):
         if callback:
             try:
                 # The callback will be the state method (e.g., self.on_username_changed)
-                callback(value)
-            except Exception as e:
-                print(f"Error executing input callback '{callback_name}': {e}")
+                with handling_input():
+                    callback(value)
+            except Exception:
+                logger.exception("Error executing input callback '%s'", callback_name)
         else:
-            print(f"Warning: Input callback '{callback_name}' not found.")
+            logger.warning("Input callback '%s' not found.", callback_name)
 
      # --- ADD THIS NEW SLOT FOR THE SLIDER ---
     @Slot(str, float, bool, result=None)
@@ -400,14 +415,15 @@ class Api(QObject):
         Executes the registered callback with the new float value.
         """
         callback = self.callbacks.get(callback_name)
-        print("callback drag_ended: ", drag_ended)
+        logger.debug("Slider callback '%s': value=%s drag_ended=%s", callback_name, value, drag_ended)
         if callback:
             try:
-                callback(value, drag_ended)
-            except Exception as e:
-                print(f"Error executing slider callback '{callback_name}': {e}")
+                with handling_input():
+                    callback(value, drag_ended)
+            except Exception:
+                logger.exception("Error executing slider callback '%s'", callback_name)
         else:
-            print(f"Warning: Slider callback '{callback_name}' not found.")
+            logger.warning("Slider callback '%s' not found.", callback_name)
     # --- END OF NEW SLOT ---
 
     @Slot(str, int)
@@ -433,13 +449,30 @@ class Api(QObject):
             try:
                 # This call now returns a dict: {"html": "...", "css": "..."}
                 return callback(index)
-            except Exception as e:
-                print(f"Error executing item builder '{builder_name}' for index {index}: {e}")
+            except Exception:
+                logger.exception("Error executing item builder '%s' for index %s", builder_name, index)
                 return {"html": "<div>Error</div>", "css": ""}
         else:
-            print(f"Warning: Item builder '{builder_name}' not found.")
+            logger.warning("Item builder '%s' not found.", builder_name)
             return {"html": "<div>Builder not found</div>", "css": ""}
 
+    @Slot(str, int, int, result='QVariantMap')
+    def build_list_items(self, builder_name, start, end):
+        """
+        Called by the virtual list JS engine to build the items in
+        [start, end) with one round trip instead of one per item.
+        """
+        callback = self.callbacks.get(f"{builder_name}{RANGE_BUILDER_SUFFIX}")
+        if callback and callable(callback):
+            try:
+                # {"items": {index: {"html": ...}}, "css": "...", "evicted": [...], "version": n}
+                return callback(start, end)
+            except Exception:
+                logger.exception("Error executing item builder '%s' for items %s-%s", builder_name, start, end)
+        else:
+            logger.warning("Range item builder '%s' not found.", builder_name)
+        return {"items": {}, "css": ""}
+
     # --- ADD THIS NEW GENERIC SLOT ---
     @Slot(str, 'QVariantMap', result=None)
     def on_gesture_event(self, callback_name, details):
@@ -447,22 +480,23 @@ class Api(QObject):
         Generic slot to handle all events from the GestureDetector JS engine.
         """
         callback = self.callbacks.get(callback_name)
-        print("Callback tap debug info: ",callback, " " ,details)
+        logger.debug("Gesture callback '%s': %s", callback_name, details)
         if callback:
             try:
-                # Based on the callback name, we can construct the correct data class.
-                if "pupdate" in callback_name:
-                    # For PanUpdate, details is a dict {'dx': float, 'dy': float}
-                    callback(PanUpdateDetails(dx=details.get('dx', 0), dy=details.get('dy', 0)))
-                elif "tap" in callback_name and "dbtap" not in callback_name:
-                    callback(TapDetails())
-                else:
-                    # For DoubleTap, LongPress, PanStart, PanEnd, no details are needed.
-                    callback()
-            except Exception as e:
-                print(f"Error executing gesture callback '{callback_name}': {e}")
+                with handling_input():
+                    # Based on the callback name, we can construct the correct data class.
+                    if "pupdate" in callback_name:
+                        # For PanUpdate, details is a dict {'dx': float, 'dy': float}
+                        callback(PanUpdateDetails(dx=details.get('dx', 0), dy=details.get('dy', 0)))
+                    elif "tap" in callback_name and "dbtap" not in callback_name:
+                        callback(TapDetails())
+                    else:
+                        # For DoubleTap, LongPress, PanStart, PanEnd, no details are needed.
+                        callback()
+            except Exception:
+                logger.exception("Error executing gesture callback '%s'", callback_name)
         else:
-            print(f"Warning: Gesture callback '{callback_name}' not found.")
+            logger.warning("Gesture callback '%s' not found.", callback_name)
 
 
 # Create a global instance of the WindowManager